@@ -48,6 +48,7 @@ def get_stats():
             'total_users': len(users),
             'active_users': active_users,
             'total_leases': len(all_leases),
+            'database_pool': database.get_pool_stats(),
         }
         
         return jsonify({'success': True, 'stats': stats})
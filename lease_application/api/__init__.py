@@ -19,10 +19,47 @@ from auth import require_login
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 
+# Query parameters of the lease lists -> leases columns
+_LEASE_LIST_FILTERS = {
+    'cost_center': 'cost_centre',
+    'entity': 'group_entity_name',
+    'asset_class': 'asset_class',
+    'profit_center': 'profit_center',
+}
+
+
+def _list_leases(user_id: int, is_admin: bool):
+    """
+    Leases for the list endpoints, filtered in SQL
+
+    Without limit or cursor query parameters every matching lease is returned.
+    With them, one page (newest first) is returned along with the cursor of the
+    next page, which is None on the last page. Returns (leases, next_cursor,
+    error response).
+    """
+    filters = {column: request.args.get(arg) for arg, column in _LEASE_LIST_FILTERS.items()}
+    cursor = request.args.get('cursor') or None
+    limit = request.args.get('limit', type=int)
+    paged = cursor is not None or limit is not None
+    try:
+        if is_admin:
+            leases = database.get_all_leases_admin(filters=filters, after=cursor, limit=limit)
+        else:
+            leases = database.get_all_leases(user_id, filters=filters, after=cursor, limit=limit)
+    except ValueError as e:
+        return None, None, (jsonify({'error': str(e)}), 400)
+    
+    next_cursor = None
+    page_size = max(1, min(limit or database.LEASE_PAGE_SIZE, database.MAX_LEASE_PAGE_SIZE))
+    if paged and len(leases) >= page_size:
+        next_cursor = database.lease_page_cursor(leases[-1])
+    return leases, next_cursor, None
+
+
 @api_bp.route('/leases', methods=['GET'])
 @require_login
 def get_leases():
-    """Get all leases for current user (or all leases if admin)"""
+    """Get all leases for current user (or all leases if admin), optionally filtered and paged"""
     user_id = session['user_id']
     
     # Check if user is admin
@@ -31,13 +68,12 @@ def get_leases():
     
     logger.info(f"📋 GET /api/leases - User {user_id} {'(Admin)' if is_admin else ''} fetching leases")
     
-    if is_admin:
-        leases = database.get_all_leases_admin()
-    else:
-        leases = database.get_all_leases(user_id)
+    leases, next_cursor, error = _list_leases(user_id, is_admin)
+    if error:
+        return error
     
     logger.info(f"Found {len(leases)} leases for user {user_id}")
-    return jsonify({'success': True, 'leases': leases})
+    return jsonify({'success': True, 'leases': leases, 'next_cursor': next_cursor})
 
 
 @api_bp.route('/leases/<int:lease_id>', methods=['GET'])
@@ -54,8 +90,7 @@ def get_lease(lease_id):
     
     if is_admin:
         # Admin can access any lease
-        all_leases = database.get_all_leases_admin()
-        lease = next((l for l in all_leases if l['lease_id'] == lease_id), None)
+        lease = database.get_leases_by_ids([lease_id]).get(lease_id)
     else:
         # Regular user can only access their own leases
         lease = database.get_lease(lease_id, user_id)
@@ -287,8 +322,7 @@ def update_lease(lease_id):
     # For admin, use save_lease_admin; for regular users, use regular save_lease
     if is_admin:
         # Admin can update any lease - need to find original user_id
-        all_leases = database.get_all_leases_admin()
-        original_lease = next((l for l in all_leases if l['lease_id'] == lease_id), None)
+        original_lease = database.get_leases_by_ids([lease_id]).get(lease_id)
         if original_lease:
             updated_id = database.save_lease(original_lease['user_id'], filtered_data)
         else:
@@ -316,31 +350,13 @@ def get_leases_for_bulk():
     
     logger.info(f"📋 GET /api/leases/bulk - User {user_id} {'(Admin)' if is_admin else ''} fetching leases for bulk processing")
     
-    # Get optional filters from query parameters
-    cost_center = request.args.get('cost_center')
-    entity = request.args.get('entity')
-    asset_class = request.args.get('asset_class')
-    profit_center = request.args.get('profit_center')
+    # Optional filters (cost_center, entity, asset_class, profit_center) and paging
+    leases, next_cursor, error = _list_leases(user_id, is_admin)
+    if error:
+        return error
     
-    # Get all leases - admin gets all, regular user gets their own
-    if is_admin:
-        leases = database.get_all_leases_admin()
-    else:
-        leases = database.get_all_leases(user_id)
-    
-    # Apply filters if provided
-    filtered_leases = leases
-    if cost_center:
-        filtered_leases = [l for l in filtered_leases if l.get('cost_centre') == cost_center]
-    if entity:
-        filtered_leases = [l for l in filtered_leases if l.get('group_entity_name') == entity]
-    if asset_class:
-        filtered_leases = [l for l in filtered_leases if l.get('asset_class') == asset_class]
-    if profit_center:
-        filtered_leases = [l for l in filtered_leases if l.get('profit_center') == profit_center]
-    
-    logger.info(f"Found {len(filtered_leases)} leases (filtered from {len(leases)})")
-    return jsonify({'success': True, 'leases': filtered_leases})
+    logger.info(f"Found {len(leases)} leases")
+    return jsonify({'success': True, 'leases': leases, 'next_cursor': next_cursor})
 
 
 @api_bp.route('/leases/<int:lease_id>', methods=['DELETE'])
@@ -357,8 +373,7 @@ def delete_lease(lease_id):
     
     if is_admin:
         # Admin can delete any lease - need to find original user_id
-        all_leases = database.get_all_leases_admin()
-        original_lease = next((l for l in all_leases if l['lease_id'] == lease_id), None)
+        original_lease = database.get_leases_by_ids([lease_id]).get(lease_id)
         if original_lease:
             success = database.delete_lease(lease_id, original_lease['user_id'])
         else:
@@ -38,8 +38,7 @@ def submit_for_approval_api():
             return jsonify({'success': False, 'error': 'Admin and reviewer changes are automatically approved. No approval submission needed.'}), 400
         
         if is_admin:
-            all_leases = database.get_all_leases_admin()
-            lease = next((l for l in all_leases if l['lease_id'] == lease_id), None)
+            lease = database.get_leases_by_ids([lease_id]).get(lease_id)
         else:
             lease = database.get_lease(lease_id, user_id)
         
@@ -151,8 +150,7 @@ def get_approval_history_api(lease_id):
         is_admin = user and user.get('role') == 'admin'
         
         if is_admin:
-            all_leases = database.get_all_leases_admin()
-            lease = next((l for l in all_leases if l['lease_id'] == lease_id), None)
+            lease = database.get_leases_by_ids([lease_id]).get(lease_id)
         else:
             lease = database.get_lease(lease_id, user_id)
         
@@ -5,7 +5,8 @@ Handles lease calculation requests and returns schedules, journal entries, and r
 VBA Source: VB script/Code, compu() Sub
 """
 
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, Response, json, request, jsonify, session, stream_with_context
+from dataclasses import replace
 from datetime import date, datetime
 from typing import Optional, List
 import logging
@@ -32,6 +33,51 @@ def _parse_date(date_str: Optional[str]) -> Optional[date]:
         return None
 
 
+def _parse_auto_id(value) -> int:
+    """Parse auto_id; missing or non-numeric values mean 'not a stored lease' (0)"""
+    try:
+        return int(value or 0)
+    except (ValueError, TypeError):
+        return 0
+
+
+def _projection_options(data: dict) -> dict:
+    """
+    ProcessingFilters projection fields from a request: extended_projections,
+    projection_periods and projection_period_months (omitted fields keep their
+    defaults). With extended_projections, projection_periods null projects to lease end.
+    Raises ValueError for values that do not parse.
+    """
+    options = {}
+    if 'extended_projections' in data:
+        options['extended_projections'] = str(data['extended_projections']).lower() in ['yes', 'on', 'true', '1']
+    if 'projection_periods' in data:
+        periods = data['projection_periods']
+        if periods is None or periods == '':
+            if not options.get('extended_projections'):
+                raise ValueError("projection_periods can only be null with extended_projections")
+            options['projection_periods'] = None
+        else:
+            options['projection_periods'] = int(periods)
+    if data.get('projection_period_months'):
+        options['projection_period_months'] = int(data['projection_period_months'])
+    return options
+
+
+def _modified_lease(lease_data: LeaseData, user_scope: Optional[int]) -> Optional[LeaseData]:
+    """
+    The stored lease lease_data modifies (modifies_this_id), or None if it is not
+    found; user_scope as in database.get_leases_by_ids()
+    """
+    if not lease_data.modifies_this_id or lease_data.modifies_this_id <= 0:
+        return None
+    modified = database.get_leases_by_ids([lease_data.modifies_this_id], user_scope, as_lease_data=True)
+    previous_lease = modified.get(lease_data.modifies_this_id)
+    if previous_lease is None:
+        logger.warning(f"⚠️  Modified lease {lease_data.modifies_this_id} not found - modification not applied")
+    return previous_lease
+
+
 @calc_bp.route('/calculate_lease', methods=['POST'])
 def calculate_lease():
     """
@@ -60,7 +106,7 @@ def calculate_lease():
         
         # Parse lease data from form
         lease_data = LeaseData(
-            auto_id=data.get('auto_id', 1),
+            auto_id=_parse_auto_id(data.get('auto_id')),  # 0: not a stored lease
             description=data.get('description', ''),
             asset_class=data.get('asset_class', ''),
             asset_id_code=data.get('asset_id_code', ''),
@@ -192,95 +238,103 @@ def calculate_lease():
         if not to_date:
             to_date = lease_data.end_date or date.today()
         
+        try:
+            projection_options = _projection_options(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Create filters
         filters = ProcessingFilters(
             start_date=from_date,
             end_date=to_date,
-            gaap_standard=data.get('gaap_standard', 'IFRS')
+            gaap_standard=data.get('gaap_standard', 'IFRS'),
+            **projection_options
         )
         
         # Set gaap_standard on lease_data so it's available for schedule generation
         lease_data.gaap_standard = filters.gaap_standard
         
         # Import here to avoid circular imports
-        from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
+        from lease_accounting.schedule.generator_vba_complete import iter_schedule, with_carried_row
         from lease_accounting.core.processor import LeaseProcessor
         from lease_accounting.utils.journal_generator import JournalGenerator
         
-        # Generate full schedule (VBA: datessrent + basic_calc)
-        logger.info("📅 Generating payment schedule...")
-        full_schedule = generate_complete_schedule(lease_data)
+        # The lease this one modifies is only readable by a logged-in user who may see it
+        previous_lease = None
+        if session.get('user_id'):
+            previous_lease = _modified_lease(lease_data, _results_scope(session['user_id']))
+            if previous_lease:
+                previous_lease.gaap_standard = filters.gaap_standard
+        processor = LeaseProcessor(replace(filters, results_only=True, compact_schedules=True))
         
-        if not full_schedule:
+        # Schedule rows (VBA: datessrent + basic_calc), generated as they are streamed into
+        # the response - the full list of rows is not held
+        # VBA: If to_date is not a payment date, INSERT row and COPY values from previous row
+        # Note: VBA always shows full schedule, only opening/closing balances change with date range
+        logger.info("📅 Generating payment schedule...")
+        modified_schedule = None
+        if previous_lease:
+            # A modifying lease is regenerated from the modified lease's balances
+            # (VBA modify_calc()); its full schedule is shown and the results read from it
+            modified_schedule = processor.lease_schedule(lease_data, previous_lease=previous_lease)
+            schedule_rows = with_carried_row(iter(modified_schedule or []), to_date)
+        else:
+            schedule_rows = iter_schedule(lease_data, insert_date=to_date)
+        first_row = next(schedule_rows, None)
+        
+        if first_row is None:
             return jsonify({'error': 'Failed to generate schedule - check lease parameters'}), 400
         
-        logger.info(f"✅ Generated {len(full_schedule)} schedule rows")
-        
-        # Process lease (VBA: compu() main logic)
+        # Process lease (VBA: compu() main logic); results come from the rows up to the
+        # reporting horizon, without month-end rows outside the reporting window
         logger.info("🔄 Processing lease...")
-        processor = LeaseProcessor(filters)
-        result = processor.process_single_lease(lease_data)
+        if modified_schedule is not None:
+            result = processor.result_from_schedule(lease_data, modified_schedule)
+        else:
+            result = processor.process_single_lease(lease_data)
         
         if not result:
             return jsonify({'error': 'Failed to process lease'}), 400
         
         logger.info(f"✅ Lease processed: Opening Liability={result.opening_lease_liability:,.2f}, Closing={result.closing_lease_liability_current + result.closing_lease_liability_non_current:,.2f}")
         
-        # Filter schedule by date range if provided (VBA: Only summary changes, schedule always full)
-        # Note: VBA always shows full schedule, only opening/closing balances change with date range
-        schedule = list(full_schedule)
-        
-        # VBA: If to_date is not a payment date, INSERT row and COPY values from previous row
-        if to_date:
-            # Check if to_date exists in schedule
-            to_date_exists = any(row.date == to_date for row in schedule)
-            
-            if not to_date_exists:
-                # Find where to insert
-                for i, row in enumerate(schedule):
-                    if row.date > to_date:
-                        # Insert new row before this one, copying previous row values
-                        prev_row = schedule[i-1] if i > 0 else row
-                        from lease_accounting.core.models import PaymentScheduleRow
-                        new_row = PaymentScheduleRow(
-                            date=to_date,
-                            rental_amount=0.0,  # No payment on interpolated row
-                            pv_factor=prev_row.pv_factor,
-                            interest=0.0,
-                            lease_liability=prev_row.lease_liability,
-                            pv_of_rent=0.0,
-                            rou_asset=prev_row.rou_asset,
-                            depreciation=0.0,
-                            change_in_rou=0.0,
-                            security_deposit_pv=prev_row.security_deposit_pv,
-                            aro_gross=prev_row.aro_gross,
-                            aro_interest=0.0,
-                            aro_provision=prev_row.aro_provision,
-                            principal=0.0,
-                            remaining_balance=None
-                        )
-                        schedule.insert(i, new_row)
-                        break
-        
-        # Generate journal entries
+        # Generate journal entries (from the results; the schedule is not read)
         logger.info("📝 Generating journal entries...")
         journal_gen = JournalGenerator(gaap_standard=filters.gaap_standard)  # Use GAAP from filters
-        journals = journal_gen.generate_journals(result, schedule, None)
+        journals = journal_gen.generate_journals(result, [], None)
         
         # Prepare response
-        response = {
-            'lease_result': result.to_dict(),
-            'schedule': [row.to_dict() for row in schedule],
-            'journal_entries': [j.to_dict() for j in journals],
-            'date_range': {
-                'filtered': bool(from_date or to_date),
-                'from_date': from_date.isoformat() if from_date else None,
-                'to_date': to_date.isoformat() if to_date else None,
-            }
+        date_range = {
+            'filtered': bool(from_date or to_date),
+            'from_date': from_date.isoformat() if from_date else None,
+            'to_date': to_date.isoformat() if to_date else None,
         }
         
-        logger.info("✅ Calculation complete")
-        return jsonify(response)
+        # Everything but the schedule is serialized before the response starts, so
+        # errors in it are still reported with a 500
+        head = ('{"lease_result": ' + json.dumps(result.to_dict())
+                + ', "journal_entries": ' + json.dumps([j.to_dict() for j in journals])
+                + ', "date_range": ' + json.dumps(date_range)
+                + ', "schedule": [' + json.dumps(first_row.to_dict()))
+        
+        def generate_response():
+            # Same JSON object as before, with the schedule rows written as they are generated.
+            # The status is sent with the first chunk: a later error closes the schedule
+            # and is reported in an "error" member, keeping the document valid JSON.
+            yield head
+            count = 1
+            try:
+                for row in schedule_rows:
+                    yield ', ' + json.dumps(row.to_dict())
+                    count += 1
+            except Exception as e:
+                logger.error(f"❌ Error streaming schedule after {count} rows: {e}", exc_info=True)
+                yield '], "error": ' + json.dumps(str(e)) + '}'
+                return
+            yield ']}'
+            logger.info(f"✅ Calculation complete: {count} schedule rows")
+        
+        return Response(stream_with_context(generate_response()), mimetype='application/json')
     
     except Exception as e:
         logger.error(f"❌ Error in calculate_lease: {e}", exc_info=True)
@@ -330,6 +384,11 @@ def calculate_leases():
         
         logger.info(f"   Processing {len(lease_ids)} leases from {from_date} to {to_date}")
         
+        try:
+            projection_options = _projection_options(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Parse additional filters
         filters = ProcessingFilters(
             start_date=from_date,
@@ -340,26 +399,22 @@ def calculate_leases():
             entity_filter=data.get('entity'),
             asset_class_filter=data.get('asset_class'),
             profit_center_filter=data.get('profit_center'),
-            gaap_standard=data.get('gaap_standard', 'IFRS')
+            gaap_standard=data.get('gaap_standard', 'IFRS'),
+            results_only=True,  # Bulk results do not return schedules
+            compact_schedules=True,
+            **projection_options
         )
         
         # Load lease data from database
+        # Admin can load any lease, regular user only their own
+        loaded = database.get_leases_by_ids(lease_ids, None if is_admin else user_id, as_lease_data=True)
         lease_data_list = []
         for lease_id in lease_ids:
-            # Admin can load any lease, regular user only their own
-            if is_admin:
-                all_leases_admin = database.get_all_leases_admin()
-                lease_dict = next((l for l in all_leases_admin if l['lease_id'] == lease_id), None)
-            else:
-                lease_dict = database.get_lease(lease_id, user_id)
-            
-            if not lease_dict:
+            lease_data = loaded.get(int(lease_id))
+            if not lease_data:
                 logger.warning(f"⚠️  Lease {lease_id} not found")
                 continue
             
-            # Convert dict to LeaseData
-            lease_data = _dict_to_lease_data(lease_dict)
-            lease_data.auto_id = lease_id
             # Set gaap_standard from filters so it's available for schedule generation
             lease_data.gaap_standard = filters.gaap_standard
             lease_data_list.append(lease_data)
@@ -373,29 +428,15 @@ def calculate_leases():
         include_gaap_comparison = data.get('include_gaap_comparison', False)
         gaap_comparison_results = {}
         
+        results_processor = ResultsProcessor(filters)
         if include_gaap_comparison:
-            # Calculate for all GAAP standards
-            for gaap_std in ['IFRS', 'IndAS', 'US-GAAP']:
-                logger.info(f"   Computing results for {gaap_std}...")
-                gaap_filters = ProcessingFilters(
-                    start_date=from_date,
-                    end_date=to_date,
-                    start_lease_id=data.get('start_lease_id'),
-                    end_lease_id=data.get('end_lease_id'),
-                    cost_center_filter=data.get('cost_center'),
-                    entity_filter=data.get('entity'),
-                    asset_class_filter=data.get('asset_class'),
-                    profit_center_filter=data.get('profit_center'),
-                    gaap_standard=gaap_std
-                )
-                
-                # Set GAAP standard on each lease data
-                for lease_data in lease_data_list:
-                    lease_data.gaap_standard = gaap_std
-                
-                # Process with this GAAP standard
-                gaap_results_processor = ResultsProcessor(gaap_filters)
-                gaap_bulk_results = gaap_results_processor.process_bulk_leases(lease_data_list)
+            # Calculate for all GAAP standards - schedules are generated once per lease,
+            # only depreciation/ROU are computed per standard
+            logger.info("   Computing results for IFRS, IndAS and US-GAAP...")
+            bulk_results_by_standard = results_processor.process_bulk_leases_by_standard(
+                lease_data_list, ['IFRS', 'IndAS', 'US-GAAP']
+            )
+            for gaap_std, gaap_bulk_results in bulk_results_by_standard.items():
                 gaap_comparison_results[gaap_std] = {
                     'results': gaap_bulk_results['results'],
                     'aggregated_totals': gaap_bulk_results['aggregated_totals'],
@@ -406,52 +447,20 @@ def calculate_leases():
                     }
                 }
         
-        # Process bulk leases for the selected GAAP standard
-        results_processor = ResultsProcessor(filters)
-        bulk_results = results_processor.process_bulk_leases(lease_data_list)
-        
-        # Save results summary to database
-        import json
-        summary_data = {
-            'summary_id': None,
-            'user_id': user_id,
-            'calculation_date': datetime.now().isoformat(),
-            'from_date': from_date.isoformat(),
-            'to_date': to_date.isoformat(),
-            'filters_applied': json.dumps({
-                'cost_center': filters.cost_center_filter,
-                'entity': filters.entity_filter,
-                'asset_class': filters.asset_class_filter,
-                'profit_center': filters.profit_center_filter,
-                'gaap_standard': filters.gaap_standard
-            }),
-            'results_data': json.dumps(bulk_results['results']),
-            'aggregated_totals': json.dumps(bulk_results['aggregated_totals']),
-            'consolidated_journals': json.dumps(bulk_results['consolidated_journals']),
-            'processed_count': bulk_results['processed_count'],
-            'skipped_count': bulk_results['skipped_count']
-        }
-        
-        # Save to database  
-        with database.get_db_connection() as conn:
-            cursor = conn.execute("""
-                INSERT INTO results_summary 
-                (user_id, from_date, to_date, filters_applied, results_data, 
-                 aggregated_totals, consolidated_journals, processed_count, skipped_count)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                summary_data['user_id'],
-                summary_data['from_date'],
-                summary_data['to_date'],
-                summary_data['filters_applied'],
-                summary_data['results_data'],
-                summary_data['aggregated_totals'],
-                summary_data['consolidated_journals'],
-                summary_data['processed_count'],
-                summary_data['skipped_count']
-            ))
-            summary_id = cursor.lastrowid
-            summary_data['summary_id'] = summary_id
+        # Process bulk leases for the selected GAAP standard (already done if compared)
+        if include_gaap_comparison and filters.gaap_standard in bulk_results_by_standard:
+            bulk_results = bulk_results_by_standard[filters.gaap_standard]
+        else:
+            bulk_results = results_processor.process_bulk_leases(lease_data_list)
+        
+        # Save results to database (per-lease rows plus compressed journals and totals)
+        summary_id = database.save_bulk_results(user_id, from_date, to_date, {
+            'cost_center': filters.cost_center_filter,
+            'entity': filters.entity_filter,
+            'asset_class': filters.asset_class_filter,
+            'profit_center': filters.profit_center_filter,
+            'gaap_standard': filters.gaap_standard
+        }, bulk_results)
         
         logger.info(f"✅ Bulk processing complete: {bulk_results['processed_count']} processed, {bulk_results['skipped_count']} skipped")
         
@@ -461,10 +470,10 @@ def calculate_leases():
             from lease_accounting.utils.disclosures_generator import DisclosuresGenerator
             from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
             
-            # Generate schedules for all leases
+            # Generate schedules for all leases (column-oriented - all are held until disclosures are built)
             schedule_list = []
             for lease_data in lease_data_list:
-                schedule = generate_complete_schedule(lease_data)
+                schedule = generate_complete_schedule(lease_data, as_frame=True)
                 schedule_list.append(schedule or [])
             
             # Get results for disclosures
@@ -507,54 +516,66 @@ def calculate_leases():
         return jsonify({'error': str(e)}), 500
 
 
-def _dict_to_lease_data(lease_dict: dict) -> LeaseData:
-    """Convert database lease dict to LeaseData object"""
-    manual_adj_value = lease_dict.get('manual_adj', 'No')
-    manual_adj = "Yes" if str(manual_adj_value).lower() in ['yes', 'on', 'true', '1'] else "No"
-    
-    lease_data = LeaseData(
-        auto_id=lease_dict.get('lease_id', 0),
-        description=lease_dict.get('description', ''),
-        asset_class=lease_dict.get('asset_class', ''),
-        asset_id_code=lease_dict.get('asset_id_code', ''),
-        lease_start_date=_parse_date(lease_dict.get('lease_start_date')),
-        first_payment_date=_parse_date(lease_dict.get('first_payment_date')),
-        end_date=_parse_date(lease_dict.get('end_date')),
-        agreement_date=_parse_date(lease_dict.get('agreement_date')),
-        termination_date=_parse_date(lease_dict.get('termination_date')),
-        tenure=float(lease_dict.get('tenure', 0) or 0),
-        frequency_months=int(lease_dict.get('frequency_months', 1) or 1),
-        day_of_month=str(lease_dict.get('day_of_month', '1')),
-        auto_rentals=lease_dict.get('auto_rentals', 'Yes'),
-        manual_adj=manual_adj,
-        rental_1=float(lease_dict.get('rental_1', 0) or 0),
-        rental_2=float(lease_dict.get('rental_2', 0) or 0),
-        escalation_start=_parse_date(lease_dict.get('escalation_start_date')),
-        escalation_percent=float(lease_dict.get('escalation_percent', 0) or 0),
-        esc_freq_months=int(lease_dict.get('esc_freq_months', 12) or 12),
-        accrual_day=int(lease_dict.get('accrual_day', 1) or 1),
-        borrowing_rate=float(lease_dict.get('borrowing_rate', 0) or 0),
-        compound_months=int(lease_dict.get('compound_months')) if lease_dict.get('compound_months') else None,
-        currency=lease_dict.get('currency', 'USD'),
-        cost_centre=lease_dict.get('cost_centre', ''),
-        counterparty=lease_dict.get('counterparty', ''),
-        security_deposit=float(lease_dict.get('security_deposit', 0) or 0),
-        security_discount=float(lease_dict.get('security_discount', 0) or 0),
-        aro=float(lease_dict.get('aro', 0) or 0),
-        aro_table=int(lease_dict.get('aro_table', 0) or 0),
-        initial_direct_expenditure=float(lease_dict.get('initial_direct_expenditure', 0) or 0),
-        lease_incentive=float(lease_dict.get('lease_incentive', 0) or 0),
-        sublease=lease_dict.get('sublease', 'No'),
-        date_modified=_parse_date(lease_dict.get('date_modified')),
-        profit_center=lease_dict.get('profit_center', ''),
-        group_entity_name=lease_dict.get('group_entity_name', ''),
-        short_term_lease_ifrs=lease_dict.get('shortterm_lease_ifrs_indas', 'No'),
-        short_term_lease_usgaap=lease_dict.get('finance_lease_usgaap', 'No'),
-    )
+# Query parameters of the stored results -> results_leases columns
+_RESULT_FILTERS = {
+    'entity': 'group_entity_name',
+    'cost_center': 'cost_centre',
+    'asset_class': 'asset_class',
+    'profit_center': 'profit_center',
+}
+
+
+def _results_scope(user_id: int) -> Optional[int]:
+    """user_id whose runs the user may read, None for admins (any run)"""
+    user = database.get_user(user_id)
+    return None if user and user.get('role') == 'admin' else user_id
+
+
+@calc_bp.route('/results/<int:summary_id>', methods=['GET'])
+@require_login
+def get_bulk_results(summary_id):
+    """
+    A stored bulk run: filters, counts and aggregated totals
     
-    # Parse manual rental dates and amounts from database if stored as JSON
-    # Note: Database doesn't store rental_dates directly, so we'll need to reconstruct
-    # from rental_date_2, rental_date_3, etc. if they're stored separately
-    # For now, rental_dates will be empty and populated from payload when calculating
+    ?include_journals=true adds the consolidated journals. The per-lease
+    results are paged by /results/<summary_id>/leases.
+    """
+    try:
+        include_journals = request.args.get('include_journals', '').lower() in ('1', 'true', 'yes')
+        summary = database.get_bulk_results(summary_id, _results_scope(session['user_id']), include_journals)
+        if not summary:
+            return jsonify({'error': 'Results not found'}), 404
+        return jsonify({'success': True, 'summary': summary})
+    except Exception as e:
+        logger.error(f"❌ Error in get_bulk_results: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
+@calc_bp.route('/results/<int:summary_id>/leases', methods=['GET'])
+@require_login
+def get_bulk_result_leases(summary_id):
+    """
+    Per-lease results of a stored bulk run, filtered and paged
     
-    return lease_data
+    Filters: entity, cost_center, asset_class, profit_center. Paging: limit and
+    cursor (the next_cursor of the previous page); all rows without them.
+    """
+    try:
+        if not database.get_bulk_results(summary_id, _results_scope(session['user_id'])):
+            return jsonify({'error': 'Results not found'}), 404
+        
+        filters = {column: request.args.get(arg) for arg, column in _RESULT_FILTERS.items()}
+        after = request.args.get('cursor', type=int)
+        limit = request.args.get('limit', type=int)
+        rows = database.get_bulk_result_rows(summary_id, filters, after, limit)
+        
+        next_cursor = None
+        page_size = max(1, min(limit or database.LEASE_PAGE_SIZE, database.MAX_LEASE_PAGE_SIZE))
+        if (after is not None or limit is not None) and len(rows) >= page_size:
+            next_cursor = rows[-1]['position']
+        return jsonify({'success': True, 'results': rows, 'next_cursor': next_cursor})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"❌ Error in get_bulk_result_leases: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
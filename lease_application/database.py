@@ -1,15 +1,18 @@
 """
 Database layer for Lease Management System
 """
+import os
 import sqlite3
+import threading
 from datetime import date, datetime
-from typing import List, Dict, Optional
+from typing import Any, Iterable, List, Dict, Optional, Tuple
 import bcrypt
 from contextlib import contextmanager
 import base64
 import hashlib
 from cryptography.fernet import Fernet
 import logging
+from lease_accounting.core.models import LeaseData
 
 logger = logging.getLogger(__name__)
 
@@ -41,342 +44,582 @@ def _decrypt_text(encrypted_text: str) -> str:
 
 DATABASE_PATH = "lease_management.db"
 
+# SQLite connection settings (LEASE_SQLITE_* environment variables override)
+# Idle connections kept for reuse; a thread holds one connection while it is checked out
+SQLITE_POOL_SIZE = int(os.environ.get('LEASE_SQLITE_POOL_SIZE', 8))
+# Page cache per connection, in KiB (PRAGMA cache_size takes negative values as KiB)
+SQLITE_CACHE_KB = int(os.environ.get('LEASE_SQLITE_CACHE_KB', 65536))
+SQLITE_MMAP_BYTES = int(os.environ.get('LEASE_SQLITE_MMAP_BYTES', 256 * 1024 * 1024))
+# Prepared statements cached per connection
+SQLITE_STATEMENT_CACHE = int(os.environ.get('LEASE_SQLITE_STATEMENT_CACHE', 256))
+# How long a writer waits for another writer's lock
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('LEASE_SQLITE_BUSY_TIMEOUT_MS', 30000))
+
+
+class ConnectionPool:
+    """
+    Pooled SQLite connections in WAL mode
+
+    A thread checks out one connection for its outermost get_db_connection() block and
+    gets the same connection back in nested blocks, which run as savepoints; the
+    outermost block commits or rolls back. Connections are returned to an idle list
+    (at most max_idle) and reused by the next block in any thread, keeping their page
+    and prepared statement caches. In WAL mode readers see the last committed data
+    while a writer inserts, so dashboard reads do not wait for bulk writes.
+    Connections opened before a fork are not reused in the child process.
+    """
+
+    def __init__(self, max_idle: int = SQLITE_POOL_SIZE):
+        self.max_idle = max_idle
+        self._idle: List[Tuple[str, sqlite3.Connection]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self.in_use = 0
+        self.opened = 0
+        self.closed = 0
+        self.checkouts = 0
+        self.reuses = 0
+        self.nested = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    @contextmanager
+    def connection(self, path: str):
+        """Connection for path: the thread's current one inside another block, else a pooled one"""
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is not None and local.path == path and local.pid == os.getpid():
+            with self._savepoint(conn):
+                yield conn
+            return
+
+        conn = self._checkout(path)
+        outer = (getattr(local, 'conn', None), getattr(local, 'path', None), getattr(local, 'pid', None),
+                 getattr(local, 'depth', 0))
+        local.conn, local.path, local.pid, local.depth = conn, path, os.getpid(), 0
+        try:
+            yield conn
+            conn.commit()
+            with self._lock:
+                self.commits += 1
+        except Exception:
+            conn.rollback()
+            with self._lock:
+                self.rollbacks += 1
+            raise
+        finally:
+            local.conn, local.path, local.pid, local.depth = outer
+            self._checkin(path, conn)
+
+    @contextmanager
+    def _savepoint(self, conn: sqlite3.Connection):
+        """Nested block: rolls back its own statements on error, commits with the outermost block"""
+        local = self._local
+        local.depth += 1
+        name = f"nested_{local.depth}"
+        with self._lock:
+            self.nested += 1
+        conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield
+        except Exception:
+            if conn.in_transaction:
+                conn.execute(f"ROLLBACK TO {name}")
+                conn.execute(f"RELEASE {name}")
+            raise
+        else:
+            if conn.in_transaction:
+                conn.execute(f"RELEASE {name}")
+        finally:
+            local.depth -= 1
+
+    def _checkout(self, path: str) -> sqlite3.Connection:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the parent's connections must not be used here
+                self._idle = []
+                self.in_use = 0
+                self._pid = os.getpid()
+            self.checkouts += 1
+            self.in_use += 1
+            for index in range(len(self._idle) - 1, -1, -1):
+                if self._idle[index][0] == path:
+                    self.reuses += 1
+                    conn = self._idle.pop(index)[1]
+                    # In case a helper replaced it on the connection
+                    conn.row_factory = sqlite3.Row
+                    return conn
+        try:
+            conn = _open_connection(path)
+        except Exception:
+            with self._lock:
+                self.in_use -= 1
+            raise
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    def _checkin(self, path: str, conn: sqlite3.Connection) -> None:
+        keep = False
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+            if self._pid == os.getpid() and not conn.in_transaction and len(self._idle) < self.max_idle:
+                self._idle.append((path, conn))
+                keep = True
+            else:
+                self.closed += 1
+        if not keep:
+            conn.close()
+
+    def close_all(self) -> None:
+        """Close the idle connections (checked out ones are closed when they are returned)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self.closed += len(idle)
+        for _, conn in idle:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection counters and current pool size"""
+        with self._lock:
+            return {
+                'idle': len(self._idle),
+                'in_use': self.in_use,
+                'max_idle': self.max_idle,
+                'opened': self.opened,
+                'closed': self.closed,
+                'checkouts': self.checkouts,
+                'reuses': self.reuses,
+                'nested': self.nested,
+                'commits': self.commits,
+                'rollbacks': self.rollbacks,
+                'reuse_rate': self.reuses / self.checkouts if self.checkouts else 0.0,
+            }
+
+
+def _open_connection(path: str) -> sqlite3.Connection:
+    """New connection with WAL journaling and the tuned pragmas"""
+    conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+                           cached_statements=SQLITE_STATEMENT_CACHE, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    journal_mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    if journal_mode.lower() != 'wal':
+        logger.warning(f"SQLite database {path} is in {journal_mode} journal mode, not WAL")
+    # NORMAL is durable in WAL mode except for the last commits on power loss
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size={-SQLITE_CACHE_KB}")
+    conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_BYTES}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    return conn
+
+
+# Global instance used by get_db_connection()
+_pool = ConnectionPool()
+
 
 @contextmanager
 def get_db_connection():
-    """Context manager for database connections"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    try:
+    """Context manager for database connections (pooled, see ConnectionPool)"""
+    with _pool.connection(DATABASE_PATH) as conn:
         yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Connection pool metrics"""
+    return _pool.stats()
+
+
+def close_db_connections() -> None:
+    """Close the pooled connections, e.g. before DATABASE_PATH is replaced"""
+    _pool.close_all()
 
 
 def init_database():
-    """Initialize database tables"""
+    """Initialize database tables (applies the migrations newer than PRAGMA user_version)"""
     with get_db_connection() as conn:
-        # Users table
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                email TEXT,
-                role TEXT DEFAULT 'user',
-                is_active INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Add role and is_active columns if they don't exist (migration for existing databases)
-        try:
-            conn.execute("ALTER TABLE users ADD COLUMN role TEXT DEFAULT 'user'")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        try:
-            conn.execute("ALTER TABLE users ADD COLUMN is_active INTEGER DEFAULT 1")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        # Leases table - stores all lease data
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS leases (
-                lease_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                lease_name TEXT NOT NULL,
-                description TEXT,
-                asset_class TEXT,
-                asset_id_code TEXT,
-                counterparty TEXT,
-                group_entity_name TEXT,
-                region TEXT,
-                segment TEXT,
-                cost_element TEXT,
-                vendor_code TEXT,
-                agreement_type TEXT,
-                responsible_person_operations TEXT,
-                responsible_person_accounts TEXT,
-                
-                -- Dates
-                lease_start_date DATE,
-                first_payment_date DATE,
-                end_date DATE,
-                agreement_date DATE,
-                termination_date DATE,
-                
-                -- Terms
-                tenure REAL,
-                frequency_months INTEGER,
-                day_of_month TEXT,
-                accrual_day INTEGER,
-                
-                -- Rentals
-                auto_rentals TEXT,
-                rental_1 REAL,
-                rental_2 REAL,
-                
-                -- Escalation
-                escalation_percent REAL,
-                esc_freq_months INTEGER,
-                escalation_start_date DATE,
-                index_rate_table TEXT,
-                
-                -- Financial
-                borrowing_rate REAL,
-                currency TEXT,
-                compound_months INTEGER,
-                fv_of_rou REAL,
-                initial_direct_expenditure REAL,
-                lease_incentive REAL,
-                
-                -- ARO
-                aro REAL,
-                aro_table INTEGER,
-                
-                -- Security Deposit
-                security_deposit REAL,
-                security_discount REAL,
-                
-                -- Cost Centers
-                cost_centre TEXT,
-                profit_center TEXT,
-                
-                -- Flags
-                finance_lease_usgaap TEXT,
-                shortterm_lease_ifrs_indas TEXT,
-                manual_adj TEXT,
-                
-                -- Transition
-                transition_date DATE,
-                transition_option TEXT,
-                
-                -- Impairments
-                impairment1 REAL,
-                impairment_date_1 DATE,
-                
-                -- Other
-                intragroup_lease TEXT,
-                sublease TEXT,
-                sublease_rou REAL,
-                modifies_this_id INTEGER,
-                modified_by_this_id INTEGER,
-                date_modified DATE,
-                head_lease_id TEXT,
-                scope_reduction REAL,
-                scope_date DATE,
-                practical_expedient TEXT,
-                entered_by TEXT,
-                last_modified_by TEXT,
-                last_reviewed_by TEXT,
-                
-                -- Approval workflow
-                approval_status TEXT DEFAULT 'draft',  -- draft, pending, approved, rejected
-                approved_lease_id INTEGER,  -- For versioning: points to the approved version
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                
-                FOREIGN KEY (user_id) REFERENCES users(user_id),
-                FOREIGN KEY (approved_lease_id) REFERENCES leases(lease_id) ON DELETE SET NULL
-            )
-        """)
-        
-        # Add approved_lease_id column if not exists (migration)
-        try:
-            conn.execute("ALTER TABLE leases ADD COLUMN approved_lease_id INTEGER")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_approved_lease_id ON leases(approved_lease_id)")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        # Leases calculations - stores calculated schedules and journal entries
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS lease_calculations (
-                calc_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                lease_id INTEGER NOT NULL,
-                from_date DATE NOT NULL,
-                to_date DATE NOT NULL,
-                calculation_data TEXT,  -- JSON stored results
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (lease_id) REFERENCES leases(lease_id)
-            )
-        """)
-        
-        # Results summary - stores bulk calculation results
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS results_summary (
-                summary_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                calculation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                from_date DATE NOT NULL,
-                to_date DATE NOT NULL,
-                filters_applied TEXT,  -- JSON of filters
-                results_data TEXT,  -- JSON of all lease results
-                aggregated_totals TEXT,  -- JSON of aggregated totals
-                consolidated_journals TEXT,  -- JSON of consolidated journal entries
-                processed_count INTEGER DEFAULT 0,
-                skipped_count INTEGER DEFAULT 0,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        """)
-        
-        # Lease documents table
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS lease_documents (
-                doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                lease_id INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                filename TEXT NOT NULL,
-                original_filename TEXT NOT NULL,
-                file_path TEXT NOT NULL,
-                file_size INTEGER,
-                file_type TEXT,
-                document_type TEXT DEFAULT 'contract',
-                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                uploaded_by INTEGER,
-                version INTEGER DEFAULT 1,
-                FOREIGN KEY (lease_id) REFERENCES leases(lease_id) ON DELETE CASCADE,
-                FOREIGN KEY (user_id) REFERENCES users(user_id),
-                FOREIGN KEY (uploaded_by) REFERENCES users(user_id)
-            )
-        """)
-        
-        # Email settings table
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS email_settings (
-                setting_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                smtp_host TEXT NOT NULL,
-                smtp_port INTEGER NOT NULL,
-                smtp_username TEXT NOT NULL,
-                smtp_password TEXT NOT NULL,
-                use_tls INTEGER DEFAULT 1,
-                from_email TEXT NOT NULL,
-                from_name TEXT NOT NULL,
-                is_active INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Google AI API settings table
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS google_ai_settings (
-                setting_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                api_key TEXT NOT NULL,
-                is_active INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # AI extraction metadata table - stores field-level extraction info with coordinates
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS ai_extraction_metadata (
-                extraction_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                lease_id INTEGER NOT NULL,
-                field_name TEXT NOT NULL,
-                extracted_value TEXT,
-                ai_confidence REAL,
-                page_number INTEGER,
-                bounding_boxes TEXT,  -- JSON array of {x, y, width, height}
-                snippet TEXT,
-                extraction_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (lease_id) REFERENCES leases(lease_id) ON DELETE CASCADE
-            )
-        """)
-        
-        # Field edit audit trail table - tracks reviewer changes
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS field_edit_audit (
-                audit_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                lease_id INTEGER NOT NULL,
-                field_name TEXT NOT NULL,
-                original_ai_value TEXT,
-                reviewer_value TEXT,
-                reviewer_user_id INTEGER NOT NULL,
-                edit_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (lease_id) REFERENCES leases(lease_id) ON DELETE CASCADE,
-                FOREIGN KEY (reviewer_user_id) REFERENCES users(user_id)
-            )
-        """)
-        
-        # Create indexes for performance
-        try:
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_extraction_lease_id ON ai_extraction_metadata(lease_id)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_lease_id ON field_edit_audit(lease_id)")
-        except sqlite3.OperationalError:
-            pass
-        
-        # Pending PDFs table - stores PDFs uploaded before lease creation
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS pending_pdfs (
-                pending_pdf_id TEXT PRIMARY KEY,
-                user_id INTEGER NOT NULL,
-                original_filename TEXT NOT NULL,
-                pending_filename TEXT NOT NULL,
-                pending_path TEXT NOT NULL,
-                file_size INTEGER,
-                file_type TEXT,
-                extraction_data TEXT,  -- JSON of extracted data for metadata
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        """)
-        
-        # Add extraction_data column if it doesn't exist (migration)
-        try:
-            conn.execute("ALTER TABLE pending_pdfs ADD COLUMN extraction_data TEXT")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        # Create index for user lookup
-        try:
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_pending_pdfs_user_id ON pending_pdfs(user_id)")
-        except sqlite3.OperationalError:
-            pass
-        
-        # Email notifications table
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS email_notifications (
-                notification_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                notification_type TEXT NOT NULL,
-                is_enabled INTEGER DEFAULT 1,
-                reminder_days INTEGER DEFAULT 30,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        """)
-        
-        # Lease approvals table - tracks approval workflow
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS lease_approvals (
-                approval_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                lease_id INTEGER NOT NULL,
-                requester_user_id INTEGER NOT NULL,
-                approver_user_id INTEGER,
-                approval_status TEXT NOT NULL DEFAULT 'pending',
-                request_type TEXT NOT NULL,
-                comments TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                reviewed_at TIMESTAMP,
-                FOREIGN KEY (lease_id) REFERENCES leases(lease_id) ON DELETE CASCADE,
-                FOREIGN KEY (requester_user_id) REFERENCES users(user_id),
-                FOREIGN KEY (approver_user_id) REFERENCES users(user_id)
-            )
-        """)
-        
-        # Migration: Add approval_status column to existing leases table if not exists
-        try:
-            conn.execute("ALTER TABLE leases ADD COLUMN approval_status TEXT DEFAULT 'draft'")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        print("✅ Database initialized")
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        # One process migrates; the others wait here and then find the schema current
+        conn.execute("BEGIN IMMEDIATE")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target, migration in enumerate(_MIGRATIONS[version:], start=version + 1):
+            migration(conn)
+            logger.info(f"Database schema migrated to version {target} ({migration.__name__})")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+        if version < SCHEMA_VERSION:
+            # Refresh the planner statistics for the new indexes
+            conn.execute("ANALYZE")
+            print("✅ Database initialized")
+
+
+def _migration_base_schema(conn: sqlite3.Connection) -> None:
+    """Version 1: the tables, and the columns added to them before schema versioning"""
+    # Databases created before versioning are at user_version 0 with some or all of
+    # this schema in place, so every statement here must be safe to repeat
+    # Users table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            email TEXT,
+            role TEXT DEFAULT 'user',
+            is_active INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Add role and is_active columns if they don't exist (migration for existing databases)
+    try:
+        conn.execute("ALTER TABLE users ADD COLUMN role TEXT DEFAULT 'user'")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+    
+    try:
+        conn.execute("ALTER TABLE users ADD COLUMN is_active INTEGER DEFAULT 1")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+    
+    # Leases table - stores all lease data
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS leases (
+            lease_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            lease_name TEXT NOT NULL,
+            description TEXT,
+            asset_class TEXT,
+            asset_id_code TEXT,
+            counterparty TEXT,
+            group_entity_name TEXT,
+            region TEXT,
+            segment TEXT,
+            cost_element TEXT,
+            vendor_code TEXT,
+            agreement_type TEXT,
+            responsible_person_operations TEXT,
+            responsible_person_accounts TEXT,
+            
+            -- Dates
+            lease_start_date DATE,
+            first_payment_date DATE,
+            end_date DATE,
+            agreement_date DATE,
+            termination_date DATE,
+            
+            -- Terms
+            tenure REAL,
+            frequency_months INTEGER,
+            day_of_month TEXT,
+            accrual_day INTEGER,
+            
+            -- Rentals
+            auto_rentals TEXT,
+            rental_1 REAL,
+            rental_2 REAL,
+            
+            -- Escalation
+            escalation_percent REAL,
+            esc_freq_months INTEGER,
+            escalation_start_date DATE,
+            index_rate_table TEXT,
+            
+            -- Financial
+            borrowing_rate REAL,
+            currency TEXT,
+            compound_months INTEGER,
+            fv_of_rou REAL,
+            initial_direct_expenditure REAL,
+            lease_incentive REAL,
+            
+            -- ARO
+            aro REAL,
+            aro_table INTEGER,
+            
+            -- Security Deposit
+            security_deposit REAL,
+            security_discount REAL,
+            
+            -- Cost Centers
+            cost_centre TEXT,
+            profit_center TEXT,
+            
+            -- Flags
+            finance_lease_usgaap TEXT,
+            shortterm_lease_ifrs_indas TEXT,
+            manual_adj TEXT,
+            
+            -- Transition
+            transition_date DATE,
+            transition_option TEXT,
+            
+            -- Impairments
+            impairment1 REAL,
+            impairment_date_1 DATE,
+            
+            -- Other
+            intragroup_lease TEXT,
+            sublease TEXT,
+            sublease_rou REAL,
+            modifies_this_id INTEGER,
+            modified_by_this_id INTEGER,
+            date_modified DATE,
+            head_lease_id TEXT,
+            scope_reduction REAL,
+            scope_date DATE,
+            practical_expedient TEXT,
+            entered_by TEXT,
+            last_modified_by TEXT,
+            last_reviewed_by TEXT,
+            
+            -- Approval workflow
+            approval_status TEXT DEFAULT 'draft',  -- draft, pending, approved, rejected
+            approved_lease_id INTEGER,  -- For versioning: points to the approved version
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (approved_lease_id) REFERENCES leases(lease_id) ON DELETE SET NULL
+        )
+    """)
+    
+    # Add approved_lease_id column if not exists (migration)
+    try:
+        conn.execute("ALTER TABLE leases ADD COLUMN approved_lease_id INTEGER")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_approved_lease_id ON leases(approved_lease_id)")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+    
+    # Leases calculations - stores calculated schedules and journal entries
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS lease_calculations (
+            calc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lease_id INTEGER NOT NULL,
+            from_date DATE NOT NULL,
+            to_date DATE NOT NULL,
+            calculation_data TEXT,  -- JSON stored results
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (lease_id) REFERENCES leases(lease_id)
+        )
+    """)
+    
+    # Results summary - stores bulk calculation results
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS results_summary (
+            summary_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            calculation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            from_date DATE NOT NULL,
+            to_date DATE NOT NULL,
+            filters_applied TEXT,  -- JSON of filters
+            results_data TEXT,  -- JSON of all lease results
+            aggregated_totals TEXT,  -- JSON of aggregated totals
+            consolidated_journals TEXT,  -- JSON of consolidated journal entries
+            processed_count INTEGER DEFAULT 0,
+            skipped_count INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        )
+    """)
+    
+    # Lease documents table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS lease_documents (
+            doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lease_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            original_filename TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            file_size INTEGER,
+            file_type TEXT,
+            document_type TEXT DEFAULT 'contract',
+            uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            uploaded_by INTEGER,
+            version INTEGER DEFAULT 1,
+            FOREIGN KEY (lease_id) REFERENCES leases(lease_id) ON DELETE CASCADE,
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (uploaded_by) REFERENCES users(user_id)
+        )
+    """)
+    
+    # Email settings table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS email_settings (
+            setting_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            smtp_host TEXT NOT NULL,
+            smtp_port INTEGER NOT NULL,
+            smtp_username TEXT NOT NULL,
+            smtp_password TEXT NOT NULL,
+            use_tls INTEGER DEFAULT 1,
+            from_email TEXT NOT NULL,
+            from_name TEXT NOT NULL,
+            is_active INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Google AI API settings table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS google_ai_settings (
+            setting_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            api_key TEXT NOT NULL,
+            is_active INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # AI extraction metadata table - stores field-level extraction info with coordinates
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ai_extraction_metadata (
+            extraction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lease_id INTEGER NOT NULL,
+            field_name TEXT NOT NULL,
+            extracted_value TEXT,
+            ai_confidence REAL,
+            page_number INTEGER,
+            bounding_boxes TEXT,  -- JSON array of {x, y, width, height}
+            snippet TEXT,
+            extraction_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (lease_id) REFERENCES leases(lease_id) ON DELETE CASCADE
+        )
+    """)
+    
+    # Field edit audit trail table - tracks reviewer changes
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS field_edit_audit (
+            audit_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lease_id INTEGER NOT NULL,
+            field_name TEXT NOT NULL,
+            original_ai_value TEXT,
+            reviewer_value TEXT,
+            reviewer_user_id INTEGER NOT NULL,
+            edit_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (lease_id) REFERENCES leases(lease_id) ON DELETE CASCADE,
+            FOREIGN KEY (reviewer_user_id) REFERENCES users(user_id)
+        )
+    """)
+    
+    # Create indexes for performance
+    try:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_extraction_lease_id ON ai_extraction_metadata(lease_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_lease_id ON field_edit_audit(lease_id)")
+    except sqlite3.OperationalError:
+        pass
+    
+    # Pending PDFs table - stores PDFs uploaded before lease creation
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pending_pdfs (
+            pending_pdf_id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            original_filename TEXT NOT NULL,
+            pending_filename TEXT NOT NULL,
+            pending_path TEXT NOT NULL,
+            file_size INTEGER,
+            file_type TEXT,
+            extraction_data TEXT,  -- JSON of extracted data for metadata
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        )
+    """)
+    
+    # Add extraction_data column if it doesn't exist (migration)
+    try:
+        conn.execute("ALTER TABLE pending_pdfs ADD COLUMN extraction_data TEXT")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+    
+    # Create index for user lookup
+    try:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_pending_pdfs_user_id ON pending_pdfs(user_id)")
+    except sqlite3.OperationalError:
+        pass
+    
+    # Email notifications table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS email_notifications (
+            notification_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            notification_type TEXT NOT NULL,
+            is_enabled INTEGER DEFAULT 1,
+            reminder_days INTEGER DEFAULT 30,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        )
+    """)
+    
+    # Lease approvals table - tracks approval workflow
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS lease_approvals (
+            approval_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lease_id INTEGER NOT NULL,
+            requester_user_id INTEGER NOT NULL,
+            approver_user_id INTEGER,
+            approval_status TEXT NOT NULL DEFAULT 'pending',
+            request_type TEXT NOT NULL,
+            comments TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            reviewed_at TIMESTAMP,
+            FOREIGN KEY (lease_id) REFERENCES leases(lease_id) ON DELETE CASCADE,
+            FOREIGN KEY (requester_user_id) REFERENCES users(user_id),
+            FOREIGN KEY (approver_user_id) REFERENCES users(user_id)
+        )
+    """)
+    
+    # Migration: Add approval_status column to existing leases table if not exists
+    try:
+        conn.execute("ALTER TABLE leases ADD COLUMN approval_status TEXT DEFAULT 'draft'")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+
+
+def _migration_query_indexes(conn: sqlite3.Connection) -> None:
+    """Version 2: composite indexes for the lease list, approval and document queries"""
+    # get_all_leases(): WHERE user_id = ? AND approval_status ... ORDER BY created_at
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_leases_user_status_created ON leases(user_id, approval_status, created_at)")
+    # get_all_leases_admin() and the keyset pages: ORDER BY created_at, lease_id
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_leases_created ON leases(created_at, lease_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_leases_user_created ON leases(user_id, created_at, lease_id)")
+    # Latest rejection per lease, approval history
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_approvals_lease_status_reviewed ON lease_approvals(lease_id, approval_status, reviewed_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_lease_id ON lease_documents(lease_id)")
+    # results_summary has no created_at; runs are dated by calculation_date
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_results_summary_user_date ON results_summary(user_id, calculation_date)")
+
+
+def _migration_results_store(conn: sqlite3.Connection) -> None:
+    """Version 3: per-lease bulk results and compressed run blobs (save_bulk_results())"""
+    conn.execute("ALTER TABLE results_summary ADD COLUMN aggregated_totals_blob BLOB")
+    conn.execute("ALTER TABLE results_summary ADD COLUMN consolidated_journals_blob BLOB")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS results_leases (
+            summary_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,  -- order in the run's results
+            lease_id INTEGER,
+            group_entity_name TEXT,
+            cost_centre TEXT,
+            asset_class TEXT,
+            profit_center TEXT,
+            result_data TEXT NOT NULL,  -- JSON of the lease's results row
+            PRIMARY KEY (summary_id, position),
+            FOREIGN KEY (summary_id) REFERENCES results_summary(summary_id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_results_leases_entity ON results_leases(summary_id, group_entity_name, position)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_results_leases_cost_centre ON results_leases(summary_id, cost_centre, position)")
+
+
+# Schema migrations in order; migration n brings PRAGMA user_version from n - 1 to n.
+# Append new migrations, never edit or reorder applied ones.
+_MIGRATIONS = [
+    _migration_base_schema,
+    _migration_query_indexes,
+    _migration_results_store,
+]
+SCHEMA_VERSION = len(_MIGRATIONS)
 
 
 # ============ USER MANAGEMENT ============
@@ -585,30 +828,233 @@ def get_lease(lease_id: int, user_id: int) -> Optional[Dict]:
         ).fetchone()
         if not row:
             return None
-        
-        lease_dict = dict(row)
         # Ensure None values are returned as None (not 'N/A')
-        # CRITICAL: Convert numeric fields to proper types (SQLite returns floats as float)
-        numeric_fields = ['rental_1', 'rental_2', 'borrowing_rate', 'escalation_percent', 
+        # The frontend will handle displaying 'N/A' if needed
+        return _lease_record(row)
+
+
+# SQLite limits host parameters per statement (999 before 3.32); IN lists are split in chunks
+IN_CHUNK_SIZE = 500
+
+# Numeric lease columns returned as float
+_NUMERIC_LEASE_FIELDS = ['rental_1', 'rental_2', 'borrowing_rate', 'escalation_percent',
                          'tenure', 'frequency_months', 'compound_months', 'esc_freq_months',
                          'security_deposit', 'aro', 'initial_direct_expenditure', 'lease_incentive']
-        for field in numeric_fields:
-            if field in lease_dict and lease_dict[field] is not None:
-                try:
-                    lease_dict[field] = float(lease_dict[field])
-                except (ValueError, TypeError):
-                    lease_dict[field] = None
-        # The frontend will handle displaying 'N/A' if needed
-        return lease_dict
 
+# Columns _lease_data_row() unpacks, in SELECT order
+_LEASE_DATA_COLUMNS = (
+    'lease_id', 'description', 'asset_class', 'asset_id_code',
+    'lease_start_date', 'first_payment_date', 'end_date', 'agreement_date', 'termination_date',
+    'tenure', 'frequency_months', 'day_of_month', 'auto_rentals', 'manual_adj',
+    'rental_1', 'rental_2', 'escalation_start_date', 'escalation_percent', 'esc_freq_months',
+    'accrual_day', 'borrowing_rate', 'compound_months', 'currency', 'cost_centre', 'counterparty',
+    'security_deposit', 'security_discount', 'aro', 'aro_table',
+    'initial_direct_expenditure', 'lease_incentive', 'sublease', 'date_modified',
+    'profit_center', 'group_entity_name', 'shortterm_lease_ifrs_indas', 'finance_lease_usgaap',
+)
+
+
+def _lease_record(row) -> Dict:
+    """Lease row as a dict, numeric fields as float"""
+    lease_dict = dict(row)
+    # CRITICAL: Convert numeric fields to proper types (SQLite returns floats as float)
+    for field in _NUMERIC_LEASE_FIELDS:
+        if field in lease_dict and lease_dict[field] is not None:
+            try:
+                lease_dict[field] = float(lease_dict[field])
+            except (ValueError, TypeError):
+                lease_dict[field] = None
+    return lease_dict
+
+
+def _parse_db_date(value) -> Optional[date]:
+    """Stored YYYY-MM-DD date, or None"""
+    if not value:
+        return None
+    if not isinstance(value, str):
+        return value
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def _lease_data_row(cursor, row) -> LeaseData:
+    """Row factory: LeaseData from a row of _LEASE_DATA_COLUMNS"""
+    (lease_id, description, asset_class, asset_id_code,
+     lease_start_date, first_payment_date, end_date, agreement_date, termination_date,
+     tenure, frequency_months, day_of_month, auto_rentals, manual_adj,
+     rental_1, rental_2, escalation_start_date, escalation_percent, esc_freq_months,
+     accrual_day, borrowing_rate, compound_months, currency, cost_centre, counterparty,
+     security_deposit, security_discount, aro, aro_table,
+     initial_direct_expenditure, lease_incentive, sublease, date_modified,
+     profit_center, group_entity_name, shortterm_lease_ifrs_indas, finance_lease_usgaap) = row
+    return LeaseData(
+        auto_id=lease_id,
+        description=description,
+        asset_class=asset_class,
+        asset_id_code=asset_id_code,
+        lease_start_date=_parse_db_date(lease_start_date),
+        first_payment_date=_parse_db_date(first_payment_date),
+        end_date=_parse_db_date(end_date),
+        agreement_date=_parse_db_date(agreement_date),
+        termination_date=_parse_db_date(termination_date),
+        tenure=float(tenure or 0),
+        frequency_months=int(frequency_months or 1),
+        day_of_month=str(day_of_month),
+        auto_rentals=auto_rentals,
+        manual_adj="Yes" if str(manual_adj).lower() in ['yes', 'on', 'true', '1'] else "No",
+        rental_1=float(rental_1 or 0),
+        rental_2=float(rental_2 or 0),
+        escalation_start=_parse_db_date(escalation_start_date),
+        escalation_percent=float(escalation_percent or 0),
+        esc_freq_months=int(esc_freq_months or 12),
+        accrual_day=int(accrual_day or 1),
+        borrowing_rate=float(borrowing_rate or 0),
+        compound_months=int(compound_months) if compound_months else None,
+        currency=currency,
+        cost_centre=cost_centre,
+        counterparty=counterparty,
+        security_deposit=float(security_deposit or 0),
+        security_discount=float(security_discount or 0),
+        aro=float(aro or 0),
+        aro_table=int(aro_table or 0),
+        initial_direct_expenditure=float(initial_direct_expenditure or 0),
+        lease_incentive=float(lease_incentive or 0),
+        sublease=sublease,
+        date_modified=_parse_db_date(date_modified),
+        profit_center=profit_center,
+        group_entity_name=group_entity_name,
+        short_term_lease_ifrs=shortterm_lease_ifrs_indas,
+        short_term_lease_usgaap=finance_lease_usgaap,
+    )
+
+
+def lease_data_from_record(record: Dict) -> LeaseData:
+    """LeaseData from a lease dict as get_lease() returns it (same fields as get_leases_by_ids())"""
+    return _lease_data_row(None, tuple(record.get(column) for column in _LEASE_DATA_COLUMNS))
+
+
+def get_leases_by_ids(lease_ids: Iterable[int], user_scope: Optional[int] = None,
+                      as_lease_data: bool = False) -> Dict[int, Any]:
+    """
+    Leases by ID, loaded with one IN (...) query per IN_CHUNK_SIZE IDs
 
-def get_all_leases(user_id: int) -> List[Dict]:
-    """Get all leases for a user (includes rejected with rejection reason)"""
+    user_scope: only leases owned by this user; None loads any lease (admin/reviewer).
+    Returns {lease_id: lease} for the leases found, in lease_ids order. Leases are
+    dicts as get_lease() returns them plus the owner's username, or LeaseData
+    objects with as_lease_data=True.
+    """
+    ids = list(dict.fromkeys(int(lease_id) for lease_id in lease_ids))
+    if as_lease_data:
+        columns = ', '.join(f"l.{column}" for column in _LEASE_DATA_COLUMNS)
+        query = f"SELECT {columns} FROM leases l"
+    else:
+        query = "SELECT l.*, COALESCE(u.username, 'Unknown') AS username FROM leases l LEFT JOIN users u ON u.user_id = l.user_id"
+
+    found = {}
     with get_db_connection() as conn:
-        # Get column names to verify what's available
-        conn.row_factory = lambda cursor, row: {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
-        cursor = conn.execute(
-            """
+        cursor = conn.cursor()
+        if as_lease_data:
+            cursor.row_factory = _lease_data_row
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            chunk = ids[start:start + IN_CHUNK_SIZE]
+            sql = f"{query} WHERE l.lease_id IN ({', '.join('?' * len(chunk))})"
+            params = list(chunk)
+            if user_scope is not None:
+                sql += " AND l.user_id = ?"
+                params.append(user_scope)
+            for row in cursor.execute(sql, params):
+                if as_lease_data:
+                    found[row.auto_id] = row
+                else:
+                    found[row['lease_id']] = _lease_record(row)
+    return {lease_id: found[lease_id] for lease_id in ids if lease_id in found}
+
+
+# Lease list paging: page size without an explicit limit, and the largest page served
+LEASE_PAGE_SIZE = int(os.environ.get('LEASE_PAGE_SIZE', 500))
+MAX_LEASE_PAGE_SIZE = int(os.environ.get('LEASE_MAX_PAGE_SIZE', 5000))
+
+# Columns lease lists can be filtered on (equality)
+LEASE_FILTER_COLUMNS = ('cost_centre', 'group_entity_name', 'asset_class', 'profit_center', 'approval_status')
+
+# Latest rejection comment per lease, in one pass over lease_approvals
+_REJECTION_REASON_JOIN = """
+    LEFT JOIN (
+        SELECT lease_id, comments AS rejection_reason,
+               ROW_NUMBER() OVER (PARTITION BY lease_id ORDER BY reviewed_at DESC) AS rejection_rank
+        FROM lease_approvals
+        WHERE approval_status = 'rejected'
+    ) r ON r.lease_id = l.lease_id AND r.rejection_rank = 1
+"""
+
+
+def lease_page_cursor(lease: Dict) -> str:
+    """Opaque cursor for the page after lease (keyset on created_at, lease_id)"""
+    key = f"{lease.get('created_at') or ''}|{lease['lease_id']}"
+    return base64.urlsafe_b64encode(key.encode('utf-8')).decode('ascii')
+
+
+def _decode_page_cursor(cursor: str) -> Tuple[Optional[str], int]:
+    """(created_at, lease_id) from lease_page_cursor(); ValueError if malformed"""
+    try:
+        created_at, lease_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').rsplit('|', 1)
+        return created_at or None, int(lease_id)
+    except Exception:
+        raise ValueError(f"Invalid page cursor: {cursor!r}")
+
+
+def _lease_list_clauses(filters: Optional[Dict] = None, after: Optional[str] = None,
+                        limit: Optional[int] = None) -> Tuple[str, str, List]:
+    """
+    (WHERE conditions, ORDER BY/LIMIT, parameters) for a lease list
+
+    Leases are ordered newest first by (created_at, lease_id); after is a
+    lease_page_cursor() and limit the page size (capped at MAX_LEASE_PAGE_SIZE).
+    Leases without created_at sort last, as SQLite sorts NULLs in DESC order.
+    """
+    conditions = []
+    params = []
+    for column, value in (filters or {}).items():
+        if column not in LEASE_FILTER_COLUMNS:
+            raise ValueError(f"Cannot filter leases on {column}")
+        if value:
+            conditions.append(f"l.{column} = ?")
+            params.append(value)
+    if after:
+        created_at, lease_id = _decode_page_cursor(after)
+        if created_at is None:
+            conditions.append("(l.created_at IS NULL AND l.lease_id < ?)")
+            params.append(lease_id)
+        else:
+            conditions.append("(l.created_at < ? OR (l.created_at = ? AND l.lease_id < ?) OR l.created_at IS NULL)")
+            params.extend([created_at, created_at, lease_id])
+        if limit is None:
+            limit = LEASE_PAGE_SIZE
+    where = ''.join(f" AND {condition}" for condition in conditions)
+    order = " ORDER BY l.created_at DESC, l.lease_id DESC"
+    if limit is not None:
+        order += " LIMIT ?"
+        params.append(max(1, min(int(limit), MAX_LEASE_PAGE_SIZE)))
+    return where, order, params
+
+
+def get_all_leases(user_id: int, filters: Optional[Dict] = None, after: Optional[str] = None,
+                   limit: Optional[int] = None) -> List[Dict]:
+    """
+    Get all leases for a user (includes rejected with rejection reason)
+
+    filters: {column: value} on LEASE_FILTER_COLUMNS; after/limit: one page
+    (see _lease_list_clauses()), all leases without them.
+    """
+    where, order, params = _lease_list_clauses(filters, after, limit)
+    with get_db_connection() as conn:
+        # Get column names to verify what's available (on the cursor: the connection is pooled)
+        cursor = conn.cursor()
+        cursor.row_factory = lambda cursor, row: {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
+        cursor.execute(
+            f"""
             SELECT l.lease_id, l.lease_name, l.description,
                    COALESCE(l.asset_class, 'N/A') as asset_class, 
                    COALESCE(l.asset_id_code, 'N/A') as asset_id_code,
@@ -618,13 +1064,15 @@ def get_all_leases(user_id: int) -> List[Dict]:
                    l.auto_rentals, l.frequency_months,
                    l.approval_status,
                    l.created_at, l.updated_at,
-                   (SELECT comments FROM lease_approvals WHERE lease_id = l.lease_id AND approval_status = 'rejected' ORDER BY reviewed_at DESC LIMIT 1) as rejection_reason
+                   r.rejection_reason
             FROM leases l
+            {_REJECTION_REASON_JOIN}
             WHERE l.user_id = ? 
               AND (l.approval_status IN ('draft', 'pending', 'approved', 'rejected') OR l.approval_status IS NULL)
-            ORDER BY l.created_at DESC
+              {where}
+            {order}
             """,
-            (user_id,)
+            [user_id] + params
         )
         rows = cursor.fetchall()
         
@@ -694,6 +1142,162 @@ def get_calculation(calc_id: int) -> Optional[Dict]:
     return None
 
 
+# ============ BULK RESULTS ============
+
+# zlib level for the stored journals and totals
+RESULTS_COMPRESSION_LEVEL = int(os.environ.get('LEASE_RESULTS_COMPRESSION_LEVEL', 6))
+
+# Columns per-lease results can be filtered on (equality)
+RESULT_FILTER_COLUMNS = ('group_entity_name', 'cost_centre', 'asset_class', 'profit_center')
+
+
+def _pack(value) -> bytes:
+    """JSON, zlib-compressed"""
+    import json
+    import zlib
+    return zlib.compress(json.dumps(value).encode('utf-8'), RESULTS_COMPRESSION_LEVEL)
+
+
+def _unpack(blob: Optional[bytes]):
+    import json
+    import zlib
+    return json.loads(zlib.decompress(blob).decode('utf-8')) if blob is not None else None
+
+
+def save_bulk_results(user_id: int, from_date: date, to_date: date, filters_applied: Dict, bulk_results: Dict) -> int:
+    """
+    Store a bulk calculation run and return its summary_id
+
+    The run's counts go to results_summary with the consolidated journals and
+    aggregated totals as compressed blobs; each lease's results row goes to
+    results_leases, with the columns results can be filtered on alongside it.
+    """
+    import json
+    rows = []
+    for position, result in enumerate(r for r in bulk_results['results'] if r):
+        rows.append((position, result.get('lease_id'), result.get('group_entity_name'), result.get('cost_centre'),
+                     result.get('asset_class'), result.get('profit_center'), json.dumps(result)))
+    with get_db_connection() as conn:
+        cursor = conn.execute("""
+            INSERT INTO results_summary
+            (user_id, from_date, to_date, filters_applied, aggregated_totals_blob, consolidated_journals_blob,
+             processed_count, skipped_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            user_id,
+            from_date.isoformat(),
+            to_date.isoformat(),
+            json.dumps(filters_applied),
+            _pack(bulk_results['aggregated_totals']),
+            _pack(bulk_results['consolidated_journals']),
+            bulk_results['processed_count'],
+            bulk_results['skipped_count']
+        ))
+        summary_id = cursor.lastrowid
+        conn.executemany("""
+            INSERT INTO results_leases
+            (summary_id, position, lease_id, group_entity_name, cost_centre, asset_class, profit_center, result_data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(summary_id,) + row for row in rows])
+        return summary_id
+
+
+def get_bulk_results(summary_id: int, user_id: Optional[int] = None, include_journals: bool = False) -> Optional[Dict]:
+    """
+    A stored run without its per-lease results (see get_bulk_result_rows())
+
+    user_id: only a run of this user; None for any run (admin). The consolidated
+    journals are decompressed only with include_journals=True.
+    """
+    import json
+    query = "SELECT * FROM results_summary WHERE summary_id = ?"
+    params = [summary_id]
+    if user_id is not None:
+        query += " AND user_id = ?"
+        params.append(user_id)
+    with get_db_connection() as conn:
+        row = conn.execute(query, params).fetchone()
+        if not row:
+            return None
+        summary = dict(row)
+        lease_count = conn.execute("SELECT COUNT(*) FROM results_leases WHERE summary_id = ?",
+                                   (summary_id,)).fetchone()[0]
+
+    # Runs stored before results_leases keep everything in the JSON text columns
+    legacy = summary.pop('results_data', None)
+    totals_blob = summary.pop('aggregated_totals_blob', None)
+    journals_blob = summary.pop('consolidated_journals_blob', None)
+    legacy_totals = summary.pop('aggregated_totals', None)
+    legacy_journals = summary.pop('consolidated_journals', None)
+    summary['filters_applied'] = json.loads(summary['filters_applied']) if summary.get('filters_applied') else None
+    summary['aggregated_totals'] = _unpack(totals_blob) if totals_blob is not None else (
+        json.loads(legacy_totals) if legacy_totals else None)
+    if include_journals:
+        summary['consolidated_journals'] = _unpack(journals_blob) if journals_blob is not None else (
+            json.loads(legacy_journals) if legacy_journals else None)
+    summary['lease_count'] = lease_count if lease_count or not legacy else sum(1 for r in json.loads(legacy) if r)
+    return summary
+
+
+def get_bulk_result_rows(summary_id: int, filters: Optional[Dict] = None, after: Optional[int] = None,
+                         limit: Optional[int] = None) -> List[Dict]:
+    """
+    Per-lease results of a stored run, in calculation order
+
+    filters: {column: value} on RESULT_FILTER_COLUMNS. after/limit: keyset page,
+    after being the 'position' of the last row of the previous page; every
+    matching row without them. Check access with get_bulk_results() first.
+    """
+    import json
+    conditions = ""
+    params: List[Any] = [summary_id]
+    for column, value in (filters or {}).items():
+        if column not in RESULT_FILTER_COLUMNS:
+            raise ValueError(f"Cannot filter results on {column}")
+        if value:
+            conditions += f" AND {column} = ?"
+            params.append(value)
+    if after is not None:
+        conditions += " AND position > ?"
+        params.append(int(after))
+        if limit is None:
+            limit = LEASE_PAGE_SIZE
+    order = " ORDER BY position"
+    if limit is not None:
+        order += " LIMIT ?"
+        params.append(max(1, min(int(limit), MAX_LEASE_PAGE_SIZE)))
+
+    with get_db_connection() as conn:
+        rows = conn.execute(
+            f"SELECT position, result_data FROM results_leases WHERE summary_id = ?{conditions}{order}", params
+        ).fetchall()
+        if not rows:
+            legacy = conn.execute("SELECT results_data FROM results_summary WHERE summary_id = ?",
+                                  (summary_id,)).fetchone()
+            if legacy and legacy['results_data']:
+                return _legacy_result_rows(json.loads(legacy['results_data']), filters, after, limit)
+
+    results = []
+    for row in rows:
+        result = json.loads(row['result_data'])
+        result['position'] = row['position']
+        results.append(result)
+    return results
+
+
+def _legacy_result_rows(results: List[Dict], filters: Optional[Dict], after: Optional[int],
+                        limit: Optional[int]) -> List[Dict]:
+    """get_bulk_result_rows() for a run stored as one results_data JSON list"""
+    rows = []
+    for position, result in enumerate(r for r in results if r):
+        if after is not None and position <= int(after):
+            continue
+        if all(not value or result.get(column) == value for column, value in (filters or {}).items()):
+            result['position'] = position
+            rows.append(result)
+    return rows[:max(1, min(int(limit), MAX_LEASE_PAGE_SIZE))] if limit is not None else rows
+
+
 # ============ ADMIN MANAGEMENT ============
 
 def get_all_users() -> List[Dict]:
@@ -727,30 +1331,20 @@ def set_user_active(user_id: int, is_active: bool) -> bool:
         return cursor.rowcount > 0
 
 
-def get_all_leases_admin(user_id: Optional[int] = None) -> List[Dict]:
-    """Get all leases (admin only) - optionally filtered by user"""
+def get_all_leases_admin(user_id: Optional[int] = None, filters: Optional[Dict] = None,
+                         after: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+    """Get all leases (admin only) - optionally filtered by user, filters and page as get_all_leases()"""
+    where, order, params = _lease_list_clauses(filters, after, limit)
+    if user_id:
+        where = " AND l.user_id = ?" + where
+        params = [user_id] + params
     with get_db_connection() as conn:
-        if user_id:
-            rows = conn.execute("""
-                SELECT * FROM leases WHERE user_id = ? ORDER BY created_at DESC
-            """, (user_id,)).fetchall()
-        else:
-            rows = conn.execute("""
-                SELECT * FROM leases ORDER BY created_at DESC
-            """).fetchall()
-        
-        leases = []
-        for row in rows:
-            lease_dict = dict(row)
-            # Get username separately
-            user_row = conn.execute(
-                "SELECT username FROM users WHERE user_id = ?",
-                (lease_dict['user_id'],)
-            ).fetchone()
-            lease_dict['username'] = user_row['username'] if user_row else 'Unknown'
-            leases.append(lease_dict)
-        
-        return leases
+        rows = conn.execute(f"""
+            SELECT l.*, COALESCE(u.username, 'Unknown') AS username
+            FROM leases l LEFT JOIN users u ON u.user_id = l.user_id
+            WHERE 1 = 1{where}{order}
+        """, params).fetchall()
+        return [dict(row) for row in rows]
 
 
 # ============ DOCUMENT MANAGEMENT ============
@@ -5,15 +5,27 @@ Lines 712-826 from VBA Code
 """
 
 from typing import Optional, Dict, Tuple, List
-from datetime import date
-from lease_accounting.core.models import LeaseData, PaymentScheduleRow
+from datetime import date, timedelta
+from lease_accounting.core.models import LeaseData, PaymentScheduleRow, OpeningBalances
+from lease_accounting.utils.discount_factors import discount_curve
+from lease_accounting.schedule.generator_vba_complete import (
+    generate_complete_schedule, generate_schedule_from, remeasure_at_restart, findrent, _derive_icompound,
+)
 
 
-def process_lease_modifications(lease_data: LeaseData, schedule: List[PaymentScheduleRow],
-                                baldate: date) -> Tuple[List[PaymentScheduleRow], Dict]:
+def process_lease_modifications(lease_data: LeaseData, schedule: Optional[List[PaymentScheduleRow]],
+                                baldate: date, previous_lease: Optional[LeaseData] = None
+                                ) -> Tuple[Optional[List[PaymentScheduleRow]], Dict]:
     """
     VBA modify_calc() function - Main modification processing
     Handles modification chains and gain/loss calculations
+    
+    previous_lease is the lease this one modifies (modifies_this_id). Balances are
+    captured from its schedule at its modification date, and this lease's schedule
+    is regenerated with generate_schedule_from() seeded from them. Without it the
+    balances are unknown: the schedule is returned unchanged, with no gains.
+    schedule may be None when lease_data's schedule has not been generated: it is
+    only generated if the modification is not applied.
     """
     if not lease_data.modifies_this_id or lease_data.modifies_this_id <= 0:
         return schedule, {}
@@ -39,30 +51,34 @@ def process_lease_modifications(lease_data: LeaseData, schedule: List[PaymentSch
         # current_lease_id = previous_lease.modifies_this_id
         break  # Simplified - would traverse full chain
     
-    if not modification_chain:
+    if not modification_chain or previous_lease is None:
         return schedule, modification_results
     
-    # VBA Line 729: nextleasedate = date_modified
-    nextleasedate = lease_data.date_modified
+    # VBA Line 729: nextleasedate = date_modified (of the lease being modified)
+    modified_lease = previous_lease
+    nextleasedate = modified_lease.date_modified or lease_data.date_modified
     
     if not nextleasedate:
         return schedule, modification_results
     
     # VBA Line 731-740: Calculate security_gross at modification
-    sec_gross = lease_data.security_deposit or 0.0
-    if hasattr(lease_data, 'security_dates') and lease_data.security_dates:
+    sec_gross = modified_lease.security_deposit or 0.0
+    if hasattr(modified_lease, 'security_dates') and modified_lease.security_dates:
         for qqq in range(1, 5):
-            if (qqq <= len(lease_data.security_dates) and 
-                lease_data.security_dates[qqq - 1] and
-                lease_data.security_dates[qqq - 1] <= baldate):
+            if (qqq <= len(modified_lease.security_dates) and 
+                modified_lease.security_dates[qqq - 1] and
+                modified_lease.security_dates[qqq - 1] <= baldate):
                 if qqq == 1:
-                    sec_gross += lease_data.increase_security_1 or 0.0
+                    sec_gross += modified_lease.increase_security_1 or 0.0
                 elif qqq == 2:
-                    sec_gross += lease_data.increase_security_2 or 0.0
+                    sec_gross += modified_lease.increase_security_2 or 0.0
                 elif qqq == 3:
-                    sec_gross += lease_data.increase_security_3 or 0.0
+                    sec_gross += modified_lease.increase_security_3 or 0.0
                 elif qqq == 4:
-                    sec_gross += lease_data.increase_security_4 or 0.0
+                    sec_gross += modified_lease.increase_security_4 or 0.0
+    
+    # Balances are read from the modified lease's schedule
+    modified_schedule = generate_complete_schedule(previous_lease)
     
     # VBA Line 743-784: Find modification date in schedule and capture values
     Liability_value = 0.0
@@ -72,65 +88,112 @@ def process_lease_modifications(lease_data: LeaseData, schedule: List[PaymentSch
     deprp = 0.0  # Cumulative depreciation up to modification
     
     # Find modification row and capture balances
-    mod_row = None
-    for row in schedule:
+    for row in modified_schedule:
         row_date = getattr(row, 'payment_date', row.date)
-        if isinstance(row_date, date) and row_date == nextleasedate:
-            Liability_value = row.lease_liability
-            security_value = row.security_deposit_pv or 0.0
-            ROU_value = row.rou_asset
-            ARO_value = row.aro_provision or 0.0
-            mod_row = row
-            break
-        elif row_date < nextleasedate:
+        if isinstance(row_date, date) and row_date < nextleasedate:
             deprp += abs(row.depreciation or 0.0)
     
-    if not mod_row:
-        # Insert modification row if not found (VBA Line 755-783)
-        # Simplified - would insert row with interpolated values
-        pass
+    # VBA Line 755-783: Inserts the modification row when it is not plotted
+    balances = balances_at(modified_lease, modified_schedule, nextleasedate)
+    balances.security_gross = sec_gross
+    Liability_value = balances.lease_liability
+    security_value = balances.security_deposit_pv
+    ROU_value = balances.rou_asset
+    ARO_value = balances.aro_provision
     
     modification_results['liability_at_modification'] = Liability_value
     modification_results['rou_at_modification'] = ROU_value
     modification_results['security_at_modification'] = security_value
     modification_results['aro_at_modification'] = ARO_value
+    modification_results['depreciation_to_modification'] = deprp
+    
+    # VBA Line 789-813: Regenerate the modifying lease (Call datessrent) with
+    # I7 = ROU_value, then K9 and the modification gains (COVID practical
+    # expedient K7, gain on modification K6, sublease gain/loss K5)
+    schedule = generate_schedule_from(lease_data, None, balances, modification=True)
+    if schedule:
+        gains = remeasure_at_restart(lease_data, schedule[0], balances, modification=True)
+        modification_results['covid_pe_gain'] = gains['covid_pe_gain']
+        modification_results['modification_gain'] = gains['modification_gain']
+        modification_results['sublease_modification_gainloss'] = gains['sublease_modification_gainloss']
     
-    # VBA Line 789-813: Calculate modification gain/loss
-    # Recalculate from modification date with new terms
-    # This would trigger a new schedule generation from modification date
-    
-    # VBA Line 796-798: COVID Practical Expedient
-    if lease_data.practical_expedient == "Yes":
-        # covid_pe_gain = new_liability - old_liability
-        # Would need new schedule to calculate
-        modification_results['covid_pe_gain'] = 0.0  # Placeholder
-    
-    # VBA Line 800-806: Modification gain/loss
-    # K9 = G7 + O9 + L9 - Liability_value - ARO_value + security_value + D6 - sec_gross
-    ide = (lease_data.initial_direct_expenditure or 0) - (lease_data.lease_incentive or 0)
-    
-    # Would need to recalculate schedule from modification date to get new values
-    # Simplified calculation:
-    modification_gain = (
-        Liability_value +  # Old liability
-        ARO_value -  # Old ARO
-        security_value -  # Old security PV
-        (lease_data.security_deposit or 0.0) +  # New security base
-        sec_gross  # New security gross
-    )
+    return schedule, modification_results
+
+
+def balances_at(lease_data: LeaseData, schedule: List[PaymentScheduleRow], on_date: date) -> OpeningBalances:
+    """
+    Liability, ROU, security deposit PV and ARO provision on on_date
     
-    # VBA Line 802-806: If I9 < 0, additional gain calculation
-    # (Would need new ROU asset calculation)
+    VBA Line 743-783 / 841-863: the row for on_date if plotted; otherwise VBA inserts
+    a row and fills the formulas down, so the liability accrues interest from the
+    previous row (no rent) and the other balances carry over.
+    """
+    previous = None
+    for row in schedule:
+        if row.date == on_date:
+            return OpeningBalances(
+                lease_liability=row.lease_liability,
+                rou_asset=row.rou_asset,
+                security_deposit_pv=row.security_deposit_pv or 0.0,
+                aro_provision=row.aro_provision or 0.0,
+            )
+        if row.date > on_date:
+            break
+        previous = row
+    if previous is None:
+        return OpeningBalances()
+    
+    # F = G * (1+r*icompound/12)^((days/365)*12/icompound) - G on the inserted row
+    icompound = _derive_icompound(lease_data)
+    discount_rate = (lease_data.borrowing_rate or 8) / 100
+    days_between = (on_date - previous.date).days
+    liability = previous.lease_liability * discount_curve(discount_rate, icompound).compound(days_between)
+    return OpeningBalances(
+        lease_liability=liability,
+        rou_asset=previous.rou_asset,
+        security_deposit_pv=previous.security_deposit_pv or 0.0,
+        aro_provision=previous.aro_provision or 0.0,
+    )
+
+
+def apply_index_resets(lease_data: LeaseData, schedule: List[PaymentScheduleRow],
+                       baldate: date) -> List[PaymentScheduleRow]:
+    """
+    VBA indexrate() function (Lines 828-877) - remeasure at each index reset
     
-    # VBA Line 808-812: Sublease modification gain/loss
-    if lease_data.sublease == "Yes":
-        # K5 = Liability_value - new_liability
-        # Would need new schedule calculation
-        modification_results['sublease_modification_gainloss'] = 0.0  # Placeholder
+    Each reset date is the day after a findrent() rent period ends. The schedule
+    is regenerated from that date with generate_schedule_from(), seeded from the
+    balances on the date, and spliced after the rows before it. Stops at the
+    balance date, the end date or the termination/modification date.
     
-    modification_results['modification_gain'] = modification_gain
+    Not called by LeaseProcessor yet: index_rate_table only names a table and no
+    index rate series is read, so a reset would remeasure with unchanged rents.
+    """
+    if not lease_data.index_rate_table or not schedule:
+        return schedule
+    
+    # VBA Line 837: forceenddate = Max(termination_date, date_modified), else end_date
+    if lease_data.termination_date or lease_data.date_modified:
+        forceenddate = max(d for d in (lease_data.termination_date, lease_data.date_modified) if d)
+    else:
+        forceenddate = lease_data.end_date
+    
+    # VBA Line 833-838: next reset = app_rent_date + 1
+    for n in range(1, 201):
+        _, app_rent_date = findrent(lease_data, n)
+        nextleasedate = app_rent_date + timedelta(days=1)
+        if nextleasedate > baldate or nextleasedate == lease_data.end_date or nextleasedate >= forceenddate:
+            break
+        if nextleasedate <= schedule[0].date:
+            continue
+        
+        balances = balances_at(lease_data, schedule, nextleasedate)
+        restarted = generate_schedule_from(lease_data, nextleasedate, balances)
+        if not restarted:
+            break
+        schedule = [row for row in schedule if row.date < nextleasedate] + restarted
     
-    return schedule, modification_results
+    return schedule
 
 
 def calculate_original_lease_id(lease_id: int, modifies_this_id: Optional[int]) -> int:
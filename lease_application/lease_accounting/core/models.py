@@ -216,6 +216,19 @@ class PaymentScheduleRow:
         }
 
 
+@dataclass
+class OpeningBalances:
+    """
+    Balances carried into a regenerated schedule
+    VBA modify_calc()/indexrate(): Liability_value, ROU_value, security_value, ARO_value, sec_gross
+    """
+    lease_liability: float = 0.0
+    rou_asset: float = 0.0
+    security_deposit_pv: float = 0.0
+    aro_provision: float = 0.0
+    security_gross: float = 0.0  # Security deposit paid to date (modifications only)
+
+
 @dataclass
 class LeaseResult:
     """Results for a single lease - mirrors Excel Results sheet"""
@@ -335,6 +348,9 @@ class ProcessingFilters:
     profit_center_filter: Optional[str] = None
     gaap_standard: str = "IFRS"  # IFRS, IndAS, or US-GAAP
     enable_projections: bool = True  # VBA: A3.Value = 1 (enable projections)
-    projection_periods: int = 3  # Number of periods to calculate (max 6)
+    projection_periods: Optional[int] = 3  # Number of periods to calculate (max 6)
     projection_period_months: int = 3  # Months per period (VBA: A4.Value)
+    extended_projections: bool = False  # Consecutive periods, no 6 cap; projection_periods=None runs to lease end
+    results_only: bool = False  # Build schedule rows only up to the reporting horizon (same results)
+    compact_schedules: bool = False  # Leave out month-end rows outside the reporting window (same balances)
 
@@ -13,11 +13,16 @@ VBA Function: compu() Sub (Lines 251-624)
 """
 
 from datetime import date, datetime, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from dateutil.relativedelta import relativedelta
 import logging
 from lease_accounting.core.models import LeaseData, LeaseResult, ProcessingFilters, PaymentScheduleRow
-from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
+from lease_accounting.core.schedule_index import ScheduleIndex
+from lease_accounting.schedule.generator_vba_complete import (
+    generate_complete_schedule, generate_schedule_to_horizon, generate_compact_schedule,
+)
+from lease_accounting.utils.date_utils import eomonth
+from lease_accounting.utils.discount_factors import discount_curve
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +36,8 @@ class LeaseProcessor:
     def __init__(self, filters: ProcessingFilters):
         self.filters = filters
         self.lease_results = []
+        # Leases of the current run by auto_id (modification chains)
+        self._leases_by_id: Dict[int, LeaseData] = {}
     
     def process_all_leases(self, lease_data_list: List[LeaseData]) -> List[LeaseResult]:
         """
@@ -38,6 +45,7 @@ class LeaseProcessor:
         Main loop equivalent to For ai = G2 To G3 in VBA
         """
         results = []
+        self._leases_by_id = {lease_data.auto_id: lease_data for lease_data in lease_data_list}
         
         for lease_data in lease_data_list:
             # Check filters
@@ -92,7 +100,9 @@ class LeaseProcessor:
         else:
             return lease_data.short_term_lease_ifrs == "Yes"
     
-    def process_single_lease(self, lease_data: LeaseData) -> Optional[LeaseResult]:
+    def process_single_lease(self, lease_data: LeaseData,
+                             schedule: Optional[List[PaymentScheduleRow]] = None,
+                             previous_lease: Optional[LeaseData] = None) -> Optional[LeaseResult]:
         """
         Process a single lease - equivalent to main loop in compu()
         
@@ -104,40 +114,82 @@ class LeaseProcessor:
           4. Get closing balances (VBA Lines 404-419)
           5. Split current/non-current liability (VBA Lines 553-566)
           6. Create LeaseResult object (VBA Results sheet)
-        """
-        if not self.filters.start_date or not self.filters.end_date:
-            return None
         
-        # Generate payment schedule
-        schedule = generate_complete_schedule(lease_data)
+        schedule: lease_data's schedule if already generated (e.g. by
+        generate_schedules_by_standard()), otherwise it is generated here.
+        With filters.results_only, only the rows up to the reporting horizon
+        are generated where the results allow it; with filters.compact_schedules,
+        month-end rows outside the reporting window are left out (see
+        _results_only_schedule()).
         
-        if not schedule:
+        previous_lease: the lease lease_data modifies, if it is not in the current
+        run (see process_lease_modifications()).
+        """
+        if not self.filters.start_date or not self.filters.end_date:
             return None
+        schedule = self.lease_schedule(lease_data, schedule, previous_lease)
+        return self.result_from_schedule(lease_data, schedule)
+    
+    def lease_schedule(self, lease_data: LeaseData,
+                       schedule: Optional[List[PaymentScheduleRow]] = None,
+                       previous_lease: Optional[LeaseData] = None) -> Optional[List[PaymentScheduleRow]]:
+        """
+        The schedule process_single_lease() reads lease_data's results from
         
+        A lease modifying one that is known (previous_lease or the current run) is
+        regenerated from the balances at the modification date
+        (process_lease_modifications()), and its schedule is not generated first.
+        The modification results are stored in lease_data.calculated_fields.
+        """
         # VBA Line 361: Process lease modifications if applicable
         if lease_data.modifies_this_id and lease_data.modifies_this_id > 0:
             from lease_accounting.core.lease_modifications import process_lease_modifications
             schedule, mod_results = process_lease_modifications(
-                lease_data, schedule, self.filters.end_date
+                lease_data, schedule, self.filters.end_date,
+                previous_lease=previous_lease or self.modified_lease(lease_data)
             )
             # Store modification results in lease_data for use in results
             lease_data.calculated_fields.update(mod_results)
         
+        # Generate payment schedule
+        if schedule is None and (self.filters.results_only or self.filters.compact_schedules):
+            schedule = self._results_only_schedule(lease_data)
+        if schedule is None:
+            schedule = generate_complete_schedule(lease_data)
+        return schedule
+    
+    def modified_lease(self, lease_data: LeaseData) -> Optional[LeaseData]:
+        """The lease of the current run lease_data modifies, if any"""
+        if not lease_data.modifies_this_id or lease_data.modifies_this_id <= 0:
+            return None
+        return self._leases_by_id.get(lease_data.modifies_this_id)
+    
+    def result_from_schedule(self, lease_data: LeaseData,
+                             schedule: Optional[List[PaymentScheduleRow]]) -> Optional[LeaseResult]:
+        """Results for lease_data from the schedule lease_schedule() returned"""
+        if not self.filters.start_date or not self.filters.end_date:
+            return None
+        if not schedule:
+            return None
+        
+        # Date/prefix-sum index for the balance and period lookups below
+        index = ScheduleIndex(schedule)
+        
         # Calculate opening balances
         opening_liability, opening_rou, opening_aro, opening_security = self.get_opening_balances(
-            schedule, self.filters.start_date
+            schedule, self.filters.start_date, index
         )
         
         # Calculate period activity (depreciation, interest, rent paid)
         # Pass date_modified if available in lease_data
         date_modified = getattr(lease_data, 'date_modified', None)
         period_activity = self.calculate_period_activity(
-            schedule, self.filters.start_date, self.filters.end_date, date_modified
+            schedule, self.filters.start_date, self.filters.end_date, date_modified, index
         )
         
         # Calculate closing balances (VBA: baldate = D3)
         closing_liability, closing_rou, closing_aro, closing_security = self.get_closing_balances(
-            schedule, self.filters.end_date
+            schedule, self.filters.end_date, index
         )
         
         # Calculate Current vs Non-Current Liability
@@ -158,7 +210,7 @@ class LeaseProcessor:
         
         # Get PV factor at balance date (baldatepv) - VBA Line 410
         baldatepv = self._get_pv_factor_at_date(
-            schedule, self.filters.end_date, lease_data
+            schedule, self.filters.end_date, lease_data, index
         )
         
         # Calculate current liability = sum of PV of payments due in next 12 months
@@ -168,20 +220,25 @@ class LeaseProcessor:
         twelve_months_later = self.filters.end_date + relativedelta(months=12)
         
         liacurrent = 0.0
-        for row in schedule:
-            # Get row date - PaymentScheduleRow uses 'date' attribute
-            row_date = row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None)
-            if not row_date:
-                continue
-                
-            # Check if payment is in next 12 months after balance date
-            # VBA: cell.Value > opendatep And cell.Value <= baldatep (for projection period 1, 12 months)
-            if (row_date > self.filters.end_date and 
-                row_date <= twelve_months_later and 
-                row.rental_amount and row.rental_amount > 0):
-                # VBA Line 543: liacurrent = liacurrent + rental * pv_factor / baldatepv
-                if baldatepv > 0 and row.pv_factor:
-                    liacurrent += row.rental_amount * row.pv_factor / baldatepv
+        if index.ordered:
+            # Sum of D*E over the window from the index prefix sums
+            if baldatepv > 0:
+                liacurrent = index.pv_of_rent_between(self.filters.end_date, twelve_months_later) / baldatepv
+        else:
+            for row in schedule:
+                # Get row date - PaymentScheduleRow uses 'date' attribute
+                row_date = row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None)
+                if not row_date:
+                    continue
+                    
+                # Check if payment is in next 12 months after balance date
+                # VBA: cell.Value > opendatep And cell.Value <= baldatep (for projection period 1, 12 months)
+                if (row_date > self.filters.end_date and 
+                    row_date <= twelve_months_later and 
+                    row.rental_amount and row.rental_amount > 0):
+                    # VBA Line 543: liacurrent = liacurrent + rental * pv_factor / baldatepv
+                    if baldatepv > 0 and row.pv_factor:
+                        liacurrent += row.rental_amount * row.pv_factor / baldatepv
         
         # Apply sublease multiplier (VBA: * subl) - VBA Line 362
         subl = -1 if lease_data.sublease == "Yes" else 1
@@ -206,12 +263,13 @@ class LeaseProcessor:
         # Calculate Projections (VBA Lines 510-568)
         from lease_accounting.core.projection_calculator import ProjectionCalculator
         
-        projection_calc = ProjectionCalculator(schedule, lease_data)
+        projection_calc = ProjectionCalculator(schedule, lease_data, index)
         projections = projection_calc.calculate_projections(
             balance_date=self.filters.end_date,
             projection_periods=self.filters.projection_periods,
             period_months=self.filters.projection_period_months,
-            enable_projections=self.filters.enable_projections
+            enable_projections=self.filters.enable_projections,
+            extended=self.filters.extended_projections
         )
         
         # Log for debugging
@@ -243,18 +301,24 @@ class LeaseProcessor:
                     
                     # Find security deposit PV at projection date
                     sec_current_at_projection = 0.0
-                    for row in schedule:
-                        row_date = row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None)
-                        if row_date and row_date == first_projection_date:
-                            sec_current_at_projection = row.security_deposit_pv or 0.0
-                            break
-                        elif row_date and row_date > first_projection_date:
-                            # Use previous row's value (interpolation)
-                            if len(schedule) > 0:
-                                prev_idx = schedule.index(row) - 1
-                                if prev_idx >= 0:
-                                    sec_current_at_projection = schedule[prev_idx].security_deposit_pv or 0.0
-                            break
+                    if index.ordered:
+                        # Row on the date, else the row before the first row after it
+                        i = index.row_on_or_before(first_projection_date)
+                        if i is not None and (i < len(index) - 1 or index.dates[i] == first_projection_date):
+                            sec_current_at_projection = schedule[i].security_deposit_pv or 0.0
+                    else:
+                        for row in schedule:
+                            row_date = row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None)
+                            if row_date and row_date == first_projection_date:
+                                sec_current_at_projection = row.security_deposit_pv or 0.0
+                                break
+                            elif row_date and row_date > first_projection_date:
+                                # Use previous row's value (interpolation)
+                                if len(schedule) > 0:
+                                    prev_idx = schedule.index(row) - 1
+                                    if prev_idx >= 0:
+                                        sec_current_at_projection = schedule[prev_idx].security_deposit_pv or 0.0
+                                break
                     
                     # VBA Line 554: If sec_current = 0 Then
                     # If security deposit at projection date is 0, all is current
@@ -294,11 +358,9 @@ class LeaseProcessor:
             self.filters.start_date and self.filters.end_date and
             self.filters.start_date < lease_data.lease_start_date <= self.filters.end_date):
             # Find initial ROU from schedule (first row after lease start = I9)
-            for row in schedule:
-                row_date = row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None)
-                if row_date and row_date == lease_data.lease_start_date:
-                    initial_rou_asset = row.rou_asset or 0.0
-                    break
+            start_row = index.row_at(lease_data.lease_start_date)
+            if start_row is not None:
+                initial_rou_asset = start_row.rou_asset or 0.0
         
         # BB4: Security Deposit Gross (VBA Lines 421-424, 490)
         security_deposit_gross = self._calculate_security_deposit_gross(lease_data, self.filters.end_date)
@@ -310,7 +372,7 @@ class LeaseProcessor:
             # VBA: deprp + H4 + J7 (accumulated from Firstdate to opendate + period depreciation + J7)
             # For now, calculate from lease start to end_date
             accumulated_depreciation = self._calculate_accumulated_depreciation(
-                schedule, lease_data, self.filters.start_date, self.filters.end_date
+                schedule, lease_data, self.filters.start_date, self.filters.end_date, index
             )
         
         # BD4: Initial Direct Expenditure on transition (VBA Line 599)
@@ -364,12 +426,10 @@ class LeaseProcessor:
                 # Find initial ROU and Liability at lease start
                 initial_rou = 0.0
                 initial_liability = 0.0
-                for row in schedule:
-                    row_date = row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None)
-                    if row_date and row_date == lease_data.lease_start_date:
-                        initial_rou = row.rou_asset or 0.0
-                        initial_liability = row.lease_liability or 0.0
-                        break
+                start_row = index.row_at(lease_data.lease_start_date)
+                if start_row is not None:
+                    initial_rou = start_row.rou_asset or 0.0
+                    initial_liability = start_row.lease_liability or 0.0
                 sublease_gain_loss = initial_rou - initial_liability
         
         # VBA Line 460: Sublease Modification Gain/Loss
@@ -387,12 +447,7 @@ class LeaseProcessor:
         if (lease_data.termination_date and self.filters.start_date and self.filters.end_date and
             self.filters.start_date < lease_data.termination_date <= self.filters.end_date):
             # Find termination row in schedule
-            termination_row = None
-            for row in schedule:
-                row_date = row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None)
-                if row_date and row_date == lease_data.termination_date:
-                    termination_row = row
-                    break
+            termination_row = index.row_at(lease_data.termination_date)
             
             if termination_row:
                 # VBA Line 468: Termination gain = Termination_penalty + ROU - Liability - sec_grossT + Security_PV - ARO_PV + All other gains
@@ -493,14 +548,82 @@ class LeaseProcessor:
         
         return result
     
+    def _results_horizon(self) -> Optional[date]:
+        """
+        Last date process_single_lease() reads from the schedule: the 12-month current
+        portion (VBA Line 543) and the projection periods. None when projections run
+        to lease end.
+        """
+        horizon = self.filters.end_date + relativedelta(months=12)
+        if self.filters.enable_projections:
+            if self.filters.projection_periods is None:
+                return None
+            # VBA projection modes move baldatep on twice per period (Lines 522, 537)
+            months = 2 * self.filters.projection_periods * self.filters.projection_period_months
+            horizon = max(horizon, eomonth(self.filters.end_date, months))
+        return horizon
+    
+    def _results_only_schedule(self, lease_data: LeaseData) -> Optional[List[PaymentScheduleRow]]:
+        """
+        Schedule rows up to the first row after the reporting horizon (results_only),
+        without the month-end rows outside the reporting window (compact_schedules),
+        or None when the full schedule is needed: modifications regenerate from
+        the schedule, and US-GAAP operating depreciation reads the
+        whole F column. Every lookup at or before the horizon finds the same balances
+        and period totals as in the full schedule.
+        """
+        window, horizon = self._results_only_bounds(lease_data)
+        if window is not None:
+            schedule = generate_compact_schedule(lease_data, window, horizon)
+            if schedule is not None:
+                return schedule
+        if horizon is None:
+            return None
+        return generate_schedule_to_horizon(lease_data, horizon)
+    
+    def _results_only_bounds(self, lease_data: LeaseData) -> Tuple[Optional[Tuple[date, date]], Optional[date]]:
+        """
+        (accrual_window, horizon) of the schedule _results_only_schedule() generates:
+        the month-end rows kept by generate_compact_schedule() (compact_schedules,
+        else None) and the horizon the rows stop after (results_only and the lease
+        runs past it, else None). (None, None): the full schedule.
+        """
+        if lease_data.modifies_this_id and lease_data.modifies_this_id > 0:
+            return None, None
+        if not lease_data.end_date:
+            return None, None
+        horizon = self._results_horizon()
+        truncate = self.filters.results_only and horizon is not None and horizon < lease_data.end_date
+        window = None
+        if self.filters.compact_schedules:
+            # Month-end rows from the one before start_date: opening balances and
+            # period sums read the same rows as in the full schedule. Projections
+            # from after the end date start from the last row before it.
+            first = min(eomonth(self.filters.start_date, -1), eomonth(lease_data.end_date, -1))
+            if lease_data.transition_option == "2B" and lease_data.transition_date:
+                # Accumulated depreciation sums the rows after transition_date (VBA Line 583)
+                first = min(first, eomonth(lease_data.transition_date, -1))
+            window = (first, horizon or date.max)
+        return window, horizon if truncate else None
+    
     def _get_pv_factor_at_date(self, schedule: List[PaymentScheduleRow], 
-                               balance_date: date, lease_data: LeaseData) -> float:
+                               balance_date: date, lease_data: LeaseData,
+                               index: Optional[ScheduleIndex] = None) -> float:
         """
         Get PV factor at balance date (baldatepv)
         VBA: Find cell.Value = baldate, get cell.Offset(0, 2).Value (PV factor)
         """
+        if index is not None and index.ordered:
+            # Row on the date, else the last row before it
+            i = index.row_on_or_before(balance_date)
+            if i is not None:
+                return schedule[i].pv_factor if schedule[i].pv_factor else 1.0
+            schedule_for_scan = ()
+        else:
+            schedule_for_scan = schedule
+        
         # First, try to find exact date match
-        for row in schedule:
+        for row in schedule_for_scan:
             row_date = row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None)
             if row_date == balance_date:
                 return row.pv_factor if row.pv_factor else 1.0
@@ -510,7 +633,7 @@ class LeaseProcessor:
         prev_row = None
         next_row = None
         
-        for i, row in enumerate(schedule):
+        for i, row in enumerate(schedule_for_scan):
             row_date = row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None)
             if not row_date:
                 continue
@@ -548,13 +671,13 @@ class LeaseProcessor:
             days_from_start = (balance_date - start_date).days
             
             if days_from_start > 0:
-                pv_factor = 1 / ((1 + discount_rate * icompound / 12) ** ((days_from_start / 365) * 12 / icompound))
+                pv_factor = discount_curve(discount_rate, icompound).discount(days_from_start)
                 return pv_factor
         
         return 1.0
     
     def get_opening_balances(self, schedule: List[PaymentScheduleRow], 
-                            balance_date: date) -> tuple:
+                            balance_date: date, index: Optional[ScheduleIndex] = None) -> tuple:
         """
         Get opening balances at a specific date
         
@@ -564,7 +687,12 @@ class LeaseProcessor:
           2. If cell.Value < opendate And cell.Offset(1, 0).Value > opendate:
              INSERT row with opendate and COPY values from previous row (columns E-O) (Lines 374-380)
         Returns: (liability, rou, aro, security_deposit)
+        
+        index: ScheduleIndex of schedule, for an O(log n) lookup
         """
+        if index is not None and index.ordered:
+            return index.opening_balances(balance_date)
+        
         # VBA logic: find exact match or interpolate by inserting row
         for i, row in enumerate(schedule):
             # Get date from row
@@ -621,7 +749,7 @@ class LeaseProcessor:
         return (0.0, 0.0, 0.0, 0.0)
     
     def get_closing_balances(self, schedule: List[PaymentScheduleRow],
-                            balance_date: date) -> tuple:
+                            balance_date: date, index: Optional[ScheduleIndex] = None) -> tuple:
         """
         Get closing balances at a specific date
         
@@ -632,7 +760,12 @@ class LeaseProcessor:
           3. If cell.Value < baldate And cell.Offset(1, 0).Value > baldate:
              INSERT row with baldate and COPY values from previous row (columns E-O) (Lines 413-418)
         Returns: (liability, rou, aro, security_deposit)
+        
+        index: ScheduleIndex of schedule, for an O(log n) lookup
         """
+        if index is not None and index.ordered:
+            return index.closing_balances(balance_date)
+        
         closing_liability = 0.0
         closing_rou = 0.0
         closing_aro = 0.0
@@ -690,7 +823,8 @@ class LeaseProcessor:
     
     def calculate_period_activity(self, schedule: List[PaymentScheduleRow],
                                   start_date: date, end_date: date, 
-                                  date_modified: Optional[date] = None) -> dict:
+                                  date_modified: Optional[date] = None,
+                                  index: Optional[ScheduleIndex] = None) -> dict:
         """
         Calculate depreciation, interest, and rent paid for period
         
@@ -703,7 +837,12 @@ class LeaseProcessor:
           - Lines 454-460: Special gains/losses (COVID PE, modification, sublease)
           - Lines 462-474: Termination gain/loss calculation
         Returns: dict with 'depreciation', 'interest', 'rent_paid', 'aro_interest', 'security_change'
+        
+        index: ScheduleIndex of schedule - the sums come from its prefix sums in O(log n)
         """
+        if index is not None and index.ordered:
+            return index.period_activity(start_date, end_date, date_modified)
+        
         depreciation = 0.0
         interest = 0.0
         rent_paid = 0.0
@@ -818,7 +957,8 @@ class LeaseProcessor:
         return sec_gross
     
     def _calculate_accumulated_depreciation(self, schedule: List[PaymentScheduleRow],
-                                          lease_data: LeaseData, start_date: date, end_date: date) -> float:
+                                          lease_data: LeaseData, start_date: date, end_date: date,
+                                          index: Optional[ScheduleIndex] = None) -> float:
         """
         Calculate Accumulated Depreciation from lease start
         VBA Source: Line 585
@@ -832,6 +972,9 @@ class LeaseProcessor:
         if not first_date:
             return 0.0
         
+        if index is not None and index.ordered:
+            return index.depreciation_between(first_date, start_date)
+        
         accumulated_dep = 0.0
         
         # VBA Line 583: For cell.Value > Firstdate And cell.Value <= opendate
@@ -15,6 +15,7 @@ from typing import List, Dict, Optional
 from dateutil.relativedelta import relativedelta
 import logging
 from lease_accounting.core.models import LeaseData, PaymentScheduleRow
+from lease_accounting.core.schedule_index import ScheduleIndex
 from lease_accounting.utils.date_utils import eomonth
 
 logger = logging.getLogger(__name__)
@@ -24,18 +25,31 @@ class ProjectionCalculator:
     """
     Calculates projection periods showing future balances and activity
     VBA Source: Lines 510-568 (Projections loop)
+    
+    The projection dates are worked out first; balances and period sums for all
+    of them then come from the schedule's ScheduleIndex (bisect to each boundary,
+    prefix-sum differences per period) instead of a schedule scan per period.
+    Pass the index when the caller already has one for this schedule.
     """
     
-    def __init__(self, schedule: List[PaymentScheduleRow], lease_data: LeaseData):
+    def __init__(self, schedule: List[PaymentScheduleRow], lease_data: LeaseData,
+                 index: Optional[ScheduleIndex] = None):
         self.schedule = schedule
         self.lease_data = lease_data
+        self.index = index if index is not None and index.schedule is schedule else ScheduleIndex(schedule)
+        # Last schedule date (rows without a date are ignored)
+        if self.index.ordered:
+            self._max_date = self.index.dates[-1] if self.index.dates else None
+        else:
+            self._max_date = max((d for d in self.index.dates if d), default=None)
         
     def calculate_projections(
         self, 
         balance_date: date,
-        projection_periods: int = 3,
+        projection_periods: Optional[int] = 3,
         period_months: int = 3,
-        enable_projections: bool = True
+        enable_projections: bool = True,
+        extended: bool = False
     ) -> List[Dict[str, any]]:
         """
         Calculate projection periods
@@ -46,10 +60,13 @@ class ProjectionCalculator:
             projection_periods: Number of periods to calculate (max 6, like VBA)
             period_months: Months per period (from A4 in VBA)
             enable_projections: Whether projections are enabled (A3 in VBA)
+            extended: Extended mode for cash-flow forecasting - consecutive periods
+                of period_months with no 6-period cap; projection_periods=None
+                projects to lease end
         
         Returns:
             List of projection dicts, each containing:
-            - projection_mode: 1-6
+            - projection_mode: 1-6 (1-n in extended mode)
             - projection_date: Future date
             - closing_liability: Liability at projection date
             - closing_rou_asset: ROU Asset at projection date
@@ -57,17 +74,51 @@ class ProjectionCalculator:
             - interest: Sum of interest in period
             - rent_paid: Sum of rent paid in period
         """
-        if not enable_projections or projection_periods <= 0:
+        if not enable_projections or (projection_periods is not None and projection_periods <= 0):
+            return []
+        if projection_periods is None and not extended:
             return []
         
-        projections = []
-        baldatep = balance_date  # VBA: baldatep = baldate
-        projectionmode = 0
-        max_projections = min(projection_periods, 6)  # VBA: projectionmode < 6
+        balance_date = self._projection_start(balance_date)
+        if balance_date is None:
+            return []
+        
+        if extended:
+            periods = self._extended_periods(balance_date, projection_periods, period_months)
+        else:
+            periods = self._vba_periods(balance_date, min(projection_periods, 6), period_months)
         
         # Sublease multiplier (VBA Line 362)
         subl = -1 if self.lease_data.sublease == "Yes" else 1
         
+        projections = []
+        for projectionmode, (opendatep, baldatep) in enumerate(periods, start=1):
+            # VBA Lines 526-533: pfindclosing - Find closing balances at baldatep
+            closing_liability_p, closing_rou_p = self._find_closing_at_date(baldatep)
+            
+            # VBA Lines 537-546: pfindPL - Calculate period activity
+            # Sum depreciation, interest, rent between opendatep and baldatep
+            deprp, inttp, RentPaidp = self._calculate_period_activity(opendatep, baldatep)
+            
+            # VBA Lines 548-550: Store results
+            # AD4 = closing_liability, AC4 = closing_rou
+            # AE4 = depreciation, AF4 = interest, AG4 = rent
+            projection = {
+                'projection_mode': projectionmode,
+                'projection_date': baldatep.isoformat(),
+                'closing_liability': closing_liability_p * subl,
+                'closing_rou_asset': closing_rou_p * subl,
+                'depreciation': deprp * subl,
+                'interest': inttp * subl,
+                'rent_paid': RentPaidp * subl,
+            }
+            
+            projections.append(projection)
+        
+        return projections
+    
+    def _projection_start(self, balance_date: date) -> Optional[date]:
+        """Date the projections run from, or None when projections are skipped"""
         # VBA Line 386: forceenddate = Max(date_modified, termination_date)
         # VBA Line 511: If forceenddate <= baldate And forceenddate <> 0 Then GoTo skip_projections
         # This means: if lease was terminated/modified on or before balance_date, skip projections
@@ -81,38 +132,23 @@ class ProjectionCalculator:
         elif self.lease_data.termination_date:
             forceenddate = self.lease_data.termination_date
         
+        max_schedule_date = self._max_date
+        
         # VBA Line 511: If forceenddate <= baldate And forceenddate <> 0 Then GoTo skip_projections
         # However, if schedule data exists beyond termination_date AND beyond balance_date, allow projections
         # This handles cases where lease was modified but schedule continues
         if forceenddate:
-            # Find max schedule date
-            max_schedule_check = None
-            for row in self.schedule:
-                row_date = row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None)
-                if row_date:
-                    if max_schedule_check is None or row_date > max_schedule_check:
-                        max_schedule_check = row_date
-            
             # VBA Line 511: If forceenddate <= balance_date, skip projections
             # BUT: If schedule extends beyond balance_date, we can still project forward
             if forceenddate <= balance_date:
                 # Only skip if max schedule date is at or before balance_date (no future to project)
-                if not max_schedule_check or max_schedule_check <= balance_date:
-                    return []
+                if not max_schedule_date or max_schedule_date <= balance_date:
+                    return None
         
         # If forceenddate is after balance_date (future modification), can't project into that period
         if forceenddate and forceenddate > balance_date:
             # Can't project into a future modification - return empty
-            return []
-        
-        # Check if there's any schedule data after balance_date for projections
-        # If balance_date is beyond all schedule dates, we can't project forward
-        max_schedule_date = None
-        for row in self.schedule:
-            row_date = row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None)
-            if row_date:
-                if max_schedule_date is None or row_date > max_schedule_date:
-                    max_schedule_date = row_date
+            return None
         
         # If balance_date is beyond max_schedule_date, start from max_schedule_date
         # This ensures we can still calculate projections even when to_date extends beyond lease end
@@ -121,23 +157,24 @@ class ProjectionCalculator:
         
         # If balance_date equals lease end exactly, find the last date before lease end to project from
         if self.lease_data.end_date and balance_date == self.lease_data.end_date:
-            dates_before_end = [row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None) 
-                               for row in self.schedule 
-                               if (row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None)) 
-                               and (row.date if hasattr(row, 'date') else row.payment_date) < self.lease_data.end_date]
-            if dates_before_end:
-                balance_date = max(dates_before_end)
+            if self.index.ordered:
+                before_end = self.index.date_before(self.lease_data.end_date)
+            else:
+                before_end = max((d for d in self.index.dates if d and d < self.lease_data.end_date), default=None)
+            if before_end:
+                balance_date = before_end
         
-        baldatep = balance_date
+        return balance_date
+    
+    def _vba_periods(self, balance_date: date, max_projections: int, period_months: int) -> List[tuple]:
+        """(opendatep, baldatep) of each VBA projection mode (at most 6)"""
+        periods = []
+        baldatep = balance_date  # VBA: baldatep = baldate
+        projectionmode = 0
         
         while projectionmode < max_projections:
             projectionmode += 1  # VBA Line 513
             
-            # Reset period activity counters
-            deprp = 0.0  # VBA Line 514
-            inttp = 0.0  # VBA Line 515
-            RentPaidp = 0.0  # VBA Line 516
-            
             opendatep = baldatep  # VBA Line 521
             # VBA Line 522: baldatep = EoMonth(baldatep, A4.Value)
             # Note: VBA EoMonth adds months and returns end of month
@@ -152,29 +189,7 @@ class ProjectionCalculator:
             if baldatep <= opendatep:
                 break
             
-            # VBA Lines 526-533: pfindclosing - Find closing balances at baldatep
-            closing_liability_p, closing_rou_p = self._find_closing_at_date(baldatep)
-            
-            # VBA Lines 537-546: pfindPL - Calculate period activity
-            # Sum depreciation, interest, rent between opendatep and baldatep
-            deprp, inttp, RentPaidp = self._calculate_period_activity(
-                opendatep, baldatep
-            )
-            
-            # VBA Lines 548-550: Store results
-            # AD4 = closing_liability, AC4 = closing_rou
-            # AE4 = depreciation, AF4 = interest, AG4 = rent
-            projection = {
-                'projection_mode': projectionmode,
-                'projection_date': baldatep.isoformat(),
-                'closing_liability': closing_liability_p * subl,
-                'closing_rou_asset': closing_rou_p * subl,
-                'depreciation': deprp * subl,
-                'interest': inttp * subl,
-                'rent_paid': RentPaidp * subl,
-            }
-            
-            projections.append(projection)
+            periods.append((opendatep, baldatep))
             
             # VBA Line 536: If End_date < opendatep Then GoTo Projections
             # Continue if we've reached lease end (allows showing final balances)
@@ -189,7 +204,25 @@ class ProjectionCalculator:
             if projectionmode < max_projections:
                 baldatep = self._eomonth_add(baldatep, period_months)
         
-        return projections
+        return periods
+    
+    def _extended_periods(self, balance_date: date, projection_periods: Optional[int],
+                          period_months: int) -> List[tuple]:
+        """(opendatep, baldatep) of consecutive periods up to lease end (extended mode)"""
+        end_date = self.lease_data.end_date or self._max_date
+        if end_date is None:
+            return []
+        
+        periods = []
+        opendatep = balance_date
+        while projection_periods is None or len(periods) < projection_periods:
+            baldatep = min(self._eomonth_add(opendatep, period_months), end_date)
+            if baldatep <= opendatep:
+                break
+            periods.append((opendatep, baldatep))
+            opendatep = baldatep
+        
+        return periods
     
     def _eomonth_add(self, date_val: date, months: int) -> date:
         """
@@ -212,6 +245,15 @@ class ProjectionCalculator:
         closing_liability = 0.0
         closing_rou = 0.0
         
+        if self.index.ordered:
+            # Row on the date, else the last row before it
+            i = self.index.row_on_or_before(target_date)
+            if i is not None:
+                row = self.schedule[i]
+                closing_liability = row.lease_liability or 0.0
+                closing_rou = row.rou_asset or 0.0
+            return (closing_liability, closing_rou)
+        
         # Try exact date match first
         for row in self.schedule:
             row_date = row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None)
@@ -256,6 +298,10 @@ class ProjectionCalculator:
         if from_date >= to_date:
             return (0.0, 0.0, 0.0)
         
+        if self.index.ordered:
+            # Prefix-sum differences over the period's rows
+            return self.index.projection_activity(from_date, to_date)
+        
         for row in self.schedule:
             row_date = row.date if hasattr(row, 'date') else (row.payment_date if hasattr(row, 'payment_date') else None)
             if not row_date:
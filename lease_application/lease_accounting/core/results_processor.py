@@ -6,22 +6,43 @@ VBA Source: VB script/Code, compu() Sub (Lines 316-605)
 VBA Results Sheet: Columns D4-AG4 (and beyond) for lease results
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
 from datetime import date
-from typing import List, Dict, Optional
+from functools import partial
+from pickle import PicklingError
+from typing import Any, List, Dict, Optional, Sequence
 import logging
-from lease_accounting.core.models import LeaseData, LeaseResult, ProcessingFilters
+import multiprocessing
+import os
+import pickle
+from lease_accounting.core.models import LeaseData, LeaseResult, PaymentScheduleRow, ProcessingFilters
 from lease_accounting.core.processor import LeaseProcessor
+from lease_accounting.schedule.multi_gaap import GAAP_STANDARDS, generate_schedules_by_standard
+from lease_accounting.schedule.batch import generate_schedules_batch
 from lease_accounting.utils.journal_generator import JournalGenerator
 
 logger = logging.getLogger(__name__)
 
+# Parallel bulk processing defaults (see ResultsProcessor)
+DEFAULT_WORKERS = int(os.environ.get('LEASE_BULK_WORKERS', 0)) or (os.cpu_count() or 1)
+DEFAULT_CHUNK_SIZE = int(os.environ.get('LEASE_BULK_CHUNK_SIZE', 250))
+# Batches smaller than this run serially - pool start-up would cost more than it saves
+DEFAULT_PARALLEL_MIN_LEASES = int(os.environ.get('LEASE_BULK_PARALLEL_MIN', 500))
+# Batches of at least this many leases generate their schedules with generate_schedules_batch()
+DEFAULT_BATCH_MIN_LEASES = int(os.environ.get('LEASE_BULK_BATCH_MIN', 200))
+# Workers are not forked from the request thread: a fork copies locks held by other
+# threads (logging, database pool, schedule caches) and the child can deadlock on them
+DEFAULT_START_METHOD = os.environ.get(
+    'LEASE_BULK_START_METHOD',
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
 # Import JournalEntry from journal_generator
 try:
     from lease_accounting.utils.journal_generator import JournalEntry
 except ImportError:
     # Fallback if JournalEntry is defined differently
-    from dataclasses import dataclass
-    
     @dataclass
     class JournalEntry:
         bs_pl: str
@@ -46,17 +67,101 @@ except ImportError:
             }
 
 
+@dataclass
+class LeaseOutcome:
+    """Per-lease output of bulk processing, merged in lease order"""
+    status: str  # "processed", "skipped" or "empty" (no result)
+    result_row: Optional[Dict] = None
+    journals: List[Any] = field(default_factory=list)
+    calculated_fields: Dict = field(default_factory=dict)
+
+
+def _process_lease_chunk(filters: ProcessingFilters, batch: bool, chunk: List[LeaseData],
+                         related: Dict[int, LeaseData]) -> List[LeaseOutcome]:
+    """
+    Worker entry point: process a chunk of leases in a pool process
+    related holds the leases modified by leases in the chunk (modification chains)
+    batch: generate the chunk's schedules with generate_schedules_batch(), as decided for the whole run
+    """
+    processor = ResultsProcessor(filters, workers=1)
+    processor.lease_processor._leases_by_id = {**related, **{lease.auto_id: lease for lease in chunk}}
+    return processor._process_leases(chunk, batch)
+
+
+def _process_lease_chunk_by_standard(filters: ProcessingFilters, standards: Sequence[str], chunk: List[LeaseData],
+                                     related: Dict[int, LeaseData]) -> List[Dict[str, LeaseOutcome]]:
+    """Worker entry point for process_bulk_leases_by_standard()"""
+    processor = ResultsProcessor(filters, workers=1)
+    processors = processor._standard_processors(standards)
+    leases_by_id = {**related, **{lease.auto_id: lease for lease in chunk}}
+    for standard_processor in processors.values():
+        standard_processor.lease_processor._leases_by_id = leases_by_id
+    return [_process_lease_by_standard(processors, lease_data, leases_by_id) for lease_data in chunk]
+
+
+def _process_lease_by_standard(processors: Dict[str, 'ResultsProcessor'], lease_data: LeaseData,
+                               leases_by_id: Dict[int, LeaseData]) -> Dict[str, LeaseOutcome]:
+    """
+    One lease under every standard in processors, with its schedules from one
+    generate_schedules_by_standard() run. gaap_standard of the lease (and of the
+    lease it modifies) is set per standard and restored afterwards.
+    """
+    wanted = [standard for standard, processor in processors.items()
+              if processor._should_process_lease(lease_data) and not processor._is_short_term_lease(lease_data)]
+    previous_lease = leases_by_id.get(lease_data.modifies_this_id) if lease_data.modifies_this_id else None
+    schedules = {}
+    # A lease modifying a known lease is regenerated from its balances per standard
+    if wanted and previous_lease is None:
+        try:
+            schedules = generate_schedules_by_standard(lease_data, wanted)
+        except Exception as e:
+            # Left to the per-standard run, which reports the error
+            logger.debug(f"Multi-standard schedule failed for lease {lease_data.auto_id}: {e}")
+    
+    affected = [lease for lease in (lease_data, previous_lease) if lease is not None]
+    original_standards = [lease.gaap_standard for lease in affected]
+    outcomes = {}
+    try:
+        for standard, processor in processors.items():
+            for lease in affected:
+                lease.gaap_standard = standard
+            outcomes[standard] = processor._process_lease(lease_data, schedules.get(standard))
+    finally:
+        for lease, original in zip(affected, original_standards):
+            lease.gaap_standard = original
+    return outcomes
+
+
 class ResultsProcessor:
     """
     Processes multiple leases and generates consolidated results
     Equivalent to VBA compu() loop: For ai = G2 To G3
+    
+    With workers > 1, batches of at least parallel_min_leases leases are split
+    into chunks of chunk_size and processed in a process pool. Outcomes are
+    merged in lease order, so results, journals and totals are identical to a
+    serial run.
+    
+    Batches of at least batch_min_leases leases generate their schedules with
+    generate_schedules_batch() (schedule/batch.py), which computes basic_calc()
+    for many leases as array operations; the schedules, and so the results, are
+    the same as generated lease by lease. With filters.results_only or
+    compact_schedules the batch builds the rows LeaseProcessor would generate
+    (truncated at the results horizon, month-end rows outside the reporting
+    window left out).
     """
     
-    def __init__(self, filters: ProcessingFilters):
+    def __init__(self, filters: ProcessingFilters, workers: Optional[int] = None,
+                 chunk_size: Optional[int] = None, parallel_min_leases: Optional[int] = None,
+                 batch_min_leases: Optional[int] = None):
         self.filters = filters
         self.lease_processor = LeaseProcessor(filters)
         self.results: List[Dict] = []
         self.aggregated_totals: Dict = {}
+        self.workers = workers or DEFAULT_WORKERS
+        self.chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        self.parallel_min_leases = DEFAULT_PARALLEL_MIN_LEASES if parallel_min_leases is None else parallel_min_leases
+        self.batch_min_leases = DEFAULT_BATCH_MIN_LEASES if batch_min_leases is None else batch_min_leases
     
     def process_bulk_leases(self, lease_data_list: List[LeaseData]) -> Dict:
         """
@@ -74,65 +179,102 @@ class ResultsProcessor:
         """
         logger.info(f"🔄 Starting bulk processing: {len(lease_data_list)} leases")
         
+        # Process each lease (VBA: For ai = G2 To G3)
+        leases_by_id = {lease_data.auto_id: lease_data for lease_data in lease_data_list}
+        batch = self._use_batch(lease_data_list)
+        outcomes = None
+        if self._use_parallel(lease_data_list):
+            outcomes = self._process_parallel(lease_data_list, leases_by_id,
+                                              partial(_process_lease_chunk, self.filters, batch))
+        if outcomes is None:
+            self.lease_processor._leases_by_id = leases_by_id
+            outcomes = self._process_leases(lease_data_list, batch)
+        
+        return self._merge_outcomes(lease_data_list, outcomes)
+    
+    def process_bulk_leases_by_standard(self, lease_data_list: List[LeaseData],
+                                        standards: Sequence[str] = GAAP_STANDARDS) -> Dict[str, Dict]:
+        """
+        process_bulk_leases() under each GAAP standard, for GAAP comparison
+        
+        Each lease's schedules come from one generate_schedules_by_standard() run
+        (shared columns once, depreciation/ROU per standard) instead of one full
+        generation per standard. The filters' gaap_standard is replaced by each
+        standard; leases keep their own gaap_standard.
+        
+        Returns:
+            {standard: process_bulk_leases() result}
+        """
+        logger.info(f"🔄 Starting bulk processing: {len(lease_data_list)} leases under {', '.join(standards)}")
+        
+        leases_by_id = {lease_data.auto_id: lease_data for lease_data in lease_data_list}
+        processors = self._standard_processors(standards)
+        outcomes = None
+        if self._use_parallel(lease_data_list):
+            outcomes = self._process_parallel(lease_data_list, leases_by_id,
+                                              partial(_process_lease_chunk_by_standard, self.filters, tuple(standards)))
+        if outcomes is None:
+            for processor in processors.values():
+                processor.lease_processor._leases_by_id = leases_by_id
+            outcomes = [_process_lease_by_standard(processors, lease_data, leases_by_id)
+                        for lease_data in lease_data_list]
+        
+        return {
+            standard: processor._merge_outcomes(lease_data_list, [outcome[standard] for outcome in outcomes])
+            for standard, processor in processors.items()
+        }
+    
+    def _standard_processors(self, standards: Sequence[str]) -> Dict[str, 'ResultsProcessor']:
+        """Serial processor per standard, with this processor's filters"""
+        return {
+            standard: ResultsProcessor(replace(self.filters, gaap_standard=standard), workers=1)
+            for standard in standards
+        }
+    
+    def _use_parallel(self, lease_data_list: List[LeaseData]) -> bool:
+        return self.workers > 1 and len(lease_data_list) >= max(self.parallel_min_leases, 2)
+    
+    def _use_batch(self, lease_data_list: List[LeaseData]) -> bool:
+        return len(lease_data_list) >= max(self.batch_min_leases, 2)
+    
+    def _merge_outcomes(self, lease_data_list: List[LeaseData], outcomes: List[LeaseOutcome]) -> Dict:
+        """Results, consolidated journals and totals from per-lease outcomes, in lease order"""
         processed_count = 0
         skipped_count = 0
         individual_results = []
         consolidated_journals_dict: Dict[str, JournalEntry] = {}
         
-        # Process each lease (VBA: For ai = G2 To G3)
-        for lease_data in lease_data_list:
-            # Check if lease should be processed (VBA Lines 330-337: Filter checks)
-            if not self._should_process_lease(lease_data):
+        for lease_data, outcome in zip(lease_data_list, outcomes):
+            if outcome.calculated_fields is not lease_data.calculated_fields:
+                # Worker copy: bring back what processing recorded on the lease
+                lease_data.calculated_fields.update(outcome.calculated_fields)
+            if outcome.status == "skipped":
                 skipped_count += 1
-                logger.debug(f"⏭️  Skipping lease {lease_data.auto_id}: Failed filters")
                 continue
-            
-            # Skip short-term leases (VBA Lines 340-345)
-            if self._is_short_term_lease(lease_data):
-                skipped_count += 1
-                logger.debug(f"⏭️  Skipping lease {lease_data.auto_id}: Short-term lease")
+            if outcome.status != "processed":
                 continue
+            processed_count += 1
+            individual_results.append(outcome.result_row)
             
-            try:
-                # Process single lease (VBA: Calls modify_calc, then processes)
-                result = self.lease_processor.process_single_lease(lease_data)
-                
-                if result:
-                    processed_count += 1
-                    
-                    # Convert result to Results table row format (VBA Lines 485-499)
-                    result_row = self._convert_to_results_row(lease_data, result)
-                    individual_results.append(result_row)
-                    
-                    # Generate journals for this lease and consolidate
-                    journal_gen = JournalGenerator(gaap_standard=self.filters.gaap_standard)
-                    journals = journal_gen.generate_journals(result, [], None)  # No schedule needed for journals
-                    
-                    # Consolidate journal entries (sum by account)
-                    for journal in journals:
-                        account_key = f"{journal.account_code}_{journal.account_name}"
-                        if account_key not in consolidated_journals_dict:
-                            consolidated_journals_dict[account_key] = JournalEntry(
-                                bs_pl=journal.bs_pl,
-                                account_code=journal.account_code,
-                                account_name=journal.account_name,
-                                result_period=0.0,
-                                previous_period=0.0,
-                                ifrs_adjustment=0.0,
-                                incremental_adjustment=0.0,
-                                usgaap_entry=0.0
-                            )
-                        
-                        consolidated_journals_dict[account_key].result_period += journal.result_period
-                        consolidated_journals_dict[account_key].previous_period += journal.previous_period
-                        consolidated_journals_dict[account_key].ifrs_adjustment += journal.ifrs_adjustment
-                        consolidated_journals_dict[account_key].incremental_adjustment += journal.incremental_adjustment
-                    
-                    logger.info(f"✅ Processed lease {lease_data.auto_id}: {lease_data.description}")
+            # Consolidate journal entries (sum by account)
+            for journal in outcome.journals:
+                account_key = f"{journal.account_code}_{journal.account_name}"
+                if account_key not in consolidated_journals_dict:
+                    consolidated_journals_dict[account_key] = JournalEntry(
+                        bs_pl=journal.bs_pl,
+                        account_code=journal.account_code,
+                        account_name=journal.account_name,
+                        result_period=0.0,
+                        previous_period=0.0,
+                        ifrs_adjustment=0.0,
+                        incremental_adjustment=0.0,
+                        usgaap_entry=0.0
+                    )
                 
-            except Exception as e:
-                logger.error(f"❌ Error processing lease {lease_data.auto_id}: {e}", exc_info=True)
-                skipped_count += 1
+                consolidated_journals_dict[account_key].result_period += journal.result_period
+                consolidated_journals_dict[account_key].previous_period += journal.previous_period
+                consolidated_journals_dict[account_key].ifrs_adjustment += journal.ifrs_adjustment
+                consolidated_journals_dict[account_key].incremental_adjustment += journal.incremental_adjustment
         
         # Calculate aggregated totals (sum all results)
         aggregated_totals = self._calculate_aggregated_totals(individual_results)
@@ -152,6 +294,104 @@ class ResultsProcessor:
             'total_count': len(lease_data_list)
         }
     
+    def _process_leases(self, lease_data_list: List[LeaseData], batch: bool) -> List[LeaseOutcome]:
+        """_process_lease() for each lease; with batch, schedules come from one generate_schedules_batch() run"""
+        schedules: List[Optional[List[PaymentScheduleRow]]] = [None] * len(lease_data_list)
+        if batch:
+            # Leases modifying one of the run are regenerated from its balances: not generated here
+            wanted = [i for i, lease_data in enumerate(lease_data_list)
+                      if self._should_process_lease(lease_data) and not self._is_short_term_lease(lease_data)
+                      and self.lease_processor.modified_lease(lease_data) is None]
+            windows = horizons = None
+            if self.filters.results_only or self.filters.compact_schedules:
+                # The rows process_single_lease() would generate (_results_only_schedule())
+                bounds = [self.lease_processor._results_only_bounds(lease_data_list[i]) for i in wanted]
+                windows = [window for window, _ in bounds]
+                horizons = [horizon for _, horizon in bounds]
+            try:
+                generated = generate_schedules_batch([lease_data_list[i] for i in wanted],
+                                                     accrual_windows=windows, horizons=horizons)
+            except Exception as e:
+                # Left to the per-lease run, which reports the error
+                logger.debug(f"Batch schedule generation failed: {e}")
+                generated = []
+            for i, schedule in zip(wanted, generated):
+                schedules[i] = schedule
+        return [self._process_lease(lease_data, schedule) for lease_data, schedule in zip(lease_data_list, schedules)]
+    
+    def _process_lease(self, lease_data: LeaseData,
+                       schedule: Optional[List[PaymentScheduleRow]] = None) -> LeaseOutcome:
+        """
+        Filters, LeaseProcessor.process_single_lease() and journals for one lease
+        schedule: lease_data's schedule if already generated
+        """
+        # Check if lease should be processed (VBA Lines 330-337: Filter checks)
+        if not self._should_process_lease(lease_data):
+            logger.debug(f"⏭️  Skipping lease {lease_data.auto_id}: Failed filters")
+            return LeaseOutcome("skipped", calculated_fields=lease_data.calculated_fields)
+        
+        # Skip short-term leases (VBA Lines 340-345)
+        if self._is_short_term_lease(lease_data):
+            logger.debug(f"⏭️  Skipping lease {lease_data.auto_id}: Short-term lease")
+            return LeaseOutcome("skipped", calculated_fields=lease_data.calculated_fields)
+        
+        try:
+            # Process single lease (VBA: Calls modify_calc, then processes)
+            result = self.lease_processor.process_single_lease(lease_data, schedule)
+            if not result:
+                return LeaseOutcome("empty", calculated_fields=lease_data.calculated_fields)
+            
+            # Convert result to Results table row format (VBA Lines 485-499)
+            result_row = self._convert_to_results_row(lease_data, result)
+            
+            # Generate journals for this lease
+            journal_gen = JournalGenerator(gaap_standard=self.filters.gaap_standard)
+            journals = journal_gen.generate_journals(result, [], None)  # No schedule needed for journals
+            
+            logger.info(f"✅ Processed lease {lease_data.auto_id}: {lease_data.description}")
+            return LeaseOutcome("processed", result_row, journals, lease_data.calculated_fields)
+        
+        except Exception as e:
+            logger.error(f"❌ Error processing lease {lease_data.auto_id}: {e}", exc_info=True)
+            return LeaseOutcome("skipped", calculated_fields=lease_data.calculated_fields)
+    
+    def _process_parallel(self, lease_data_list: List[LeaseData], leases_by_id: Dict[int, LeaseData],
+                          worker) -> Optional[List[Any]]:
+        """
+        Process chunks in a process pool with worker(chunk, related); outcomes come back in lease order
+        Returns None if the pool cannot be used (caller falls back to serial)
+        """
+        chunks = [lease_data_list[i:i + self.chunk_size] for i in range(0, len(lease_data_list), self.chunk_size)]
+        related = []
+        for chunk in chunks:
+            chunk_ids = {lease.auto_id for lease in chunk}
+            related.append({
+                lease.modifies_this_id: leases_by_id[lease.modifies_this_id]
+                for lease in chunk
+                if lease.modifies_this_id in leases_by_id and lease.modifies_this_id not in chunk_ids
+            })
+        
+        workers = min(self.workers, len(chunks))
+        try:
+            # pickle reports local objects with AttributeError or TypeError; probe the
+            # worker here so those are not confused with errors raised inside workers
+            try:
+                pickle.dumps(worker)
+            except (AttributeError, TypeError) as e:
+                raise PicklingError(str(e)) from e
+            context = multiprocessing.get_context(DEFAULT_START_METHOD)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                results = pool.map(worker, chunks, related)
+                outcomes = [outcome for chunk_outcomes in results for outcome in chunk_outcomes]
+        # Only pool start-up and pickling failures fall back; errors raised by
+        # the worker itself propagate instead of silently re-running serially
+        except (OSError, BrokenProcessPool, PicklingError) as e:
+            logger.warning(f"⚠️  Parallel processing unavailable ({e}), processing serially")
+            return None
+        
+        logger.info(f"🔀 Processed {len(lease_data_list)} leases in {len(chunks)} chunks on {workers} workers")
+        return outcomes
+    
     def _should_process_lease(self, lease_data: LeaseData) -> bool:
         """
         Check if lease passes all filters
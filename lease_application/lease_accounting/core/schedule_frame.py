@@ -0,0 +1,184 @@
+"""
+Column-oriented payment schedule
+Holds the Compute sheet columns (C to O) as typed arrays instead of one dataclass per row
+
+A PaymentScheduleRow costs an object header, a __dict__ and a boxed float per
+field (~700 bytes per row). ScheduleFrame stores each column in an array.array, so
+a row is 122 bytes. Rows are exposed as ScheduleRowView objects (__slots__, no __dict__)
+with the same attributes and to_dict() as PaymentScheduleRow, so code that iterates
+a schedule, indexes it or reads row attributes works unchanged on either form.
+"""
+
+from array import array
+from datetime import date
+from operator import attrgetter
+from typing import Iterable, Iterator, List, Optional, Union
+from lease_accounting.core.models import PaymentScheduleRow
+
+# Float columns in Compute sheet order (D to O, then derived fields)
+FLOAT_COLUMNS = (
+    'rental_amount', 'pv_factor', 'interest', 'lease_liability', 'pv_of_rent',
+    'rou_asset', 'depreciation', 'change_in_rou', 'security_deposit_pv',
+    'aro_gross', 'aro_interest', 'aro_provision', 'principal', 'remaining_balance',
+)
+FLAG_COLUMNS = ('is_opening', 'is_closing')
+
+# None is stored as NaN in float columns and as ordinal 0 in the date column
+_NONE = float('nan')
+
+
+class ScheduleRowView:
+    """Row of a ScheduleFrame - reads and writes go straight to the frame's columns"""
+    __slots__ = ('_frame', '_index')
+
+    def __init__(self, frame: 'ScheduleFrame', index: int):
+        self._frame = frame
+        self._index = index
+
+    @property
+    def date(self):
+        ordinal = self._frame._dates[self._index]
+        return date.fromordinal(ordinal) if ordinal else None
+
+    @date.setter
+    def date(self, value):
+        self._frame._dates[self._index] = value.toordinal() if value else 0
+
+    @property
+    def payment_date(self):
+        """Return date as payment_date for compatibility"""
+        return self.date
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization (same keys as PaymentScheduleRow)"""
+        return self.to_row().to_dict()
+
+    def to_row(self) -> PaymentScheduleRow:
+        """Materialise as a standalone PaymentScheduleRow"""
+        return PaymentScheduleRow(date=self.date, **{name: getattr(self, name) for name in FLOAT_COLUMNS + FLAG_COLUMNS})
+
+    def __eq__(self, other) -> bool:
+        # Value equality, like the PaymentScheduleRow dataclass
+        if not isinstance(other, (ScheduleRowView, PaymentScheduleRow)):
+            return NotImplemented
+        return self.to_row() == (other.to_row() if isinstance(other, ScheduleRowView) else other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ScheduleRowView({self._index}, {self.to_row()!r})"
+
+
+def _float_property(name: str) -> property:
+    def getter(self):
+        value = self._frame._floats[name][self._index]
+        return None if value != value else value
+
+    def setter(self, value):
+        self._frame._floats[name][self._index] = _NONE if value is None else value
+
+    return property(getter, setter)
+
+
+def _flag_property(name: str) -> property:
+    def getter(self):
+        return bool(self._frame._flags[name][self._index])
+
+    def setter(self, value):
+        self._frame._flags[name][self._index] = 1 if value else 0
+
+    return property(getter, setter)
+
+
+for _name in FLOAT_COLUMNS:
+    setattr(ScheduleRowView, _name, _float_property(_name))
+for _name in FLAG_COLUMNS:
+    setattr(ScheduleRowView, _name, _flag_property(_name))
+
+
+class ScheduleFrame:
+    """
+    Payment schedule stored column by column
+
+    Behaves like a read/write list of rows: len(), iteration, indexing (including
+    negative indices), slicing (a list of row views), index() and append().
+    """
+
+    def __init__(self, rows: Optional[Iterable[PaymentScheduleRow]] = None):
+        self._dates = array('l')
+        self._floats = {name: array('d') for name in FLOAT_COLUMNS}
+        self._flags = {name: array('b') for name in FLAG_COLUMNS}
+        if rows is not None:
+            for row in rows:
+                self.append(row)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[PaymentScheduleRow]) -> 'ScheduleFrame':
+        """Build a frame from PaymentScheduleRow objects (or row views)"""
+        rows = list(rows)
+        frame = cls()
+        frame._dates = array('l', [row.date.toordinal() if row.date else 0 for row in rows])
+        for name in FLOAT_COLUMNS:
+            frame._floats[name] = array('d', [_NONE if value is None else value for value in map(attrgetter(name), rows)])
+        for name in FLAG_COLUMNS:
+            frame._flags[name] = array('b', [1 if value else 0 for value in map(attrgetter(name), rows)])
+        return frame
+
+    def append(self, row: Union[PaymentScheduleRow, ScheduleRowView]) -> None:
+        self._dates.append(row.date.toordinal() if row.date else 0)
+        for name, column in self._floats.items():
+            value = getattr(row, name)
+            column.append(_NONE if value is None else value)
+        for name, column in self._flags.items():
+            column.append(1 if getattr(row, name) else 0)
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [ScheduleRowView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("schedule index out of range")
+        return ScheduleRowView(self, index)
+
+    def __iter__(self) -> Iterator[ScheduleRowView]:
+        for i in range(len(self)):
+            yield ScheduleRowView(self, i)
+
+    def index(self, row: Union[PaymentScheduleRow, ScheduleRowView]) -> int:
+        """Position of row - O(1) for this frame's own views, value scan otherwise"""
+        if isinstance(row, ScheduleRowView) and row._frame is self:
+            return row._index
+        for i, candidate in enumerate(self):
+            if candidate == row:
+                return i
+        raise ValueError("row is not in schedule")
+
+    def column(self, name: str) -> array:
+        """Raw column: 'date' (ordinals), a float column (NaN = None) or a flag column"""
+        if name == 'date':
+            return self._dates
+        if name in self._floats:
+            return self._floats[name]
+        return self._flags[name]
+
+    def to_rows(self) -> List[PaymentScheduleRow]:
+        # Column by column: FLOAT_COLUMNS + FLAG_COLUMNS are PaymentScheduleRow's fields after date
+        dates = [date.fromordinal(ordinal) if ordinal else None for ordinal in self._dates]
+        floats = [[None if value != value else value for value in self._floats[name]] for name in FLOAT_COLUMNS]
+        flags = [[bool(value) for value in self._flags[name]] for name in FLAG_COLUMNS]
+        return [PaymentScheduleRow(*values) for values in zip(dates, *floats, *flags)]
+
+    def to_dicts(self) -> List[dict]:
+        return [view.to_dict() for view in self]
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the column buffers"""
+        columns = [self._dates, *self._floats.values(), *self._flags.values()]
+        return sum(column.buffer_info()[1] * column.itemsize for column in columns)
+
+    def __repr__(self) -> str:
+        return f"ScheduleFrame({len(self)} rows)"
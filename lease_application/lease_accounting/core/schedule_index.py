@@ -0,0 +1,188 @@
+"""
+Schedule lookup index
+Date lookups by bisect and period sums by prefix sums over one payment schedule
+
+LeaseProcessor looks up balances at the opening and closing dates (compu() Lines
+364-427), the PV factor at the balance date (Line 410) and sums the findPL columns
+over the period (Lines 429-477). Scanning the schedule costs O(n) per lookup;
+ScheduleIndex is built once per schedule (O(n)) and answers each lookup in O(log n),
+so any number of reporting windows can be evaluated against the same schedule.
+
+Lookups follow the scans they replace, including the row the VBA inserts at a date
+between two rows (values copied from the row before). Sums come from prefix sums,
+so they can differ from a row-by-row sum in the last bits.
+
+The index applies to schedules in date order with only row 0 flagged as opening
+(everything generate_complete_schedule() produces); 'ordered' is False otherwise
+and callers scan instead.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+
+
+class ScheduleIndex:
+    """Sorted date array and prefix sums of the J/F/D/K/N columns of a schedule"""
+
+    def __init__(self, schedule: List):
+        self.schedule = schedule
+        self.dates: List[date] = []
+        for row in schedule:
+            row_date = row.date
+            if isinstance(row_date, datetime):
+                row_date = row_date.date()
+            self.dates.append(row_date)
+        n = len(self.dates)
+        self.ordered = (
+            all(d is not None for d in self.dates)
+            and all(self.dates[i] <= self.dates[i + 1] for i in range(n - 1))
+            and not any(row.is_opening for row in schedule[1:])
+        )
+        self.opening_first = bool(n and schedule[0].is_opening)
+        if not self.ordered:
+            return
+
+        # Prefix sums: column[k] = sum over rows [0, k)
+        def prefix(values) -> List[float]:
+            return [0.0] + list(accumulate(values))
+
+        self._depreciation = prefix(abs(row.depreciation or 0.0) for row in schedule)
+        self._interest = prefix(abs(row.interest or 0.0) for row in schedule)
+        self._rent = prefix(row.rental_amount or 0.0 for row in schedule)
+        self._change_rou = prefix(row.change_in_rou or 0.0 for row in schedule)
+        self._aro_interest = prefix(row.aro_interest or 0.0 for row in schedule)
+        # D*E for rental rows - PV of the rentals (current liability, VBA Line 543)
+        self._pv_rent = prefix(
+            row.rental_amount * row.pv_factor if row.rental_amount and row.rental_amount > 0 and row.pv_factor else 0.0
+            for row in schedule
+        )
+        # Signed J and F for the projection sums, built on first use
+        self._signed: Optional[Tuple[List[float], List[float]]] = None
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    # --- Date lookups ---
+
+    def find(self, on_date: date) -> Optional[int]:
+        """Index of the first row dated on_date, or None (scans when not ordered)"""
+        if not self.ordered:
+            return next((i for i, d in enumerate(self.dates) if d and d == on_date), None)
+        i = bisect_left(self.dates, on_date)
+        return i if i < len(self.dates) and self.dates[i] == on_date else None
+
+    def row_at(self, on_date: date):
+        """First row dated on_date, or None"""
+        i = self.find(on_date)
+        return self.schedule[i] if i is not None else None
+
+    def row_on_or_before(self, on_date: date) -> Optional[int]:
+        """
+        Row the VBA reads at on_date: the row dated on_date, or the row before the
+        first row after it (the values copied into an inserted row). None before row 0.
+        Ordered schedules only.
+        """
+        i = bisect_left(self.dates, on_date)
+        if i < len(self.dates) and self.dates[i] == on_date:
+            return i
+        return i - 1 if i > 0 else None
+
+    def date_before(self, on_date: date) -> Optional[date]:
+        """Last schedule date strictly before on_date, or None"""
+        i = bisect_left(self.dates, on_date)
+        return self.dates[i - 1] if i > 0 else None
+
+    def _window(self, start_date: date, end_date: date) -> Tuple[int, int]:
+        """Rows [lo, hi) with start_date < date <= end_date"""
+        lo = bisect_right(self.dates, start_date)
+        hi = bisect_right(self.dates, end_date)
+        return lo, max(lo, hi)
+
+    # --- Balances (compu() Lines 364-427) ---
+
+    def opening_balances(self, balance_date: date) -> Tuple[float, float, float, float]:
+        """(liability, rou, aro, security_deposit) as LeaseProcessor.get_opening_balances()"""
+        if not self.dates:
+            return (0.0, 0.0, 0.0, 0.0)
+        i = self.row_on_or_before(balance_date)
+        row = self.schedule[i if i is not None else 0]
+        return (row.lease_liability or 0.0, row.rou_asset or 0.0,
+                row.aro_provision or 0.0, row.security_deposit_pv or 0.0)
+
+    def closing_balances(self, balance_date: date) -> Tuple[float, float, float, float]:
+        """(liability, rou, aro, security_deposit) as LeaseProcessor.get_closing_balances()"""
+        if not self.dates:
+            return (0.0, 0.0, 0.0, 0.0)
+        i = self.row_on_or_before(balance_date)
+        if i is not None and (i < len(self.dates) - 1 or self.dates[i] == balance_date):
+            # Row on the date, or between two rows: values as held in the row
+            row = self.schedule[i]
+            return (row.lease_liability, row.rou_asset, row.aro_provision or 0.0, row.security_deposit_pv or 0.0)
+        # Before the first row, or after the last row
+        row = self.schedule[-1] if i is not None else None
+        closing = (0.0, 0.0, 0.0, 0.0) if row is None else (
+            row.lease_liability or 0.0, row.rou_asset or 0.0, row.aro_provision or 0.0, row.security_deposit_pv or 0.0)
+        if closing[0] == 0 and closing[1] == 0:
+            row = self.schedule[0]
+            closing = (row.lease_liability or 0.0, row.rou_asset or 0.0,
+                       row.aro_provision or 0.0, row.security_deposit_pv or 0.0)
+        return closing
+
+    # --- Period sums (findPL, compu() Lines 429-477) ---
+
+    def period_activity(self, start_date: date, end_date: date,
+                        date_modified: Optional[date] = None) -> Dict[str, float]:
+        """Sums over start_date < date <= end_date, as LeaseProcessor.calculate_period_activity()"""
+        lo, hi = self._window(start_date, end_date)
+        if self.opening_first:
+            lo = max(lo, 1)
+        if lo >= hi:
+            return {'depreciation': 0.0, 'interest': 0.0, 'rent_paid': 0.0,
+                    'aro_interest': 0.0, 'security_change': 0.0, 'change_rou': 0.0}
+
+        rent_paid = self._rent[hi] - self._rent[lo]
+        if date_modified:
+            # VBA Line 439: Not_modified - rent on date_modified is excluded
+            mod_lo = max(bisect_left(self.dates, date_modified), lo)
+            mod_hi = min(bisect_right(self.dates, date_modified), hi)
+            if mod_lo < mod_hi:
+                rent_paid -= self._rent[mod_hi] - self._rent[mod_lo]
+
+        # VBA Line 445: the security deltas telescope to last - previous
+        last_security = self.schedule[hi - 1].security_deposit_pv or 0.0
+        if self.opening_first or lo == 0:
+            base_security = self.schedule[0].security_deposit_pv or 0.0
+        else:
+            base_security = 0.0
+
+        return {
+            'depreciation': self._depreciation[hi] - self._depreciation[lo],
+            'interest': self._interest[hi] - self._interest[lo],
+            'rent_paid': rent_paid,
+            'aro_interest': self._aro_interest[hi] - self._aro_interest[lo],
+            'security_change': last_security - base_security,
+            'change_rou': self._change_rou[hi] - self._change_rou[lo],
+        }
+
+    def depreciation_between(self, start_date: date, end_date: date) -> float:
+        """Sum of abs(J) over start_date < date <= end_date, opening row included"""
+        lo, hi = self._window(start_date, end_date)
+        return self._depreciation[hi] - self._depreciation[lo]
+
+    def pv_of_rent_between(self, start_date: date, end_date: date) -> float:
+        """Sum of D*E over rental rows with start_date < date <= end_date"""
+        lo, hi = self._window(start_date, end_date)
+        return self._pv_rent[hi] - self._pv_rent[lo]
+
+    def projection_activity(self, start_date: date, end_date: date) -> Tuple[float, float, float]:
+        """(depreciation, interest, rent) over start_date < date <= end_date as signed sums (pfindPL, Lines 537-546)"""
+        if self._signed is None:
+            self._signed = (
+                [0.0] + list(accumulate(row.depreciation or 0.0 for row in self.schedule)),
+                [0.0] + list(accumulate(row.interest or 0.0 for row in self.schedule)),
+            )
+        depreciation, interest = self._signed
+        lo, hi = self._window(start_date, end_date)
+        return (depreciation[hi] - depreciation[lo], interest[hi] - interest[lo], self._rent[hi] - self._rent[lo])
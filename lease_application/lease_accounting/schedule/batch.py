@@ -0,0 +1,341 @@
+"""
+Batch schedule generation
+Runs basic_calc() for many leases at once as 2-D array operations
+
+VBA Source File: VB script/Code
+VBA Function: basic_calc() Sub (Lines 628-707)
+
+generate_complete_schedule() handles one lease at a time, so a bulk run pays the
+per-row Python cost of basic_calc() for every lease. Here the leases' rows are
+plotted as usual (datessrent(), shared skeletons from timing_cache.py), then
+grouped by row count into matrices padded to a multiple of ROW_BUCKET rows, one
+lease per matrix row. Padding rows repeat the last date with no rental, so they
+accrue nothing and leave every balance unchanged. Each group steps through its
+columns once per pass, computing row i of every lease in one array operation:
+the F/G/I/L recurrences run down the rows, but not across leases.
+Transition option 2B and the add-on routines are then applied lease by lease.
+
+Every lease goes through the same operations, in the same order, as the scalar
+row loop, with E and the accrual factors from the shared DiscountCurves, so the
+schedules equal generate_complete_schedule(engine="scalar") exactly. The
+closed-form roll-forward of columnar.py is not used: it ends leases on an exact
+zero liability where the row loop leaves a rounding residual, which changes the
+closing balances LeaseProcessor reports after the end of the lease.
+
+The batch kernels cover leases with straight-line depreciation, no ARO provision
+and no FV of ROU goal seek. US-GAAP operating leases (depreciation reads
+Sum(F10:$F$endrow), Lines 670-671), leases with an ARO provision (RFR rates per
+row, Lines 679-680) and FV of ROU leases (Lines 683-685) go through
+generate_complete_schedule() instead, as do all leases without NumPy.
+Schedules share the schedule cache (cache.py) with the scalar engine.
+
+With accrual windows and horizons, leases get the schedules LeaseProcessor's
+results-only and compact modes use: generate_compact_schedule() and
+generate_schedule_to_horizon(). The month-end rows left out are still stepped
+through as columns without rental, and each kept row's F, J and principal add up
+those of the rows left out before it, in the order _basic_calc_sweep() adds them.
+Rows past the horizon are not built; their rentals enter G7 and the provisional
+G9 after the columns, as in the row loop. These schedules are not cached.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+from lease_accounting.core.models import LeaseData, PaymentScheduleRow
+from lease_accounting.core.schedule_frame import ScheduleFrame
+from lease_accounting.schedule import columnar
+from lease_accounting.schedule.cache import get_schedule_cache, schedule_cache_key
+from lease_accounting.schedule.generator_vba_complete import (
+    generate_complete_schedule, generate_compact_schedule, generate_schedule_to_horizon,
+    _plot_schedule_rows, _apply_schedule_addons, _apply_transition_option, _event_dates, _get_aro_for_date,
+    _calculate_initial_rou, _calculate_security_pv, _calculate_end_of_life_vba, _derive_icompound,
+)
+from lease_accounting.utils.discount_factors import discount_curve
+
+logger = logging.getLogger(__name__)
+
+# basic_calc() engine the batch reproduces (cache keys, fallback generation)
+BATCH_ENGINE = "scalar"
+# Row counts are padded up to a multiple of this (a year of monthly rows)
+ROW_BUCKET = 12
+
+# (position in the input, lease, plotted rows, month-end dates left out before each row,
+#  (date, rental) of the rows past the horizon)
+_Member = Tuple[int, LeaseData, List[PaymentScheduleRow], Optional[Dict[int, List[date]]],
+                Optional[List[Tuple[date, float]]]]
+
+
+def batch_eligible(lease_data: LeaseData, schedule: List[PaymentScheduleRow]) -> bool:
+    """True when the batch kernels reproduce basic_calc() for lease_data's plotted rows"""
+    if len(schedule) < 2:
+        return False
+    if lease_data.fv_of_rou and lease_data.fv_of_rou != 0:
+        return False
+    if getattr(lease_data, 'gaap_standard', 'IFRS') == "US-GAAP" and lease_data.finance_lease_usgaap != "Yes":
+        return False
+    # _calculate_aro_provision_vba() is None (no provision) without a table or a gross amount
+    if (lease_data.aro_table or 0) > 0:
+        if (schedule[0].aro_gross or lease_data.aro or 0) > 0:
+            return False
+        if any((row.aro_gross or 0) > 0 for row in schedule[1:]):
+            return False
+    return True
+
+
+def generate_schedules_batch(lease_data_list: Sequence[LeaseData], as_frame: bool = False,
+                             use_cache: bool = True,
+                             accrual_windows: Optional[Sequence[Optional[Tuple[date, date]]]] = None,
+                             horizons: Optional[Sequence[Optional[date]]] = None
+                             ) -> List[Optional[List[PaymentScheduleRow]]]:
+    """
+    Schedules for many leases, as generate_complete_schedule() would return them
+
+    Returns one entry per lease, in input order: a list of rows (a ScheduleFrame with
+    as_frame=True), or None when the lease's schedule could not be generated.
+    Leases the batch kernels do not cover are generated one by one.
+    accrual_windows/horizons: per lease, None or the accrual_window of
+    generate_compact_schedule() / the horizon of generate_schedule_to_horizon().
+    Those leases get the rows these would return, falling back to the full
+    schedule where they return None (as LeaseProcessor._results_only_schedule()).
+    """
+    results: List[Optional[List[PaymentScheduleRow]]] = [None] * len(lease_data_list)
+    cache = get_schedule_cache() if use_cache else None
+    keys = {}
+    groups = defaultdict(list)
+
+    for position, lease_data in enumerate(lease_data_list):
+        window = accrual_windows[position] if accrual_windows is not None else None
+        horizon = horizons[position] if horizons is not None else None
+        if cache is not None and window is None and horizon is None:
+            keys[position] = schedule_cache_key(lease_data, BATCH_ENGINE)
+            cached = cache.get(keys[position], lease_data.calculated_fields)
+            if cached is not None:
+                results[position] = cached
+                continue
+        try:
+            member = _plot_member(position, lease_data, window, horizon)
+            if member is None:
+                results[position] = _generate_schedule(lease_data, window, horizon, use_cache)
+                continue
+        except Exception as e:
+            logger.debug(f"Schedule generation failed for lease {lease_data.auto_id}: {e}")
+            continue
+        groups[_width(member)].append(member)
+
+    for width, members in groups.items():
+        _basic_calc_batch(members, width)
+        for position, lease_data, schedule, _, tail in members:
+            try:
+                schedule = _apply_transition_option(lease_data, schedule)
+                schedule = _apply_schedule_addons(lease_data, schedule, tail[-1][0] if tail else None)
+            except Exception as e:
+                logger.debug(f"Schedule generation failed for lease {lease_data.auto_id}: {e}")
+                continue
+            if position in keys:
+                cache.put(keys[position], schedule)
+            results[position] = schedule
+
+    if as_frame:
+        return [ScheduleFrame.from_rows(schedule) if schedule is not None else None for schedule in results]
+    return results
+
+
+def _plot_member(position: int, lease_data: LeaseData, window: Optional[Tuple[date, date]],
+                 horizon: Optional[date]) -> Optional[_Member]:
+    """Plotted rows of lease_data as a batch member, or None if the kernels do not cover it"""
+    if not columnar.HAS_NUMPY:
+        return None
+    keep_accrual = None
+    accruals: Optional[Dict[int, List[date]]] = None
+    if window is not None:
+        first, last = window
+        events = _event_dates(lease_data)
+        keep_accrual = lambda accrual_date: first <= accrual_date <= last or accrual_date in events
+        accruals = {}
+    tail: Optional[List[Tuple[date, float]]] = [] if horizon is not None else None
+    schedule = _plot_schedule_rows(lease_data, False, horizon=horizon, tail=tail,
+                                   keep_accrual=keep_accrual, accruals=accruals)
+    if not batch_eligible(lease_data, schedule):
+        return None
+    # The rows left out carry an ARO provision of their own (Lines 679-680)
+    if accruals and (lease_data.aro_table or 0) > 0 and any(
+            _get_aro_for_date(lease_data, accrual_date) for dates in accruals.values() for accrual_date in dates):
+        return None
+    return position, lease_data, schedule, accruals or None, tail or None
+
+
+def _generate_schedule(lease_data: LeaseData, window: Optional[Tuple[date, date]], horizon: Optional[date],
+                       use_cache: bool) -> Optional[List[PaymentScheduleRow]]:
+    """Schedule of a lease the batch kernels do not cover, generated on its own"""
+    schedule = None
+    if window is not None:
+        schedule = generate_compact_schedule(lease_data, window, horizon, engine=BATCH_ENGINE)
+    if schedule is None and horizon is not None:
+        schedule = generate_schedule_to_horizon(lease_data, horizon, engine=BATCH_ENGINE)
+    if schedule is None:
+        schedule = generate_complete_schedule(lease_data, engine=BATCH_ENGINE, use_cache=use_cache)
+    return schedule
+
+
+def _width(member: _Member) -> int:
+    """Columns for member's rows and the month-end rows left out, padded to a multiple of ROW_BUCKET"""
+    _, _, schedule, accruals, _ = member
+    steps = len(schedule) + sum(len(dates) for dates in (accruals or {}).values())
+    return -(-steps // ROW_BUCKET) * ROW_BUCKET
+
+
+def _basic_calc_batch(members: List[_Member], width: int) -> None:
+    """
+    Both basic_calc() passes for leases padded to width columns; fills the rows in place
+    Month-end rows left out (accruals) are columns without rental whose F, J and
+    principal are added to the next row, as in _basic_calc_sweep().
+    """
+    np = columnar.np
+    count = len(members)
+    days = np.zeros((count, width))
+    days_between = np.zeros((count, width))
+    rental = np.zeros((count, width))
+    pv_factor = np.ones((count, width))
+    growth = np.ones((count, width))
+    security_factor = np.ones((count, width))
+    security_opening = np.zeros(count)
+    has_security = np.zeros(count, dtype=bool)
+    initial_rou_args = []
+    life_days = np.zeros(count)
+
+    # Per lease, the row each column writes back to (None for a month-end row left out)
+    step_rows = []
+    # Per lease, (rental, E) of the rows past the horizon
+    tails = []
+    for k, (_, lease_data, schedule, accruals, tail) in enumerate(members):
+        rows, step_dates = [schedule[0]], [schedule[0].date]
+        for i in range(1, len(schedule)):
+            left_out = accruals.get(i, ()) if accruals else ()
+            rows.extend([None] * len(left_out))
+            step_dates.extend(left_out)
+            rows.append(schedule[i])
+            step_dates.append(schedule[i].date)
+        step_rows.append(rows)
+        n = len(rows)
+        start = schedule[0].date
+        offsets = [(step_date - start).days for step_date in step_dates]
+        steps = [0] + [offsets[i] - offsets[i - 1] for i in range(1, n)]
+        days[k, :n] = offsets
+        days[k, n:] = offsets[-1]
+        days_between[k, :n] = steps
+        rental[k, :n] = [row.rental_amount if row is not None else 0.0 for row in rows]
+
+        # VBA Lines 631-634: ide, secdeprate (percent or decimal), icompound, C7
+        ide = (lease_data.initial_direct_expenditure or 0) - (lease_data.lease_incentive or 0)
+        raw_secdeprate = lease_data.security_discount or 0.0
+        secdeprate = raw_secdeprate / 100 if raw_secdeprate > 1 else raw_secdeprate
+        curve = discount_curve((lease_data.borrowing_rate or 8) / 100, _derive_icompound(lease_data))
+
+        # E10 and the F10 accrual factor from the shared curves (discount_factors.py)
+        pv_factor[k, 1:n] = curve.discount_many(offsets[1:])
+        pv_factor[k, n:] = pv_factor[k, n - 1]
+        growth[k, 1:n] = curve.compound_many(steps[1:])
+        tails.append([(tail_rental, curve.discount((tail_date - start).days)) for tail_date, tail_rental in tail or ()])
+        # Cendrow
+        last_date = tail[-1][0] if tail else schedule[-1].date
+        # VBA Lines 643, 678: L9 and the PV factors L10 is rolled forward with
+        security_opening[k] = _calculate_security_pv(lease_data, start, last_date, secdeprate, start, None)
+        if secdeprate > 0 and lease_data.security_deposit and lease_data.security_deposit > 0:
+            has_security[k] = True
+            security_factor[k, :n] = discount_curve(secdeprate, 1).discount_many(offsets)
+            security_factor[k, n:] = security_factor[k, n - 1]
+        initial_rou_args.append((lease_data, ide))
+        # VBA Lines 647-659: $J$6 as days from C9
+        life_days[k] = (_calculate_end_of_life_vba(lease_data, last_date) - start).days
+
+    # H10 = E10 * D10 (VBA Line 664)
+    pv_of_rent = pv_factor * rental
+    pv_of_rent[:, 0] = 1.0 * rental[:, 0]
+    accrues = days_between > 0
+
+    # Provisional G9 (_calculate_initial_liability()) and G7 = SUM(H9:Hendrow) (VBA Line 688),
+    # summed in row order
+    paid = (rental > 0) & (days > 0)
+    provisional = np.zeros(count)
+    total_pv_rent = np.zeros(count)
+    for i in range(width):
+        provisional = provisional + np.where(paid[:, i], rental[:, i] * pv_factor[:, i], 0.0)
+        total_pv_rent = total_pv_rent + pv_of_rent[:, i]
+    for k, tail in enumerate(tails):
+        for tail_rental, tail_pv_factor in tail:
+            if tail_rental and tail_rental > 0:
+                provisional[k] += tail_rental * tail_pv_factor
+            total_pv_rent[k] += tail_pv_factor * tail_rental
+
+    def rollforward(opening):
+        """F10 = G9*((1+r)^n - 1), G10 = G9 - D10 + F10 (VBA Lines 662-663), one row at a time"""
+        interest = np.zeros((count, width))
+        liability = np.zeros((count, width))
+        liability[:, 0] = opening
+        for i in range(1, width):
+            previous = liability[:, i - 1]
+            interest[:, i] = np.where(accrues[:, i], previous * (growth[:, i] - 1), 0.0)
+            liability[:, i] = previous - rental[:, i] + interest[:, i]
+        return interest, liability
+
+    # First pass F/G are kept as principal and remaining balance; second pass with the final G9
+    first_interest, first_liability = rollforward(provisional)
+    interest, liability = rollforward(total_pv_rent)
+
+    # L10 = L9 * PV_factor(C9) / PV_factor(C10) (VBA Line 678)
+    security_pv = np.zeros((count, width))
+    security_pv[:, 0] = security_opening
+    for i in range(1, width):
+        rolled = security_pv[:, i - 1] * security_factor[:, i - 1] / security_factor[:, i]
+        security_pv[:, i] = np.where(has_security, rolled, 0.0)
+
+    # I9, then J10 = MAX(MIN(I9/($J$6-C9)*(C10-C9), I9), 0) and I10 = I9 - J10 + K10 (VBA Line 673)
+    rou = np.zeros((count, width))
+    depreciation = np.zeros((count, width))
+    rou[:, 0] = [_calculate_initial_rou(lease_data, float(total_pv_rent[k]), ide)
+                 for k, (lease_data, ide) in enumerate(initial_rou_args)]
+    for i in range(1, width):
+        previous = rou[:, i - 1]
+        total_days = life_days - days[:, i - 1]
+        straight_line = previous * days_between[:, i] / np.where(total_days > 0, total_days, 1.0)
+        depreciation[:, i] = np.where(total_days > 0, np.maximum(0.0, np.minimum(straight_line, previous)), 0.0)
+        rou[:, i] = previous - depreciation[:, i] + 0.0
+
+    for k, (_, lease_data, schedule, _, _) in enumerate(members):
+        rows = step_rows[k]
+        n = len(rows)
+        # VBA Lines 636-643: row 0
+        opening = schedule[0]
+        opening.pv_factor = 1.0
+        opening.aro_gross = opening.aro_gross or lease_data.aro or 0.0
+        opening.interest = 0.0
+        opening.depreciation = 0.0
+        opening.aro_interest = 0.0
+        opening.lease_liability = float(total_pv_rent[k])
+        opening.rou_asset = float(rou[k, 0])
+        opening.security_deposit_pv = float(security_opening[k])
+        opening.pv_of_rent = float(pv_of_rent[k, 0])
+
+        columns = zip(pv_factor[k, 1:n].tolist(), pv_of_rent[k, 1:n].tolist(), interest[k, 1:n].tolist(),
+                      liability[k, 1:n].tolist(), first_interest[k, 1:n].tolist(), first_liability[k, 1:n].tolist(),
+                      security_pv[k, 1:n].tolist(), depreciation[k, 1:n].tolist(), rou[k, 1:n].tolist())
+        first_interest_sum = interest_sum = depreciation_sum = 0.0
+        for row, (e, h, f, g, first_f, first_g, sec, j, i) in zip(rows[1:], columns):
+            if row is None:
+                first_interest_sum += first_f
+                interest_sum += f
+                depreciation_sum += j
+                continue
+            row.pv_factor = e
+            row.pv_of_rent = h
+            row.interest = interest_sum + f
+            row.lease_liability = g
+            row.principal = row.rental_amount - (first_interest_sum + first_f)
+            row.remaining_balance = first_g
+            row.security_deposit_pv = sec
+            row.aro_interest = 0.0
+            row.change_in_rou = 0.0
+            row.depreciation = depreciation_sum + j
+            row.rou_asset = i
+            first_interest_sum = interest_sum = depreciation_sum = 0.0
@@ -0,0 +1,238 @@
+"""
+Content-addressed schedule cache
+Reuses generated schedules across requests for leases whose inputs have not changed
+
+A schedule is a pure function of the lease's schedule inputs, the GAAP standard,
+the basic_calc() engine and the RFR table used for ARO discount rates. The cache
+key is a SHA-256 of exactly those, so an edited lease, or an update of the rate
+table it uses, misses and is regenerated. Entries are stored as ScheduleFrame (compact columns) and handed out
+as fresh PaymentScheduleRow lists, so callers may mutate what they get back.
+
+Memory is bounded by the total number of cached rows; least recently used
+schedules are evicted first.
+
+Values the generator computes alongside a schedule (the FV of ROU goal seek
+results in calculated_fields) are stored with it and copied back on a hit.
+
+The cache also remembers the latest schedule generated for each lease id, so an
+edited lease can be recalculated incrementally from it on request
+(recalculate_edited_schedule() in incremental.py, never cached). A
+lease id is forgotten when its latest schedule is evicted. Only stored leases are
+tracked: an auto_id of 0 (or None) marks a lease that has no id of its own, such
+as an ad-hoc calculation, whose schedules would otherwise all share one slot.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+from lease_accounting.core.models import LeaseData, PaymentScheduleRow
+from lease_accounting.core.schedule_frame import ScheduleFrame
+from lease_accounting.utils.rfr_rates import get_rfr_version
+
+# LeaseData fields that never reach the schedule (descriptive, audit and output fields)
+NON_SCHEDULE_FIELDS = frozenset({
+    'auto_id', 'description', 'asset_class', 'asset_id_code', 'agreement_date',
+    'currency', 'group_entity_name', 'region', 'cost_element', 'profit_center',
+    'cost_centre', 'segment', 'counterparty', 'vendor_code', 'agreement_type',
+    'responsible_person_operations', 'responsible_person_accounts',
+    'modifies_this_id', 'modified_by_this_id', 'head_lease_id',
+    'intra_group_lease', 'short_term_lease_ifrs', 'short_term_lease_usgaap', 'practical_expedient',
+    'entered_by', 'last_modified_by', 'last_reviewed_by', 'calculated_fields',
+})
+
+# Default bound: ~2 million rows (~250 MB as ScheduleFrame columns)
+DEFAULT_MAX_ROWS = int(os.environ.get('LEASE_SCHEDULE_CACHE_ROWS', 2_000_000))
+
+
+def _normalise(value: Any) -> Any:
+    """JSON-stable form of a LeaseData value"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(k): _normalise(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalise(v) for v in value]
+    if isinstance(value, float):
+        return repr(value)
+    return value
+
+
+def rfr_dependency_version(lease_data: LeaseData) -> int:
+    """Version of the RFR table lease_data's ARO is discounted with (0 when it has no ARO)"""
+    table = lease_data.aro_table or 0
+    uses_aro = (lease_data.aro or 0) > 0 or any(lease_data.aro_revisions or [])
+    return get_rfr_version(table) if table > 0 and uses_aro else 0
+
+
+def schedule_cache_key(lease_data: LeaseData, engine: str, rfr_version: Optional[int] = None) -> str:
+    """
+    Stable hash of everything that determines lease_data's schedule
+
+    Covers every LeaseData attribute (including ones set dynamically, such as
+    rental_amounts_by_date) except NON_SCHEDULE_FIELDS, and the version of the
+    RFR table the lease uses, so a rate update only invalidates leases on that table.
+    """
+    standard = getattr(lease_data, 'gaap_standard', 'IFRS')
+    return schedule_cache_keys(lease_data, engine, [standard], rfr_version)[standard]
+
+
+def schedule_cache_keys(lease_data: LeaseData, engine: str, standards: Iterable[str],
+                        rfr_version: Optional[int] = None) -> Dict[str, str]:
+    """
+    schedule_cache_key() of lease_data with gaap_standard set to each of standards
+    The lease attributes are normalised once for all standards.
+    """
+    inputs = {
+        name: _normalise(value)
+        for name, value in vars(lease_data).items()
+        if name not in NON_SCHEDULE_FIELDS
+    }
+    if rfr_version is None:
+        rfr_version = rfr_dependency_version(lease_data)
+    keys = {}
+    for standard in standards:
+        if 'gaap_standard' in inputs:
+            inputs['gaap_standard'] = standard
+        payload = {
+            'lease': inputs,
+            'gaap_standard': standard,
+            'engine': engine,
+            'rfr_version': rfr_version,
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+        keys[standard] = hashlib.sha256(encoded).hexdigest()
+    return keys
+
+
+class ScheduleCache:
+    """LRU cache of generated schedules, bounded by total rows held"""
+
+    def __init__(self, max_rows: int = DEFAULT_MAX_ROWS):
+        self.max_rows = max_rows
+        self._entries: "OrderedDict[str, ScheduleFrame]" = OrderedDict()
+        # key -> calculated_fields values stored with the schedule
+        self._fields: Dict[str, Dict[str, Any]] = {}
+        # lease id -> (key, lease snapshot, engine, RFR version) of its latest schedule
+        self._latest: Dict[Any, Tuple[str, LeaseData, str, int]] = {}
+        # key -> lease ids whose latest schedule it is
+        self._latest_ids: Dict[str, Set[Any]] = {}
+        self._rows = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, fields: Optional[Dict[str, Any]] = None) -> Optional[List[PaymentScheduleRow]]:
+        """
+        Cached schedule as a new list of rows, or None on a miss
+        On a hit, the values stored with the schedule are copied into fields
+        (normally the lease's calculated_fields).
+        """
+        with self._lock:
+            frame = self._entries.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if fields is not None:
+                fields.update(self._fields.get(key, {}))
+        return frame.to_rows()
+
+    def put(self, key: str, schedule: Union[List[PaymentScheduleRow], ScheduleFrame],
+            lease_data: Optional[LeaseData] = None, engine: Optional[str] = None,
+            fields: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Store a snapshot of schedule (later changes to the rows are not seen)
+        With lease_data, it also becomes that lease id's latest schedule (stored
+        leases only, see the module docstring).
+        fields: values get() copies back with the schedule.
+        A ScheduleFrame is stored as is (it may be shared by several keys: get()
+        and latest_for() only read it).
+        """
+        frame = schedule if isinstance(schedule, ScheduleFrame) else ScheduleFrame.from_rows(schedule)
+        if len(frame) > self.max_rows:
+            return
+        # Leases without an id of their own (auto_id 0) are not tracked
+        snapshot = copy.deepcopy(lease_data) if lease_data is not None and lease_data.auto_id else None
+        with self._lock:
+            if snapshot is not None:
+                lease_id = snapshot.auto_id
+                previous_latest = self._latest.get(lease_id)
+                if previous_latest is not None:
+                    self._latest_ids.get(previous_latest[0], set()).discard(lease_id)
+                self._latest[lease_id] = (key, snapshot, engine, rfr_dependency_version(snapshot))
+                self._latest_ids.setdefault(key, set()).add(lease_id)
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._rows -= len(previous)
+            self._entries[key] = frame
+            self._rows += len(frame)
+            if fields:
+                self._fields[key] = dict(fields)
+            else:
+                self._fields.pop(key, None)
+            while self._rows > self.max_rows:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._rows -= len(evicted)
+                self._fields.pop(evicted_key, None)
+                for lease_id in self._latest_ids.pop(evicted_key, ()):
+                    del self._latest[lease_id]
+                self.evictions += 1
+
+    def latest_for(self, lease_data: LeaseData, engine: str) -> Optional[Tuple[LeaseData, List[PaymentScheduleRow]]]:
+        """
+        (lease as it was, schedule) last cached for lease_data's id, if still cached
+        and computed with the same engine and RFR tables
+        """
+        if not lease_data.auto_id:
+            return None
+        with self._lock:
+            latest = self._latest.get(lease_data.auto_id)
+            if latest is None:
+                return None
+            key, snapshot, latest_engine, rfr_version = latest
+            frame = self._entries.get(key)
+            if frame is None or latest_engine != engine or rfr_version != rfr_dependency_version(snapshot):
+                return None
+        return snapshot, frame.to_rows()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._fields.clear()
+            self._latest.clear()
+            self._latest_ids.clear()
+            self._rows = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'rows': self._rows,
+                'latest': len(self._latest),
+                'max_rows': self.max_rows,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global instance used by generate_complete_schedule()
+_schedule_cache = ScheduleCache()
+
+
+def get_schedule_cache() -> ScheduleCache:
+    """Process-wide schedule cache"""
+    return _schedule_cache
@@ -0,0 +1,144 @@
+"""
+Event-driven date skeleton for the schedule generator
+Enumerates the row dates plotted by VBA datessrent() without walking every calendar day
+
+VBA Source File: VB script/Code
+VBA Function: datessrent() - Lines 83-236 (main date loop)
+
+The VBA loop visits each day from starto + 1 and decides whether to plot a row.
+Rows can only land on a handful of days per month (first payment date, month end,
+payment day, end date), so we visit just those days and apply the same per-day
+rules. Once the end date is reached the loop falls back to day-by-day stepping,
+which keeps the VBA termination quirks (e.g. a payment plotted the day after a
+month-end end date) identical to the reference day loop.
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional
+from lease_accounting.core.models import LeaseData
+from lease_accounting.utils.date_utils import eomonth
+
+# VBA: For i = 1 To 50000
+MAX_DAYS = 50000
+
+# Row kinds produced by the skeleton
+FIRST_PAYMENT = "first_payment"  # VBA Line 91-132: Rent on first payment date
+MONTH_END = "month_end"  # VBA Line 187-206: Month-end accrual row
+PAYMENT = "payment"  # VBA Line 137-184: Regular payment frequency row
+END_DATE = "end_date"  # VBA Line 209-228: End date row carrying purchase option
+
+
+@dataclass
+class SkeletonRow:
+    """Single plotted date in the schedule skeleton"""
+    date: date
+    kind: str
+    # VBA Line 246-248: Purchase price is added to the rental already on the end date
+    add_purchase_option: bool = False
+
+
+def _month_end(d: date) -> date:
+    """Last day of d's month (cheap equivalent of eomonth(d, 0))"""
+    if d.month == 12:
+        return date(d.year, 12, 31)
+    return date(d.year, d.month + 1, 1) - timedelta(days=1)
+
+
+def _payment_day(d: date, dayofm, dayofma1: int, monthof: int, firstpaymentDate: date) -> Optional[int]:
+    """
+    Payment day of month for d's month, or None if d's month is not a payment month
+    VBA Line 88 (dayofma for "Last"), Line 137 (frequency), Lines 143-146 (February)
+    """
+    if ((d.year * 12 + d.month) - (firstpaymentDate.year * 12 + firstpaymentDate.month)) % monthof != 0:
+        return None
+    dayofma = _month_end(d).day if dayofm == "Last" else dayofma1
+    if d.month == 2 and dayofma1 > 28:
+        dayofma = 28
+    return dayofma
+
+
+def generate_date_skeleton(lease_data: LeaseData) -> List[SkeletonRow]:
+    """
+    Generate the ordered row dates of the schedule after the opening row (C9)
+
+    Produces the same dates, in the same order, as the day loop in
+    generate_complete_schedule_reference() but costs O(rows) instead of O(days).
+    Rental amounts are not assigned here - they depend on findrent() state and
+    are plotted by the generator while walking the skeleton.
+    """
+    starto = lease_data.lease_start_date
+    enddate = lease_data.end_date
+    if not starto or not enddate:
+        return []
+
+    firstpaymentDate = lease_data.first_payment_date if lease_data.first_payment_date else starto
+    monthof = lease_data.frequency_months
+    dayofm = lease_data.day_of_month
+    # VBA: dayofma1 is fixed from the lease start month
+    dayofma1 = int(dayofm) if isinstance(dayofm, str) and dayofm.isdigit() else (eomonth(starto, 0).day if dayofm == "Last" else 1)
+
+    last_day = starto + timedelta(days=MAX_DAYS)
+    # From this day on the day loop can stop on any day that plots nothing,
+    # so we step day by day instead of jumping between candidate dates
+    daily_from = max(enddate + timedelta(days=1), firstpaymentDate)
+
+    # Candidate dates before daily_from: first payment date, month ends, payment days, end date
+    candidates = set()
+    if starto < firstpaymentDate < daily_from:
+        candidates.add(firstpaymentDate)
+    if starto < enddate < daily_from:
+        candidates.add(enddate)
+    month_start = date(starto.year, starto.month, 1)
+    while month_start < daily_from and month_start <= last_day:
+        month_end = _month_end(month_start)
+        candidates.add(month_end)
+        pay_day = _payment_day(month_start, dayofm, dayofma1, monthof, firstpaymentDate)
+        if pay_day is not None and pay_day <= month_end.day:
+            candidates.add(date(month_start.year, month_start.month, pay_day))
+        month_start = month_end + timedelta(days=1)
+
+    skeleton: List[SkeletonRow] = []
+    ordered = sorted(d for d in candidates if starto < d < daily_from and d <= last_day)
+
+    def plot_day(dateo: date) -> bool:
+        """Apply VBA per-day rules to dateo - returns True when the loop exits"""
+        x = 0
+        # VBA Line 91-132: Plotting rent on first payment date
+        if dateo == firstpaymentDate and starto != firstpaymentDate:
+            skeleton.append(SkeletonRow(dateo, FIRST_PAYMENT))
+            x = 1
+        # VBA Line 187-206: Month-end rows
+        if x == 0 and dateo.month != (dateo + timedelta(days=1)).month:
+            skeleton.append(SkeletonRow(dateo, MONTH_END))
+            x = 1
+        if dateo < firstpaymentDate and x == 0:
+            return False
+        # VBA Line 137-184: Regular payment frequency logic
+        pay_day = _payment_day(dateo, dayofm, dayofma1, monthof, firstpaymentDate)
+        if pay_day is not None:
+            if x == 1:
+                return False
+            if dateo.day == pay_day:
+                skeleton.append(SkeletonRow(dateo, PAYMENT))
+                x = 1
+        # VBA Line 209-228: End date handling with purchase option
+        if dateo == enddate:
+            if x == 0:
+                skeleton.append(SkeletonRow(dateo, END_DATE))
+            else:
+                skeleton[-1].add_purchase_option = True
+            return True
+        return dateo >= enddate
+
+    for dateo in ordered:
+        if plot_day(dateo):
+            return skeleton
+
+    dateo = max(daily_from, starto + timedelta(days=1))
+    while dateo <= last_day:
+        if plot_day(dateo):
+            break
+        dateo += timedelta(days=1)
+
+    return skeleton
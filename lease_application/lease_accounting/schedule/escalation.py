@@ -0,0 +1,258 @@
+"""
+Escalation engine - precomputed findrent() sequence
+Ports VBA findrent() so that a lease's escalation basis is derived once
+
+VBA Source File: VB script/Code
+VBA Function: findrent() Sub (Lines 879-958)
+
+VBA findrent() re-derives the escalation start point (begind/startd/offse, up to
+24 EDate steps) on every call, and datessrent() calls it with rent_no increasing
+by one for each escalation step. EscalationTable derives that basis once and fills
+the (app_rent, app_rent_date) sequence in a single forward pass, serving each
+rent_no lookup by index. The sequence is kept as Rental_1 multipliers
+(UnitEscalation), so leases with the same escalation terms can share it.
+"""
+
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+from dateutil.relativedelta import relativedelta
+from lease_accounting.core.models import LeaseData
+from lease_accounting.utils.date_utils import edate
+
+
+@dataclass
+class EscalationBasis:
+    """Lease-level findrent() inputs - VBA Lines 884-921"""
+    rental_1: float
+    pre: float  # Escalation percent (5.0 = 5%)
+    fre: int  # Esc_Freq_months
+    frequency_months: int
+    end_date: date
+    begdate: date
+    begdate1: date
+    offse: int
+
+
+def escalation_basis(lease_data: LeaseData) -> Optional[EscalationBasis]:
+    """
+    Derive the findrent() starting point for a lease (VBA Lines 884-921)
+    Returns None when the lease has no escalation (VBA Line 889-893 early exit)
+    """
+    fre = lease_data.esc_freq_months or 0
+    # VBA Line 884: pre = Escalation_percent * 100
+    # CRITICAL: In Excel, if cell shows "5%" (percentage format), Excel stores it as 0.05
+    # When VBA reads .Value, it gets 0.05, then multiplies by 100 → 5.0
+    # But JSON sends 5.0 directly (already in percentage form), so:
+    # - If escalation_percent >= 1: Already in percentage form (5 = 5%), use directly
+    # - If escalation_percent < 1: In decimal form (0.05 = 5%), multiply by 100
+    escalation_pct = lease_data.escalation_percent or 0.0
+    if escalation_pct >= 1:
+        # Already in percentage form (5.0 means 5%)
+        pre = escalation_pct
+    else:
+        # In decimal form (0.05 means 5%), multiply by 100 to match VBA
+        pre = escalation_pct * 100
+
+    Frequency_months = lease_data.frequency_months
+    accrualday = lease_data.accrual_day or 1
+
+    # VBA Line 889-893: Early exit if no escalation
+    if fre == 0 or pre == 0 or Frequency_months == 0:
+        return None
+
+    # VBA Line 895-902: Determining starting point
+    # CRITICAL: escalation_start_date field name
+    Escalation_Start = getattr(lease_data, 'escalation_start_date', None) or getattr(lease_data, 'escalation_start', None) or lease_data.lease_start_date
+    Lease_start_date = lease_data.lease_start_date
+    Day_of_Month = lease_data.day_of_month
+
+    # Handle "Last" day of month
+    if Day_of_Month == "Last":
+        if Lease_start_date.month in [1, 3, 5, 7, 8, 10, 12]:
+            Day_of_Month = 31
+        elif Lease_start_date.month == 2:
+            Day_of_Month = 28
+        else:
+            Day_of_Month = 30
+    else:
+        Day_of_Month = int(Day_of_Month) if isinstance(Day_of_Month, str) and Day_of_Month.isdigit() else 1
+
+    # VBA Line 904: begind calculation
+    begind = date(Escalation_Start.year - 1, Lease_start_date.month, accrualday)
+
+    # VBA Line 906-915: Find startd
+    startd = begind
+    for t in range(1, 25):
+        e_date = begind + relativedelta(months=Frequency_months * t)
+        if Escalation_Start < e_date:
+            startd = begind + relativedelta(months=Frequency_months * (t - 1))
+            break
+        elif Escalation_Start == e_date:
+            startd = begind + relativedelta(months=Frequency_months * t)
+            break
+
+    # VBA Line 917-919: begdate and startd adjustments
+    begdate = startd
+    begdate1 = date(begdate.year, begdate.month, Day_of_Month)
+    startd = date(startd.year, startd.month, accrualday)
+
+    # VBA Line 921: offse calculation
+    offse = (startd - Escalation_Start).days
+
+    return EscalationBasis(
+        rental_1=lease_data.rental_1 or 0.0,
+        pre=pre,
+        fre=fre,
+        frequency_months=Frequency_months,
+        end_date=lease_data.end_date or date.today(),
+        begdate=begdate,
+        begdate1=begdate1,
+        offse=offse,
+    )
+
+
+def escalated_rent(basis: EscalationBasis, app: int) -> Tuple[float, date]:
+    """
+    Rental and its validity date for payment number 'app' (VBA Lines 924-956)
+    """
+    terms, app_rent_date = escalation_terms(basis, app)
+    return (scale_rent(basis.rental_1, terms), app_rent_date)
+
+
+def scale_rent(rental_1: float, terms: Tuple) -> float:
+    """
+    app_rent for rental_1 from escalation_terms() - the VBA expressions, same operations
+    (f,): Rental_1 * f; (f1, offse, f0, rest, days): the offset-weighted rent of Line 943
+    """
+    if len(terms) == 1:
+        return rental_1 * terms[0]
+    f1, offse, f0, rest, days = terms
+    return rental_1 * f1 * offse / days + rental_1 * f0 * rest / days
+
+
+def escalation_terms(basis: EscalationBasis, app: int) -> Tuple[Tuple, date]:
+    """
+    Rental-independent form of escalated_rent(): (terms, app_rent_date) with
+    app_rent = scale_rent(Rental_1, terms). basis.rental_1 is not used.
+    """
+    pre = basis.pre
+    fre = basis.fre
+    begdate = basis.begdate
+    begdate1 = basis.begdate1
+    offse = basis.offse
+
+    # VBA Line 924-925: u and k calculations
+    if app % 2 == 1:
+        u = app
+    else:
+        u = app - 1
+
+    if offse != 0:
+        k = int(u / 2)
+    else:
+        k = 0
+
+    # VBA Line 928-956: Main loop
+    # CRITICAL: VBA's For i = u To 200 allows modifying i inside the loop
+    # Python's for loop doesn't allow this, so we must use a while loop
+    i = u
+    while i < 201:
+        # VBA Line 929: app_rent_date = EDate(begdate1, fre * (i - k)) - 1
+        app_rent_date = edate(begdate1, fre * (i - k)) - timedelta(days=1)
+        # VBA Line 930: app_rent = Rental_1 * (1 + pre / 100) ^ (i - 1 - k)
+        terms = ((1 + pre / 100) ** (i - 1 - k),)
+
+        if app == i:
+            return (terms, app_rent_date)
+
+        # VBA Line 933-936: Check if past end date
+        if app_rent_date >= basis.end_date:
+            app_rent_date = basis.end_date
+            return (terms, app_rent_date)
+
+        # VBA Line 938-954: Offset handling
+        i_was_incremented = False
+        if offse != 0:
+            # VBA Line 940: app_rent_date = EDate(begdate1, fre * (i - k))
+            app_rent_date = edate(begdate1, fre * (i - k))
+            # VBA Line 941: RPeriod calculation
+            RPeriod = (edate(begdate, fre * (i - k) + basis.frequency_months)) - edate(begdate, fre * (i - k))
+            offseOriginal = offse
+            if offseOriginal < 0:
+                offse = RPeriod.days + offseOriginal
+
+            terms = ((1 + pre / 100) ** (i - k), offse, (1 + pre / 100) ** (i - 1 - k),
+                     RPeriod.days - offse, RPeriod.days)
+            i += 1
+            i_was_incremented = True
+            if app == i:
+                return (terms, app_rent_date)
+            k += 1
+
+            # VBA Line 949-952: Check end date again
+            if app_rent_date >= basis.end_date:
+                app_rent_date = basis.end_date
+                return (terms, app_rent_date)
+
+        # Increment i for next iteration ONLY if we didn't already increment inside the offse block
+        if not i_was_incremented:
+            i += 1
+
+    return (terms, app_rent_date)
+
+
+class UnitEscalation:
+    """
+    escalation_terms() sequence by rent_no for one set of escalation terms
+
+    Independent of Rental_1, so leases with the same timing and escalation terms
+    share one (see timing_cache.py), across threads. Entries are appended in order
+    as rent numbers are requested, under a lock; entries already there are read
+    without it, as they are never changed or removed.
+    """
+
+    def __init__(self, basis: EscalationBasis):
+        self.basis = basis
+        self.entries: List[Tuple[Tuple, date]] = []
+        self._lock = threading.Lock()
+
+    def terms(self, app: int) -> Tuple[Tuple, date]:
+        if len(self.entries) < app:
+            with self._lock:
+                # Another thread may have appended them while this one waited
+                while len(self.entries) < app:
+                    self.entries.append(escalation_terms(self.basis, len(self.entries) + 1))
+        return self.entries[app - 1]
+
+
+class EscalationTable:
+    """
+    Per-lease (app_rent, app_rent_date) sequence, indexed by VBA rent_no
+
+    The basis is derived once; entries are appended in order as rent numbers are
+    requested, so a schedule walk costs one escalated_rent() step per rent number.
+    unit: shared UnitEscalation for the lease's escalation terms, if any; the
+    table then only scales its terms by Rental_1.
+    """
+
+    def __init__(self, lease_data: LeaseData, unit: Optional[UnitEscalation] = None):
+        self.rental_1 = lease_data.rental_1 or 0.0
+        if unit is None:
+            basis = escalation_basis(lease_data)
+            unit = UnitEscalation(basis) if basis is not None else None
+        self.unit = unit
+        self.basis = unit.basis if unit is not None else None
+        # VBA Line 889-893: constant rental valid until end date when there is no escalation
+        self._flat = (self.rental_1, lease_data.end_date or date.today())
+        self.entries: List[Tuple[float, date]] = []
+
+    def rent(self, app: int) -> Tuple[float, date]:
+        """findrent(lease_data, app) equivalent"""
+        if self.unit is None:
+            return self._flat
+        while len(self.entries) < app:
+            terms, app_rent_date = self.unit.terms(len(self.entries) + 1)
+            self.entries.append((scale_rent(self.rental_1, terms), app_rent_date))
+        return self.entries[app - 1]
@@ -11,21 +11,133 @@ VBA Functions:
 """
 
 from datetime import date, timedelta
-from typing import List, Optional, Tuple, Dict
-from lease_accounting.core.models import LeaseData, PaymentScheduleRow
-from lease_accounting.utils.date_utils import eomonth, edate
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from lease_accounting.core.models import LeaseData, PaymentScheduleRow, OpeningBalances
+from lease_accounting.core.schedule_frame import ScheduleFrame
+from lease_accounting.utils.date_utils import eomonth
 from lease_accounting.utils.finance import present_value
-from lease_accounting.utils.rfr_rates import get_aro_rate
-from dateutil.relativedelta import relativedelta
+from lease_accounting.utils.rfr_rates import get_aro_rate, get_aro_rates
+from lease_accounting.utils.discount_factors import DiscountCurve, discount_curve
+from lease_accounting.schedule.date_skeleton import FIRST_PAYMENT, MONTH_END, PAYMENT, END_DATE
+from lease_accounting.schedule.escalation import EscalationTable, escalation_basis, escalated_rent
+from lease_accounting.schedule import columnar
+from lease_accounting.schedule.cache import get_schedule_cache, schedule_cache_key
+from lease_accounting.schedule.timing_cache import get_timing_cache
+from lease_accounting.schedule.goal_seek import solve_fv_of_rou_rate
+import calendar
+import copy
+import itertools
 import math
+import os
 
+# basic_calc() engine: "scalar" (row by row, as in VBA) or "numpy" (columnar.py)
+BASIC_CALC_ENGINES = ("scalar", "numpy")
+BASIC_CALC_ENGINE = os.environ.get('LEASE_BASIC_CALC_ENGINE', 'scalar')
 
-def generate_complete_schedule(lease_data: LeaseData) -> List[PaymentScheduleRow]:
+
+def set_basic_calc_engine(engine: str) -> None:
+    """Select the default basic_calc() engine for all schedule generation"""
+    global BASIC_CALC_ENGINE
+    if engine not in BASIC_CALC_ENGINES:
+        raise ValueError(f"Unknown basic_calc engine '{engine}', expected one of {BASIC_CALC_ENGINES}")
+    BASIC_CALC_ENGINE = engine
+
+
+def generate_complete_schedule(lease_data: LeaseData, use_day_loop: bool = False,
+                               engine: Optional[str] = None, as_frame: bool = False,
+                               use_cache: bool = True) -> List[PaymentScheduleRow]:
     """
     Generate complete lease payment schedule - FULL VBA datessrent() implementation
     Includes: ARO revisions, Security increases, Manual rentals, Impairments, etc.
     
     VBA Source: VB script/Code, datessrent() function (Lines 16-249)
+    
+    Row dates come from generate_date_skeleton(), which visits only the dates VBA
+    plots; skeletons and escalation terms are shared by leases with the same timing
+    terms (timing_cache.py). use_day_loop=True runs the original day-by-day loop
+    instead (reference path).
+    engine selects the basic_calc() engine ("scalar" or "numpy"), default BASIC_CALC_ENGINE.
+    as_frame=True returns a column-oriented ScheduleFrame instead of a list of rows.
+    
+    Schedules are served from the process-wide schedule cache (cache.py) when the
+    lease inputs, GAAP, engine and RFR tables are unchanged; use_cache=False forces
+    generation. The reference path is never cached. A hit also restores the FV of
+    ROU goal seek results in lease_data.calculated_fields. A miss always generates
+    the whole schedule; recalculating an edited lease from its previous schedule is
+    the explicit recalculate_edited_schedule() (incremental.py).
+    """
+    engine = engine or BASIC_CALC_ENGINE
+    cache = get_schedule_cache() if use_cache and not use_day_loop else None
+    schedule = None
+    if cache is not None:
+        key = schedule_cache_key(lease_data, engine)
+        schedule = cache.get(key, lease_data.calculated_fields)
+    if schedule is None:
+        schedule = _generate_schedule_rows(lease_data, use_day_loop, engine)
+        if cache is not None:
+            cache.put(key, schedule, lease_data, engine, _goal_seek_cache_fields(lease_data))
+    
+    if as_frame:
+        return ScheduleFrame.from_rows(schedule)
+    return schedule
+
+
+def _generate_schedule_rows(lease_data: LeaseData, use_day_loop: bool, engine: str) -> List[PaymentScheduleRow]:
+    """datessrent() row generation followed by basic_calc() and the add-on routines"""
+    schedule = _plot_schedule_rows(lease_data, use_day_loop)
+    
+    # === VBA basic_calc() logic ===
+    schedule = _apply_basic_calculations(lease_data, schedule, engine)
+    
+    # Single-day lease (end date = start date): no add-on routines
+    if lease_data.end_date and lease_data.end_date == lease_data.lease_start_date:
+        return schedule
+    
+    return _apply_schedule_addons(lease_data, schedule)
+
+
+def _apply_schedule_addons(lease_data: LeaseData, schedule: List[PaymentScheduleRow],
+                           end_date: Optional[date] = None) -> List[PaymentScheduleRow]:
+    """
+    Post basic_calc() routines: addsecdep(), addimpair(), addmanualadj()
+    end_date: Cendrow when schedule stops before the end date (generate_schedule_to_horizon())
+    """
+    # === Apply Security Deposit Increases ===
+    schedule = _apply_security_deposit_increases(lease_data, schedule, end_date)
+    
+    # === Apply Impairments ===
+    schedule = _apply_impairments(lease_data, schedule)
+    
+    # === Apply Manual Rental Adjustments ===
+    schedule = _apply_manual_rental_adjustments(lease_data, schedule)
+    
+    return schedule
+
+
+def _schedule_addon_rows(lease_data: LeaseData, rows: Iterable[PaymentScheduleRow],
+                         end_date: date) -> Iterator[PaymentScheduleRow]:
+    """_apply_schedule_addons() one row at a time; end_date: Cendrow"""
+    rows = _security_deposit_increase_rows(lease_data, rows, end_date)
+    rows = _impairment_rows(lease_data, rows)
+    return _manual_rental_adjustment_rows(lease_data, rows)
+
+
+def _plot_schedule_rows(lease_data: LeaseData, use_day_loop: bool,
+                        escalation_lease: Optional[LeaseData] = None,
+                        horizon: Optional[date] = None,
+                        tail: Optional[List[Tuple[date, float]]] = None,
+                        keep_accrual: Optional[Callable[[date], bool]] = None,
+                        accruals: Optional[Dict[int, List[date]]] = None) -> List[PaymentScheduleRow]:
+    """
+    VBA datessrent() row plotting: dates, rentals and ARO inputs (columns C, D, M)
+    Row 0 is the opening row C9; basic_calc() has not run yet.
+    escalation_lease: lease whose dates drive findrent(), if not lease_data
+    (datessrent(istart) moves C9 but findrent() still reads the lease table).
+    horizon/tail: rows are built up to the first row after horizon; the dates and
+    rentals (C, D) of the later rows are appended to tail instead (skeleton path only).
+    keep_accrual/accruals: month-end rows (Lines 187-206) whose date keep_accrual()
+    rejects are not built; accruals[i] lists the dates left out before row i
+    (skeleton path only, generate_compact_schedule()).
     """
     if not lease_data.lease_start_date or not lease_data.end_date:
         return []
@@ -35,8 +147,15 @@ def generate_complete_schedule(lease_data: LeaseData) -> List[PaymentScheduleRow
     # Initialize rental tracking (VBA app_rent, app_rent_date)
     # CRITICAL: Initialize by calling findrent() first (VBA initializes before loop)
     rent_no = 1  # Start with 1 for first payment (VBA uses 1-based indexing)
+    # Escalation basis is derived once per lease; the day loop keeps calling findrent()
+    # Skeleton and escalation terms are shared by leases with the same timing (timing_cache.py)
+    rent_lease = escalation_lease or lease_data
+    if use_day_loop:
+        find_rent = lambda n: findrent(rent_lease, n)
+    else:
+        find_rent = EscalationTable(rent_lease, get_timing_cache().escalation(rent_lease)).rent
     # For initial lookup, use rent_no=1
-    app_rent, app_rent_date = findrent(lease_data, rent_no)
+    app_rent, app_rent_date = find_rent(rent_no)
     # If no escalation, app_rent_date is end_date, so we use rental_1 for all payments starting from first_payment_date
     if app_rent_date == lease_data.end_date and (not lease_data.escalation_percent or lease_data.escalation_percent == 0):
         # No escalation - rental is constant, valid from first payment date
@@ -59,7 +178,6 @@ def generate_complete_schedule(lease_data: LeaseData) -> List[PaymentScheduleRow
                 lease_data.lease_start_date, enddate, 0, schedule
             )
             schedule.append(row)
-            schedule = _apply_basic_calculations(lease_data, schedule)
             return schedule
     
     # Payment frequency
@@ -93,7 +211,7 @@ def generate_complete_schedule(lease_data: LeaseData) -> List[PaymentScheduleRow
                 else:
                     # VBA Lines 49-51: Increment rent_no and call findrent()
                     rent_no = rent_no + 1
-                    app_rent, app_rent_date = findrent(lease_data, rent_no)
+                    app_rent, app_rent_date = find_rent(rent_no)
             else:
                 # If loop completes without break, no valid rental found
                 first_rental = 0.0
@@ -124,99 +242,111 @@ def generate_complete_schedule(lease_data: LeaseData) -> List[PaymentScheduleRow
     
     dateo = starto  # Reset for main loop
     
-    # === VBA Line 83-236: Main date loop ===
-    for i in range(1, 50001):
-        x = 0  # x = 1 means date is plotted
-        dateo = starto + timedelta(days=i)
-        
-        # VBA Line 88: Finding last day of month
-        if dayofm == "Last":
-            dayofma = eomonth(dateo, 0).day
-        
-        # VBA Line 91-132: Plotting rent on first payment date
-        # This only applies when starto != firstpaymentDate (already handled above if equal)
-        if dateo == firstpaymentDate and starto != firstpaymentDate:
+    if not use_day_loop:
+        # === VBA Line 83-236: Main date loop, driven by the date skeleton ===
+        # Only the dates VBA would plot are visited (see date_skeleton.py)
+        auto_rentals_value = str(lease_data.auto_rentals or "").strip()
+        auto_rentals = auto_rentals_value.lower() in ["yes", "on", "true", "1"]
+        left_out: List[date] = []
+        for event in get_timing_cache().skeleton(lease_data):
+            dateo = event.date
             rental = 0.0
-            auto_rentals_value = str(lease_data.auto_rentals or "").strip()
-            if auto_rentals_value.lower() in ["yes", "on", "true", "1"]:
-                # VBA Lines 95-116: Same logic as above
-                for xx in range(1, 51):  # VBA: For xx = 1 To 50
-                    if app_rent_date >= dateo:  # VBA Line 97
-                        # VBA Line 98: Sets rental = app_rent
-                        rental = app_rent
-                        lastmonthpay = dateo.month + dateo.year * 12  # VBA Line 99
-                        break
-                    else:
-                        # VBA Lines 102-104: Increment rent_no and call findrent()
-                        rent_no = rent_no + 1
-                        app_rent, app_rent_date = findrent(lease_data, rent_no)
-            else:
-                rental = _get_manual_rental_for_date(lease_data, dateo)
             
-            aro_value = _get_aro_for_date(lease_data, dateo)
+            if event.kind == FIRST_PAYMENT:
+                # VBA Line 91-132: Plotting rent on first payment date
+                if auto_rentals:
+                    for xx in range(1, 51):  # VBA: For xx = 1 To 50
+                        if app_rent_date >= dateo:  # VBA Line 97
+                            rental = app_rent
+                            lastmonthpay = dateo.month + dateo.year * 12  # VBA Line 99
+                            break
+                        else:
+                            rent_no = rent_no + 1
+                            app_rent, app_rent_date = find_rent(rent_no)
+                else:
+                    rental = _get_manual_rental_for_date(lease_data, dateo)
+            elif event.kind == PAYMENT:
+                # VBA Line 150-171: Find rental
+                if auto_rentals:
+                    for xx in range(1, 51):  # VBA: For xx = 1 To 50
+                        if app_rent_date >= dateo:  # VBA Line 152
+                            current_month = dateo.month + dateo.year * 12
+                            if lastmonthpay != current_month:
+                                rental = app_rent
+                            lastmonthpay = 0  # VBA Line 154
+                            break
+                        else:
+                            rent_no = rent_no + 1
+                            app_rent, app_rent_date = find_rent(rent_no)
+                else:
+                    rental = _get_manual_rental_for_date(lease_data, dateo)
+            elif event.kind == END_DATE:
+                # VBA Line 209-228: No payment on end date - add purchase option as rental
+                rental = lease_data.purchase_option_price or 0.0
+            
+            if tail is not None and schedule[-1].date > horizon:
+                # Past the horizon: only C and D are kept (G7, VBA Line 688)
+                if event.add_purchase_option:
+                    rental += (lease_data.purchase_option_price or 0.0)
+                tail.append((dateo, rental))
+                continue
+            
+            if (keep_accrual is not None and event.kind == MONTH_END and not event.add_purchase_option
+                    and not keep_accrual(dateo)):
+                # Month-end row without rental, left to basic_calc() (compact schedule)
+                left_out.append(dateo)
+                continue
+            if left_out:
+                accruals[len(schedule)] = left_out
+                left_out = []
             
             row = _create_schedule_row(
-                lease_data, dateo, rental, aro_value,
+                lease_data, dateo, rental, _get_aro_for_date(lease_data, dateo),
                 lease_data.lease_start_date, enddate, k, schedule
             )
+            if event.add_purchase_option:
+                # Payment exists on end date - add purchase price to last rental
+                row.rental_amount += (lease_data.purchase_option_price or 0.0)
             schedule.append(row)
             k += 1
-            x = 1
         
-        # VBA Line 187-206: Month-end rows (check before skipping dates before first payment)
-        # These accrual entries must be created even before first payment date
-        if x == 0 and dateo.month != (dateo + timedelta(days=1)).month:
-            # Month-end row - only ARO, no rental
-            # CRITICAL: Create these entries even if before first payment date
-            # They accumulate interest on the liability
-            aro_value = _get_aro_for_date(lease_data, dateo)
-            row = _create_schedule_row(
-                lease_data, dateo, 0.0, aro_value,
+        # Month-end rows after the last row plotted are built after all
+        for dateo in left_out:
+            schedule.append(_create_schedule_row(
+                lease_data, dateo, 0.0, _get_aro_for_date(lease_data, dateo),
                 lease_data.lease_start_date, enddate, k, schedule
-            )
-            schedule.append(row)
+            ))
             k += 1
-            x = 1
-        
-        # Skip payment dates if before first payment date (but keep month-end accruals)
-        if dateo < firstpaymentDate and x == 0:
-            continue
-        
-        # VBA Line 137-184: Regular payment frequency logic
-        if ((dateo.year * 12 + dateo.month) - (firstpaymentDate.year * 12 + firstpaymentDate.month)) % monthof == 0:
-            if x == 1:
-                continue
+    else:
+        # === VBA Line 83-236: Main date loop (reference path, one iteration per day) ===
+        for i in range(1, 50001):
+            x = 0  # x = 1 means date is plotted
+            dateo = starto + timedelta(days=i)
             
-            # VBA Line 143-146: Handle February
-            if dateo.month == 2 and dayofma1 > 28:
-                dayofma1_temp = dayofma1
-                dayofma = 28
+            # VBA Line 88: Finding last day of month
+            if dayofm == "Last":
+                dayofma = eomonth(dateo, 0).day
             
-            if dateo.day == dayofma:
+            # VBA Line 91-132: Plotting rent on first payment date
+            # This only applies when starto != firstpaymentDate (already handled above if equal)
+            if dateo == firstpaymentDate and starto != firstpaymentDate:
                 rental = 0.0
-                
-                # VBA Line 150-171: Find rental
                 auto_rentals_value = str(lease_data.auto_rentals or "").strip()
                 if auto_rentals_value.lower() in ["yes", "on", "true", "1"]:
-                    # VBA Lines 151-162: Loop to find correct rental
+                    # VBA Lines 95-116: Same logic as above
                     for xx in range(1, 51):  # VBA: For xx = 1 To 50
-                        if app_rent_date >= dateo:  # VBA Line 152
-                            # VBA Line 153: Check lastmonthpay
-                            current_month = dateo.month + dateo.year * 12
-                            if lastmonthpay != current_month:
-                                # VBA Line 153: Set rental = app_rent
-                                rental = app_rent
-                            # VBA Line 154: lastmonthpay = 0 (ALWAYS sets to 0)
-                            lastmonthpay = 0
+                        if app_rent_date >= dateo:  # VBA Line 97
+                            # VBA Line 98: Sets rental = app_rent
+                            rental = app_rent
+                            lastmonthpay = dateo.month + dateo.year * 12  # VBA Line 99
                             break
                         else:
-                            # VBA Lines 157-159: Increment rent_no and call findrent()
+                            # VBA Lines 102-104: Increment rent_no and call findrent()
                             rent_no = rent_no + 1
-                            app_rent, app_rent_date = findrent(lease_data, rent_no)
+                            app_rent, app_rent_date = find_rent(rent_no)
                 else:
                     rental = _get_manual_rental_for_date(lease_data, dateo)
                 
-                # VBA Line 173-181: Find ARO
                 aro_value = _get_aro_for_date(lease_data, dateo)
                 
                 row = _create_schedule_row(
@@ -227,174 +357,421 @@ def generate_complete_schedule(lease_data: LeaseData) -> List[PaymentScheduleRow
                 k += 1
                 x = 1
             
-            # VBA Line 185: Restore dayofma if February
-            if dateo.month == 2 and dayofma1 > 28:
-                dayofma = dayofma1
-        
-        # VBA Line 209-228: End date handling with purchase option
-        if dateo == enddate:
-            if x == 0:
-                # No payment on end date - add purchase option as rental
-                purchase_price = lease_data.purchase_option_price or 0.0
+            # VBA Line 187-206: Month-end rows (check before skipping dates before first payment)
+            # These accrual entries must be created even before first payment date
+            if x == 0 and dateo.month != (dateo + timedelta(days=1)).month:
+                # Month-end row - only ARO, no rental
+                # CRITICAL: Create these entries even if before first payment date
+                # They accumulate interest on the liability
                 aro_value = _get_aro_for_date(lease_data, dateo)
                 row = _create_schedule_row(
-                    lease_data, dateo, purchase_price, aro_value,
+                    lease_data, dateo, 0.0, aro_value,
                     lease_data.lease_start_date, enddate, k, schedule
                 )
                 schedule.append(row)
-            else:
-                # Payment exists - add purchase price to last rental
-                if schedule:
-                    schedule[-1].rental_amount += (lease_data.purchase_option_price or 0.0)
+                k += 1
+                x = 1
             
-            break
-        
-        if dateo >= enddate:
-            break
+            # Skip payment dates if before first payment date (but keep month-end accruals)
+            if dateo < firstpaymentDate and x == 0:
+                continue
+            
+            # VBA Line 137-184: Regular payment frequency logic
+            if ((dateo.year * 12 + dateo.month) - (firstpaymentDate.year * 12 + firstpaymentDate.month)) % monthof == 0:
+                if x == 1:
+                    continue
+                
+                # VBA Line 143-146: Handle February
+                if dateo.month == 2 and dayofma1 > 28:
+                    dayofma1_temp = dayofma1
+                    dayofma = 28
+                
+                if dateo.day == dayofma:
+                    rental = 0.0
+                    
+                    # VBA Line 150-171: Find rental
+                    auto_rentals_value = str(lease_data.auto_rentals or "").strip()
+                    if auto_rentals_value.lower() in ["yes", "on", "true", "1"]:
+                        # VBA Lines 151-162: Loop to find correct rental
+                        for xx in range(1, 51):  # VBA: For xx = 1 To 50
+                            if app_rent_date >= dateo:  # VBA Line 152
+                                # VBA Line 153: Check lastmonthpay
+                                current_month = dateo.month + dateo.year * 12
+                                if lastmonthpay != current_month:
+                                    # VBA Line 153: Set rental = app_rent
+                                    rental = app_rent
+                                # VBA Line 154: lastmonthpay = 0 (ALWAYS sets to 0)
+                                lastmonthpay = 0
+                                break
+                            else:
+                                # VBA Lines 157-159: Increment rent_no and call findrent()
+                                rent_no = rent_no + 1
+                                app_rent, app_rent_date = find_rent(rent_no)
+                    else:
+                        rental = _get_manual_rental_for_date(lease_data, dateo)
+                    
+                    # VBA Line 173-181: Find ARO
+                    aro_value = _get_aro_for_date(lease_data, dateo)
+                    
+                    row = _create_schedule_row(
+                        lease_data, dateo, rental, aro_value,
+                        lease_data.lease_start_date, enddate, k, schedule
+                    )
+                    schedule.append(row)
+                    k += 1
+                    x = 1
+                
+                # VBA Line 185: Restore dayofma if February
+                if dateo.month == 2 and dayofma1 > 28:
+                    dayofma = dayofma1
+            
+            # VBA Line 209-228: End date handling with purchase option
+            if dateo == enddate:
+                if x == 0:
+                    # No payment on end date - add purchase option as rental
+                    purchase_price = lease_data.purchase_option_price or 0.0
+                    aro_value = _get_aro_for_date(lease_data, dateo)
+                    row = _create_schedule_row(
+                        lease_data, dateo, purchase_price, aro_value,
+                        lease_data.lease_start_date, enddate, k, schedule
+                    )
+                    schedule.append(row)
+                else:
+                    # Payment exists - add purchase price to last rental
+                    if schedule:
+                        schedule[-1].rental_amount += (lease_data.purchase_option_price or 0.0)
+                
+                break
+            
+            if dateo >= enddate:
+                break
     
-    # === VBA basic_calc() logic ===
-    schedule = _apply_basic_calculations(lease_data, schedule)
+    return schedule
+
+
+def generate_schedule_from(lease_data: LeaseData, istart: Optional[date],
+                           opening_balances: OpeningBalances,
+                           modification: bool = False) -> List[PaymentScheduleRow]:
+    """
+    Regenerate the schedule from istart onward - VBA datessrent(istart) followed by basic_calc()
     
-    # === Apply Security Deposit Increases ===
-    schedule = _apply_security_deposit_increases(lease_data, schedule)
+    VBA Source: VB script/Code, datessrent() (Lines 30-31), modify_calc() (Lines 789-813),
+    indexrate() (Lines 866-872)
     
-    # === Apply Impairments ===
-    schedule = _apply_impairments(lease_data, schedule)
+    Returns only the rows from istart (row 0 = C9 = istart) to the end date, so a
+    remeasurement late in a long lease costs the remaining rows. VBA treats istart
+    as both start and first payment date; istart=None plots from the lease's own
+    dates (modify_calc() regenerating the modifying lease).
     
-    # === Apply Manual Rental Adjustments ===
-    schedule = _apply_manual_rental_adjustments(lease_data, schedule)
+    Liability, security deposit PV and ARO are measured afresh at istart (G7, L9, O9).
+    The ROU asset carries forward: I9 = I7 + K9 + ide with I7 = opening_balances.rou_asset
+    and K9 from remeasure_at_restart(). Depreciation and ROU then roll forward from I9.
+    """
+    restarted = lease_data
+    if istart is not None:
+        # VBA Line 30-31: starto = firstpaymentDate = istart
+        restarted = copy.copy(lease_data)
+        restarted.lease_start_date = istart
+        restarted.first_payment_date = istart
+    schedule = _plot_schedule_rows(restarted, False, escalation_lease=lease_data)
+    if not schedule:
+        return schedule
+    schedule = _apply_basic_calculations(restarted, schedule)
     
-    return schedule
+    # VBA Line 790-794 / 869-871: I7 = ROU_value, I9 = I7 + K9 + ide
+    remeasurement = remeasure_at_restart(restarted, schedule[0], opening_balances, modification)
+    ide = (lease_data.initial_direct_expenditure or 0) - (lease_data.lease_incentive or 0)
+    schedule[0].change_in_rou = remeasurement['change_in_rou']
+    schedule[0].rou_asset = opening_balances.rou_asset + schedule[0].change_in_rou + ide
+    
+    # J10/I10 - Depreciation and ROU roll forward from the carried I9
+    icompound = _derive_icompound(restarted)
+    discount_rate = (restarted.borrowing_rate or 8) / 100
+    endoflife = _calculate_end_of_life_vba(restarted, schedule[-1].date)
+    usgaap_operating = getattr(restarted, 'gaap_standard', 'IFRS') == "US-GAAP" and restarted.finance_lease_usgaap != "Yes"
+    future_interest = _future_interest_sums(schedule) if usgaap_operating else None
+    for i in range(1, len(schedule)):
+        prev_row = schedule[i - 1]
+        curr_row = schedule[i]
+        curr_row.depreciation = _calculate_depreciation_vba(
+            restarted, prev_row, curr_row, endoflife, discount_rate, icompound, schedule,
+            row_index=i, future_interest=future_interest
+        )
+        curr_row.rou_asset = prev_row.rou_asset - curr_row.depreciation + curr_row.change_in_rou
+    _apply_transition_option(restarted, schedule)
+    
+    if restarted.end_date and restarted.end_date == restarted.lease_start_date:
+        return schedule
+    return _apply_schedule_addons(restarted, schedule)
 
 
-def findrent(lease_data: LeaseData, app: int) -> Tuple[float, date]:
+def remeasure_at_restart(lease_data: LeaseData, opening_row: PaymentScheduleRow,
+                         opening_balances: OpeningBalances, modification: bool = False) -> Dict[str, float]:
     """
-    VBA findrent() function - Complete implementation
+    K9 (change in ROU at the restart row) and the gains booked with it
     
-    VBA Source: VB script/Code, findrent() Sub (Lines 879-958)
-    Calculates rental amount with escalation for payment number 'app'
+    VBA Source: indexrate() Line 872 (index reset), modify_calc() Lines 796-812 (modification)
+    opening_row is the regenerated C9 row after basic_calc() (G7, O9 and L9).
     """
-    fre = lease_data.esc_freq_months or 0
-    # VBA Line 884: pre = Escalation_percent * 100
-    # CRITICAL: In Excel, if cell shows "5%" (percentage format), Excel stores it as 0.05
-    # When VBA reads .Value, it gets 0.05, then multiplies by 100 → 5.0
-    # But JSON sends 5.0 directly (already in percentage form), so:
-    # - If escalation_percent >= 1: Already in percentage form (5 = 5%), use directly
-    # - If escalation_percent < 1: In decimal form (0.05 = 5%), multiply by 100
-    escalation_pct = lease_data.escalation_percent or 0.0
-    if escalation_pct >= 1:
-        # Already in percentage form (5.0 means 5%)
-        pre = escalation_pct
-    else:
-        # In decimal form (0.05 means 5%), multiply by 100 to match VBA
-        pre = escalation_pct * 100
+    g7 = opening_row.lease_liability
+    o9 = opening_row.aro_provision or 0.0
+    l9 = opening_row.security_deposit_pv or 0.0
+    ide = (lease_data.initial_direct_expenditure or 0) - (lease_data.lease_incentive or 0)
+    results = {
+        'change_in_rou': 0.0,
+        'covid_pe_gain': 0.0,
+        'modification_gain': 0.0,
+        'sublease_modification_gainloss': 0.0,
+    }
+    
+    if not modification:
+        # VBA Line 872: K9 = G7 + O9 + L9 - Liability_value - ARO_value - security_value
+        results['change_in_rou'] = (g7 + o9 + l9 - opening_balances.lease_liability
+                                    - opening_balances.aro_provision - opening_balances.security_deposit_pv)
+        return results
+    
+    if lease_data.practical_expedient == "Yes":
+        # VBA Line 796-798: K7 = G7 - Liability_value, K9 keeps its basic_calc() value
+        results['covid_pe_gain'] = g7 - opening_balances.lease_liability
+        results['change_in_rou'] = opening_row.change_in_rou or 0.0
+        return results
+    
+    # VBA Line 800: K9 = G7 + O9 - L9 - Liability_value - ARO_value + security_value + D6 - sec_gross
+    k9 = (g7 + o9 - l9 - opening_balances.lease_liability - opening_balances.aro_provision
+          + opening_balances.security_deposit_pv + (lease_data.security_deposit or 0.0)
+          - opening_balances.security_gross)
+    # VBA Line 802-806: A negative I9 is booked as a gain on modification
+    if opening_balances.rou_asset + k9 + ide < 0:
+        k6 = k9 + opening_balances.rou_asset + ide
+        results['modification_gain'] = k6
+        k9 -= k6
+    # VBA Line 808-812: Sublease modification gain/loss
+    if lease_data.sublease == "Yes":
+        k5 = opening_balances.lease_liability - g7
+        results['sublease_modification_gainloss'] = k5
+        k9 += k5
+    results['change_in_rou'] = k9
+    return results
+
+
+def generate_schedule_to_horizon(lease_data: LeaseData, horizon: date,
+                                 engine: Optional[str] = None) -> Optional[List[PaymentScheduleRow]]:
+    """
+    Leading rows of the schedule, up to the first row after horizon
     
-    Frequency_months = lease_data.frequency_months
-    accrualday = lease_data.accrual_day or 1
+    For results that never read past horizon (LeaseProcessor results-only mode).
+    Later rows are not built: their dates and rentals only enter G7 = SUM(H9:Hendrow)
+    and the provisional G9 (VBA Lines 639, 688), and Cendrow still drives L9, the
+    ARO provisions and the end of life. The rows equal the same rows of
+    generate_complete_schedule(). Not cached.
     
-    # VBA Line 889-893: Early exit if no escalation
-    if fre == 0 or pre == 0 or Frequency_months == 0:
-        app_rent = lease_data.rental_1 or 0.0
-        app_rent_date = lease_data.end_date or date.today()
-        return (app_rent, app_rent_date)
-    
-    # VBA Line 895-902: Determining starting point
-    # CRITICAL: escalation_start_date field name
-    Escalation_Start = getattr(lease_data, 'escalation_start_date', None) or getattr(lease_data, 'escalation_start', None) or lease_data.lease_start_date
-    Lease_start_date = lease_data.lease_start_date
-    Day_of_Month = lease_data.day_of_month
-    
-    # Handle "Last" day of month
-    if Day_of_Month == "Last":
-        if Lease_start_date.month in [1, 3, 5, 7, 8, 10, 12]:
-            Day_of_Month = 31
-        elif Lease_start_date.month == 2:
-            Day_of_Month = 28
-        else:
-            Day_of_Month = 30
-    else:
-        Day_of_Month = int(Day_of_Month) if isinstance(Day_of_Month, str) and Day_of_Month.isdigit() else 1
+    Returns None for US-GAAP operating leases, whose depreciation reads
+    Sum(F10:$F$endrow) over the whole schedule (VBA Lines 670-671), and when
+    engine (default BASIC_CALC_ENGINE) is not "scalar".
+    """
+    if (engine or BASIC_CALC_ENGINE) != "scalar":
+        return None
+    if getattr(lease_data, 'gaap_standard', 'IFRS') == "US-GAAP" and lease_data.finance_lease_usgaap != "Yes":
+        return None
+    tail: List[Tuple[date, float]] = []
+    schedule = _plot_schedule_rows(lease_data, False, horizon=horizon, tail=tail)
+    schedule = _apply_basic_calculations(lease_data, schedule, "scalar", tail=tail)
     
-    # VBA Line 904: begind calculation
-    begind = date(Escalation_Start.year - 1, Lease_start_date.month, accrualday)
+    # Single-day lease (end date = start date): no add-on routines
+    if not schedule or (lease_data.end_date and lease_data.end_date == lease_data.lease_start_date):
+        return schedule
+    return _apply_schedule_addons(lease_data, schedule, tail[-1][0] if tail else None)
+
+
+def generate_compact_schedule(lease_data: LeaseData, accrual_window: Optional[Tuple[date, date]] = None,
+                              horizon: Optional[date] = None,
+                              engine: Optional[str] = None) -> Optional[List[PaymentScheduleRow]]:
+    """
+    Schedule without the month-end accrual rows (VBA Lines 187-206) outside accrual_window
+    
+    Payment rows, the end date row and the month-end rows of events (security
+    deposit increases, impairments, manual adjustments, transition 2B, termination,
+    modification) are always built. Month-end rows dated within
+    accrual_window (first, last date inclusive; None: none) are built as well. The
+    left-out rows are accrued through by basic_calc(): balances (G, I, L, O) equal
+    the same rows of generate_complete_schedule(), and each row's F, J, K, N and
+    principal include the left-out rows before it. horizon: rows stop after the
+    first row past it, as in generate_schedule_to_horizon(). Not cached.
+    Month-end rows outside the window are derived on demand with compact_schedule_row().
+    
+    Returns None for US-GAAP operating leases and leases with FV of ROU, and when
+    engine (default BASIC_CALC_ENGINE) is not "scalar".
+    """
+    if (engine or BASIC_CALC_ENGINE) != "scalar":
+        return None
+    if getattr(lease_data, 'gaap_standard', 'IFRS') == "US-GAAP" and lease_data.finance_lease_usgaap != "Yes":
+        return None
+    if lease_data.fv_of_rou and lease_data.fv_of_rou != 0:
+        return None
+    first, last = accrual_window or (date.max, date.min)
+    events = _event_dates(lease_data)
+    keep_accrual = lambda accrual_date: first <= accrual_date <= last or accrual_date in events
+    accruals: Dict[int, List[date]] = {}
+    tail: Optional[List[Tuple[date, float]]] = [] if horizon is not None else None
+    schedule = _plot_schedule_rows(lease_data, False, horizon=horizon, tail=tail,
+                                   keep_accrual=keep_accrual, accruals=accruals)
+    schedule = _apply_basic_calculations(lease_data, schedule, "scalar", tail=tail, accruals=accruals)
+    
+    # Single-day lease (end date = start date): no add-on routines
+    if not schedule or (lease_data.end_date and lease_data.end_date == lease_data.lease_start_date):
+        return schedule
+    return _apply_schedule_addons(lease_data, schedule, tail[-1][0] if tail else None)
+
+
+def compact_schedule_row(lease_data: LeaseData, on_date: date,
+                         engine: Optional[str] = None) -> Optional[PaymentScheduleRow]:
+    """
+    Row of generate_complete_schedule(lease_data) on on_date, derived on demand
     
-    # VBA Line 906-915: Find startd
-    startd = begind
-    for t in range(1, 25):
-        e_date = begind + relativedelta(months=Frequency_months * t)
-        if Escalation_Start < e_date:
-            startd = begind + relativedelta(months=Frequency_months * (t - 1))
-            break
-        elif Escalation_Start == e_date:
-            startd = begind + relativedelta(months=Frequency_months * t)
+    For month-end rows a compact schedule left out: a compact schedule is built up
+    to on_date, keeping the month-end rows from the month before it, so the row on
+    on_date goes through the same steps as in the full schedule. Not cached.
+    Returns None when the full schedule has no row on on_date, and where
+    generate_compact_schedule() returns None.
+    """
+    schedule = generate_compact_schedule(lease_data, (eomonth(on_date, -1), on_date), on_date, engine)
+    for row in schedule or ():
+        if row.date == on_date:
+            return row
+        if row.date > on_date:
             break
+    return None
+
+
+def _event_dates(lease_data: LeaseData) -> set:
+    """Dates the add-on routines, transition 2B and LeaseProcessor look up rows for"""
+    dates = set()
+    for attribute in ('security_dates', 'impairment_dates', 'rental_dates'):
+        dates.update(d for d in getattr(lease_data, attribute, None) or () if isinstance(d, date))
+    if lease_data.transition_option == "2B" and lease_data.transition_date:
+        dates.add(lease_data.transition_date - timedelta(days=1))
+    for attribute in ('termination_date', 'date_modified'):
+        value = getattr(lease_data, attribute, None)
+        if isinstance(value, date):
+            dates.add(value)
+    return dates
+
+
+def iter_schedule(lease_data: LeaseData, insert_date: Optional[date] = None) -> Iterator[PaymentScheduleRow]:
+    """
+    Rows of generate_complete_schedule(lease_data, engine="scalar"), yielded one at a time
     
-    # VBA Line 917-919: begdate and startd adjustments
-    begdate = startd
-    begdate1 = date(begdate.year, begdate.month, Day_of_Month)
-    startd = date(startd.year, startd.month, accrualday)
-    
-    # VBA Line 921: offse calculation
-    offse = (startd - Escalation_Start).days
+    Only the dates and rentals (C, D) are plotted ahead, for G7 = SUM(H9:Hendrow),
+    the provisional G9 and Cendrow (VBA Lines 639, 688). Each row is then built,
+    run through both basic_calc() passes, transition 2B and the add-on routines,
+    and yielded, so the rows already yielded are not held. Not cached.
     
-    # VBA Line 924-925: u and k calculations
-    if app % 2 == 1:
-        u = app
+    insert_date: when no row falls on it, a row with the previous row's balances
+    and no activity is yielded before the first row after it (the to_date row of
+    /calculate_lease). US-GAAP operating leases (Sum(F10:$F$endrow), VBA Lines
+    670-671) and leases with FV of ROU are generated in full and yielded from the list.
+    """
+    usgaap_operating = getattr(lease_data, 'gaap_standard', 'IFRS') == "US-GAAP" and lease_data.finance_lease_usgaap != "Yes"
+    if (usgaap_operating or (lease_data.fv_of_rou and lease_data.fv_of_rou != 0)
+            or not lease_data.lease_start_date or not lease_data.end_date
+            or lease_data.end_date <= lease_data.lease_start_date):
+        rows = iter(generate_complete_schedule(lease_data, engine="scalar"))
     else:
-        u = app - 1
+        rows = _stream_schedule_rows(lease_data)
+    return with_carried_row(rows, insert_date)
+
+
+def with_carried_row(rows: Iterable[PaymentScheduleRow], insert_date: Optional[date]) -> Iterator[PaymentScheduleRow]:
+    """
+    rows, with a row carrying the previous row's balances on insert_date when no
+    row falls on it (see iter_schedule())
+    """
+    previous = None
+    for row in rows:
+        if insert_date is not None and row.date >= insert_date:
+            if row.date > insert_date:
+                # VBA: If to_date is not a payment date, INSERT row and COPY values from previous row
+                yield _carried_row(previous or row, insert_date)
+            insert_date = None
+        yield row
+        previous = row
+
+
+def _stream_schedule_rows(lease_data: LeaseData) -> Iterator[PaymentScheduleRow]:
+    """iter_schedule() for leases _basic_calc_sweep() covers"""
+    # C9, and the dates and rentals of the rows after it
+    tail: List[Tuple[date, float]] = []
+    schedule = _plot_schedule_rows(lease_data, False, horizon=date.min, tail=tail)
+    provisional = _calculate_initial_liability(lease_data, schedule, tail)
+    opening = _apply_basic_calculations(lease_data, schedule, "scalar", tail=tail)[0]
+    
+    # VBA Lines 631-634, 647-659: ide, secdeprate, C7, end of life
+    ide = (lease_data.initial_direct_expenditure or 0) - (lease_data.lease_incentive or 0)
+    raw_secdeprate = lease_data.security_discount or 0.0
+    secdeprate = raw_secdeprate / 100 if raw_secdeprate > 1 else raw_secdeprate
+    curve = discount_curve((lease_data.borrowing_rate or 8) / 100, _derive_icompound(lease_data))
+    last_date = tail[-1][0] if tail else opening.date
+    endoflife = _calculate_end_of_life_vba(lease_data, last_date)
+    
+    steps = ((row_date, _create_schedule_row(
+                lease_data, row_date, rental, _get_aro_for_date(lease_data, row_date),
+                lease_data.lease_start_date, lease_data.end_date, k, None
+             )) for k, (row_date, rental) in enumerate(tail, start=1))
+    rows = itertools.chain([opening], _basic_calc_sweep(lease_data, opening, steps, provisional,
+                                                        opening.lease_liability, ide, secdeprate, curve,
+                                                        endoflife, last_date))
+    rows = _transition_option_rows(lease_data, rows)
+    return _schedule_addon_rows(lease_data, rows, last_date)
+
+
+def _carried_row(previous: PaymentScheduleRow, row_date: date) -> PaymentScheduleRow:
+    """Row on row_date with previous's balances and no rental, interest or depreciation"""
+    return PaymentScheduleRow(
+        date=row_date,
+        rental_amount=0.0,  # No payment on interpolated row
+        pv_factor=previous.pv_factor,
+        interest=0.0,
+        lease_liability=previous.lease_liability,
+        pv_of_rent=0.0,
+        rou_asset=previous.rou_asset,
+        depreciation=0.0,
+        change_in_rou=0.0,
+        security_deposit_pv=previous.security_deposit_pv,
+        aro_gross=previous.aro_gross,
+        aro_interest=0.0,
+        aro_provision=previous.aro_provision,
+        principal=0.0,
+        remaining_balance=None
+    )
+
+
+def generate_complete_schedule_reference(lease_data: LeaseData) -> List[PaymentScheduleRow]:
+    """
+    Reference schedule generator - walks every calendar day like VBA datessrent()
+    Kept for parity checks against the date skeleton path
+    """
+    return generate_complete_schedule(lease_data, use_day_loop=True)
+
+
+def findrent(lease_data: LeaseData, app: int) -> Tuple[float, date]:
+    """
+    VBA findrent() function - Complete implementation
     
-    if offse != 0:
-        k = int(u / 2)
-    else:
-        k = 0
-    
-    # VBA Line 928-956: Main loop
-    # CRITICAL: VBA's For i = u To 200 allows modifying i inside the loop
-    # Python's for loop doesn't allow this, so we must use a while loop
-    i = u
-    while i < 201:
-        # VBA Line 929: app_rent_date = EDate(begdate1, fre * (i - k)) - 1
-        app_rent_date = edate(begdate1, fre * (i - k)) - timedelta(days=1)
-        app_rent = (lease_data.rental_1 or 0.0) * ((1 + pre / 100) ** (i - 1 - k))
-        
-        if app == i:
-            return (app_rent, app_rent_date)
-        
-        # VBA Line 933-936: Check if past end date
-        if app_rent_date >= (lease_data.end_date or date.today()):
-            app_rent_date = lease_data.end_date or date.today()
-            return (app_rent, app_rent_date)
-        
-        # VBA Line 938-954: Offset handling
-        J = 0
-        i_was_incremented = False
-        if offse != 0:
-            # VBA Line 940: app_rent_date = EDate(begdate1, fre * (i - k))
-            app_rent_date = edate(begdate1, fre * (i - k))
-            # VBA Line 941: RPeriod calculation
-            RPeriod = (edate(begdate, fre * (i - k) + Frequency_months)) - edate(begdate, fre * (i - k))
-            offseOriginal = offse
-            if offseOriginal < 0:
-                offse = RPeriod.days + offseOriginal
-            
-            app_rent = ((lease_data.rental_1 or 0.0) * ((1 + pre / 100) ** (i - k)) * offse / RPeriod.days + 
-                       (lease_data.rental_1 or 0.0) * ((1 + pre / 100) ** (i - 1 - k)) * (RPeriod.days - offse) / RPeriod.days)
-            i += 1
-            i_was_incremented = True
-            if app == i:
-                return (app_rent, app_rent_date)
-            k += 1
-            
-            # VBA Line 949-952: Check end date again
-            if app_rent_date >= (lease_data.end_date or date.today()):
-                app_rent_date = lease_data.end_date or date.today()
-                return (app_rent, app_rent_date)
-        
-        # Increment i for next iteration ONLY if we didn't already increment inside the offse block
-        if not i_was_incremented:
-            i += 1
+    VBA Source: VB script/Code, findrent() Sub (Lines 879-958)
+    Calculates rental amount with escalation for payment number 'app'
     
-    return (app_rent, app_rent_date)
+    Re-derives the escalation basis on every call like VBA; schedule walks use
+    EscalationTable (escalation.py), which derives it once per lease.
+    """
+    basis = escalation_basis(lease_data)
+    
+    # VBA Line 889-893: Early exit if no escalation
+    if basis is None:
+        app_rent = lease_data.rental_1 or 0.0
+        app_rent_date = lease_data.end_date or date.today()
+        return (app_rent, app_rent_date)
+    
+    return escalated_rent(basis, app)
 
 
 def _get_aro_for_date(lease_data: LeaseData, payment_date: date) -> Optional[float]:
@@ -463,17 +840,29 @@ def _create_schedule_row(lease_data: LeaseData, payment_date: date, rental_amoun
     )
 
 
-def _apply_basic_calculations(lease_data: LeaseData, schedule: List[PaymentScheduleRow]) -> List[PaymentScheduleRow]:
+def _apply_basic_calculations(lease_data: LeaseData, schedule: List[PaymentScheduleRow],
+                              engine: Optional[str] = None,
+                              tail: Optional[List[Tuple[date, float]]] = None,
+                              accruals: Optional[Dict[int, List[date]]] = None) -> List[PaymentScheduleRow]:
     """
     VBA basic_calc() function implementation
     Calculates PV factors, interest, liability, ROU asset, depreciation for each row
     
     VBA Source: VB script/Code, basic_calc() Sub (Lines 628-707)
+    
+    engine="numpy" computes the PV factor/interest/liability/security columns with
+    columnar.py (falls back to the row loop when NumPy is not installed).
+    tail: (date, rental) of rows plotted after schedule but not built; they count
+    towards G7 and Cendrow only (row loop, not US-GAAP operating).
+    accruals: month-end rows left out by _plot_schedule_rows() (compact schedule,
+    straight-line depreciation, no FV of ROU).
     """
     if not schedule:
         return schedule
     
     endrow = len(schedule)
+    # Cendrow - end date row
+    last_date = tail[-1][0] if tail else schedule[-1].date
     
     # VBA Line 631: ide calculation
     ide = (lease_data.initial_direct_expenditure or 0) - (lease_data.lease_incentive or 0)
@@ -488,33 +877,7 @@ def _apply_basic_calculations(lease_data: LeaseData, schedule: List[PaymentSched
     secdeprate = raw_secdeprate / 100 if raw_secdeprate > 1 else raw_secdeprate
     
     # icompound: derive from frequency_months (compound frequency should match payment frequency)
-    # Only use compound_months if explicitly provided and valid, otherwise derive from frequency
-    freq = lease_data.frequency_months or 1
-    if lease_data.compound_months and lease_data.compound_months > 0:
-        # Validate that compound_months matches frequency_months
-        # If mismatch, derive from frequency_months instead
-        if lease_data.compound_months == freq:
-            icompound = lease_data.compound_months
-        else:
-            # Mismatch: derive from frequency instead
-            if freq == 3:
-                icompound = 3  # Quarterly
-            elif freq == 6:
-                icompound = 6  # Semi-annually
-            elif freq >= 12:
-                icompound = 12  # Annually
-            else:
-                icompound = 1  # Monthly
-    else:
-        # No compound_months provided, derive from frequency: 1=monthly, 3=quarterly, 6=semi-annually, 12=annually
-        if freq == 3:
-            icompound = 3  # Quarterly
-        elif freq == 6:
-            icompound = 6  # Semi-annually
-        elif freq >= 12:
-            icompound = 12  # Annually
-        else:
-            icompound = 1  # Monthly
+    icompound = _derive_icompound(lease_data)
     
     # VBA Line 636-638: Initialize first row
     schedule[0].pv_factor = 1.0
@@ -528,14 +891,26 @@ def _apply_basic_calculations(lease_data: LeaseData, schedule: List[PaymentSched
     # I9 = G7 + K9 + D6 - L9 + ide (ROU asset)
     # K9 = O9 (change in ROU)
     
-    # CRITICAL: We need to set temporary initial values for first pass
-    # Then recalculate after all PV factors are computed
-    initial_liability = _calculate_initial_liability(lease_data, schedule)
+    # VBA Lines 683-685: with FV of ROU, G7 = FV_of_RoU and C7 is goal-sought
+    discount_rate = (lease_data.borrowing_rate or 8) / 100
+    goal_seek = _goal_seek_rate(lease_data, schedule, icompound, tail)
+    if goal_seek is not None:
+        # Single pass at the solved rate (solved rates get their own curve, not the shared cache)
+        discount_rate = goal_seek
+        curve = DiscountCurve(discount_rate, icompound)
+        initial_liability = lease_data.fv_of_rou
+    else:
+        curve = discount_curve(discount_rate, icompound)
+        # CRITICAL: We need to set temporary initial values for first pass
+        # Then recalculate after all PV factors are computed
+        initial_liability = _calculate_initial_liability(lease_data, schedule, tail)
     initial_rou = _calculate_initial_rou(lease_data, initial_liability, ide)
     
     schedule[0].lease_liability = initial_liability
     schedule[0].rou_asset = initial_rou
-    schedule[0].security_deposit_pv = _calculate_security_pv(lease_data, schedule[0].date, schedule[-1].date, secdeprate, schedule[0].date, None)
+    security_curve = discount_curve(secdeprate, 1)
+    schedule[0].security_deposit_pv = _calculate_security_pv(lease_data, schedule[0].date, last_date, secdeprate, schedule[0].date, None,
+                                                             security_curve)
     
     # VBA Line 664: H9 = E9 * D9 - PV of Rent for opening row
     # Opening row has rental = 0 usually, but set it anyway
@@ -545,7 +920,26 @@ def _apply_basic_calculations(lease_data: LeaseData, schedule: List[PaymentSched
     # D6 = Security_deposit value
     
     # VBA Line 647-659: End of life calculation
-    endoflife = _calculate_end_of_life_vba(lease_data, schedule[-1].date)
+    endoflife = _calculate_end_of_life_vba(lease_data, last_date)
+    
+    # US-GAAP operating depreciation needs Sum(F10:$F$endrow) on every row
+    usgaap_operating = getattr(lease_data, 'gaap_standard', 'IFRS') == "US-GAAP" and lease_data.finance_lease_usgaap != "Yes"
+    
+    if accruals:
+        _apply_basic_calculations_accruals(lease_data, schedule, accruals, ide, secdeprate, curve,
+                                           endoflife, last_date, tail)
+        return _apply_transition_option(lease_data, schedule)
+    
+    if (engine or BASIC_CALC_ENGINE) == "numpy" and columnar.HAS_NUMPY and not tail:
+        _apply_basic_calculations_columnar(lease_data, schedule, ide, secdeprate, icompound, endoflife,
+                                           usgaap_operating, discount_rate)
+        return _apply_transition_option(lease_data, schedule)
+    
+    future_interest = _future_interest_sums(schedule) if usgaap_operating else None
+    
+    # Shared factor curves (discount_factors.py) for the borrowing rate, the security deposit
+    # rate and the ARO rates, looked up once per schedule
+    aro_curves: Dict[float, DiscountCurve] = {}
     
     # VBA Line 661-664: PV factor, Interest, Liability, PV of Rent formulas for rows 10+
     for i in range(1, endrow):
@@ -554,13 +948,12 @@ def _apply_basic_calculations(lease_data: LeaseData, schedule: List[PaymentSched
         
         # E10 = 1/((1+r)^n) - PV factor
         days_from_start = (curr_row.date - schedule[0].date).days
-        discount_rate = (lease_data.borrowing_rate or 8) / 100
-        curr_row.pv_factor = 1 / ((1 + discount_rate * icompound / 12) ** ((days_from_start / 365) * 12 / icompound))
+        curr_row.pv_factor = curve.discount(days_from_start)
         
         # F10 = G9*(1+r)^n - G9 - Interest
         days_between = (curr_row.date - prev_row.date).days
         if days_between > 0:
-            curr_row.interest = prev_row.lease_liability * ((1 + discount_rate * icompound / 12) ** ((days_between / 365) * 12 / icompound) - 1)
+            curr_row.interest = prev_row.lease_liability * (curve.compound(days_between) - 1)
         
         # G10 = G9 - D10 + F10 - Liability
         curr_row.lease_liability = prev_row.lease_liability - curr_row.rental_amount + curr_row.interest
@@ -579,7 +972,8 @@ def _apply_basic_calculations(lease_data: LeaseData, schedule: List[PaymentSched
         
         # Calculate ARO provision first
         curr_row.aro_provision = _calculate_aro_provision_vba(
-            lease_data, curr_row.aro_gross or 0.0, curr_row.date, schedule[-1].date, lease_data.aro_table
+            lease_data, curr_row.aro_gross or 0.0, curr_row.date, last_date, lease_data.aro_table,
+            aro_curves=aro_curves
         )
         
         prev_aro_prov = prev_row.aro_provision or 0.0
@@ -596,7 +990,8 @@ def _apply_basic_calculations(lease_data: LeaseData, schedule: List[PaymentSched
         
         # J10 = Depreciation (VBA Lines 667-674)
         curr_row.depreciation = _calculate_depreciation_vba(
-            lease_data, prev_row, curr_row, endoflife, discount_rate, icompound, schedule
+            lease_data, prev_row, curr_row, endoflife, discount_rate, icompound, schedule,
+            row_index=i, future_interest=future_interest
         )
         
         # I10 = ROU Asset
@@ -611,8 +1006,8 @@ def _apply_basic_calculations(lease_data: LeaseData, schedule: List[PaymentSched
             days_from_start_curr = (curr_row.date - schedule[0].date).days
             days_from_start_prev = (prev_row.date - schedule[0].date).days
             
-            pv_factor_curr = 1 / ((1 + secdeprate / 12) ** ((days_from_start_curr / 365) * 12))
-            pv_factor_prev = 1 / ((1 + secdeprate / 12) ** ((days_from_start_prev / 365) * 12))
+            pv_factor_curr = security_curve.discount(days_from_start_curr)
+            pv_factor_prev = security_curve.discount(days_from_start_prev)
             
             if pv_factor_curr > 0:
                 curr_row.security_deposit_pv = prev_security_pv * pv_factor_prev / pv_factor_curr
@@ -627,17 +1022,15 @@ def _apply_basic_calculations(lease_data: LeaseData, schedule: List[PaymentSched
     
     # VBA Lines 683-689: Handle FV of ROU or recalculate G7
     if lease_data.fv_of_rou and lease_data.fv_of_rou != 0:
-        # VBA Line 685: GoalSeek - adjust C7 (discount rate) to make G(endrow) = 0
-        # This is an iterative process - simplified here
-        # Would need to adjust borrowing_rate until sum of PV of rents matches fv_of_rou
-        total_pv_rent = sum(row.pv_of_rent for row in schedule)
-        if abs(total_pv_rent - lease_data.fv_of_rou) > 0.01:
-            # Adjust discount rate (simplified - would iterate)
-            pass
+        # VBA Line 685: GoalSeek - C7 was solved above, so the first pass is final
+        pass
     else:
         # VBA Line 688: G7 = SUM(H9:Hendrow) - Initial liability = sum of all PV of rents
         # This must be calculated AFTER all PV factors and PV of rents are set
         total_pv_rent = sum(row.pv_of_rent for row in schedule)
+        for tail_date, tail_rental in tail or ():
+            # H = E * D of the rows not built
+            total_pv_rent += curve.discount((tail_date - schedule[0].date).days) * tail_rental
         
         # Update initial liability with correct value
         schedule[0].lease_liability = total_pv_rent
@@ -647,84 +1040,383 @@ def _apply_basic_calculations(lease_data: LeaseData, schedule: List[PaymentSched
         
         # Now we need to recalculate the entire schedule with the correct initial liability
         # Recalculate Interest, Liability, and ROU for all rows
+        future_interest = _future_interest_sums(schedule) if usgaap_operating else None
         for i in range(1, endrow):
             prev_row = schedule[i - 1]
             curr_row = schedule[i]
             
             # Interest calculation remains the same
             days_between = (curr_row.date - prev_row.date).days
-            discount_rate = (lease_data.borrowing_rate or 8) / 100
             if days_between > 0:
-                curr_row.interest = prev_row.lease_liability * ((1 + discount_rate * icompound / 12) ** ((days_between / 365) * 12 / icompound) - 1)
+                curr_row.interest = prev_row.lease_liability * (curve.compound(days_between) - 1)
             
             # Liability calculation with correct prev_row.lease_liability
             curr_row.lease_liability = prev_row.lease_liability - curr_row.rental_amount + curr_row.interest
             
             # Update ROU asset
             curr_row.depreciation = _calculate_depreciation_vba(
-                lease_data, prev_row, curr_row, endoflife, discount_rate, icompound, schedule
+                lease_data, prev_row, curr_row, endoflife, discount_rate, icompound, schedule,
+                row_index=i, future_interest=future_interest
             )
             curr_row.rou_asset = prev_row.rou_asset - curr_row.depreciation + curr_row.change_in_rou
     
+    return _apply_transition_option(lease_data, schedule)
+
+
+def _apply_basic_calculations_columnar(lease_data: LeaseData, schedule: List[PaymentScheduleRow],
+                                       ide: float, secdeprate: float, icompound: int,
+                                       endoflife: date, usgaap_operating: bool,
+                                       discount_rate: float) -> None:
+    """
+    Both basic_calc() passes (VBA Lines 661-689) with the E/F/G/H/L columns from columnar.py
+    
+    ARO and depreciation/ROU stay row by row: ARO rates come from the RFR tables and
+    the depreciation MIN/MAX clamps depend on the previous row's ROU. Expects row 0
+    to be initialised by _apply_basic_calculations(). discount_rate is C7.
+    """
+    np = columnar.np
+    endrow = len(schedule)
+    cols = columnar.BasicCalcColumns.from_rows(schedule)
+    
+    # E10 and H10 for all rows (E9 stays 1)
+    pv_factor = columnar.discount_factors(cols.days, discount_rate, icompound)
+    pv_factor[0] = schedule[0].pv_factor
+    pv_of_rent = pv_factor * cols.rental
+    pv_of_rent[0] = schedule[0].pv_of_rent
+    
+    # F10/G10 with the provisional G9 from _calculate_initial_liability()
+    growth = columnar.growth_factors(cols.days_between, discount_rate, icompound)
+    interest, liability = columnar.liability_rollforward(schedule[0].lease_liability, cols.rental, growth)
+    
+    # L10 - Security Deposit PV (VBA Line 678)
+    if secdeprate > 0 and lease_data.security_deposit and lease_data.security_deposit > 0:
+        security_pv = columnar.security_deposit_pv(schedule[0].security_deposit_pv or 0.0, cols.days, secdeprate)
+    else:
+        security_pv = np.zeros(endrow)
+    
+    # O10 discount rates for all rows in one lookup
+    aro_rates = get_aro_rates([row.date for row in schedule], lease_data.aro_table) if (lease_data.aro_table or 0) > 0 else None
+    aro_curves: Dict[float, DiscountCurve] = {}
+    
+    pv_factor_list = pv_factor.tolist()
+    pv_of_rent_list = pv_of_rent.tolist()
+    interest_list = interest.tolist()
+    liability_list = liability.tolist()
+    security_list = security_pv.tolist()
+    for i in range(1, endrow):
+        prev_row = schedule[i - 1]
+        curr_row = schedule[i]
+        curr_row.pv_factor = pv_factor_list[i]
+        curr_row.pv_of_rent = pv_of_rent_list[i]
+        curr_row.interest = interest_list[i]
+        curr_row.lease_liability = liability_list[i]
+        curr_row.security_deposit_pv = security_list[i]
+        curr_row.principal = curr_row.rental_amount - curr_row.interest
+        curr_row.remaining_balance = curr_row.lease_liability
+        
+        # ARO provision, N10 and K10 (same as the scalar pass)
+        current_aro_gross = _get_aro_for_date(lease_data, curr_row.date) or 0.0
+        if current_aro_gross:
+            curr_row.aro_gross = current_aro_gross
+        curr_row.aro_provision = _calculate_aro_provision_vba(
+            lease_data, curr_row.aro_gross or 0.0, curr_row.date, schedule[-1].date, lease_data.aro_table,
+            aro_rate=aro_rates[i] if aro_rates is not None else None, aro_curves=aro_curves
+        )
+        prev_aro_prov = prev_row.aro_provision or 0.0
+        curr_aro_prov = curr_row.aro_provision or 0.0
+        curr_row.aro_interest = curr_aro_prov - prev_aro_prov
+        curr_row.change_in_rou = curr_aro_prov - curr_row.aro_interest - prev_aro_prov
+    
+    # Sum(F10:$F$endrow) as held before the pass that computes depreciation
+    previous_interest = cols.interest
+    
+    # VBA Line 688: G7 = SUM(H9:Hendrow), then second pass with the final G9
+    # (with FV of ROU, C7 is already goal-sought, so the first pass is final)
+    if not (lease_data.fv_of_rou and lease_data.fv_of_rou != 0):
+        total_pv_rent = sum(pv_of_rent_list)
+        schedule[0].lease_liability = total_pv_rent
+        schedule[0].rou_asset = _calculate_initial_rou(lease_data, total_pv_rent, ide)
+        previous_interest = interest
+        interest, liability = columnar.liability_rollforward(total_pv_rent, cols.rental, growth)
+        interest_list = interest.tolist()
+        liability_list = liability.tolist()
+        for i in range(1, endrow):
+            schedule[i].interest = interest_list[i]
+            schedule[i].lease_liability = liability_list[i]
+    
+    # J10/I10 - Depreciation and ROU roll forward from the final G9/I9
+    future_interest = None
+    if usgaap_operating:
+        future_interest = np.zeros(endrow + 1)
+        future_interest[:endrow] = np.cumsum(np.abs(previous_interest)[::-1])[::-1]
+        future_interest = future_interest.tolist()
+    for i in range(1, endrow):
+        prev_row = schedule[i - 1]
+        curr_row = schedule[i]
+        curr_row.depreciation = _calculate_depreciation_vba(
+            lease_data, prev_row, curr_row, endoflife, discount_rate, icompound, schedule,
+            row_index=i, future_interest=future_interest
+        )
+        curr_row.rou_asset = prev_row.rou_asset - curr_row.depreciation + curr_row.change_in_rou
+
+
+def _apply_basic_calculations_accruals(lease_data: LeaseData, schedule: List[PaymentScheduleRow],
+                                       accruals: Dict[int, List[date]], ide: float, secdeprate: float,
+                                       curve: DiscountCurve, endoflife: date, last_date: date,
+                                       tail: Optional[List[Tuple[date, float]]] = None) -> None:
+    """
+    Both basic_calc() passes (VBA Lines 661-689) for a schedule without some month-end rows
+    
+    accruals[i]: dates of the month-end rows (no rental) left out before row i, see
+    _basic_calc_sweep(). Expects row 0 to be initialised by _apply_basic_calculations().
+    tail: rows not built, as in _apply_basic_calculations().
+    """
+    start = schedule[0].date
+    # (date, row or None for a month-end row left out), row 0 excluded
+    steps = []
+    for i in range(1, len(schedule)):
+        steps.extend((accrual_date, None) for accrual_date in accruals.get(i, ()))
+        steps.append((schedule[i].date, schedule[i]))
+    
+    # VBA Line 688: G7 = SUM(H9:Hendrow) with H = E * D (0 on the rows left out)
+    total_pv_rent = schedule[0].pv_of_rent
+    for row in schedule[1:]:
+        total_pv_rent += curve.discount((row.date - start).days) * row.rental_amount
+    for tail_date, tail_rental in tail or ():
+        total_pv_rent += curve.discount((tail_date - start).days) * tail_rental
+    
+    for _ in _basic_calc_sweep(lease_data, schedule[0], steps, schedule[0].lease_liability, total_pv_rent,
+                               ide, secdeprate, curve, endoflife, last_date):
+        pass
+
+
+def _basic_calc_sweep(lease_data: LeaseData, opening: PaymentScheduleRow,
+                      steps: Iterable[Tuple[date, Optional[PaymentScheduleRow]]], provisional: float,
+                      total_pv_rent: float, ide: float, secdeprate: float, curve: DiscountCurve,
+                      endoflife: date, last_date: date) -> Iterator[PaymentScheduleRow]:
+    """
+    Both basic_calc() passes (VBA Lines 661-689) in one sweep, yielding each row once final
+    
+    steps: (date, row) of the rows after opening (C9) in date order; row None for a
+    month-end row left out (no rental). The two passes only share K, which is known
+    row by row, so they run side by side: the first from the provisional G9
+    (_calculate_initial_liability()), kept as principal and remaining balance, the
+    second from G9 = G7 = total_pv_rent. Left-out rows go through the same operations
+    as the row loop, so G, I, L and O of every row equal the full schedule's; F, J,
+    K, N and principal of a row add up its own amount and those of the rows left
+    out before it. Straight-line depreciation only.
+    """
+    start = opening.date
+    security_curve = discount_curve(secdeprate, 1)
+    aro_curves: Dict[float, DiscountCurve] = {}
+    has_security = secdeprate > 0 and lease_data.security_deposit and lease_data.security_deposit > 0
+    has_aro = (lease_data.aro_table or 0) > 0
+    
+    # VBA Line 688: G9 = G7, then I9 from it
+    opening.lease_liability = total_pv_rent
+    opening.rou_asset = _calculate_initial_rou(lease_data, total_pv_rent, ide)
+    
+    prev_date = start
+    first_liability = provisional
+    liability = opening.lease_liability
+    rou = opening.rou_asset
+    security = opening.security_deposit_pv or 0.0
+    provision = opening.aro_provision or 0.0
+    first_interest_sum = interest_sum = aro_interest_sum = change_sum = depreciation_sum = 0.0
+    for step_date, row in steps:
+        rental = row.rental_amount if row is not None else 0.0
+        
+        # F10 = G9*(1+r)^n - G9, G10 = G9 - D10 + F10 (VBA Lines 662-663), both passes
+        days_between = (step_date - prev_date).days
+        if days_between > 0:
+            growth = curve.compound(days_between) - 1
+            first_interest = first_liability * growth
+            interest = liability * growth
+        else:
+            first_interest = interest = 0.0
+        first_liability = first_liability - rental + first_interest
+        liability = liability - rental + interest
+        
+        # M, O, N, K (VBA Lines 676, 679-680)
+        curr_provision = None
+        if row is not None:
+            current_aro_gross = _get_aro_for_date(lease_data, step_date) or 0.0
+            if current_aro_gross:
+                row.aro_gross = current_aro_gross
+            curr_provision = _calculate_aro_provision_vba(
+                lease_data, row.aro_gross or 0.0, step_date, last_date, lease_data.aro_table,
+                aro_curves=aro_curves
+            )
+        elif has_aro:
+            curr_provision = _calculate_aro_provision_vba(
+                lease_data, _get_aro_for_date(lease_data, step_date) or 0.0, step_date, last_date,
+                lease_data.aro_table, aro_curves=aro_curves
+            )
+        curr_aro_prov = curr_provision or 0.0
+        aro_interest = curr_aro_prov - provision
+        change = curr_aro_prov - aro_interest - provision
+        provision = curr_aro_prov
+        
+        # L10 = L9 * PV_factor_C9 / PV_factor_C10 (VBA Line 678)
+        if has_security:
+            pv_factor_curr = security_curve.discount((step_date - start).days)
+            pv_factor_prev = security_curve.discount((prev_date - start).days)
+            if pv_factor_curr > 0:
+                security = security * pv_factor_prev / pv_factor_curr
+        else:
+            security = 0.0
+        
+        # J10 = MAX(MIN(I9/($J$6-C9)*(C10-C9),I9),0), I10 = I9 - J10 + K10 (VBA Line 673)
+        total_days = (endoflife - prev_date).days
+        if total_days <= 0:
+            depreciation = 0.0
+        else:
+            depreciation = max(0.0, min(rou * days_between / total_days, rou))
+        rou = rou - depreciation + change
+        prev_date = step_date
+        
+        if row is None:
+            first_interest_sum += first_interest
+            interest_sum += interest
+            aro_interest_sum += aro_interest
+            change_sum += change
+            depreciation_sum += depreciation
+            continue
+        row.pv_factor = curve.discount((step_date - start).days)
+        row.interest = interest_sum + interest
+        row.lease_liability = liability
+        row.pv_of_rent = row.pv_factor * rental
+        row.aro_provision = curr_provision
+        row.aro_interest = aro_interest_sum + aro_interest
+        row.change_in_rou = change_sum + change
+        row.security_deposit_pv = security
+        row.principal = rental - (first_interest_sum + first_interest)
+        row.remaining_balance = first_liability
+        row.depreciation = depreciation_sum + depreciation
+        row.rou_asset = rou
+        first_interest_sum = interest_sum = aro_interest_sum = change_sum = depreciation_sum = 0.0
+        yield row
+
+
+def _apply_transition_option(lease_data: LeaseData, schedule: List[PaymentScheduleRow]) -> List[PaymentScheduleRow]:
+    """Transition Option 2B: ROU on the day before transition = liability + prepaid (VBA Lines 695-705)"""
     # VBA Line 695-705: Transition Option 2B handling
     if lease_data.transition_option == "2B" and lease_data.transition_date:
-        transitiondate = lease_data.transition_date - timedelta(days=1)
-        
-        for row in schedule:
-            if row.date == transitiondate:
-                # VBA Line 701: Set ROU = Liability + Prepaid_accrual
-                prepaid = lease_data.prepaid_accrual or 0.0
-                row.rou_asset = row.lease_liability + prepaid
-                break
+        for _ in _transition_option_rows(lease_data, schedule):
+            pass
     
     return schedule
 
 
-def _calculate_initial_liability(lease_data: LeaseData, schedule: List[PaymentScheduleRow]) -> float:
-    """Calculate initial lease liability as sum of PV of all payments"""
-    if not schedule:
-        return 0.0
+def _transition_option_rows(lease_data: LeaseData, rows: Iterable[PaymentScheduleRow]) -> Iterator[PaymentScheduleRow]:
+    """_apply_transition_option() one row at a time"""
+    transitiondate = None
+    if lease_data.transition_option == "2B" and lease_data.transition_date:
+        transitiondate = lease_data.transition_date - timedelta(days=1)
+    for row in rows:
+        if transitiondate is not None and row.date == transitiondate:
+            # VBA Line 701: Set ROU = Liability + Prepaid_accrual
+            prepaid = lease_data.prepaid_accrual or 0.0
+            row.rou_asset = row.lease_liability + prepaid
+            transitiondate = None
+        yield row
+
+
+# calculated_fields set by _goal_seek_rate(), cached with the schedule
+GOAL_SEEK_FIELDS = ('goal_seek_rate', 'goal_seek_iterations', 'goal_seek_seconds', 'goal_seek_converged')
+
+
+def _goal_seek_cache_fields(lease_data: LeaseData) -> Optional[Dict[str, object]]:
+    """GOAL_SEEK_FIELDS of lease_data.calculated_fields to store with its schedule (None without FV of ROU)"""
+    if not (lease_data.fv_of_rou and lease_data.fv_of_rou != 0):
+        return None
+    return {name: lease_data.calculated_fields[name]
+            for name in GOAL_SEEK_FIELDS if name in lease_data.calculated_fields}
+
+
+def _goal_seek_rate(lease_data: LeaseData, schedule: List[PaymentScheduleRow], icompound: int,
+                    tail: Optional[List[Tuple[date, float]]] = None) -> Optional[float]:
+    """
+    C7 for a lease with FV of ROU (VBA Line 685 GoalSeek), from the plotted rentals
     
-    discount_rate = (lease_data.borrowing_rate or 8) / 100
-    # icompound: derive from frequency_months (compound frequency should match payment frequency)
+    Solved before the basic_calc() pass (goal_seek.py), so the columns are computed
+    once. Rate, iterations, time and convergence go to lease_data.calculated_fields.
+    None without FV of ROU, or when no rate reaches it (the borrowing rate is kept).
+    """
+    if not (lease_data.fv_of_rou and lease_data.fv_of_rou != 0):
+        return None
+    start_date = schedule[0].date
+    payments = [((row.date - start_date).days, row.rental_amount) for row in schedule]
+    payments.extend(((tail_date - start_date).days, rental) for tail_date, rental in tail or ())
+    result = solve_fv_of_rou_rate(payments, lease_data.fv_of_rou, icompound,
+                                  (lease_data.borrowing_rate or 8) / 100)
+    lease_data.calculated_fields.update({
+        'goal_seek_rate': result.rate * 100 if result.converged else None,
+        'goal_seek_iterations': result.iterations,
+        'goal_seek_seconds': result.seconds,
+        'goal_seek_converged': result.converged,
+    })
+    if not result.converged:
+        import logging
+        logging.getLogger(__name__).warning(
+            f"FV of ROU goal seek did not converge for lease {lease_data.auto_id}; using the borrowing rate")
+        return None
+    return result.rate
+
+
+def _derive_icompound(lease_data: LeaseData) -> int:
+    """Compounding period in months for the borrowing rate (VBA Line 634: icompound)"""
     # Only use compound_months if explicitly provided and valid, otherwise derive from frequency
     freq = lease_data.frequency_months or 1
     if lease_data.compound_months and lease_data.compound_months > 0:
         # Validate that compound_months matches frequency_months
         # If mismatch, derive from frequency_months instead
         if lease_data.compound_months == freq:
-            icompound = lease_data.compound_months
+            return lease_data.compound_months
         else:
             # Mismatch: derive from frequency instead
             if freq == 3:
-                icompound = 3  # Quarterly
+                return 3  # Quarterly
             elif freq == 6:
-                icompound = 6  # Semi-annually
+                return 6  # Semi-annually
             elif freq >= 12:
-                icompound = 12  # Annually
+                return 12  # Annually
             else:
-                icompound = 1  # Monthly
+                return 1  # Monthly
     else:
         # No compound_months provided, derive from frequency: 1=monthly, 3=quarterly, 6=semi-annually, 12=annually
         if freq == 3:
-            icompound = 3  # Quarterly
+            return 3  # Quarterly
         elif freq == 6:
-            icompound = 6  # Semi-annually
+            return 6  # Semi-annually
         elif freq >= 12:
-            icompound = 12  # Annually
+            return 12  # Annually
         else:
-            icompound = 1  # Monthly
+            return 1  # Monthly
+
+
+def _calculate_initial_liability(lease_data: LeaseData, schedule: List[PaymentScheduleRow],
+                                 tail: Optional[List[Tuple[date, float]]] = None) -> float:
+    """Calculate initial lease liability as sum of PV of all payments (tail: later (date, rental) pairs)"""
+    if not schedule:
+        return 0.0
+    
+    discount_rate = (lease_data.borrowing_rate or 8) / 100
+    # icompound: derive from frequency_months (compound frequency should match payment frequency)
+    icompound = _derive_icompound(lease_data)
     start_date = schedule[0].date
     
+    curve = discount_curve(discount_rate, icompound)
     total_pv = 0.0
     rental_count = 0
-    for row in schedule[1:]:  # Skip opening row
-        if row.rental_amount and row.rental_amount > 0:
+    payments = [(row.date, row.rental_amount) for row in schedule[1:]]  # Skip opening row
+    for payment_date, rental_amount in payments + list(tail or ()):
+        if rental_amount and rental_amount > 0:
             rental_count += 1
-            days_from_start = (row.date - start_date).days
+            days_from_start = (payment_date - start_date).days
             if days_from_start > 0:
-                pv_factor = 1 / ((1 + discount_rate * icompound / 12) ** ((days_from_start / 365) * 12 / icompound))
-                total_pv += row.rental_amount * pv_factor
+                pv_factor = curve.discount(days_from_start)
+                total_pv += rental_amount * pv_factor
     
     # Debug: If no rentals found, log a warning
     if rental_count == 0 and len(schedule) > 1:
@@ -743,9 +1435,10 @@ def _calculate_initial_rou(lease_data: LeaseData, initial_liability: float, ide:
         return initial_liability + ide
 
 
-def _calculate_security_pv(lease_data: LeaseData, current_date: date, end_date: date, secdeprate: float, start_date: Optional[date] = None, prev_security_pv: Optional[float] = None) -> float:
+def _calculate_security_pv(lease_data: LeaseData, current_date: date, end_date: date, secdeprate: float, start_date: Optional[date] = None, prev_security_pv: Optional[float] = None,
+                           security_curve: Optional[DiscountCurve] = None) -> float:
     """
-    Calculate Security Deposit PV (VBA Line 643, 678)
+    Calculate Security Deposit PV (VBA Line 643, 678); security_curve if already looked up
     VBA Line 643 (initial): L9 = D6*1/((1+secdeprate*1/12)^(((Cendrow-$C$9)/365)*12/1))
     VBA Line 678 (subsequent): L10 = L9/(1/((1+secdeprate*1/12)^(((C10-$C$9)/365)*12/1)))*(1/((1+secdeprate*1/12)^(((C9-$C$9)/365)*12/1)))
     """
@@ -755,11 +1448,13 @@ def _calculate_security_pv(lease_data: LeaseData, current_date: date, end_date:
     days_remaining = (end_date - current_date).days
     if days_remaining <= 0:
         return 0.0
+    if security_curve is None:
+        security_curve = discount_curve(secdeprate, 1)
     
     # VBA Line 643: Initial calculation
     if prev_security_pv is None:
         # L9 = D6 * 1/((1+secdeprate*1/12)^(((Cendrow-$C$9)/365)*12/1))
-        pv_factor = 1 / ((1 + secdeprate / 12) ** ((days_remaining / 365) * 12))
+        pv_factor = security_curve.discount(days_remaining)
         return lease_data.security_deposit * pv_factor
     else:
         # VBA Line 678: Subsequent rows
@@ -772,8 +1467,8 @@ def _calculate_security_pv(lease_data: LeaseData, current_date: date, end_date:
             # Find previous date by looking at previous schedule row
             # Simplified: use current_date - 1 day to approximate previous row
             # The actual implementation should use the previous row's date
-            pv_factor_curr = 1 / ((1 + secdeprate / 12) ** ((days_from_start_curr / 365) * 12))
-            pv_factor_prev = 1 / ((1 + secdeprate / 12) ** ((max(days_from_start_prev, 0) / 365) * 12)) if days_from_start_prev > 0 else 1.0
+            pv_factor_curr = security_curve.discount(days_from_start_curr)
+            pv_factor_prev = security_curve.discount(days_from_start_prev) if days_from_start_prev > 0 else 1.0
             
             if pv_factor_curr > 0:
                 return prev_security_pv * pv_factor_prev / pv_factor_curr
@@ -781,17 +1476,22 @@ def _calculate_security_pv(lease_data: LeaseData, current_date: date, end_date:
                 return prev_security_pv
         else:
             # Fallback to simple calculation
-            pv_factor = 1 / ((1 + secdeprate / 12) ** ((days_remaining / 365) * 12))
+            pv_factor = security_curve.discount(days_remaining)
             return lease_data.security_deposit * pv_factor
 
 
 def _calculate_aro_provision_vba(lease_data: LeaseData, aro_gross: float, current_date: date, 
-                                 end_date: date, table: int) -> Optional[float]:
-    """Calculate ARO Provision (VBA Lines 679-680)"""
+                                 end_date: date, table: int, aro_rate: Optional[float] = None,
+                                 aro_curves: Optional[Dict[float, DiscountCurve]] = None) -> Optional[float]:
+    """
+    Calculate ARO Provision (VBA Lines 679-680); aro_rate if already looked up
+    aro_curves holds the curves a schedule has looked up so far, by ARO rate
+    """
     if aro_gross <= 0 or table <= 0:
         return None
     
-    aro_rate = get_aro_rate(current_date, table)
+    if aro_rate is None:
+        aro_rate = get_aro_rate(current_date, table)
     if aro_rate <= 0:
         return aro_gross
     
@@ -799,20 +1499,50 @@ def _calculate_aro_provision_vba(lease_data: LeaseData, aro_gross: float, curren
     if days_remaining <= 0:
         return aro_gross
     
-    pv_factor = 1 / ((1 + aro_rate / 12) ** ((days_remaining / 365) * 12))
-    return aro_gross * pv_factor
+    curve = aro_curves.get(aro_rate) if aro_curves is not None else None
+    if curve is None:
+        curve = discount_curve(aro_rate, 1)
+        if aro_curves is not None:
+            aro_curves[aro_rate] = curve
+    return aro_gross * curve.discount(days_remaining)
+
+
+def _future_interest_sums(schedule: List[PaymentScheduleRow]) -> List[float]:
+    """
+    Suffix sums of abs(interest): sums[j] = Sum(Fj:$F$endrow), sums[len(schedule)] = 0
+    Taken once per basic_calc() pass, before any row of the pass is recalculated
+
+    Not bit-identical to the row scan: that adds Fj..Fendrow from the top for each
+    row, these add from the bottom once, and float addition is not associative.
+    Keeping the row scan's order means re-adding the whole tail per row (O(n^2)),
+    which is what this replaces. The sums, and the J and I columns built on them,
+    differ from the row scan by float rounding only: relative ~1e-15 on ten-year
+    leases, growing with the row count to ~6e-13 on a 99-year monthly lease
+    (test_usgaap_depreciation_suffix_sums_match_row_scan allows 1e-12).
+    """
+    sums = [0.0] * (len(schedule) + 1)
+    for j in range(len(schedule) - 1, -1, -1):
+        sums[j] = sums[j + 1] + abs(schedule[j].interest or 0.0)
+    return sums
 
 
 def _calculate_depreciation_vba(lease_data: LeaseData, prev_row: PaymentScheduleRow,
                                 curr_row: PaymentScheduleRow, endoflife: date,
                                 discount_rate: float, icompound: int, 
-                                schedule: List[PaymentScheduleRow] = None) -> float:
+                                schedule: List[PaymentScheduleRow] = None,
+                                row_index: Optional[int] = None,
+                                future_interest: Optional[List[float]] = None) -> float:
     """
     Calculate Depreciation (VBA Lines 667-674)
     US-GAAP vs IFRS/Ind-AS differences
     
     US-GAAP Operating Lease (Line 670-671): Complex formula
     IFRS/Ind-AS (Line 673): Simple straight-line
+    
+    row_index/future_interest: curr_row's position and _future_interest_sums() of the
+    current pass. Only curr_row has changed since the sums were taken, so
+    Sum(F10:$F$endrow) is curr_row's interest plus the sum of the rows after it.
+    Without them the sum is rebuilt from schedule for every row.
     """
     gaap_standard = getattr(lease_data, 'gaap_standard', 'IFRS')
     
@@ -830,35 +1560,17 @@ def _calculate_depreciation_vba(lease_data: LeaseData, prev_row: PaymentSchedule
             return max(0.0, min(prev_row.rou_asset * days_diff / total_days, prev_row.rou_asset))
         
         # Calculate Sum(F10:$F$endrow) - sum of future interest from this row onwards
-        future_interest_sum = 0.0
-        curr_idx = schedule.index(curr_row) if curr_row in schedule else len(schedule)
-        for i in range(curr_idx, len(schedule)):
-            future_interest_sum += abs(schedule[i].interest or 0.0)
-        
-        # Days calculation: DAYS(C10,C9-1)
-        days_in_period = (curr_row.date - (prev_row.date - timedelta(days=1))).days
-        
-        # DAY(EOMONTH(C10,0)) - days in current month
-        days_in_curr_month = eomonth(curr_row.date, 0).day
-        
-        # Calculate remaining period denominator
-        # ((YEAR($J$6+1)-YEAR(C9))*12+MONTH($J$6+1)-MONTH(C9)+((DAY($J$6+1)-DAY(C9))/DAY(EOMONTH(C9,0))))
-        end_life_plus_one = endoflife + timedelta(days=1)
-        months_diff = (end_life_plus_one.year - prev_row.date.year) * 12 + (end_life_plus_one.month - prev_row.date.month)
-        days_in_prev_month = eomonth(prev_row.date, 0).day
-        day_adjustment = (end_life_plus_one.day - prev_row.date.day) / days_in_prev_month
-        remaining_period_months = months_diff + day_adjustment
-        
-        # Apply formula
-        numerator = (prev_row.rou_asset + future_interest_sum) * (days_in_period / days_in_curr_month)
-        denominator = remaining_period_months
-        depreciation = (numerator / denominator) - (curr_row.interest or 0.0)
-        
-        # MIN(MAX(...-F10,0),I9),0)
-        depreciation = max(0.0, min(depreciation, prev_row.rou_asset))
-        depreciation = max(0.0, depreciation)
+        if row_index is not None and future_interest is not None:
+            future_interest_sum = abs(curr_row.interest or 0.0) + future_interest[row_index + 1]
+        else:
+            future_interest_sum = 0.0
+            curr_idx = schedule.index(curr_row) if curr_row in schedule else len(schedule)
+            for i in range(curr_idx, len(schedule)):
+                future_interest_sum += abs(schedule[i].interest or 0.0)
         
-        return depreciation
+        return _usgaap_operating_depreciation(prev_row.date, prev_row.rou_asset, curr_row.date,
+                                              curr_row.interest or 0.0, future_interest_sum,
+                                              endoflife + timedelta(days=1))
     
     else:
         # IFRS/Ind-AS (VBA Line 673): Simple straight-line
@@ -873,6 +1585,34 @@ def _calculate_depreciation_vba(lease_data: LeaseData, prev_row: PaymentSchedule
         return max(0.0, min(depreciation, prev_row.rou_asset))
 
 
+def _usgaap_operating_depreciation(prev_date: date, prev_rou: float, curr_date: date,
+                                   interest: float, future_interest_sum: float,
+                                   end_life_plus_one: date) -> float:
+    """
+    US-GAAP operating lease J10 (VBA Lines 670-671) from plain values
+    prev_rou: I9, interest: F10, future_interest_sum: Sum(F10:$F$endrow), end_life_plus_one: $J$6+1
+    """
+    # Days calculation: DAYS(C10,C9-1)
+    days_in_period = (curr_date - prev_date).days + 1
+    
+    # DAY(EOMONTH(C10,0)) - days in current month
+    days_in_curr_month = calendar.monthrange(curr_date.year, curr_date.month)[1]
+    
+    # Calculate remaining period denominator
+    # ((YEAR($J$6+1)-YEAR(C9))*12+MONTH($J$6+1)-MONTH(C9)+((DAY($J$6+1)-DAY(C9))/DAY(EOMONTH(C9,0))))
+    months_diff = (end_life_plus_one.year - prev_date.year) * 12 + (end_life_plus_one.month - prev_date.month)
+    days_in_prev_month = calendar.monthrange(prev_date.year, prev_date.month)[1]
+    day_adjustment = (end_life_plus_one.day - prev_date.day) / days_in_prev_month
+    remaining_period_months = months_diff + day_adjustment
+    
+    # Apply formula
+    numerator = (prev_rou + future_interest_sum) * (days_in_period / days_in_curr_month)
+    depreciation = (numerator / remaining_period_months) - interest
+    
+    # MIN(MAX(...-F10,0),I9),0)
+    return max(0.0, min(depreciation, prev_rou))
+
+
 def _calculate_end_of_life_vba(lease_data: LeaseData, enddate: date) -> date:
     """Calculate end of ROU life (VBA Lines 649-659)"""
     endoflife = lease_data.useful_life
@@ -888,22 +1628,34 @@ def _calculate_end_of_life_vba(lease_data: LeaseData, enddate: date) -> date:
             return enddate
 
 
-def _apply_security_deposit_increases(lease_data: LeaseData, schedule: List[PaymentScheduleRow]) -> List[PaymentScheduleRow]:
+def _apply_security_deposit_increases(lease_data: LeaseData, schedule: List[PaymentScheduleRow],
+                                      end_date: Optional[date] = None) -> List[PaymentScheduleRow]:
     """
     VBA addsecdep() function (Lines 1059-1074)
     Apply security deposit increases (up to 4)
+    end_date: Cendrow, if not the last row's date
     """
-    if not hasattr(lease_data, 'security_dates') or not lease_data.security_dates:
+    if not hasattr(lease_data, 'security_dates') or not lease_data.security_dates or not schedule:
         return schedule
     
+    for _ in _security_deposit_increase_rows(lease_data, schedule, end_date or schedule[-1].date):
+        pass
+    return schedule
+
+
+def _security_deposit_increase_rows(lease_data: LeaseData, rows: Iterable[PaymentScheduleRow],
+                                    end_date: date) -> Iterator[PaymentScheduleRow]:
+    """_apply_security_deposit_increases() one row at a time; end_date: Cendrow"""
+    security_dates = getattr(lease_data, 'security_dates', None) or []
     raw_secdeprate = lease_data.security_discount or 0.0
     secdeprate = raw_secdeprate / 100 if raw_secdeprate > 1 else raw_secdeprate
     i = 1
+    done = False
     
-    for row in schedule:
+    for row in rows:
         # Find matching security date
-        if i <= len(lease_data.security_dates) and lease_data.security_dates[i - 1]:
-            SecDepDate = lease_data.security_dates[i - 1]
+        if not done and i <= len(security_dates) and security_dates[i - 1]:
+            SecDepDate = security_dates[i - 1]
             
             if row.date == SecDepDate:
                 increase_amount = 0.0
@@ -918,16 +1670,14 @@ def _apply_security_deposit_increases(lease_data: LeaseData, schedule: List[Paym
                 
                 if increase_amount > 0:
                     # Add PV of increase to Security Deposit PV column
-                    days_remaining = (schedule[-1].date - row.date).days
+                    days_remaining = (end_date - row.date).days
                     if days_remaining > 0 and secdeprate > 0:
-                        pv_factor = 1 / ((1 + secdeprate / 12) ** ((days_remaining / 365) * 12))
+                        pv_factor = discount_curve(secdeprate, 1).discount(days_remaining)
                         row.security_deposit_pv += increase_amount * pv_factor
                 
                 i += 1
-                if i > 4 or (i <= len(lease_data.security_dates) and not lease_data.security_dates[i - 1]):
-                    break
-    
-    return schedule
+                done = i > 4 or (i <= len(security_dates) and not security_dates[i - 1])
+        yield row
 
 
 def _apply_impairments(lease_data: LeaseData, schedule: List[PaymentScheduleRow]) -> List[PaymentScheduleRow]:
@@ -938,10 +1688,18 @@ def _apply_impairments(lease_data: LeaseData, schedule: List[PaymentScheduleRow]
     if not hasattr(lease_data, 'impairment_dates') or not lease_data.impairment_dates:
         return schedule
     
+    for _ in _impairment_rows(lease_data, schedule):
+        pass
+    return schedule
+
+
+def _impairment_rows(lease_data: LeaseData, rows: Iterable[PaymentScheduleRow]) -> Iterator[PaymentScheduleRow]:
+    """_apply_impairments() one row at a time"""
+    impairment_dates = getattr(lease_data, 'impairment_dates', None) or []
     i = 1
-    for row in schedule:
-        if i <= len(lease_data.impairment_dates) and lease_data.impairment_dates[i - 1]:
-            impairDate = lease_data.impairment_dates[i - 1]
+    for row in rows:
+        if i <= 5 and i <= len(impairment_dates) and impairment_dates[i - 1]:
+            impairDate = impairment_dates[i - 1]
             impairAmount = 0.0
             
             if i == 1:
@@ -962,10 +1720,7 @@ def _apply_impairments(lease_data: LeaseData, schedule: List[PaymentScheduleRow]
                 # VBA Line 1084 - Complex formula
                 
                 i += 1
-                if i > 5:
-                    break
-    
-    return schedule
+        yield row
 
 
 def _apply_manual_rental_adjustments(lease_data: LeaseData, schedule: List[PaymentScheduleRow]) -> List[PaymentScheduleRow]:
@@ -985,13 +1740,24 @@ def _apply_manual_rental_adjustments(lease_data: LeaseData, schedule: List[Payme
     if not hasattr(lease_data, 'rental_dates') or not lease_data.rental_dates:
         return schedule
     
+    for _ in _manual_rental_adjustment_rows(lease_data, schedule):
+        pass
+    return schedule
+
+
+def _manual_rental_adjustment_rows(lease_data: LeaseData, rows: Iterable[PaymentScheduleRow]) -> Iterator[PaymentScheduleRow]:
+    """_apply_manual_rental_adjustments() one row at a time"""
+    rental_dates = getattr(lease_data, 'rental_dates', None) or []
+    if lease_data.manual_adj != "Yes":
+        rental_dates = []
+    
     # Get rental amounts by date if stored
     rental_amounts_by_date = getattr(lease_data, 'rental_amounts_by_date', {})
     
     i = 1
-    for row in schedule:
-        if i <= len(lease_data.rental_dates) and lease_data.rental_dates[i - 1]:
-            rentaldate = lease_data.rental_dates[i - 1]
+    for row in rows:
+        if i <= 20 and i <= len(rental_dates) and rental_dates[i - 1]:
+            rentaldate = rental_dates[i - 1]
             
             # Get rental amount for this date
             # First try rental_amounts_by_date (if set from payload)
@@ -1011,8 +1777,5 @@ def _apply_manual_rental_adjustments(lease_data: LeaseData, schedule: List[Payme
                 row.pv_of_rent = row.pv_factor * rentalamount
                 
                 i += 1
-                if i > 20:
-                    break
-    
-    return schedule
+        yield row
 
@@ -0,0 +1,84 @@
+"""
+FV of ROU goal seek
+Solves the discount rate C7 at which the PV of the rentals equals the fair value of the ROU
+
+VBA Source File: VB script/Code
+VBA Function: basic_calc() - Lines 683-685
+  G7 = FV_of_RoU
+  Range("G" & endrow).GoalSeek Goal:=0, ChangingCell:=Range("C7")
+
+G(endrow) = 0 exactly when G7 = SUM(H9:Hendrow), the PV of the rentals at C7:
+    PV(r) = sum(D * (1 + r*icompound/12) ^ -((days/365)*12/icompound))
+PV is decreasing and convex in r, and its derivative is analytic, so Newton's
+method on (days, rental) pairs converges in a few steps without building the
+schedule. Steps leaving the bracket found so far are replaced by bisection.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Iterable, Tuple
+
+MAX_ITERATIONS = 100
+# Relative tolerance on PV(r) - FV_of_RoU
+TOLERANCE = 1e-10
+
+
+@dataclass
+class GoalSeekResult:
+    """Solved rate (decimal) and solver statistics"""
+    rate: float
+    iterations: int
+    seconds: float
+    converged: bool
+
+
+def _pv_and_derivative(payments: Tuple[Tuple[float, float], ...], rate: float, icompound: int) -> Tuple[float, float]:
+    """PV(rate) and dPV/drate for (rental, exponent) pairs"""
+    base = 1 + rate * icompound / 12
+    pv = 0.0
+    derivative = 0.0
+    for rental, exponent in payments:
+        factor = base ** -exponent
+        pv += rental * factor
+        derivative -= rental * exponent * factor / base
+    return pv, derivative * icompound / 12
+
+
+def solve_fv_of_rou_rate(payments: Iterable[Tuple[int, float]], fv_of_rou: float,
+                         icompound: int, guess: float) -> GoalSeekResult:
+    """
+    Rate at which the PV of payments ((days from C9, rental) pairs) equals fv_of_rou
+
+    guess: starting rate (decimal), normally the borrowing rate. converged is False
+    when no rate gives fv_of_rou (e.g. it does not exceed the rentals due on C9).
+    """
+    started = time.perf_counter()
+    terms = tuple((rental, (days / 365) * 12 / icompound) for days, rental in payments if rental)
+    # (1 + r*icompound/12) must stay positive
+    floor = -12 / icompound
+    lo, hi = floor, math.inf  # PV(lo) > fv_of_rou > PV(hi)
+    tolerance = TOLERANCE * max(1.0, abs(fv_of_rou))
+    rate = guess
+
+    iteration = 0
+    while iteration < MAX_ITERATIONS:
+        iteration += 1
+        pv, derivative = _pv_and_derivative(terms, rate, icompound)
+        error = pv - fv_of_rou
+        if abs(error) <= tolerance:
+            return GoalSeekResult(rate, iteration, time.perf_counter() - started, True)
+        if error > 0:
+            lo = rate
+        else:
+            hi = rate
+
+        step = rate - error / derivative if derivative else math.nan
+        if not (lo < step < hi):
+            # Bisect the bracket, or widen it while there is no upper end yet
+            step = (lo + hi) / 2 if hi != math.inf else max(2 * abs(rate), 1.0)
+        if step == rate or step > 1e6:
+            break
+        rate = step
+
+    return GoalSeekResult(rate, iteration, time.perf_counter() - started, False)
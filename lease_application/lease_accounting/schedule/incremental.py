@@ -0,0 +1,395 @@
+"""
+Incremental schedule recomputation
+Recalculates a lease's schedule after an edit, starting from the first row the edit can affect
+
+VBA Source File: VB script/Code
+VBA Functions: datessrent() (Lines 16-249), basic_calc() (Lines 628-707),
+addsecdep(), addimpair(), addmanualadj() (Lines 1059-1114)
+
+An edit that keeps the lease's dates (skeleton_signature()) and its lease-level
+basic_calc() inputs can only change rows from some date on: the first rental that
+is plotted differently, the first date the ARO lookup differs, or the earliest date
+of an add-on routine whose inputs changed. Rows before that first affected row are
+taken over from the previous schedule; only the rows from it on are plotted, run
+through basic_calc() and the add-on routines.
+
+Liability and ROU depend on G7 = SUM(H9:Hendrow):
+  - edits that leave the rent stream alone leave G7 unchanged, so the rows before
+    the first affected row are reused as they are
+  - edits that change rentals move G7 by the change in H (and the provisional G9 by
+    the change in the PV of the positive rents). Both G recurrences
+    (G10 = G9*(1+r)^n - D10) are linear in their opening value, so each reused row's
+    liability moves by that delta times the cumulative growth 1/E10, and its interest
+    by the delta times the growth over the row. The ROU column is rolled forward from
+    the new I9 (US-GAAP operating depreciation reads Sum(F10:$F$endrow) of every row,
+    so there J/I are recalculated from C9).
+
+Results are identical to a full generate_complete_schedule() run (scalar engine)
+when the rentals are unchanged, and equal up to float rounding when G7 moved.
+Incremental recalculation is therefore opt-in (recalculate_edited_schedule(), used
+for reviewer edits) and its schedules are never put in the schedule cache, whose
+entries must equal full generation.
+"""
+
+import itertools
+from bisect import bisect_left
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from lease_accounting.core.models import LeaseData, PaymentScheduleRow
+from lease_accounting.utils.discount_factors import DiscountCurve, discount_curve
+from lease_accounting.schedule.cache import NON_SCHEDULE_FIELDS, get_schedule_cache
+from lease_accounting.schedule.timing_cache import skeleton_signature
+from lease_accounting.schedule.generator_vba_complete import (
+    generate_complete_schedule,
+    _plot_schedule_rows,
+    _generate_schedule_rows,
+    _create_schedule_row,
+    _security_deposit_increase_rows,
+    _impairment_rows,
+    _manual_rental_adjustment_rows,
+    _apply_transition_option,
+    _calculate_aro_provision_vba,
+    _calculate_depreciation_vba,
+    _calculate_end_of_life_vba,
+    _calculate_initial_rou,
+    _derive_icompound,
+    _get_aro_for_date,
+)
+
+# basic_calc() inputs that apply to every row - a change means full regeneration
+LEASE_LEVEL_FIELDS = (
+    'lease_start_date', 'end_date', 'borrowing_rate', 'compound_months', 'frequency_months',
+    'security_deposit', 'security_discount', 'initial_direct_expenditure', 'lease_incentive',
+    'sublease', 'sublease_rou', 'fv_of_rou', 'gaap_standard', 'finance_lease_usgaap',
+    'bargain_purchase', 'title_transfer', 'useful_life', 'transition_option', 'transition_date',
+    'prepaid_accrual', 'aro', 'aro_table',
+)
+
+# Inputs of the add-on routines - a change affects rows from the routine's earliest date on
+SECURITY_FIELDS = ('security_dates', 'increase_security_1', 'increase_security_2', 'increase_security_3',
+                   'increase_security_4')
+IMPAIRMENT_FIELDS = ('impairment_dates', 'impairment1', 'impairment2', 'impairment3', 'impairment4',
+                     'impairment5')
+MANUAL_RENTAL_FIELDS = ('manual_adj', 'rental_dates', 'rental_2', 'rental_amounts_by_date')
+# ARO revisions (M column, VBA Lines 65-73)
+ARO_FIELDS = ('aro_dates', 'aro_revisions')
+
+# Fields datessrent() does not read for the rent column (D); manual rentals are plotted
+# when auto rentals are off, so they are not among them
+_RENT_NEUTRAL_FIELDS = frozenset(SECURITY_FIELDS + IMPAIRMENT_FIELDS + ARO_FIELDS)
+
+
+def _changed_fields(previous_lease: LeaseData, lease_data: LeaseData) -> Set[str]:
+    """Schedule inputs that differ between the two leases"""
+    names = (set(vars(previous_lease)) | set(vars(lease_data))) - NON_SCHEDULE_FIELDS
+    return {name for name in names if getattr(previous_lease, name, None) != getattr(lease_data, name, None)}
+
+
+def _plotted_rentals(lease_data: LeaseData) -> List[float]:
+    """Rental (D) of every row as datessrent() plots it - only C9 is built"""
+    tail: List[Tuple[date, float]] = []
+    opening = _plot_schedule_rows(lease_data, False, horizon=date.min, tail=tail)
+    return [row.rental_amount for row in opening] + [rental for _, rental in tail]
+
+
+def _schedule_rentals(lease_data: LeaseData, schedule: List[PaymentScheduleRow]) -> List[float]:
+    """D as plotted for schedule (generated for lease_data) - addmanualadj() overwrites it"""
+    if _manual_rentals(lease_data):
+        return _plotted_rentals(lease_data)
+    return [row.rental_amount for row in schedule]
+
+
+def _aro_change_date(previous_lease: LeaseData, lease_data: LeaseData, start: date) -> Optional[date]:
+    """
+    First date on or after start for which _get_aro_for_date() differs between the leases
+    The lookup only changes on ARO revision dates, so those are the dates compared.
+    """
+    revision_dates = {d for lease in (previous_lease, lease_data) for d in (lease.aro_dates or []) if d and d > start}
+    for point in [start] + sorted(revision_dates):
+        if _get_aro_for_date(previous_lease, point) != _get_aro_for_date(lease_data, point):
+            return point
+    return None
+
+
+def _manual_rentals(lease_data: LeaseData) -> bool:
+    """addmanualadj() changes rows after basic_calc()"""
+    return lease_data.manual_adj == "Yes" and bool(lease_data.rental_dates)
+
+
+def _affected_from(previous_lease: LeaseData, previous_schedule: List[PaymentScheduleRow],
+                   lease_data: LeaseData) -> Tuple[int, Optional[List[float]], Optional[List[float]]]:
+    """
+    (first affected row, previous plotted D, new plotted D)
+    The rentals are None when the edit cannot change the rent column and lease_data
+    has no manual rentals (D is then the previous schedule's).
+    """
+    changed = _changed_fields(previous_lease, lease_data)
+    if (not previous_schedule or changed.intersection(LEASE_LEVEL_FIELDS)
+            or skeleton_signature(previous_lease) != skeleton_signature(lease_data)
+            or (lease_data.fv_of_rou and lease_data.fv_of_rou != 0)
+            or lease_data.end_date == lease_data.lease_start_date):
+        return 0, None, None
+
+    endrow = len(previous_schedule)
+    dates = [row.date for row in previous_schedule]
+    first = endrow
+    old_rentals = new_rentals = None
+    if changed - _RENT_NEUTRAL_FIELDS:
+        old_rentals = _schedule_rentals(previous_lease, previous_schedule)
+        new_rentals = _plotted_rentals(lease_data)
+        if len(old_rentals) != endrow or len(new_rentals) != endrow:
+            return 0, None, None
+        rent_row = next((i for i in range(endrow) if old_rentals[i] != new_rentals[i]), endrow)
+        if rent_row < endrow and lease_data.transition_option == "2B" and lease_data.transition_date:
+            # Transition 2B sets I on the day before transition from the liability G7 moves
+            rent_row = min(rent_row, bisect_left(dates, lease_data.transition_date - timedelta(days=1)))
+        first = min(first, rent_row)
+    elif _manual_rentals(lease_data):
+        new_rentals = old_rentals = _plotted_rentals(lease_data)
+
+    starts = []
+    if changed.intersection(ARO_FIELDS):
+        starts.append(_aro_change_date(previous_lease, lease_data, dates[0]))
+    for fields, dates_field in ((SECURITY_FIELDS, 'security_dates'), (IMPAIRMENT_FIELDS, 'impairment_dates'),
+                                (MANUAL_RENTAL_FIELDS, 'rental_dates')):
+        if changed.intersection(fields):
+            starts += [d for lease in (previous_lease, lease_data) for d in (getattr(lease, dates_field) or []) if d]
+    starts = [d for d in starts if d is not None]
+    if starts:
+        first = min(first, bisect_left(dates, min(starts)))
+
+    # Row 'first' reads G, I and L of the row before it as basic_calc() left them;
+    # addsecdep() and transition 2B change L and I afterwards
+    overwritten = {d for lease in (previous_lease, lease_data) for d in (lease.security_dates or []) if d}
+    if lease_data.transition_option == "2B" and lease_data.transition_date:
+        overwritten.add(lease_data.transition_date - timedelta(days=1))
+    while 1 < first < endrow and dates[first - 1] in overwritten:
+        first -= 1
+    return first, old_rentals, new_rentals
+
+
+def first_affected_row(previous_lease: LeaseData, previous_schedule: List[PaymentScheduleRow],
+                       lease_data: LeaseData) -> int:
+    """
+    Index of the first row of lease_data's schedule that can differ from previous_schedule
+    (generated for previous_lease). Returns len(previous_schedule) when the schedules
+    cannot differ, 0 when nothing can be reused.
+    """
+    return _affected_from(previous_lease, previous_schedule, lease_data)[0]
+
+
+def recalculate_edited_schedule(lease_data: LeaseData) -> List[PaymentScheduleRow]:
+    """
+    Schedule for a stored lease after an edit, recalculated from the latest schedule
+    cached for its id (ScheduleCache.latest_for(), scalar engine)
+    
+    Equal to generate_complete_schedule(lease_data) up to float rounding, so the
+    result is not cached. Without a previous schedule, generate_complete_schedule().
+    """
+    previous = get_schedule_cache().latest_for(lease_data, "scalar")
+    if previous is None:
+        return generate_complete_schedule(lease_data, engine="scalar")
+    return recalculate_schedule(previous[0], previous[1], lease_data)
+
+
+def recalculate_schedule(previous_lease: LeaseData, previous_schedule: List[PaymentScheduleRow],
+                         lease_data: LeaseData) -> List[PaymentScheduleRow]:
+    """
+    Schedule for lease_data, reusing previous_schedule (generated for previous_lease)
+    up to the first row the edit can affect. Falls back to full generation when
+    a lease-level basic_calc() input or the dates changed, and for FV of ROU leases
+    (the goal-sought C7 depends on every rental).
+
+    The reused rows are previous_schedule's own row objects, shifted in place when
+    G7 moved: pass rows the caller does not keep (ScheduleCache.latest_for() hands
+    out new ones).
+    """
+    first, old_rentals, new_rentals = _affected_from(previous_lease, previous_schedule, lease_data)
+    if first <= 1:
+        return _generate_schedule_rows(lease_data, False, "scalar")
+    schedule = list(previous_schedule)
+    if first == len(schedule):
+        return schedule
+
+    # datessrent() for the affected rows only: the dates are the previous schedule's
+    for i in range(first, len(schedule)):
+        row_date = schedule[i].date
+        rental = new_rentals[i] if new_rentals is not None else schedule[i].rental_amount
+        schedule[i] = _create_schedule_row(lease_data, row_date, rental, _get_aro_for_date(lease_data, row_date),
+                                           lease_data.lease_start_date, lease_data.end_date, i, None)
+
+    rou_from = _apply_basic_calculations_from(lease_data, schedule, first, old_rentals, new_rentals)
+    _apply_schedule_addons_from(lease_data, schedule, first, rou_from)
+    return schedule
+
+
+def _apply_basic_calculations_from(lease_data: LeaseData, schedule: List[PaymentScheduleRow], first: int,
+                                   old_rentals: Optional[List[float]], new_rentals: Optional[List[float]]) -> int:
+    """
+    basic_calc() for the rows from 'first' on; the rows before it are the previous
+    schedule's, moved with G7 when the rentals changed. Returns the first row whose
+    depreciation was recalculated.
+    """
+    endrow = len(schedule)
+    start = schedule[0].date
+    raw_secdeprate = lease_data.security_discount or 0.0
+    secdeprate = raw_secdeprate / 100 if raw_secdeprate > 1 else raw_secdeprate
+    icompound = _derive_icompound(lease_data)
+    discount_rate = (lease_data.borrowing_rate or 8) / 100
+    curve = discount_curve(discount_rate, icompound)
+    security_curve = discount_curve(secdeprate, 1)
+    aro_curves: Dict[float, DiscountCurve] = {}
+    endoflife = _calculate_end_of_life_vba(lease_data, schedule[-1].date)
+    usgaap_operating = getattr(lease_data, 'gaap_standard', 'IFRS') == "US-GAAP" and lease_data.finance_lease_usgaap != "Yes"
+    security = secdeprate > 0 and lease_data.security_deposit and lease_data.security_deposit > 0
+
+    # E/H/M/N/O/K/L (VBA Lines 661-678), and the change in G7 and in the provisional G9
+    delta_g7 = delta_provisional = 0.0
+    for i in range(first, endrow):
+        prev_row = schedule[i - 1]
+        curr_row = schedule[i]
+        days_from_start = (curr_row.date - start).days
+        curr_row.pv_factor = curve.discount(days_from_start)
+        curr_row.pv_of_rent = curr_row.pv_factor * curr_row.rental_amount
+        if old_rentals is not None:
+            old_rental = old_rentals[i]
+            if old_rental != curr_row.rental_amount:
+                delta_g7 += curr_row.pv_of_rent - curr_row.pv_factor * old_rental
+                if days_from_start > 0:
+                    delta_provisional += (curr_row.pv_of_rent if curr_row.rental_amount > 0 else 0.0) - \
+                        (curr_row.pv_factor * old_rental if old_rental > 0 else 0.0)
+
+        current_aro_gross = _get_aro_for_date(lease_data, curr_row.date) or 0.0
+        if current_aro_gross:
+            curr_row.aro_gross = current_aro_gross
+        curr_row.aro_provision = _calculate_aro_provision_vba(
+            lease_data, curr_row.aro_gross or 0.0, curr_row.date, schedule[-1].date, lease_data.aro_table,
+            aro_curves=aro_curves
+        )
+        prev_aro_prov = prev_row.aro_provision or 0.0
+        curr_aro_prov = curr_row.aro_provision or 0.0
+        curr_row.aro_interest = curr_aro_prov - prev_aro_prov
+        curr_row.change_in_rou = curr_aro_prov - curr_row.aro_interest - prev_aro_prov
+
+        # L10 rolls forward from the previous row
+        prev_security_pv = prev_row.security_deposit_pv or 0.0
+        if security:
+            pv_factor_curr = security_curve.discount(days_from_start)
+            pv_factor_prev = security_curve.discount((prev_row.date - start).days)
+            curr_row.security_deposit_pv = prev_security_pv * pv_factor_prev / pv_factor_curr if pv_factor_curr > 0 else prev_security_pv
+        else:
+            curr_row.security_deposit_pv = 0.0
+
+    rou_from = first
+    if delta_g7 or delta_provisional:
+        # G7 = SUM(H9:Hendrow) moved (VBA Line 688): G moves by delta_g7 * (1+r)^n from C9,
+        # the first-pass G (remaining_balance) by the change in the provisional G9
+        schedule[0].lease_liability += delta_g7
+        previous_rou = schedule[0].rou_asset
+        schedule[0].rou_asset = _calculate_initial_rou(lease_data, schedule[0].lease_liability, _ide(lease_data))
+        growth_before = 1.0
+        for i in range(1, first):
+            row = schedule[i]
+            growth = curve.compound((row.date - start).days)
+            days_between = (row.date - schedule[i - 1].date).days
+            if days_between > 0:
+                step = growth_before * (curve.compound(days_between) - 1)
+                row.interest += delta_g7 * step
+                row.principal -= delta_provisional * step
+            row.lease_liability += delta_g7 * growth
+            row.remaining_balance += delta_provisional * growth
+            growth_before = growth
+        if usgaap_operating:
+            rou_from = 1
+        elif schedule[0].rou_asset != previous_rou:
+            _shift_straight_line_rou(schedule, first, previous_rou, endoflife)
+
+    # First pass F/G from the first affected row (principal, remaining_balance)
+    for i in range(first, endrow):
+        prev_row = schedule[i - 1]
+        curr_row = schedule[i]
+        days_between = (curr_row.date - prev_row.date).days
+        if days_between > 0:
+            curr_row.interest = prev_row.remaining_balance * (curve.compound(days_between) - 1)
+        curr_row.principal = curr_row.rental_amount - curr_row.interest
+        curr_row.remaining_balance = prev_row.remaining_balance - curr_row.rental_amount + curr_row.interest
+
+    # Sum(F10:$F$endrow) of the first pass, from the first row whose depreciation is recalculated
+    future_interest = None
+    if usgaap_operating:
+        future_interest = [0.0] * (endrow + 1)
+        for j in range(endrow - 1, rou_from - 1, -1):
+            row = schedule[j]
+            first_pass = row.interest if j >= first else (new_rentals[j] - row.principal)
+            future_interest[j] = future_interest[j + 1] + abs(first_pass or 0.0)
+
+    for i in range(rou_from, endrow):
+        prev_row = schedule[i - 1]
+        curr_row = schedule[i]
+        if i >= first:
+            # Second pass F/G (VBA Line 688 onwards)
+            days_between = (curr_row.date - prev_row.date).days
+            if days_between > 0:
+                curr_row.interest = prev_row.lease_liability * (curve.compound(days_between) - 1)
+            curr_row.lease_liability = prev_row.lease_liability - curr_row.rental_amount + curr_row.interest
+        curr_row.depreciation = _calculate_depreciation_vba(
+            lease_data, prev_row, curr_row, endoflife, discount_rate, icompound, schedule,
+            row_index=i, future_interest=future_interest
+        )
+        curr_row.rou_asset = prev_row.rou_asset - curr_row.depreciation + curr_row.change_in_rou
+
+    _apply_transition_option(lease_data, schedule[first:])
+    return rou_from
+
+
+def _shift_straight_line_rou(schedule: List[PaymentScheduleRow], first: int, previous_rou: float,
+                             endoflife: date) -> None:
+    """
+    Roll I/J of the reused rows forward from a new I9 (VBA Line 673: MAX(MIN(I9/($J$6-C9)*(C10-C9),I9),0))
+    J keeps whatever addimpair() added on top of the straight-line charge.
+    """
+    old_rou, new_rou = previous_rou, schedule[0].rou_asset
+    for i in range(1, first):
+        row = schedule[i]
+        prev_date = schedule[i - 1].date
+        total_days = (endoflife - prev_date).days
+        old_charge = new_charge = 0.0
+        if total_days > 0:
+            days_diff = (row.date - prev_date).days
+            old_charge = max(0.0, min(old_rou * days_diff / total_days, old_rou))
+            new_charge = max(0.0, min(new_rou * days_diff / total_days, new_rou))
+            row.depreciation += new_charge - old_charge
+        old_rou = row.rou_asset
+        row.rou_asset = new_rou - new_charge + row.change_in_rou
+        new_rou = row.rou_asset
+
+
+def _apply_schedule_addons_from(lease_data: LeaseData, schedule: List[PaymentScheduleRow], first: int,
+                                rou_from: int) -> None:
+    """
+    _apply_schedule_addons() for the rows from 'first' on (impairments from rou_from,
+    the first row whose depreciation was recalculated)
+
+    Each routine steps through its dates as it meets rows on them, so the earlier rows
+    on its dates are fed to it as throwaway stand-ins first.
+    """
+    end_date = schedule[-1].date
+    routines = [
+        (lambda rows: _security_deposit_increase_rows(lease_data, rows, end_date), lease_data.security_dates, first),
+        (lambda rows: _impairment_rows(lease_data, rows), lease_data.impairment_dates, rou_from),
+        (lambda rows: _manual_rental_adjustment_rows(lease_data, rows),
+         lease_data.rental_dates if _manual_rentals(lease_data) else None, first),
+    ]
+    for routine, routine_dates, start in routines:
+        routine_dates = {d for d in routine_dates or () if d}
+        if not routine_dates:
+            continue
+        stand_ins = [PaymentScheduleRow(date=row.date) for row in itertools.islice(schedule, start)
+                     if row.date in routine_dates]
+        for _ in routine(itertools.chain(stand_ins, itertools.islice(schedule, start, None))):
+            pass
+
+
+def _ide(lease_data: LeaseData) -> float:
+    """VBA Line 631: ide = initial direct expenditure - lease incentive"""
+    return (lease_data.initial_direct_expenditure or 0) - (lease_data.lease_incentive or 0)
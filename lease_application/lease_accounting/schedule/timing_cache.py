@@ -0,0 +1,130 @@
+"""
+Timing signature cache
+Shares the date skeleton and the escalation sequence between leases with identical timing terms
+
+The rows datessrent() plots depend only on the lease's dates, payment frequency and
+payment day; the findrent() sequence only on those and the escalation terms, scaled
+by Rental_1. Portfolios often hold many leases with the same terms (a rollout of
+identical units) that differ only in rentals, rates and deposits. Such leases share
+one SkeletonRow list and one UnitEscalation here, so generating their schedules is
+arithmetic on amounts and rates, not calendar work.
+
+Cached skeletons are shared, not copied: callers must not modify them.
+Memory is bounded by the total number of skeleton rows held; least recently used
+entries are evicted first.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from lease_accounting.core.models import LeaseData
+from lease_accounting.schedule.date_skeleton import SkeletonRow, generate_date_skeleton
+from lease_accounting.schedule.escalation import UnitEscalation, escalation_basis
+
+# Default bound: ~1 million skeleton rows
+DEFAULT_MAX_ROWS = int(os.environ.get('LEASE_TIMING_CACHE_ROWS', 1_000_000))
+
+
+def skeleton_signature(lease_data: LeaseData) -> Tuple:
+    """Inputs of generate_date_skeleton() (datessrent() Lines 83-236)"""
+    return (lease_data.lease_start_date, lease_data.first_payment_date, lease_data.end_date,
+            lease_data.frequency_months, lease_data.day_of_month)
+
+
+def escalation_signature(lease_data: LeaseData) -> Tuple:
+    """Inputs of escalation_basis() other than Rental_1 (findrent() Lines 884-921)"""
+    escalation_start = (getattr(lease_data, 'escalation_start_date', None)
+                        or getattr(lease_data, 'escalation_start', None))
+    return (lease_data.lease_start_date, lease_data.end_date, lease_data.frequency_months,
+            lease_data.day_of_month, lease_data.accrual_day, lease_data.esc_freq_months,
+            lease_data.escalation_percent, escalation_start)
+
+
+class TimingCache:
+    """LRU cache of date skeletons and unit escalation sequences, keyed by timing signature"""
+
+    def __init__(self, max_rows: int = DEFAULT_MAX_ROWS):
+        self.max_rows = max_rows
+        # ('skeleton', signature) -> List[SkeletonRow]; ('escalation', signature) -> UnitEscalation or None
+        self._entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._rows = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def skeleton(self, lease_data: LeaseData) -> List[SkeletonRow]:
+        """generate_date_skeleton(lease_data), shared with leases of the same timing"""
+        key = ('skeleton', skeleton_signature(lease_data))
+        found, skeleton = self._get(key)
+        if not found:
+            skeleton = generate_date_skeleton(lease_data)
+            self._put(key, skeleton, len(skeleton))
+        return skeleton
+
+    def escalation(self, lease_data: LeaseData) -> Optional[UnitEscalation]:
+        """UnitEscalation for lease_data's escalation terms, or None without escalation"""
+        key = ('escalation', escalation_signature(lease_data))
+        found, unit = self._get(key)
+        if not found:
+            basis = escalation_basis(lease_data)
+            unit = UnitEscalation(basis) if basis is not None else None
+            self._put(key, unit, 0)
+        return unit
+
+    def _get(self, key: Tuple) -> Tuple[bool, Any]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, self._entries[key]
+
+    def _put(self, key: Tuple, value: Any, rows: int) -> None:
+        if rows > self.max_rows:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = value
+            self._rows += rows
+            while self._rows > self.max_rows:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                if evicted_key[0] == 'skeleton':
+                    self._rows -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            skeletons = sum(1 for kind, _ in self._entries if kind == 'skeleton')
+            return {
+                'skeletons': skeletons,
+                'escalations': len(self._entries) - skeletons,
+                'rows': self._rows,
+                'max_rows': self.max_rows,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global instance used by the schedule generator
+_timing_cache = TimingCache()
+
+
+def get_timing_cache() -> TimingCache:
+    """Process-wide timing signature cache"""
+    return _timing_cache
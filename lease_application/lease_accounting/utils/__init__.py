@@ -20,7 +20,15 @@ from .finance import (
 from .rfr_rates import (
     RFRRateTable,
     get_aro_rate,
-    update_rfr_table
+    get_aro_rates,
+    update_rfr_table,
+    get_rfr_version
+)
+
+from .discount_factors import (
+    DiscountCurve,
+    discount_curve,
+    get_discount_factor_cache
 )
 
 from .journal_generator import (
@@ -46,7 +54,14 @@ __all__ = [
     # RFR rates
     'RFRRateTable',
     'get_aro_rate',
+    'get_aro_rates',
     'update_rfr_table',
+    'get_rfr_version',
+    
+    # Discount factors
+    'DiscountCurve',
+    'discount_curve',
+    'get_discount_factor_cache',
     
     # Journal generation
     'JournalGenerator',
@@ -3,6 +3,7 @@ Date utilities for lease accounting
 Ports Excel date functions to Python
 """
 
+import calendar
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from typing import List, Optional
@@ -17,15 +18,10 @@ def eomonth(d: date, months: int = 0) -> date:
     Returns:
         Last day of the month, adjusted by months
     """
-    target_month = d + relativedelta(months=months)
-    
-    # Get last day of target month
-    if target_month.month == 12:
-        last_day = date(target_month.year + 1, 1, 1) - timedelta(days=1)
-    else:
-        last_day = date(target_month.year, target_month.month + 1, 1) - timedelta(days=1)
-    
-    return last_day
+    # Month arithmetic as in relativedelta(months=months), without building one per call
+    month_index = d.year * 12 + d.month - 1 + months
+    year, month = divmod(month_index, 12)
+    return date(year, month + 1, calendar.monthrange(year, month + 1)[1])
 
 
 def calculate_payment_dates(
@@ -0,0 +1,132 @@
+"""
+Shared discount factors
+Memoizes the VBA compounding factor (1+r*icompound/12)^((days/365)*12/icompound) across leases
+
+Every schedule row evaluates this factor for its PV factor (E column), interest
+(F column), security deposit PV (L column) and ARO PV (O column). Leases with the
+same rate and compounding share one DiscountCurve, and day offsets repeat heavily
+across a portfolio (month ends, payment days), so each factor is computed once
+per process. Values are the same floats as the inline formulas.
+
+Memory is bounded by the total number of memoized factors; least recently used
+curves are evicted first.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+# Default bound: ~1 million memoized factors across all curves
+DEFAULT_MAX_FACTORS = int(os.environ.get('LEASE_DISCOUNT_FACTOR_CACHE', 1_000_000))
+
+
+class DiscountCurve:
+    """Compounding and discount factors for one (rate, icompound) pair, by day offset"""
+    __slots__ = ('rate', 'icompound', 'base', '_compound', '_discount')
+
+    def __init__(self, rate: float, icompound: int):
+        self.rate = rate
+        self.icompound = icompound
+        self.base = 1 + rate * icompound / 12
+        self._compound: Dict[int, float] = {}
+        self._discount: Dict[int, float] = {}
+
+    def compound(self, days: int) -> float:
+        """(1+r*icompound/12)^((days/365)*12/icompound)"""
+        factor = self._compound.get(days)
+        if factor is None:
+            factor = self._compound[days] = self.base ** ((days / 365) * 12 / self.icompound)
+        return factor
+
+    def discount(self, days: int) -> float:
+        """1/((1+r*icompound/12)^((days/365)*12/icompound)) - VBA E10"""
+        factor = self._discount.get(days)
+        if factor is None:
+            factor = self._discount[days] = 1 / self.compound(days)
+        return factor
+
+    def discount_many(self, days: Iterable[int]) -> List[float]:
+        discount = self.discount
+        return [discount(d) for d in days]
+
+    def compound_many(self, days: Iterable[int]) -> List[float]:
+        compound = self.compound
+        return [compound(d) for d in days]
+
+    def __len__(self) -> int:
+        return len(self._compound) + len(self._discount)
+
+
+class DiscountFactorCache:
+    """
+    Process-wide DiscountCurve registry, bounded by the number of memoized factors
+
+    Curves fill up outside the lock, so the running factor count takes each curve's
+    size when it is handed out (and drops it on eviction); growth since a curve's
+    last lookup is counted at its next one.
+    """
+
+    def __init__(self, max_factors: int = DEFAULT_MAX_FACTORS):
+        self.max_factors = max_factors
+        self._curves: "OrderedDict[Tuple[float, int], DiscountCurve]" = OrderedDict()
+        self._counted: Dict[Tuple[float, int], int] = {}
+        self._factors = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def curve(self, rate: float, icompound: int) -> DiscountCurve:
+        """Shared curve for (rate, icompound); evicts least recently used curves when full"""
+        key = (rate, icompound)
+        with self._lock:
+            curve = self._curves.get(key)
+            if curve is None:
+                curve = self._curves[key] = DiscountCurve(rate, icompound)
+                self._counted[key] = 0
+            else:
+                self._curves.move_to_end(key)
+            size = len(curve)
+            self._factors += size - self._counted[key]
+            self._counted[key] = size
+            while self._factors > self.max_factors and len(self._curves) > 1:
+                evicted_key, _ = self._curves.popitem(last=False)
+                self._factors -= self._counted.pop(evicted_key)
+                self.evictions += 1
+            if self._factors > self.max_factors:
+                # A single curve over the bound starts afresh
+                curve._compound.clear()
+                curve._discount.clear()
+                self._factors = self._counted[key] = 0
+        return curve
+
+    def clear(self) -> None:
+        with self._lock:
+            self._curves.clear()
+            self._counted.clear()
+            self._factors = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'curves': len(self._curves),
+                'factors': sum(len(c) for c in self._curves.values()),
+                'max_factors': self.max_factors,
+                'evictions': self.evictions,
+            }
+
+
+# Global instance
+_discount_factor_cache = DiscountFactorCache()
+
+
+def discount_curve(rate: float, icompound: int = 1) -> DiscountCurve:
+    """
+    Shared DiscountCurve for a rate (decimal) compounded every icompound months
+    icompound=1 gives the monthly curves used for security deposits and ARO
+    """
+    return _discount_factor_cache.curve(rate, icompound)
+
+
+def get_discount_factor_cache() -> DiscountFactorCache:
+    """Process-wide discount factor cache"""
+    return _discount_factor_cache
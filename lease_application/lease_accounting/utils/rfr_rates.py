@@ -1,12 +1,24 @@
 """
 Risk-Free Rate (RFR) Rate Tables
 Ports VBA arorate() function for ARO discount rate calculations
+
+Each table is kept as (date, rate) pairs sorted by date descending, as in the
+Excel sheet, and compiled into ascending parallel arrays (date ordinals, rates)
+so that lookups are a bisect instead of a scan.
 """
 
+from bisect import bisect_right
 from datetime import date
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 import csv
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
 
 class RFRRateTable:
     """
@@ -20,7 +32,14 @@ class RFRRateTable:
             2: [],  # Table 2
             3: []   # Table 3
         }
+        # Bumped whenever the rates change - lets cached schedules detect stale ARO rates
+        self.version = 0
+        # Per table version, bumped only when that table's rates change
+        self.table_versions: Dict[int, int] = {}
+        # Compiled curves: table -> (ascending date ordinals, rates)
+        self._curves: Dict[int, Tuple[List[int], List[float]]] = {}
         self._initialize_default_rates()
+        self._compile()
     
     def _initialize_default_rates(self):
         """Initialize with default rate tables similar to Excel"""
@@ -90,19 +109,53 @@ class RFRRateTable:
         Returns:
             Risk-free rate as decimal (e.g., 0.0703 for 7.03%)
         """
-        if table == 0 or table not in self.rate_tables:
+        curve = self._curves.get(table) if table else None
+        if not curve or not curve[0]:
             return 0.0
+        ordinals, rates = curve
         
-        # Find the rate for the given date
-        for table_date, rate in self.rate_tables[table]:
-            if table_date <= rate_date:
-                return rate
+        # Rate of the latest table date on or before rate_date
+        index = bisect_right(ordinals, rate_date.toordinal()) - 1
+        if index >= 0:
+            return rates[index]
         
         # If no rate found for that date, return the most recent available rate
-        if self.rate_tables[table]:
-            return self.rate_tables[table][0][1]
+        return rates[-1]
+    
+    def get_rates(self, dates: Iterable[date], table: int) -> List[float]:
+        """get_rate() for many dates at once (one searchsorted with NumPy)"""
+        dates = list(dates)
+        curve = self._curves.get(table) if table else None
+        if not curve or not curve[0]:
+            return [0.0] * len(dates)
+        ordinals, rates = curve
+        if not HAS_NUMPY:
+            return [self.get_rate(d, table) for d in dates]
         
-        return 0.0
+        positions = np.searchsorted(
+            np.asarray(ordinals), np.fromiter((d.toordinal() for d in dates), dtype=np.int64, count=len(dates)),
+            side='right'
+        ) - 1
+        # No table date on or before: most recent rate (as get_rate)
+        positions[positions < 0] = len(rates) - 1
+        return np.asarray(rates)[positions].tolist()
+    
+    def _compile(self, tables: Optional[Iterable[int]] = None):
+        """
+        Rebuild the bisect curves from rate_tables, bumping the version of each
+        table whose rates changed
+        """
+        for table_num in (self.rate_tables if tables is None else tables):
+            # Ascending order; equal dates keep the precedence of the descending list
+            entries = list(reversed(self.rate_tables.get(table_num, [])))
+            curve = ([d.toordinal() for d, _ in entries], [rate for _, rate in entries])
+            if self._curves.get(table_num) != curve:
+                self._curves[table_num] = curve
+                self.table_versions[table_num] = self.table_versions.get(table_num, 0) + 1
+        for table_num in list(self._curves):
+            if table_num not in self.rate_tables:
+                del self._curves[table_num]
+                self.table_versions[table_num] = self.table_versions.get(table_num, 0) + 1
     
     def load_from_file(self, filename: str):
         """Load RFR rates from CSV file"""
@@ -128,6 +181,8 @@ class RFRRateTable:
         # Sort by date descending
         for table_num in self.rate_tables:
             self.rate_tables[table_num].sort(key=lambda x: x[0], reverse=True)
+        self._compile()
+        self.version += 1
 
 
 # Global instance
@@ -142,10 +197,27 @@ def get_aro_rate(rate_date: date, table: int) -> float:
     return _rfr_table.get_rate(rate_date, table)
 
 
+def get_aro_rates(dates: Iterable[date], table: int) -> List[float]:
+    """ARO rates for a sequence of dates (global RFR table)"""
+    return _rfr_table.get_rates(dates, table)
+
+
 def update_rfr_table(rates: Dict[int, List[Tuple[date, float]]]):
     """Update the global RFR table with new rates"""
     global _rfr_table
     _rfr_table.rate_tables = rates
     for table_num in _rfr_table.rate_tables:
         _rfr_table.rate_tables[table_num].sort(key=lambda x: x[0], reverse=True)
+    _rfr_table._compile()
+    _rfr_table.version += 1
+
+
+def get_rfr_version(table: Optional[int] = None) -> int:
+    """
+    Version of the global RFR table (changes on every update_rfr_table/load_from_file),
+    or of one table (changes only when that table's rates change)
+    """
+    if table is None:
+        return _rfr_table.version
+    return _rfr_table.table_versions.get(table, 0)
 
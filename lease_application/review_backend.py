@@ -7,7 +7,7 @@ from flask import Blueprint, request, jsonify, send_file, session
 from auth.auth import require_login, require_reviewer
 from database import (get_lease, get_extraction_metadata, get_field_edit_history,
                      get_reviewer_modifications_summary, save_field_edit, get_lease_documents,
-                     get_document, get_user)
+                     get_document, get_user, get_leases_by_ids, lease_data_from_record)
 import os
 import logging
 import json
@@ -38,9 +38,7 @@ def get_review_metadata(lease_id):
                 return jsonify({'success': False, 'error': 'Lease not found'}), 404
             
             # Get lease without user_id check for admin/reviewer
-            from database import get_all_leases_admin
-            all_leases = get_all_leases_admin()
-            lease = next((l for l in all_leases if l['lease_id'] == lease_id), None)
+            lease = get_leases_by_ids([lease_id]).get(lease_id)
             if not lease:
                 return jsonify({'success': False, 'error': 'Lease not found'}), 404
         
@@ -463,6 +461,25 @@ def get_review_pdf(lease_id, doc_id):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _schedule_with_edit(lease_id, field_name, reviewer_value):
+    """
+    Schedule of the stored lease with field_name set to reviewer_value, recalculated
+    from the first row the edit affects (recalculate_edited_schedule()); None if
+    the lease is not found or the value does not parse
+    """
+    from lease_accounting.schedule.incremental import recalculate_edited_schedule
+    
+    lease = get_leases_by_ids([lease_id]).get(lease_id)
+    if not lease:
+        return None
+    try:
+        edited = lease_data_from_record({**lease, field_name: reviewer_value})
+    except (ValueError, TypeError):
+        logger.warning(f"⚠️  Edited value of {field_name} does not parse - schedule not recalculated")
+        return None
+    return recalculate_edited_schedule(edited)
+
+
 @review_bp.route('/review/<int:lease_id>/save-edit', methods=['POST'])
 @require_login
 def save_field_edit_api(lease_id):
@@ -501,11 +518,16 @@ def save_field_edit_api(lease_id):
         
         logger.info(f"✅ Field edit saved: {field_name} for lease {lease_id} by user {user_id}")
         
-        return jsonify({
+        response = {
             'success': True,
             'audit_id': audit_id,
             'message': 'Field edit saved successfully'
-        })
+        }
+        # Opt-in: the schedule with the edit applied (the stored lease is not changed)
+        if data.get('recalculate'):
+            schedule = _schedule_with_edit(lease_id, field_name, reviewer_value)
+            response['schedule'] = [row.to_dict() for row in schedule] if schedule is not None else None
+        return jsonify(response)
         
     except Exception as e:
         logger.error(f"Error saving field edit: {e}", exc_info=True)
@@ -0,0 +1,110 @@
+"""
+Tests for the basic_calc() columns (generator_vba_complete.py, schedule/columnar.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_basic_calc.py -q
+"""
+
+import sys
+import os
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.core.models import LeaseData
+from lease_accounting.schedule import generator_vba_complete
+from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
+from tests.schedule_helpers import (
+    ANNUAL_LEASE_G7, annual_lease, assert_schedules_match, monthly_lease, random_leases, run_generator,
+)
+
+
+def rows_by_date(schedule):
+    return {row.date: row for row in schedule}
+
+
+@pytest.mark.parametrize('engine', ['scalar', 'numpy'])
+def test_annual_lease_columns(engine):
+    if engine == 'numpy':
+        pytest.importorskip('numpy')
+    schedule = generate_complete_schedule(annual_lease(), engine=engine, use_cache=False)
+    rows = rows_by_date(schedule)
+
+    # E: 1/(1+10%)^(days/365), G7: PV of the three rents
+    assert rows[date(2022, 1, 1)].pv_factor == pytest.approx(1 / 1.1, rel=1e-12)
+    assert rows[date(2023, 1, 1)].pv_factor == pytest.approx(1 / 1.21, rel=1e-12)
+    assert schedule[0].lease_liability == pytest.approx(ANNUAL_LEASE_G7, rel=1e-12)
+    assert sum(row.pv_of_rent for row in schedule) == pytest.approx(ANNUAL_LEASE_G7, rel=1e-12)
+
+    # F: a year of interest at 10% accrues over the month-end rows to the next payment
+    interest_2021 = sum(row.interest for row in schedule if date(2021, 1, 1) < row.date <= date(2022, 1, 1))
+    assert interest_2021 == pytest.approx(0.1 * ANNUAL_LEASE_G7, rel=1e-12)
+    assert rows[date(2022, 1, 1)].lease_liability == pytest.approx(1.1 * ANNUAL_LEASE_G7 - 1000, rel=1e-12)
+    assert rows[date(2023, 1, 1)].lease_liability == pytest.approx(1.21 * ANNUAL_LEASE_G7 - 2100, rel=1e-12)
+
+    # J/I (IFRS): straight line over the 1094 days to the end date
+    assert rows[date(2021, 1, 31)].depreciation == pytest.approx(ANNUAL_LEASE_G7 * 30 / 1094, rel=1e-12)
+    assert sum(row.depreciation for row in schedule) == pytest.approx(ANNUAL_LEASE_G7, rel=1e-12)
+    assert schedule[-1].rou_asset == pytest.approx(0.0, abs=1e-9)
+
+
+def test_initial_direct_costs_and_transition_2b_adjust_the_rou():
+    schedule = generate_complete_schedule(annual_lease(initial_direct_expenditure=1200.0), use_cache=False)
+    assert schedule[0].lease_liability == pytest.approx(ANNUAL_LEASE_G7, rel=1e-12)
+    assert schedule[0].rou_asset == pytest.approx(ANNUAL_LEASE_G7 + 1200.0, rel=1e-12)
+
+    # Option 2B: ROU = liability + prepaid accrual on the day before transition
+    lease_data = annual_lease(transition_option='2B', transition_date=date(2022, 1, 1), prepaid_accrual=50.0)
+    rows = rows_by_date(generate_complete_schedule(lease_data, use_cache=False))
+    assert rows[date(2021, 12, 31)].rou_asset == pytest.approx(rows[date(2021, 12, 31)].lease_liability + 50.0)
+
+
+def test_usgaap_depreciation_suffix_sums_match_row_scan(monkeypatch):
+    lease_data = monthly_lease(gaap_standard='US-GAAP', end_date=date(2040, 12, 31))
+    fast = generate_complete_schedule(lease_data, use_cache=False)
+    # Without suffix sums each row rebuilds Sum(F10:$F$endrow) from the schedule
+    monkeypatch.setattr(generator_vba_complete, '_future_interest_sums', lambda schedule: None)
+    expected = generate_complete_schedule(lease_data, use_cache=False)
+    # Sums are added in the opposite order, so J and I can differ in the last
+    # few bits (see _future_interest_sums()); nothing beyond float rounding
+    assert_schedules_match(fast, expected, rel_tol=1e-12, abs_tol=1e-8)
+    # The operating lease formula is in use: J is not the straight line
+    straight_line = generate_complete_schedule(monthly_lease(end_date=date(2040, 12, 31)), use_cache=False)
+    assert fast[1].depreciation != pytest.approx(straight_line[1].depreciation)
+
+
+def test_numpy_basic_calc_matches_scalar():
+    pytest.importorskip('numpy')
+    leases = random_leases(120, seed=17)
+    leases[0].fv_of_rou = 50000.0  # first pass only
+    leases[1].transition_option, leases[1].transition_date = '2B', leases[1].lease_start_date + timedelta(days=400)
+    leases.append(LeaseData(
+        auto_id=999, lease_start_date=date(2000, 1, 1), first_payment_date=date(2000, 1, 1),
+        end_date=date(2098, 12, 31), frequency_months=1, day_of_month='1', rental_1=150000.0,
+        escalation_percent=3.0, borrowing_rate=8.0, security_deposit=100000.0, security_discount=6.0,
+        gaap_standard='US-GAAP',
+    ))
+    for lease_data in leases:
+        expected = run_generator(lambda ld: generate_complete_schedule(ld, engine='scalar'), lease_data)
+        actual = run_generator(lambda ld: generate_complete_schedule(ld, engine='numpy'), lease_data)
+        if isinstance(expected, type):
+            assert actual is expected
+        else:
+            # Closed-form liability roll-forward: equal to float rounding, which near
+            # the end of the lease is relative to the opening balances
+            scale = max(1.0, abs(expected[0].lease_liability), abs(expected[0].rou_asset))
+            assert_schedules_match(actual, expected, rel_tol=1e-9, abs_tol=1e-10 * scale)
+
+
+def test_basic_calc_engine_switch():
+    lease_data = monthly_lease()
+    with pytest.raises(ValueError):
+        generator_vba_complete.set_basic_calc_engine('fortran')
+    generator_vba_complete.set_basic_calc_engine('numpy')
+    try:
+        assert_schedules_match(generate_complete_schedule(lease_data),
+                               generate_complete_schedule(lease_data, engine='numpy'))
+    finally:
+        generator_vba_complete.set_basic_calc_engine('scalar')
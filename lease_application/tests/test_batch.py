@@ -0,0 +1,88 @@
+"""
+Tests for batched schedule generation (schedule/batch.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_batch.py -q
+"""
+
+import sys
+import os
+import copy
+from dataclasses import replace
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.core.models import ProcessingFilters
+from lease_accounting.core.results_processor import ResultsProcessor
+from lease_accounting.core.schedule_frame import ScheduleFrame
+from lease_accounting.schedule.generator_vba_complete import (
+    generate_compact_schedule, generate_complete_schedule, generate_schedule_to_horizon,
+)
+from tests.schedule_helpers import (
+    ANNUAL_LEASE_G7, annual_lease, assert_schedules_match, monthly_lease, random_leases, run_generator,
+)
+
+
+def test_batch_of_known_leases():
+    pytest.importorskip('numpy')
+    from lease_accounting.schedule.batch import generate_schedules_batch
+
+    # Leases with the same timing share the batch kernels. Day 31 from 6 June raises
+    # in datessrent() (no 31 June): None in the batch
+    leases = [annual_lease(auto_id=1), annual_lease(auto_id=2, rental_1=2000.0), monthly_lease(auto_id=3),
+              monthly_lease(auto_id=4, day_of_month='31', lease_start_date=date(2021, 6, 6),
+                            first_payment_date=date(2021, 6, 6), escalation_start=date(2021, 6, 6))]
+    schedules = generate_schedules_batch(leases, use_cache=False)
+    assert schedules[0][0].lease_liability == pytest.approx(ANNUAL_LEASE_G7, rel=1e-12)
+    assert schedules[1][0].lease_liability == pytest.approx(2 * ANNUAL_LEASE_G7, rel=1e-12)
+    for lease_data, actual in zip(leases, schedules):
+        expected = run_generator(lambda ld: generate_complete_schedule(ld, engine='scalar', use_cache=False), lease_data)
+        if isinstance(expected, type):
+            assert actual is None
+        else:
+            assert_schedules_match(actual, expected)
+    assert schedules[3] is None
+    frames = generate_schedules_batch(leases[:2], as_frame=True, use_cache=False)
+    assert all(isinstance(frame, ScheduleFrame) for frame in frames)
+
+
+def test_batch_schedules_match_per_lease_generation():
+    pytest.importorskip('numpy')
+    from lease_accounting.schedule.batch import generate_schedules_batch
+
+    leases = random_leases(150, seed=53)
+    for lease_data in leases[:60]:
+        lease_data.aro_table = 0  # no ARO provision: batch kernels
+    leases[2].transition_option, leases[2].transition_date = '2B', leases[2].lease_start_date + timedelta(days=400)
+    leases[3].fv_of_rou = 50000.0
+    schedules = generate_schedules_batch(leases, use_cache=False)
+    for lease_data, actual in zip(leases, schedules):
+        expected = run_generator(lambda ld: generate_complete_schedule(ld, engine='scalar', use_cache=False), lease_data)
+        if isinstance(expected, type):
+            assert actual is None
+            continue
+        assert_schedules_match(actual, expected)
+    # Compact schedules truncated at a horizon, falling back as LeaseProcessor._results_only_schedule() does
+    window, horizon = (date(2019, 12, 31), date(2021, 12, 31)), date(2021, 12, 31)
+    schedules = generate_schedules_batch(leases, use_cache=False, accrual_windows=[window] * len(leases),
+                                         horizons=[horizon] * len(leases))
+    for lease_data, actual in zip(leases, schedules):
+        expected = run_generator(lambda ld: generate_compact_schedule(ld, window, horizon)
+                                 or generate_schedule_to_horizon(ld, horizon)
+                                 or generate_complete_schedule(ld, engine='scalar', use_cache=False), lease_data)
+        if isinstance(expected, type):
+            assert actual is None
+            continue
+        assert_schedules_match(actual, expected)
+
+    filters = ProcessingFilters(start_date=date(2020, 1, 1), end_date=date(2020, 12, 31), gaap_standard='IFRS')
+    # Full schedules, then the truncated and compact schedules of the bulk endpoint
+    for filters in (filters, replace(filters, results_only=True, compact_schedules=True)):
+        per_lease = ResultsProcessor(filters, workers=1, batch_min_leases=10 ** 9).process_bulk_leases(
+            copy.deepcopy(leases))
+        batched = ResultsProcessor(filters, workers=1, batch_min_leases=0).process_bulk_leases(copy.deepcopy(leases))
+        assert batched['processed_count'] == per_lease['processed_count'] > 0
+        assert batched == per_lease
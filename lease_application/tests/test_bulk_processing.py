@@ -0,0 +1,66 @@
+"""
+Tests for bulk lease processing (core/results_processor.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_bulk_processing.py -q
+"""
+
+import sys
+import os
+import copy
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.core.models import ProcessingFilters
+from lease_accounting.core.results_processor import ResultsProcessor
+from tests.schedule_helpers import ANNUAL_LEASE_G7, annual_lease, random_leases
+
+FILTERS = ProcessingFilters(start_date=date(2020, 1, 1), end_date=date(2020, 12, 31), gaap_standard='IFRS')
+
+
+def test_parallel_bulk_processing_matches_serial():
+    leases = random_leases(24, seed=41)
+    leases[5].modifies_this_id = leases[17].auto_id
+
+    serial_leases = copy.deepcopy(leases)
+    serial = ResultsProcessor(FILTERS, workers=1).process_bulk_leases(serial_leases)
+    parallel = ResultsProcessor(FILTERS, workers=2, chunk_size=5, parallel_min_leases=0).process_bulk_leases(leases)
+
+    assert serial['processed_count'] > 0
+    assert parallel == serial
+    assert [lease.calculated_fields for lease in leases] == [lease.calculated_fields for lease in serial_leases]
+
+
+def test_bulk_processing_results_of_a_known_lease():
+    filters = ProcessingFilters(start_date=date(2022, 1, 1), end_date=date(2022, 12, 31), gaap_standard='IFRS')
+    leases = [annual_lease(auto_id=n + 1) for n in range(3)]
+    results = ResultsProcessor(filters, workers=1).process_bulk_leases(leases)
+    assert results['processed_count'] == 3
+    # The period opens after the 2022-01-01 payment: G7 * 1.1 - 1000, accruing 10%
+    # for the 364 days to 2022-12-31; the ROU is depreciated for 364 of 1094 days
+    opening = 1.1 * ANNUAL_LEASE_G7 - 1000
+    for result in results['results']:
+        assert result['opening_liability'] == pytest.approx(opening, rel=1e-12)
+        assert result['rent_paid'] == 0.0
+        assert result['interest_expense'] == pytest.approx(opening * (1.1 ** (364 / 365) - 1), rel=1e-9)
+        assert result['closing_liability_total'] == pytest.approx(opening * 1.1 ** (364 / 365), rel=1e-9)
+        assert result['depreciation_expense'] == pytest.approx(ANNUAL_LEASE_G7 * 364 / 1094, rel=1e-9)
+
+def test_parallel_bulk_processing_falls_back_when_worker_cannot_be_pickled():
+    processor = ResultsProcessor(FILTERS, workers=2, chunk_size=5, parallel_min_leases=0)
+    # A lambda cannot be sent to a spawned/forkserver worker; None means process serially
+    assert processor._process_parallel(random_leases(10, seed=42), {}, lambda chunk, related: []) is None
+
+
+def _failing_bulk_worker(chunk, related):
+    raise TypeError("worker bug")
+
+
+def test_parallel_bulk_processing_propagates_worker_errors():
+    processor = ResultsProcessor(FILTERS, workers=2, chunk_size=5, parallel_min_leases=0)
+    # A bug inside a worker is not a reason to silently re-run everything serially
+    with pytest.raises(TypeError, match="worker bug"):
+        processor._process_parallel(random_leases(10, seed=42), {}, _failing_bulk_worker)
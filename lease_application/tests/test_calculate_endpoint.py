@@ -0,0 +1,229 @@
+"""
+Tests for the /api/calculate_lease endpoint (complete_lease_backend.py)
+
+Needs Flask and the database dependencies; the database is created in a
+temporary directory.
+"""
+
+import sys
+import os
+import json
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LEASE_REQUEST = {
+    'lease_start_date': '2024-01-01',
+    'first_payment_date': '2024-01-01',
+    'end_date': '2028-12-31',
+    'frequency_months': 1,
+    'day_of_month': '1',
+    'rental_1': 1000,
+    'borrowing_rate': 8,
+    'from_date': '2024-01-01',
+    'to_date': '2024-12-31',
+}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    flask = pytest.importorskip('flask')
+    pytest.importorskip('bcrypt')
+    pytest.importorskip('cryptography')
+    # database.py creates its file in the working directory on import
+    monkeypatch.chdir(tmp_path)
+    import complete_lease_backend
+
+    app = flask.Flask(__name__)
+    app.secret_key = 'test'
+    app.register_blueprint(complete_lease_backend.calc_bp)
+    return app.test_client()
+
+
+def test_calculate_lease_streams_valid_json(client):
+    response = client.post('/api/calculate_lease', json=LEASE_REQUEST)
+    assert response.status_code == 200
+    body = json.loads(response.get_data(as_text=True))
+    assert 'error' not in body
+    assert len(body['schedule']) > 60
+    assert body['lease_result']['opening_lease_liability'] > 0
+
+
+def test_calculate_lease_streams_without_building_the_schedule(client, monkeypatch):
+    from lease_accounting.core.models import LeaseData, ProcessingFilters
+    from lease_accounting.core.processor import LeaseProcessor
+    from lease_accounting.schedule import generator_vba_complete
+
+    # 2024-06-15 is not a schedule date: the to_date row is inserted into the stream
+    request = dict(LEASE_REQUEST, to_date='2024-06-15')
+    lease_data = LeaseData(
+        auto_id=0, lease_start_date=date(2024, 1, 1), first_payment_date=date(2024, 1, 1),
+        end_date=date(2028, 12, 31), frequency_months=1, day_of_month='1', rental_1=1000.0, borrowing_rate=8.0,
+    )
+    expected_rows = generator_vba_complete.generate_complete_schedule(lease_data, use_cache=False)
+    filters = ProcessingFilters(start_date=date(2024, 1, 1), end_date=date(2024, 6, 15))
+    expected_result = LeaseProcessor(filters).process_single_lease(lease_data, expected_rows)
+
+    def no_full_schedule(*args, **kwargs):
+        raise AssertionError("the full schedule list is not built")
+
+    monkeypatch.setattr(generator_vba_complete, 'generate_complete_schedule', no_full_schedule)
+    body = json.loads(client.post('/api/calculate_lease', json=request).get_data(as_text=True))
+    assert 'error' not in body
+    assert body['lease_result'] == expected_result.to_dict()
+    inserted = [row for row in body['schedule'] if row['date'] == '2024-06-15']
+    assert len(inserted) == 1 and inserted[0]['rental_amount'] == 0
+    assert [row for row in body['schedule'] if row['date'] != '2024-06-15'] == \
+        [row.to_dict() for row in expected_rows]
+
+
+def test_calculate_lease_reports_error_while_streaming(client, monkeypatch):
+    from lease_accounting.schedule import generator_vba_complete
+
+    iter_schedule = generator_vba_complete.iter_schedule
+
+    def failing_iter_schedule(lease_data, **kwargs):
+        for count, row in enumerate(iter_schedule(lease_data, **kwargs)):
+            if count == 3:
+                raise RuntimeError("schedule row failed")
+            yield row
+
+    monkeypatch.setattr(generator_vba_complete, 'iter_schedule', failing_iter_schedule)
+    response = client.post('/api/calculate_lease', json=LEASE_REQUEST)
+    # The status went out with the first chunk; the document stays valid JSON
+    body = json.loads(response.get_data(as_text=True))
+    assert body['error'] == "schedule row failed"
+    assert len(body['schedule']) == 3
+    assert 'lease_result' in body
+
+
+def test_calculate_lease_tracks_stored_leases_only(client):
+    from lease_accounting.schedule.cache import get_schedule_cache
+
+    cache = get_schedule_cache()
+    cache.clear()
+    # US-GAAP operating: results come from the full (cached) schedule
+    request = dict(LEASE_REQUEST, gaap_standard='US-GAAP')
+    for rental in (1000, 1200):
+        assert client.post('/api/calculate_lease', json=dict(request, rental_1=rental)).status_code == 200
+    # Form leases without an id are not anyone's latest schedule
+    assert len(cache) == 2 and cache.stats()['latest'] == 0
+    client.post('/api/calculate_lease', json=dict(request, auto_id=7, rental_1=1100)).get_data()
+    assert cache.stats()['latest'] == 1
+    cache.clear()
+
+
+def test_calculate_lease_extended_projections(client):
+    def projections(**options):
+        response = client.post('/api/calculate_lease', json=dict(LEASE_REQUEST, **options))
+        return json.loads(response.get_data(as_text=True))['lease_result']['projections']
+
+    # VBA mode: at most 6 periods
+    assert len(projections(projection_periods=8)) == 6
+    # Extended mode: consecutive quarters from to_date 2024-12-31 to the end date 2028-12-31
+    to_lease_end = projections(extended_projections=True, projection_periods=None)
+    assert len(to_lease_end) == 16
+    assert to_lease_end[-1]['projection_date'] == '2028-12-31'
+    assert len(projections(extended_projections=True, projection_periods=8, projection_period_months=1)) == 8
+
+    response = client.post('/api/calculate_lease', json=dict(LEASE_REQUEST, projection_periods=None))
+    assert response.status_code == 400
+
+
+def test_calculate_lease_ignores_invalid_auto_id(client):
+    response = client.post('/api/calculate_lease', json=dict(LEASE_REQUEST, auto_id='new'))
+    assert response.status_code == 200
+    assert 'error' not in json.loads(response.get_data(as_text=True))
+
+
+def test_calculate_lease_loads_the_modified_lease(client, tmp_path, monkeypatch):
+    import database
+
+    database.close_db_connections()
+    monkeypatch.setattr(database, 'DATABASE_PATH', str(tmp_path / 'modified.db'))
+    database.init_database()
+    user_id = database.create_user('modifier', 'secret')
+    lease = {key: value for key, value in LEASE_REQUEST.items() if key not in ('from_date', 'to_date')}
+    modified_id = database.save_lease(user_id, dict(lease, lease_name="Original", date_modified='2025-01-01'))
+    request = dict(LEASE_REQUEST, lease_start_date='2025-01-01', first_payment_date='2025-01-01',
+                   from_date='2025-01-01', to_date='2025-12-31', rental_1=1200,
+                   modifies_this_id=modified_id, date_modified='2025-01-01')
+
+    # Without a session the modified lease is not read: results as for the lease alone
+    anonymous = json.loads(client.post('/api/calculate_lease', json=request).get_data(as_text=True))
+    unmodified = dict(request, modifies_this_id=None)
+    alone = json.loads(client.post('/api/calculate_lease', json=unmodified).get_data(as_text=True))
+    assert anonymous['lease_result']['opening_rou_asset'] == alone['lease_result']['opening_rou_asset']
+
+    with client.session_transaction() as flask_session:
+        flask_session['user_id'] = user_id
+    modified = json.loads(client.post('/api/calculate_lease', json=request).get_data(as_text=True))
+    # Balances at the modification date, from the stored lease's schedule
+    from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
+    stored = database.get_leases_by_ids([modified_id], user_id, as_lease_data=True)[modified_id]
+    at_modification = next(row.to_dict() for row in generate_complete_schedule(stored, use_cache=False)
+                           if row.date == date(2025, 1, 1))
+    opening = modified['schedule'][0]
+    # VBA modify_calc() Line 800 with no ARO or security deposit: K9 = G7 - Liability_value,
+    # and the ROU carries over: I9 = I7 + K9 + ide with I7 = ROU_value and no ide
+    assert opening['date'] == '2025-01-01'
+    assert opening['change_in_rou'] == pytest.approx(opening['lease_liability'] - at_modification['lease_liability'])
+    assert opening['rou_asset'] == pytest.approx(at_modification['rou_asset'] + opening['change_in_rou'])
+    assert opening['rou_asset'] != pytest.approx(alone['schedule'][0]['rou_asset'])
+    assert modified['lease_result']['opening_rou_asset'] == pytest.approx(opening['rou_asset'])
+    
+    # The streamed schedule is the one the results were read from
+    result = modified['lease_result']
+    closing = next(row for row in modified['schedule'] if row['date'] == '2025-12-31')
+    assert closing['rou_asset'] == pytest.approx(result['closing_rou_asset'])
+    assert closing['lease_liability'] == pytest.approx(
+        result['closing_lease_liability_current'] + result['closing_lease_liability_non_current'])
+    database.close_db_connections()
+
+
+def test_calculate_leases_generates_schedules_in_one_batch(client, tmp_path, monkeypatch):
+    pytest.importorskip('numpy')
+    import database
+    from lease_accounting.core import results_processor
+
+    database.close_db_connections()
+    monkeypatch.setattr(database, 'DATABASE_PATH', str(tmp_path / 'bulk.db'))
+    database.init_database()
+    user_id = database.create_user('bulk', 'secret')
+    lease = {key: value for key, value in LEASE_REQUEST.items() if key not in ('from_date', 'to_date')}
+    # Leases ending within and after the results horizon (a year past to_date)
+    lease_ids = [database.save_lease(user_id, dict(lease, lease_name=f"Lease {i}", rental_1=1000 + 250 * i,
+                                                   end_date=f"{2025 + i}-12-31"))
+                 for i in range(6)]
+    with client.session_transaction() as flask_session:
+        flask_session['user_id'] = user_id
+
+    runs = []
+    generate_schedules_batch = results_processor.generate_schedules_batch
+
+    def recording_batch(lease_data_list, **kwargs):
+        schedules = generate_schedules_batch(lease_data_list, **kwargs)
+        runs.append((kwargs, schedules))
+        return schedules
+
+    monkeypatch.setattr(results_processor, 'generate_schedules_batch', recording_batch)
+    monkeypatch.setattr(results_processor, 'DEFAULT_BATCH_MIN_LEASES', 2)
+    request = {'from_date': '2025-01-01', 'to_date': '2025-12-31', 'lease_ids': lease_ids}
+    batched = client.post('/api/calculate_leases', json=request).get_json()
+    assert batched['success'] and batched['stats']['processed_count'] == 6
+
+    # Compact schedules, truncated at the horizon for the leases running past it
+    assert len(runs) == 1
+    kwargs, schedules = runs[0]
+    assert all(window is not None for window in kwargs['accrual_windows'])
+    assert sum(horizon is not None for horizon in kwargs['horizons']) == 4
+    assert all(schedules)
+
+    monkeypatch.setattr(results_processor, 'DEFAULT_BATCH_MIN_LEASES', 10 ** 9)
+    per_lease = client.post('/api/calculate_leases', json=request).get_json()
+    assert len(runs) == 1
+    assert batched['results'] == per_lease['results']
+    assert batched['aggregated_totals'] == per_lease['aggregated_totals']
+    database.close_db_connections()
@@ -0,0 +1,120 @@
+"""
+Tests for compact schedules (generate_compact_schedule(), compact_schedule_row())
+
+Run from lease_application/:
+    python -m pytest tests/test_compact_schedule.py -q
+"""
+
+import sys
+import os
+from dataclasses import asdict
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.core.models import LeaseData, ProcessingFilters
+from lease_accounting.core.processor import LeaseProcessor
+from lease_accounting.schedule.generator_vba_complete import (
+    compact_schedule_row, generate_compact_schedule, generate_complete_schedule,
+)
+from tests.schedule_helpers import assert_schedules_match, monthly_lease
+
+WINDOW = (date(2024, 1, 1), date(2024, 12, 31))
+
+
+def quarterly_lease(**terms) -> LeaseData:
+    """Twenty years of quarterly rent on the 10th, escalating 3% a year, with ARO and deposit"""
+    values = dict(
+        auto_id=1, lease_start_date=date(2012, 4, 10), first_payment_date=date(2012, 4, 10),
+        end_date=date(2032, 4, 9), frequency_months=3, day_of_month='10', accrual_day=1, rental_1=25000.0,
+        escalation_percent=3, esc_freq_months=12, escalation_start=date(2012, 4, 10), borrowing_rate=8.0,
+        aro=3000.0, aro_table=1, security_deposit=10000.0, security_discount=6.0, gaap_standard='IFRS',
+    )
+    values.update(terms)
+    return LeaseData(**values)
+
+
+LEASES = {
+    'quarterly': quarterly_lease(),
+    'quarterly with deposit increase': quarterly_lease(security_dates=[date(2020, 4, 10)], increase_security_1=500.0),
+    'monthly': monthly_lease(end_date=date(2045, 12, 31)),
+}
+
+
+@pytest.mark.parametrize('lease_data', LEASES.values(), ids=list(LEASES))
+def test_compact_schedule_keeps_payment_rows_and_window_month_ends(lease_data):
+    full_schedule = generate_complete_schedule(lease_data, use_cache=False)
+    # Every month-end row built: the full schedule
+    assert_schedules_match(generate_compact_schedule(lease_data, (date.min, date.max)), full_schedule)
+
+    schedule = generate_compact_schedule(lease_data, WINDOW)
+    kept = {row.date for row in schedule}
+    payments = {row.date for row in full_schedule if row.rental_amount}
+    month_ends_in_window = {row.date for row in full_schedule
+                            if WINDOW[0] <= row.date <= WINDOW[1] and (row.date.replace(day=28) != row.date
+                                                                       or row.date.month == 2)}
+    assert payments <= kept and month_ends_in_window <= kept
+    assert len(schedule) < len(full_schedule)
+
+    # Balances on the kept rows as in the full schedule; flows summed into them
+    full_rows = {row.date: row for row in full_schedule}
+    for row in schedule:
+        expected = full_rows[row.date]
+        for field in ('rental_amount', 'pv_factor', 'lease_liability', 'rou_asset',
+                      'security_deposit_pv', 'aro_provision', 'remaining_balance'):
+            assert getattr(row, field) == getattr(expected, field), f"{row.date} {field}"
+    for field in ('interest', 'depreciation', 'aro_interest', 'change_in_rou', 'principal'):
+        assert sum(getattr(row, field) or 0.0 for row in schedule) == pytest.approx(
+            sum(getattr(row, field) or 0.0 for row in full_schedule), rel=1e-9, abs=1e-6)
+
+
+@pytest.mark.parametrize('lease_data', LEASES.values(), ids=list(LEASES))
+@pytest.mark.parametrize('results_only', [False, True])
+def test_compact_schedule_results_match_full_schedule(lease_data, results_only):
+    filters = ProcessingFilters(start_date=WINDOW[0], end_date=WINDOW[1], projection_periods=4,
+                                projection_period_months=3, results_only=results_only)
+    full = asdict(LeaseProcessor(filters).process_single_lease(lease_data))
+    compact = asdict(LeaseProcessor(ProcessingFilters(**{**asdict(filters), 'compact_schedules': True})
+                                    ).process_single_lease(lease_data))
+    full_projections, compact_projections = full.pop('projections'), compact.pop('projections')
+    assert compact == pytest.approx(full, rel=1e-9, abs=1e-6)
+    assert len(compact_projections) == len(full_projections)
+    for actual, expected in zip(compact_projections, full_projections):
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-6)
+
+
+def test_compact_schedule_row_derives_left_out_month_ends():
+    # Quarterly rent on the 10th: the month-end rows of 2030 are left out of a
+    # compact schedule for a 2024 reporting window, and derived one at a time
+    lease_data = quarterly_lease()
+    full_rows = {row.date: row for row in generate_complete_schedule(lease_data, use_cache=False)}
+    compact_dates = {row.date for row in generate_compact_schedule(lease_data, WINDOW)}
+    for month_end in (date(2030, 5, 31), date(2030, 8, 31), date(2032, 3, 31)):
+        assert month_end not in compact_dates
+        row = compact_schedule_row(lease_data, month_end)
+        assert row.to_dict() == full_rows[month_end].to_dict()
+    # Payment rows are served too; dates without a row are not interpolated
+    assert compact_schedule_row(lease_data, date(2030, 7, 10)).to_dict() == full_rows[date(2030, 7, 10)].to_dict()
+    assert compact_schedule_row(lease_data, date(2030, 7, 11)) is None
+
+
+def test_compact_schedule_transition_2b_accumulated_depreciation():
+    # Transition 2B: accumulated depreciation sums every row after transition_date,
+    # long before the reporting window; transition_date - 1 is not a month-end and
+    # falls between two quarterly payments
+    lease_data = quarterly_lease(aro=0.0, aro_table=0, security_deposit=0.0, security_discount=0.0,
+                                 transition_option='2B', transition_date=date(2019, 6, 15))
+    for start in (date(2024, 1, 1), date(2028, 7, 1)):
+        filters = ProcessingFilters(start_date=start, end_date=date(start.year, 12, 31))
+        full = LeaseProcessor(filters).process_single_lease(lease_data)
+        for results_only in (False, True):
+            compact = LeaseProcessor(ProcessingFilters(start_date=start, end_date=date(start.year, 12, 31),
+                                                       results_only=results_only, compact_schedules=True)
+                                     ).process_single_lease(lease_data)
+            assert full.accumulated_depreciation > 0
+            assert compact.accumulated_depreciation == pytest.approx(full.accumulated_depreciation, rel=1e-9)
+            full_dict, compact_dict = asdict(full), asdict(compact)
+            full_dict.pop('projections'), compact_dict.pop('projections')
+            assert compact_dict == pytest.approx(full_dict, rel=1e-9, abs=1e-6)
@@ -0,0 +1,217 @@
+"""
+Tests for the database layer (database.py)
+
+Needs the database dependencies (bcrypt, cryptography); every test works on its
+own database file in a temporary directory.
+"""
+
+import sys
+import os
+import json
+import sqlite3
+import threading
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LEASE = {
+    'lease_name': 'Office',
+    'lease_start_date': '2024-01-01',
+    'first_payment_date': '2024-01-01',
+    'end_date': '2028-12-31',
+    'frequency_months': 1,
+    'day_of_month': '1',
+    'rental_1': 1000.0,
+    'borrowing_rate': 8.0,
+}
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    pytest.importorskip('bcrypt')
+    pytest.importorskip('cryptography')
+    # database.py creates its file in the working directory on import
+    monkeypatch.chdir(tmp_path)
+    import database
+
+    database.close_db_connections()
+    monkeypatch.setattr(database, 'DATABASE_PATH', str(tmp_path / 'test.db'))
+    database.init_database()
+    yield database
+    database.close_db_connections()
+
+
+def add_leases(db, user_id, count, **fields):
+    return [db.save_lease(user_id, dict(LEASE, lease_name=f"Lease {i}", **fields)) for i in range(count)]
+
+
+def bulk_results(count):
+    return {
+        'results': [{'lease_id': i + 1, 'cost_centre': 'CC1' if i % 2 else 'CC2', 'closing_lease_liability': i * 10.0}
+                    for i in range(count)],
+        'aggregated_totals': {'closing_lease_liability': sum(i * 10.0 for i in range(count))},
+        'consolidated_journals': [{'account_name': 'Lease Liability', 'result_period': 1.5}],
+        'processed_count': count,
+        'skipped_count': 0,
+    }
+
+
+def test_pool_reuses_connections_and_nests_savepoints(db):
+    user_id = db.create_user('pool', 'secret')
+    before = db.get_pool_stats()
+    with db.get_db_connection() as conn:
+        with db.get_db_connection() as nested:
+            assert nested is conn
+        # A failing nested block rolls back its own statements only
+        with pytest.raises(sqlite3.IntegrityError):
+            with db.get_db_connection() as nested:
+                nested.execute("INSERT INTO leases (user_id, lease_name) VALUES (?, 'kept?')", (user_id,))
+                nested.execute("INSERT INTO users (username, password_hash) VALUES ('pool', 'x')")
+        conn.execute("INSERT INTO leases (user_id, lease_name) VALUES (?, 'kept')", (user_id,))
+    with db.get_db_connection() as conn:
+        names = [row['lease_name'] for row in conn.execute("SELECT lease_name FROM leases")]
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert names == ['kept']
+    stats = db.get_pool_stats()
+    assert stats['reuses'] > before['reuses'] and stats['nested'] >= before['nested'] + 2
+    assert stats['in_use'] == 0
+
+    # Threads get their own connections
+    errors = []
+
+    def read():
+        try:
+            with db.get_db_connection() as conn:
+                conn.execute("SELECT COUNT(*) FROM leases").fetchone()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == [] and db.get_pool_stats()['in_use'] == 0
+
+
+def test_get_leases_by_ids_chunks_and_scopes(db, monkeypatch):
+    owner = db.create_user('owner', 'secret')
+    other = db.create_user('other', 'secret')
+    owned = add_leases(db, owner, 5)
+    foreign = add_leases(db, other, 2)
+    monkeypatch.setattr(db, 'IN_CHUNK_SIZE', 2)
+
+    requested = [owned[3], foreign[0], owned[0], 999, owned[3], owned[1]]
+    leases = db.get_leases_by_ids(requested)
+    assert list(leases) == [owned[3], foreign[0], owned[0], owned[1]]
+    assert leases[foreign[0]]['username'] == 'other'
+    assert list(db.get_leases_by_ids(requested, user_scope=owner)) == [owned[3], owned[0], owned[1]]
+
+    lease_data = db.get_leases_by_ids(owned, as_lease_data=True)
+    assert [lease.auto_id for lease in lease_data.values()] == owned
+    first = lease_data[owned[0]]
+    assert first.lease_start_date == date(2024, 1, 1) and first.end_date == date(2028, 12, 31)
+    assert first.rental_1 == 1000.0 and first.frequency_months == 1
+
+
+def test_lease_list_keyset_pages(db):
+    user_id = db.create_user('pager', 'secret')
+    lease_ids = add_leases(db, user_id, 7, cost_centre='CC1') + add_leases(db, user_id, 3, cost_centre='CC2')
+    everything = db.get_all_leases(user_id)
+    assert sorted(lease['lease_id'] for lease in everything) == sorted(lease_ids)
+
+    pages, after = [], None
+    while True:
+        page = db.get_all_leases(user_id, after=after, limit=3) if after else db.get_all_leases(user_id, limit=3)
+        if not page:
+            break
+        pages.append([lease['lease_id'] for lease in page])
+        after = db.lease_page_cursor(page[-1])
+    assert [lease_id for page in pages for lease_id in page] == [lease['lease_id'] for lease in everything]
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+
+    filtered = db.get_all_leases(user_id, filters={'cost_centre': 'CC2'})
+    assert len(filtered) == 3 and all(lease['cost_centre'] == 'CC2' for lease in filtered)
+    with pytest.raises(ValueError):
+        db.get_all_leases(user_id, filters={'lease_name; DROP TABLE leases': 'x'})
+    with pytest.raises(ValueError):
+        db.get_all_leases(user_id, after='not a cursor')
+
+
+def test_bulk_results_round_trip_and_pages(db):
+    user_id = db.create_user('bulk', 'secret')
+    other = db.create_user('someone', 'secret')
+    results = bulk_results(7)
+    summary_id = db.save_bulk_results(user_id, date(2024, 1, 1), date(2024, 12, 31), {'gaap_standard': 'IFRS'}, results)
+
+    summary = db.get_bulk_results(summary_id, user_id)
+    assert summary['lease_count'] == 7 and summary['processed_count'] == 7
+    assert summary['aggregated_totals'] == results['aggregated_totals']
+    assert summary['filters_applied'] == {'gaap_standard': 'IFRS'}
+    assert 'consolidated_journals' not in summary
+    assert db.get_bulk_results(summary_id, user_id, include_journals=True)['consolidated_journals'] == \
+        results['consolidated_journals']
+    assert db.get_bulk_results(summary_id, other) is None
+    assert db.get_bulk_results(summary_id) is not None
+
+    rows = db.get_bulk_result_rows(summary_id)
+    assert [row['lease_id'] for row in rows] == [1, 2, 3, 4, 5, 6, 7]
+    assert [row['position'] for row in rows] == list(range(7))
+    assert [row['lease_id'] for row in db.get_bulk_result_rows(summary_id, filters={'cost_centre': 'CC1'})] == [2, 4, 6]
+    assert paged_lease_ids(db, summary_id) == [1, 2, 3, 4, 5, 6, 7]
+    assert paged_lease_ids(db, summary_id, {'cost_centre': 'CC2'}) == [1, 3, 5, 7]
+    with pytest.raises(ValueError):
+        db.get_bulk_result_rows(summary_id, filters={'result_data': 'x'})
+
+
+def paged_lease_ids(db, summary_id, filters=None, limit=3):
+    lease_ids, after = [], None
+    while True:
+        page = db.get_bulk_result_rows(summary_id, filters=filters, after=after, limit=limit)
+        if not page:
+            return lease_ids
+        lease_ids.extend(row['lease_id'] for row in page)
+        after = page[-1]['position']
+
+
+def test_migrations_upgrade_unversioned_database(db, tmp_path, monkeypatch):
+    # A database created before schema versioning: the base tables at user_version 0,
+    # with a bulk run stored in the results_data JSON column
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    db._migration_base_schema(conn)
+    conn.execute("INSERT INTO users (username, password_hash) VALUES ('legacy', 'x')")
+    results = bulk_results(5)
+    conn.execute("""
+        INSERT INTO results_summary
+        (user_id, from_date, to_date, filters_applied, results_data, aggregated_totals, consolidated_journals,
+         processed_count, skipped_count)
+        VALUES (1, '2024-01-01', '2024-12-31', '{}', ?, ?, ?, 5, 0)
+    """, (json.dumps(results['results'] + [None]), json.dumps(results['aggregated_totals']),
+          json.dumps(results['consolidated_journals'])))
+    conn.commit()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+    conn.close()
+
+    db.close_db_connections()
+    monkeypatch.setattr(db, 'DATABASE_PATH', path)
+    db.init_database()
+    with db.get_db_connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == db.SCHEMA_VERSION == 3
+        indexes = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {'idx_leases_created', 'idx_results_leases_entity'} <= indexes
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(results_summary)")}
+        assert {'aggregated_totals_blob', 'consolidated_journals_blob', 'results_data'} <= columns
+    # Migrating again is a no-op
+    db.init_database()
+
+    summary = db.get_bulk_results(1, include_journals=True)
+    assert summary['lease_count'] == 5
+    assert summary['aggregated_totals'] == results['aggregated_totals']
+    assert summary['consolidated_journals'] == results['consolidated_journals']
+    assert [row['lease_id'] for row in db.get_bulk_result_rows(1)] == [1, 2, 3, 4, 5]
+    # Legacy runs page like stored ones
+    assert paged_lease_ids(db, 1, limit=2) == [1, 2, 3, 4, 5]
+    assert paged_lease_ids(db, 1, {'cost_centre': 'CC1'}, limit=1) == [2, 4]
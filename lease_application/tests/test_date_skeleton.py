@@ -0,0 +1,75 @@
+"""
+Tests for datessrent() row plotting (schedule/date_skeleton.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_date_skeleton.py -q
+"""
+
+import sys
+import os
+import calendar
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.core.models import LeaseData
+from lease_accounting.schedule.generator_vba_complete import (
+    generate_complete_schedule,
+    generate_complete_schedule_reference,
+)
+from tests.schedule_helpers import annual_lease, assert_schedules_match, random_leases, run_generator
+
+
+def month_ends(year: int):
+    return [date(year, month, calendar.monthrange(year, month)[1]) for month in range(1, 13)]
+
+
+def test_annual_lease_plots_payments_and_month_ends():
+    schedule = generate_complete_schedule(annual_lease(), use_cache=False)
+    # C9 is the first payment; each later payment follows the month-end rows of its year
+    expected = [date(2021, 1, 1)] + month_ends(2021) + [date(2022, 1, 1)] + month_ends(2022) \
+        + [date(2023, 1, 1)] + month_ends(2023)
+    assert [row.date for row in schedule] == expected
+    assert [row.date for row in schedule if row.rental_amount] == [date(2021, 1, 1), date(2022, 1, 1), date(2023, 1, 1)]
+    assert schedule[0].is_opening and not any(row.is_opening for row in schedule[1:])
+
+
+def test_quarterly_payments_after_the_start_date():
+    lease_data = annual_lease(frequency_months=3, compound_months=3, day_of_month='15',
+                              first_payment_date=date(2021, 1, 15), end_date=date(2021, 12, 31))
+    schedule = generate_complete_schedule(lease_data, use_cache=False)
+    payments = [date(2021, 1, 15), date(2021, 4, 15), date(2021, 7, 15), date(2021, 10, 15)]
+    # C9 is the start date, without rent; payments fall between the month ends
+    assert schedule[0].date == date(2021, 1, 1) and schedule[0].rental_amount == 0.0
+    assert [row.date for row in schedule[1:]] == sorted(payments + month_ends(2021))
+    assert [row.date for row in schedule if row.rental_amount == 1000.0] == payments
+
+
+def test_date_skeleton_long_lease_and_end_date_quirks():
+    # 99-year land lease, monthly, paid on the 1st: the end date is a month end
+    # so VBA plots one extra payment row on the following day
+    lease_data = LeaseData(
+        auto_id=1,
+        lease_start_date=date(2000, 1, 1),
+        first_payment_date=date(2000, 1, 1),
+        end_date=date(2098, 12, 31),
+        frequency_months=1,
+        day_of_month='1',
+        rental_1=150000.0,
+        escalation_percent=3.0,
+        borrowing_rate=8.0,
+        purchase_option_price=1000.0,
+    )
+    schedule = generate_complete_schedule(lease_data)
+    assert_schedules_match(schedule, generate_complete_schedule_reference(lease_data))
+    assert schedule[-1].date == date(2099, 1, 1)
+
+
+def test_date_skeleton_matches_day_loop():
+    for lease_data in random_leases(150):
+        expected = run_generator(generate_complete_schedule_reference, lease_data)
+        actual = run_generator(generate_complete_schedule, lease_data)
+        if isinstance(expected, type):
+            assert actual is expected
+        else:
+            assert_schedules_match(actual, expected)
@@ -0,0 +1,33 @@
+"""
+Tests for the discount factor cache (utils/discount_factors.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_discount_factors.py -q
+"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.utils.discount_factors import DiscountFactorCache
+
+
+def test_discount_factor_cache_matches_formula_and_evicts():
+    cache = DiscountFactorCache(max_factors=100)
+    curve = cache.curve(0.08, 3)
+    assert cache.curve(0.08, 3) is curve
+    days = [0, 1, 30, 31, 365, 366, 3652]
+    assert curve.discount_many(days) == [1 / ((1 + 0.08 * 3 / 12) ** ((d / 365) * 12 / 3)) for d in days]
+    assert curve.compound_many(days) == [(1 + 0.08 * 3 / 12) ** ((d / 365) * 12 / 3) for d in days]
+    # A year at 8% compounded quarterly: 1.02^4
+    assert curve.compound(365) == pytest.approx(1.02 ** 4, rel=1e-15)
+    assert curve.discount(730) == pytest.approx(1.02 ** -8, rel=1e-15)
+
+    curve.discount_many(range(60))
+    other = cache.curve(0.05, 1)
+    other.discount_many(range(60))
+    cache.curve(0.05, 1)
+    assert cache.stats()['evictions'] == 1 and cache.curve(0.08, 3) is not curve
@@ -0,0 +1,78 @@
+"""
+Tests for the escalation engine (schedule/escalation.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_escalation.py -q
+"""
+
+import sys
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.schedule.escalation import (
+    EscalationTable, UnitEscalation, escalation_basis, escalation_terms,
+)
+from lease_accounting.schedule.generator_vba_complete import findrent, generate_complete_schedule
+from tests.schedule_helpers import monthly_lease, random_leases, run_generator
+
+
+def test_findrent_escalates_yearly_from_the_escalation_start():
+    lease_data = monthly_lease()
+    # Rent n runs for the 12 months to its app_rent_date at 1000 * 1.05^(n-1)
+    for n in range(1, 6):
+        assert findrent(lease_data, n) == (pytest.approx(1000 * 1.05 ** (n - 1), rel=1e-12), date(2020 + n, 12, 31))
+    # The last rent holds to the end date
+    assert findrent(lease_data, 6) == findrent(lease_data, 5)
+
+    # Escalation from mid-2021: the first rent runs to the first anniversary of it
+    later = monthly_lease(escalation_start=date(2021, 7, 1))
+    assert findrent(later, 1) == (1000.0, date(2022, 6, 30))
+    assert findrent(later, 2) == (pytest.approx(1050.0), date(2023, 6, 30))
+
+    # 0.05 is read as 5% (Excel percentage cells)
+    assert findrent(monthly_lease(escalation_percent=0.05), 3)[0] == pytest.approx(1102.5)
+    assert escalation_basis(monthly_lease(escalation_percent=0)) is None
+
+
+def test_schedule_rents_follow_the_escalation_table():
+    lease_data = monthly_lease()
+    rents = defaultdict(set)
+    for row in generate_complete_schedule(lease_data, use_cache=False):
+        if row.rental_amount and row.date <= lease_data.end_date:
+            rents[row.date.year].add(round(row.rental_amount, 6))
+    assert dict(rents) == {2021 + n: {round(1000 * 1.05 ** n, 6)} for n in range(5)}
+
+    table = EscalationTable(lease_data)
+    # Out of order lookups are served from the same forward-filled entries
+    for rent_no in [3, 1, 2] + list(range(1, 10)):
+        assert table.rent(rent_no) == findrent(lease_data, rent_no)
+
+
+def test_escalation_table_matches_findrent():
+    for lease_data in random_leases(150, seed=11):
+        try:
+            table = EscalationTable(lease_data)
+        except Exception as e:
+            assert run_generator(lambda ld: findrent(ld, 1), lease_data) is type(e)
+            continue
+        for rent_no in range(1, 60):
+            assert table.rent(rent_no) == findrent(lease_data, rent_no)
+
+
+def test_unit_escalation_shared_across_threads():
+    basis = escalation_basis(monthly_lease(rental_1=2500.0))
+    unit = UnitEscalation(basis)
+    # Each thread walks its own table over the shared unit, as leases do in a batch
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: [unit.terms(app) for app in range(1, 30)], range(16)))
+    expected = [escalation_terms(basis, app) for app in range(1, 30)]
+    assert unit.entries == expected
+    assert all(result == expected for result in results)
+    # Multipliers of Rental_1, so leases with other rents share them
+    assert expected[2][0] == (pytest.approx(1.05 ** 2),)
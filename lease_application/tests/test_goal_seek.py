@@ -0,0 +1,90 @@
+"""
+Tests for the FV of ROU goal seek (schedule/goal_seek.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_goal_seek.py -q
+"""
+
+import sys
+import os
+import copy
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.schedule import generator_vba_complete, multi_gaap
+from lease_accounting.schedule.cache import ScheduleCache
+from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
+from tests.schedule_helpers import ANNUAL_LEASE_G7, annual_lease, monthly_lease
+
+
+def test_goal_seek_finds_the_rate_that_discounts_rents_to_fv_of_rou():
+    # The annual lease's rents are worth ANNUAL_LEASE_G7 at 10%: seeking that value
+    # from a borrowing rate of 8% solves C7 = 10%
+    lease_data = annual_lease(borrowing_rate=8.0, fv_of_rou=ANNUAL_LEASE_G7)
+    schedule = generate_complete_schedule(lease_data, use_cache=False)
+    fields = lease_data.calculated_fields
+    assert fields['goal_seek_converged']
+    assert 0 < fields['goal_seek_iterations'] <= 20 and fields['goal_seek_seconds'] >= 0
+    assert fields['goal_seek_rate'] == pytest.approx(10.0, rel=1e-7)
+    # VBA Line 685: G7 = FV_of_RoU
+    assert schedule[0].lease_liability == lease_data.fv_of_rou
+    assert sum(row.pv_of_rent for row in schedule) == pytest.approx(ANNUAL_LEASE_G7, rel=1e-9)
+    second_payment = next(row for row in schedule if row.date == date(2022, 1, 1))
+    assert second_payment.pv_factor == pytest.approx(1 / 1.1, rel=1e-7)
+
+
+@pytest.mark.parametrize('gaap_standard', ['IFRS', 'US-GAAP'])
+def test_goal_seek_columns_equal_those_at_the_solved_rate(gaap_standard):
+    reference = generate_complete_schedule(monthly_lease(gaap_standard=gaap_standard), use_cache=False)
+    lease_data = monthly_lease(gaap_standard=gaap_standard, fv_of_rou=0.9 * reference[0].lease_liability)
+    schedule = generate_complete_schedule(lease_data, use_cache=False)
+    fields = lease_data.calculated_fields
+    assert fields['goal_seek_converged']
+    # A lower present value needs a higher rate
+    assert fields['goal_seek_rate'] > 10.0
+    assert sum(row.pv_of_rent for row in schedule) == pytest.approx(lease_data.fv_of_rou, rel=1e-9)
+
+    # E-I columns as with the borrowing rate set to the solved rate
+    at_rate = monthly_lease(gaap_standard=gaap_standard, borrowing_rate=fields['goal_seek_rate'])
+    columns = ['pv_factor', 'interest', 'lease_liability', 'pv_of_rent']
+    if gaap_standard != 'US-GAAP':
+        columns += ['depreciation', 'rou_asset']
+    for row, expected in zip(schedule, generate_complete_schedule(at_rate, use_cache=False)):
+        for column in columns:
+            assert getattr(row, column) == pytest.approx(getattr(expected, column), rel=1e-7, abs=1e-3), column
+
+
+def test_fv_of_rou_goal_seek_fields_survive_cache_hits(monkeypatch):
+    lease_data = annual_lease(borrowing_rate=8.0, fv_of_rou=ANNUAL_LEASE_G7)
+    cache = ScheduleCache()
+    monkeypatch.setattr(generator_vba_complete, 'get_schedule_cache', lambda: cache)
+    first = copy.deepcopy(lease_data)
+    generate_complete_schedule(first)
+    # Same content, new object: served from the cache
+    second = copy.deepcopy(lease_data)
+    second.calculated_fields = {}
+    schedule = generate_complete_schedule(second)
+    assert cache.stats()['hits'] == 1
+    assert first.calculated_fields['goal_seek_converged']
+    for name in generator_vba_complete.GOAL_SEEK_FIELDS:
+        assert second.calculated_fields[name] == first.calculated_fields[name]
+    assert schedule[0].lease_liability == lease_data.fv_of_rou
+
+    # Multi-GAAP generation stores and restores them too, and does not drop the
+    # ones generate_complete_schedule() finds under the same key
+    cache.clear()
+    monkeypatch.setattr(multi_gaap, 'get_schedule_cache', lambda: cache)
+    by_standard = copy.deepcopy(lease_data)
+    multi_gaap.generate_schedules_by_standard(by_standard)
+    assert by_standard.calculated_fields['goal_seek_converged']
+    for target in (multi_gaap.generate_schedules_by_standard, generate_complete_schedule):
+        later = copy.deepcopy(lease_data)
+        later.calculated_fields = {}
+        hits = cache.stats()['hits']
+        target(later)
+        assert cache.stats()['hits'] > hits
+        for name in generator_vba_complete.GOAL_SEEK_FIELDS:
+            assert later.calculated_fields[name] == by_standard.calculated_fields[name]
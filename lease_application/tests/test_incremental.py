@@ -0,0 +1,129 @@
+"""
+Tests for incremental schedule recomputation (schedule/incremental.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_incremental.py -q
+"""
+
+import sys
+import os
+import copy
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.schedule.cache import get_schedule_cache
+from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
+from lease_accounting.schedule.incremental import (
+    first_affected_row, recalculate_edited_schedule, recalculate_schedule,
+)
+from tests.schedule_helpers import assert_schedules_match, monthly_lease
+
+EDITED_ON = date(2023, 3, 1)
+
+
+def full(lease_data):
+    return generate_complete_schedule(lease_data, use_cache=False)
+
+
+def edit(lease_data, **changes):
+    edited = copy.deepcopy(lease_data)
+    for name, value in changes.items():
+        setattr(edited, name, value)
+    return edited
+
+
+# Edits dated EDITED_ON that leave the rent stream, and so G7, alone
+UNCHANGED_G7_EDITS = {
+    'impairment': dict(impairment_dates=[EDITED_ON], impairment1=777.0),
+    'security deposit increase': dict(security_dates=[EDITED_ON], increase_security_1=500.0),
+}
+
+
+@pytest.mark.parametrize('changes', UNCHANGED_G7_EDITS.values(), ids=list(UNCHANGED_G7_EDITS))
+def test_rows_before_the_edit_are_reused_as_they_are(changes):
+    lease_data = monthly_lease()
+    previous = full(lease_data)
+    edited = edit(lease_data, **changes)
+    first = first_affected_row(lease_data, previous, edited)
+    assert previous[first].date == EDITED_ON
+    kept = list(previous[:first])
+    actual = recalculate_schedule(lease_data, copy.deepcopy(previous), edited)
+    assert_schedules_match(actual, full(edited))
+    assert_schedules_match(actual[:first], kept)
+
+
+def test_impairment_adds_to_depreciation_on_its_date():
+    lease_data = monthly_lease()
+    previous = full(lease_data)
+    edited = edit(lease_data, **UNCHANGED_G7_EDITS['impairment'])
+    actual = recalculate_schedule(lease_data, copy.deepcopy(previous), edited)
+    for old, new in zip(previous, actual):
+        assert new.depreciation == pytest.approx(old.depreciation + (777.0 if new.date == EDITED_ON else 0.0))
+
+
+def test_rent_edits_reuse_the_rows_before_the_first_changed_rent():
+    lease_data = monthly_lease()
+    previous = full(lease_data)
+    # Manual rent on one payment date: addmanualadj() runs after basic_calc(), so
+    # only that row's D and H change
+    edited = edit(lease_data, manual_adj='Yes', rental_dates=[EDITED_ON], rental_2=1234.0)
+    first = first_affected_row(lease_data, previous, edited)
+    assert previous[first].date == EDITED_ON
+    actual = recalculate_schedule(lease_data, copy.deepcopy(previous), edited)
+    assert_schedules_match(actual, full(edited), rel_tol=1e-9, abs_tol=1e-6)
+    assert actual[first].rental_amount == 1234.0
+    assert actual[first].pv_of_rent == pytest.approx(1234.0 * previous[first].pv_factor, rel=1e-12)
+    assert actual[0].lease_liability == previous[0].lease_liability
+
+    # A later escalation start: rents from 2022 change, the 2021 rows are reused
+    edited = edit(lease_data, escalation_start=date(2021, 7, 1))
+    first = first_affected_row(lease_data, previous, edited)
+    assert previous[first].date == date(2022, 1, 1)
+    assert_schedules_match(recalculate_schedule(lease_data, copy.deepcopy(previous), edited), full(edited),
+                           rel_tol=1e-9, abs_tol=1e-6)
+
+    # Rental_1 changes every rent: nothing to reuse
+    edited = edit(lease_data, rental_1=1100.0)
+    assert first_affected_row(lease_data, previous, edited) <= 1
+    assert_schedules_match(recalculate_schedule(lease_data, copy.deepcopy(previous), edited), full(edited))
+
+
+def test_edits_reusing_all_or_no_rows():
+    lease_data = monthly_lease()
+    previous = full(lease_data)
+    edited = edit(lease_data, description='renamed')
+    assert first_affected_row(lease_data, previous, edited) == len(previous)
+    assert recalculate_schedule(lease_data, previous, edited) == previous
+    # New dates: regenerated in full
+    edited = edit(lease_data, end_date=date(2026, 12, 31))
+    assert first_affected_row(lease_data, previous, edited) == 0
+    assert_schedules_match(recalculate_schedule(lease_data, copy.deepcopy(previous), edited), full(edited))
+    # ARO revisions apply from C9 (VBA Lines 65-73): nothing to reuse either
+    lease_data = monthly_lease(aro=3000.0, aro_table=1)
+    previous = full(lease_data)
+    edited = edit(lease_data, aro_dates=[EDITED_ON], aro_revisions=[5000.0])
+    assert first_affected_row(lease_data, previous, edited) == 0
+    assert_schedules_match(recalculate_schedule(lease_data, copy.deepcopy(previous), edited), full(edited))
+
+
+def test_recalculate_edited_schedule_is_opt_in_and_uncached():
+    # The edited lease is rebuilt from its previous schedule, and neither that nor
+    # a plain cache miss is served from the incremental result
+    cache = get_schedule_cache()
+    cache.clear()
+    lease_data = monthly_lease(auto_id=7)
+    generate_complete_schedule(lease_data)
+    lease_data.rental_1 *= 1.1
+    assert cache.latest_for(lease_data, 'scalar') is not None
+    assert_schedules_match(recalculate_edited_schedule(lease_data), full(lease_data), rel_tol=1e-9, abs_tol=1e-6)
+    assert len(cache) == 1
+    assert [row.to_dict() for row in generate_complete_schedule(lease_data)] == \
+        [row.to_dict() for row in full(lease_data)]
+
+    # No previous schedule: full generation
+    cache.clear()
+    assert_schedules_match(recalculate_edited_schedule(lease_data), full(lease_data))
+    cache.clear()
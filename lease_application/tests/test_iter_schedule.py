@@ -0,0 +1,64 @@
+"""
+Tests for the streaming schedule engine (iter_schedule())
+
+Run from lease_application/:
+    python -m pytest tests/test_iter_schedule.py -q
+"""
+
+import sys
+import os
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule, iter_schedule
+from tests.schedule_helpers import annual_lease, assert_schedules_match, monthly_lease
+
+LEASES = {
+    'annual': annual_lease(),
+    'monthly with add-ons': monthly_lease(
+        aro=3000.0, aro_table=1, security_deposit=10000.0, security_discount=6.0,
+        security_dates=[date(2022, 3, 1)], increase_security_1=500.0,
+        impairment_dates=[date(2023, 6, 30)], impairment1=100.0,
+        manual_adj='Yes', rental_dates=[date(2024, 2, 1)], rental_2=777.0,
+    ),
+    'monthly transition 2B': monthly_lease(transition_option='2B', transition_date=date(2022, 7, 1),
+                                           prepaid_accrual=50.0),
+    'US-GAAP': monthly_lease(gaap_standard='US-GAAP'),
+}
+
+
+@pytest.mark.parametrize('lease_data', LEASES.values(), ids=list(LEASES))
+def test_iter_schedule_streams_complete_schedule_rows(lease_data):
+    expected = generate_complete_schedule(lease_data, engine='scalar', use_cache=False)
+    assert_schedules_match(list(iter_schedule(lease_data)), expected)
+
+
+def test_iter_schedule_manual_rent_and_impairment_rows():
+    rows = {row.date: row for row in iter_schedule(LEASES['monthly with add-ons'])}
+    assert rows[date(2024, 2, 1)].rental_amount == 777.0
+    plain = {row.date: row for row in iter_schedule(monthly_lease(
+        aro=3000.0, aro_table=1, security_deposit=10000.0, security_discount=6.0,
+        security_dates=[date(2022, 3, 1)], increase_security_1=500.0))}
+    assert rows[date(2023, 6, 30)].depreciation == pytest.approx(plain[date(2023, 6, 30)].depreciation + 100.0)
+
+
+def test_iter_schedule_insert_date():
+    lease_data = monthly_lease()
+    expected = generate_complete_schedule(lease_data, engine='scalar', use_cache=False)
+
+    # A date already in the schedule adds no row
+    assert_schedules_match(list(iter_schedule(lease_data, insert_date=date(2023, 3, 1))), expected)
+
+    # Otherwise a to_date row carrying the previous row's balances, with no
+    # interest or rent of its own
+    insert_date = date(2023, 3, 15)
+    rows = list(iter_schedule(lease_data, insert_date=insert_date))
+    position = next(i for i, row in enumerate(rows) if row.date == insert_date)
+    assert rows[position - 1].date == date(2023, 3, 1)
+    assert_schedules_match(rows[:position] + rows[position + 1:], expected)
+    assert rows[position].lease_liability == expected[position - 1].lease_liability
+    assert rows[position].rou_asset == expected[position - 1].rou_asset
+    assert rows[position].interest == rows[position].rental_amount == 0.0
@@ -0,0 +1,181 @@
+"""
+Tests for lease modifications (core/lease_modifications.py)
+
+A 5-year lease of 1000/month at 8% is modified on 2022-01-01, a plotted payment
+date. Its balances on that row are liability 32301.47 and ROU 29780.89; the
+modifying leases run from 2022-01-01 to the same end date.
+"""
+
+import sys
+import os
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.core.models import LeaseData, OpeningBalances, ProcessingFilters
+from lease_accounting.core.lease_modifications import apply_index_resets, balances_at, process_lease_modifications
+from lease_accounting.core.processor import LeaseProcessor
+from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule, generate_schedule_from
+from tests.schedule_helpers import assert_schedules_match, monthly_lease
+
+MODIFIED_ON = date(2022, 1, 1)
+LIABILITY_AT_MODIFICATION = 32301.47
+ROU_AT_MODIFICATION = 29780.89
+
+
+def original_lease():
+    return LeaseData(
+        auto_id=1, lease_start_date=date(2020, 1, 1), first_payment_date=date(2020, 1, 1),
+        end_date=date(2024, 12, 31), frequency_months=1, day_of_month='1', rental_1=1000.0,
+        borrowing_rate=8.0, date_modified=MODIFIED_ON,
+    )
+
+
+def modifying_lease(rental: float, **terms):
+    terms = {'modifies_this_id': 1, 'date_modified': MODIFIED_ON, **terms}
+    return LeaseData(
+        auto_id=2, lease_start_date=MODIFIED_ON, first_payment_date=MODIFIED_ON,
+        end_date=date(2024, 12, 31), frequency_months=1, day_of_month='1', rental_1=rental,
+        borrowing_rate=8.0, **terms,
+    )
+
+
+def modify(lease_data, previous_lease):
+    schedule = generate_complete_schedule(lease_data, use_cache=False)
+    return schedule, process_lease_modifications(lease_data, schedule, date(2022, 12, 31), previous_lease)
+
+
+def test_balances_are_captured_from_the_modified_lease():
+    lease_data = modifying_lease(1000.0)
+    own, (schedule, results) = modify(lease_data, original_lease())
+    assert results['liability_at_modification'] == pytest.approx(LIABILITY_AT_MODIFICATION, abs=0.01)
+    assert results['rou_at_modification'] == pytest.approx(ROU_AT_MODIFICATION, abs=0.01)
+    # Same remaining rents: G7 is the modifying lease's own opening liability
+    assert schedule[0].lease_liability == pytest.approx(32128.32, abs=0.01)
+    # K9 = G7 - Liability_value, I9 = ROU_value + K9 (VBA Line 800)
+    assert schedule[0].change_in_rou == pytest.approx(32128.32 - LIABILITY_AT_MODIFICATION, abs=0.01)
+    assert schedule[0].rou_asset == pytest.approx(ROU_AT_MODIFICATION + 32128.32 - LIABILITY_AT_MODIFICATION, abs=0.01)
+    assert results['modification_gain'] == 0.0 and results['covid_pe_gain'] == 0.0
+    assert schedule[0].rou_asset != own[0].rou_asset
+
+
+def test_practical_expedient_books_the_liability_change_as_a_gain():
+    _, (schedule, results) = modify(modifying_lease(1000.0, practical_expedient="Yes"), original_lease())
+    # K7 = G7 - Liability_value; the ROU carries over (VBA Line 796-798)
+    assert results['covid_pe_gain'] == pytest.approx(32128.32 - LIABILITY_AT_MODIFICATION, abs=0.01)
+    assert results['modification_gain'] == 0.0
+    assert schedule[0].rou_asset == pytest.approx(ROU_AT_MODIFICATION, abs=0.01)
+
+
+def test_negative_rou_is_booked_as_modification_gain():
+    _, (schedule, results) = modify(modifying_lease(50.0), original_lease())
+    # Rent cut to 50: G7 = 1606.42 and ROU_value + K9 < 0, so K6 = K9 + ROU_value and I9 = 0 (VBA Line 802-806)
+    g7 = schedule[0].lease_liability
+    assert g7 == pytest.approx(1606.42, abs=0.01)
+    assert results['modification_gain'] == pytest.approx(g7 - LIABILITY_AT_MODIFICATION + ROU_AT_MODIFICATION, abs=0.01)
+    assert schedule[0].rou_asset == pytest.approx(0.0, abs=1e-6)
+
+
+def test_sublease_modification_gain():
+    _, (schedule, results) = modify(modifying_lease(1000.0, sublease="Yes"), original_lease())
+    # K5 = Liability_value - G7 (VBA Line 808-812)
+    assert results['sublease_modification_gainloss'] == pytest.approx(LIABILITY_AT_MODIFICATION - 32128.32, abs=0.01)
+
+
+def test_schedule_is_unchanged_without_the_modified_lease():
+    lease_data = modifying_lease(1000.0)
+    own, (schedule, results) = modify(lease_data, None)
+    assert schedule is own
+    assert all(value == 0.0 for value in results.values())
+
+    # /calculate_lease and bulk runs without the modified lease: results as if unmodified
+    filters = ProcessingFilters(start_date=date(2022, 1, 1), end_date=date(2022, 12, 31))
+    unmodified = LeaseProcessor(filters).process_single_lease(modifying_lease(1000.0, modifies_this_id=None))
+    result = LeaseProcessor(filters).process_single_lease(modifying_lease(1000.0))
+    assert result.opening_rou_asset == pytest.approx(unmodified.opening_rou_asset)
+    assert result.closing_rou_asset == pytest.approx(unmodified.closing_rou_asset)
+
+    modified = LeaseProcessor(filters).process_single_lease(modifying_lease(1000.0), previous_lease=original_lease())
+    assert modified.closing_rou_asset < unmodified.closing_rou_asset
+
+
+def test_modifying_lease_schedule_is_only_generated_from_the_modification(monkeypatch):
+    from lease_accounting.core import processor
+    from lease_accounting.core.lease_modifications import generate_complete_schedule as modified_schedule
+
+    generated = []
+
+    def recording(lease_data, *args, **kwargs):
+        generated.append(lease_data.auto_id)
+        return modified_schedule(lease_data, *args, **kwargs)
+
+    monkeypatch.setattr(processor, 'generate_complete_schedule', recording)
+    monkeypatch.setattr('lease_accounting.core.lease_modifications.generate_complete_schedule', recording)
+    for results_only in (False, True):
+        generated.clear()
+        filters = ProcessingFilters(start_date=date(2022, 1, 1), end_date=date(2022, 12, 31),
+                                    results_only=results_only, compact_schedules=results_only)
+        lease_processor = LeaseProcessor(filters)
+        lease_data = modifying_lease(1000.0)
+        schedule = lease_processor.lease_schedule(lease_data, previous_lease=original_lease())
+        # Only the modified lease's schedule, for its balances
+        assert generated == [1]
+        assert schedule[0].rou_asset == pytest.approx(ROU_AT_MODIFICATION + 32128.32 - LIABILITY_AT_MODIFICATION,
+                                                      abs=0.01)
+        # The modification results are kept on lease_data for result_from_schedule()
+        result = lease_processor.result_from_schedule(lease_data, schedule)
+        assert result.to_dict() == lease_processor.process_single_lease(
+            modifying_lease(1000.0), previous_lease=original_lease()).to_dict()
+
+
+def test_index_rate_table_alone_does_not_remeasure():
+    # No index rate series is read, so naming a table leaves the results unchanged
+    filters = ProcessingFilters(start_date=date(2021, 1, 1), end_date=date(2021, 12, 31))
+    plain = LeaseProcessor(filters).process_single_lease(original_lease())
+    indexed = original_lease()
+    indexed.index_rate_table = 'CPI'
+    assert LeaseProcessor(filters).process_single_lease(indexed).to_dict() == plain.to_dict()
+
+
+def test_generate_schedule_from_restart():
+    # Restarting at C9 with the lease's own opening balances reproduces the schedule
+    for lease_data in (original_lease(), monthly_lease(security_deposit=10000.0, security_discount=6.0,
+                                                       aro=3000.0, aro_table=1)):
+        expected = generate_complete_schedule(lease_data, use_cache=False)
+        opening = expected[0]
+        balances = OpeningBalances(
+            lease_liability=opening.lease_liability,
+            rou_asset=opening.lease_liability,
+            security_deposit_pv=opening.security_deposit_pv,
+            aro_provision=opening.aro_provision or 0.0,
+        )
+        assert_schedules_match(generate_schedule_from(lease_data, None, balances), expected, abs_tol=1e-9)
+
+    # Index resets regenerate only from each reset date, seeded from the balances there
+    lease_data = monthly_lease(end_date=date(2029, 12, 31), index_rate_table='CPI')
+    schedule = generate_complete_schedule(lease_data, use_cache=False)
+    reset = date(2022, 1, 1)
+    restarted = generate_schedule_from(lease_data, reset, balances_at(lease_data, schedule, reset))
+    assert restarted[0].date == reset and restarted[-1].date == schedule[-1].date
+    assert [row.rental_amount for row in restarted] == [row.rental_amount for row in schedule if row.date >= reset]
+
+    resets = apply_index_resets(lease_data, schedule, date(2022, 6, 30))
+    before = [row for row in schedule if row.date < reset]
+    assert_schedules_match(resets[:len(before)], before)
+    assert_schedules_match(resets[len(before):], restarted)
+
+
+def test_balances_between_rows_accrue_interest_from_the_previous_row():
+    lease_data = original_lease()
+    schedule = generate_complete_schedule(lease_data, use_cache=False)
+    # 2022-01-01 is plotted: its balances as they are
+    assert balances_at(lease_data, schedule, MODIFIED_ON).lease_liability == pytest.approx(
+        LIABILITY_AT_MODIFICATION, abs=0.01)
+    # 10 days after the 2022-01-01 payment: 8% monthly compounding over 10/365 of a year
+    balances = balances_at(lease_data, schedule, date(2022, 1, 11))
+    previous = next(row for row in schedule if row.date == MODIFIED_ON)
+    assert balances.lease_liability == pytest.approx(
+        previous.lease_liability * (1 + 0.08 / 12) ** ((10 / 365) * 12), rel=1e-12)
+    assert balances.rou_asset == previous.rou_asset
@@ -0,0 +1,108 @@
+"""
+Tests for multi-standard schedule generation (schedule/multi_gaap.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_multi_gaap.py -q
+"""
+
+import sys
+import os
+import random
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.core.models import ProcessingFilters
+from lease_accounting.core.results_processor import ResultsProcessor
+from lease_accounting.schedule.cache import ScheduleCache, get_schedule_cache
+from lease_accounting.schedule import multi_gaap
+from lease_accounting.schedule.multi_gaap import GAAP_STANDARDS, generate_schedules_by_standard
+from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
+from tests.schedule_helpers import (
+    SCHEDULE_FIELDS, annual_lease, assert_schedules_match, random_leases, run_generator, with_standard,
+)
+
+
+def test_only_usgaap_operating_depreciation_differs():
+    lease_data = annual_lease(impairment_dates=[date(2022, 1, 1)], impairment1=100.0)
+    schedules = generate_schedules_by_standard(lease_data, use_cache=False)
+    assert set(schedules) == set(GAAP_STANDARDS)
+    assert_schedules_match(schedules['IndAS'], schedules['IFRS'])
+    assert schedules['IndAS'] is not schedules['IFRS'] and schedules['IndAS'][0] is not schedules['IFRS'][0]
+
+    # US-GAAP operating lease: same E-H and K-O columns, its own J/I
+    ifrs, operating = schedules['IFRS'], schedules['US-GAAP']
+    for name in set(SCHEDULE_FIELDS) - {'depreciation', 'rou_asset'}:
+        assert [getattr(row, name) for row in operating] == [getattr(row, name) for row in ifrs], name
+    assert operating[1].depreciation != pytest.approx(ifrs[1].depreciation)
+    # addimpair() adds to J under every standard, on its date only
+    for standard in ('IFRS', 'US-GAAP'):
+        plain = generate_complete_schedule(with_standard(annual_lease(), standard), use_cache=False)
+        impaired = {new.date: new.depreciation - old.depreciation for old, new in zip(plain, schedules[standard])}
+        assert impaired.pop(date(2022, 1, 1)) == pytest.approx(100.0)
+        assert set(impaired.values()) == {0.0}
+
+    # US-GAAP finance lease: the straight line
+    finance = generate_schedules_by_standard(annual_lease(finance_lease_usgaap='Yes'), ['IFRS', 'US-GAAP'],
+                                             use_cache=False)
+    assert_schedules_match(finance['US-GAAP'], finance['IFRS'])
+
+
+def test_schedules_by_standard_use_and_fill_the_cache(monkeypatch):
+    cache = ScheduleCache()
+    monkeypatch.setattr(multi_gaap, 'get_schedule_cache', lambda: cache)
+    lease_data = annual_lease()
+    first = generate_schedules_by_standard(lease_data)
+    assert cache.stats()['entries'] == 3 and cache.stats()['misses'] == 3
+    second = generate_schedules_by_standard(lease_data)
+    assert cache.stats()['hits'] == 3
+    for standard in GAAP_STANDARDS:
+        assert_schedules_match(second[standard], first[standard])
+    # Hits are new rows
+    second['IFRS'][0].rental_amount = -1.0
+    assert generate_schedules_by_standard(lease_data, ['IFRS', 'IndAS'])['IndAS'][0].rental_amount == 1000.0
+
+    # Only the standards not cached yet are generated
+    cache.clear()
+    generate_schedules_by_standard(lease_data, ['US-GAAP'])
+    generate_schedules_by_standard(lease_data)
+    assert cache.stats()['entries'] == 3
+
+
+def test_schedules_by_standard_match_per_standard_generation():
+    rng = random.Random(23)
+    leases = [lease for lease in random_leases(40, seed=23)
+              if not isinstance(run_generator(generate_complete_schedule, lease), type)]
+    for lease in leases:
+        lease.finance_lease_usgaap = rng.choice(['No', 'No', 'Yes'])
+        # A plotted date, so addimpair() adds to J
+        plotted = generate_complete_schedule(lease, use_cache=False)
+        lease.impairment_dates = [plotted[len(plotted) // 2].date]
+        lease.impairment1 = rng.choice([0.0, 750.0])
+        if rng.random() < 0.3:
+            lease.transition_option = '2B'
+            lease.transition_date = lease.lease_start_date + timedelta(days=200)
+    leases[0].fv_of_rou = 50000.0
+
+    for lease in leases:
+        schedules = generate_schedules_by_standard(lease, use_cache=False)
+        for standard in GAAP_STANDARDS:
+            expected = generate_complete_schedule(with_standard(lease, standard), use_cache=False)
+            assert_schedules_match(schedules[standard], expected)
+
+    # Bulk GAAP comparison equals one process_bulk_leases() run per standard
+    filters = ProcessingFilters(start_date=date(2020, 1, 1), end_date=date(2020, 12, 31))
+    get_schedule_cache().clear()
+    expected = {}
+    for standard in GAAP_STANDARDS:
+        per_standard = [with_standard(lease, standard) for lease in leases]
+        expected[standard] = ResultsProcessor(ProcessingFilters(start_date=filters.start_date, end_date=filters.end_date,
+                                                                gaap_standard=standard),
+                                              workers=1).process_bulk_leases(per_standard)
+    get_schedule_cache().clear()
+    original_standards = [lease.gaap_standard for lease in leases]
+    by_standard = ResultsProcessor(filters, workers=1).process_bulk_leases_by_standard(leases)
+    assert by_standard == expected
+    assert [lease.gaap_standard for lease in leases] == original_standards
@@ -0,0 +1,90 @@
+"""
+Tests for projections (core/projection_calculator.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_projections.py -q
+"""
+
+import sys
+import os
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.core.projection_calculator import ProjectionCalculator
+from lease_accounting.core.schedule_index import ScheduleIndex
+from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
+from tests.schedule_helpers import monthly_lease
+
+BALANCE_DATE = date(2021, 1, 15)
+# Rents of the monthly lease after BALANCE_DATE: February-December 2021, then
+# four years of 12 rents escalated by 5% a year
+REMAINING_RENT = 11 * 1000 + 12 * (1050 + 1102.5 + 1157.625 + 1215.50625)
+
+
+def test_projections_default_to_six_periods():
+    lease_data = monthly_lease()
+    calculator = ProjectionCalculator(generate_complete_schedule(lease_data, use_cache=False), lease_data)
+    # VBA-compatible: capped at 6 periods
+    assert len(calculator.calculate_projections(BALANCE_DATE, projection_periods=12, period_months=1)) == 6
+
+
+def test_extended_yearly_projections_to_lease_end():
+    lease_data = monthly_lease()
+    calculator = ProjectionCalculator(generate_complete_schedule(lease_data, use_cache=False), lease_data)
+    projections = calculator.calculate_projections(BALANCE_DATE, projection_periods=None, period_months=12,
+                                                   extended=True)
+    assert [p['projection_date'] for p in projections] == \
+        ['2022-01-31', '2023-01-31', '2024-01-31', '2025-01-31', '2025-12-31']
+    assert [p['projection_mode'] for p in projections] == [1, 2, 3, 4, 5]
+    # February 2021 to January 2022: 11 rents of 1000 and the first escalated rent
+    assert projections[0]['rent_paid'] == pytest.approx(11 * 1000 + 1050)
+    assert projections[-1]['rent_paid'] == pytest.approx(11 * 1215.50625)
+    assert sum(p['rent_paid'] for p in projections) == pytest.approx(REMAINING_RENT)
+
+
+def test_extended_monthly_projections_match_the_schedule():
+    lease_data = monthly_lease()
+    schedule = generate_complete_schedule(lease_data, use_cache=False)
+    projections = ProjectionCalculator(schedule, lease_data).calculate_projections(
+        BALANCE_DATE, projection_periods=None, period_months=1, extended=True)
+    # 2021-02-28 to 2025-12-31: more than the 6 VBA periods
+    assert len(projections) == 59
+    assert projections[-1]['projection_date'] == lease_data.end_date.isoformat()
+    assert sum(p['rent_paid'] for p in projections) == pytest.approx(REMAINING_RENT)
+    remaining = [row for row in schedule if BALANCE_DATE < row.date <= lease_data.end_date]
+    assert sum(p['interest'] for p in projections) == pytest.approx(sum(row.interest for row in remaining), rel=1e-12)
+
+    # Each period equals a direct scan of the schedule
+    opening = BALANCE_DATE
+    for projection in projections:
+        closing = date.fromisoformat(projection['projection_date'])
+        in_period = [row for row in schedule if opening < row.date <= closing]
+        assert projection['depreciation'] == pytest.approx(sum(row.depreciation for row in in_period), rel=1e-12)
+        assert projection['closing_liability'] == [row for row in schedule if row.date <= closing][-1].lease_liability
+        opening = closing
+
+    # Subleases project with the opposite sign
+    sublease = monthly_lease(sublease='Yes')
+    sublet = ProjectionCalculator(generate_complete_schedule(sublease, use_cache=False), sublease).calculate_projections(
+        BALANCE_DATE, projection_periods=None, period_months=1, extended=True)
+    assert [p['rent_paid'] for p in sublet] == [-p['rent_paid'] for p in projections]
+
+
+def test_projection_index_reuse_and_unordered_fallback():
+    lease_data = monthly_lease()
+    schedule = generate_complete_schedule(lease_data, use_cache=False)
+    # A caller's index for this schedule is reused; one for another schedule is not
+    index = ScheduleIndex(schedule)
+    assert ProjectionCalculator(schedule, lease_data, index).index is index
+    assert ProjectionCalculator(list(schedule), lease_data, index).index is not index
+    # Unordered schedules fall back to the row scans
+    shuffled = schedule[::-1]
+    assert not ProjectionCalculator(shuffled, lease_data).index.ordered
+    expected = ProjectionCalculator(schedule, lease_data).calculate_projections(
+        BALANCE_DATE, projection_periods=None, period_months=3, extended=True)
+    actual = ProjectionCalculator(shuffled, lease_data).calculate_projections(
+        BALANCE_DATE, projection_periods=None, period_months=3, extended=True)
+    assert [p['projection_date'] for p in actual] == [p['projection_date'] for p in expected]
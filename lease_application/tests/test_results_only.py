@@ -0,0 +1,63 @@
+"""
+Tests for results-only processing (LeaseProcessor with ProcessingFilters.results_only)
+
+Run from lease_application/:
+    python -m pytest tests/test_results_only.py -q
+"""
+
+import sys
+import os
+from dataclasses import asdict, replace
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.core.models import ProcessingFilters
+from lease_accounting.core.processor import LeaseProcessor
+from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
+from tests.schedule_helpers import annual_lease, assert_schedules_match, monthly_lease
+
+# 2022 results with six quarterly projections: VBA moves baldatep on twice per
+# period, so nothing after 2022-12-31 + 36 months is read
+HORIZON = date(2025, 12, 31)
+FILTERS = ProcessingFilters(start_date=date(2022, 1, 1), end_date=date(2022, 12, 31),
+                            projection_periods=6, projection_period_months=3)
+
+LEASES = {
+    'long lease': monthly_lease(end_date=date(2060, 12, 31)),
+    'security deposit increase': monthly_lease(end_date=date(2060, 12, 31), security_deposit=10000.0,
+                                               security_discount=6.0, security_dates=[date(2022, 6, 1)],
+                                               increase_security_1=500.0),
+    'quarterly on the 15th': monthly_lease(end_date=date(2040, 6, 30), frequency_months=3,
+                                           first_payment_date=date(2021, 2, 15), day_of_month='15'),
+    'ends within the horizon': annual_lease(),
+}
+
+
+@pytest.mark.parametrize('lease_data', LEASES.values(), ids=list(LEASES))
+def test_results_only_mode_matches_full_schedule(lease_data):
+    fast_processor = LeaseProcessor(replace(FILTERS, results_only=True))
+    schedule = fast_processor._results_only_schedule(lease_data)
+    full_schedule = generate_complete_schedule(lease_data)
+    if lease_data.end_date <= HORIZON:
+        assert schedule is None
+    else:
+        # Rows up to the first one after the horizon
+        assert schedule[-1].date > HORIZON >= schedule[-2].date
+        assert len(schedule) < len(full_schedule)
+        assert_schedules_match(schedule, full_schedule[:len(schedule)])
+
+    full = LeaseProcessor(FILTERS).process_single_lease(lease_data)
+    fast = fast_processor.process_single_lease(lease_data)
+    assert asdict(fast) == asdict(full)
+
+
+def test_results_only_needs_the_full_schedule_for_usgaap_operating_leases():
+    # Depreciation reads Sum(F10:$F$endrow) of the whole schedule
+    lease_data = monthly_lease(end_date=date(2060, 12, 31), gaap_standard='US-GAAP')
+    processor = LeaseProcessor(replace(FILTERS, results_only=True))
+    assert processor._results_only_schedule(lease_data) is None
+    assert asdict(processor.process_single_lease(lease_data)) == \
+        asdict(LeaseProcessor(FILTERS).process_single_lease(lease_data))
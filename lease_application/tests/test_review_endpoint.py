@@ -0,0 +1,77 @@
+"""
+Tests for the reviewer field edit endpoint (review_backend.py)
+
+Needs Flask and the database dependencies; the database is created in a
+temporary directory.
+"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LEASE = {
+    'lease_name': 'Reviewed lease',
+    'lease_start_date': '2024-01-01',
+    'first_payment_date': '2024-01-01',
+    'end_date': '2028-12-31',
+    'frequency_months': 1,
+    'day_of_month': '1',
+    'rental_1': 1000,
+    'borrowing_rate': 8,
+}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    flask = pytest.importorskip('flask')
+    pytest.importorskip('bcrypt')
+    pytest.importorskip('cryptography')
+    # database.py creates its file in the working directory on import
+    monkeypatch.chdir(tmp_path)
+    import database
+    import review_backend
+
+    database.close_db_connections()
+    monkeypatch.setattr(database, 'DATABASE_PATH', str(tmp_path / 'review.db'))
+    database.init_database()
+    app = flask.Flask(__name__)
+    app.secret_key = 'test'
+    app.register_blueprint(review_backend.review_bp)
+    yield app.test_client()
+    database.close_db_connections()
+
+
+def test_save_edit_recalculates_schedule_on_request(client):
+    import database
+    from lease_accounting.schedule.cache import get_schedule_cache
+    from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
+
+    user_id = database.create_user('reviewer', 'secret')
+    lease_id = database.save_lease(user_id, LEASE)
+    with client.session_transaction() as flask_session:
+        flask_session['user_id'] = user_id
+    edit = {'field_name': 'rental_1', 'original_ai_value': '1000', 'reviewer_value': '1100'}
+
+    # Without the opt-in only the audit row is written
+    assert 'schedule' not in client.post(f'/api/review/{lease_id}/save-edit', json=edit).get_json()
+
+    cache = get_schedule_cache()
+    cache.clear()
+    stored = database.get_leases_by_ids([lease_id], as_lease_data=True)[lease_id]
+    generate_complete_schedule(stored)
+    body = client.post(f'/api/review/{lease_id}/save-edit', json=dict(edit, recalculate=True)).get_json()
+    assert body['success']
+    # Recalculated from the stored lease's schedule; the incremental result is not cached
+    assert len(cache) == 1
+    stored.rental_1 = 1100.0
+    expected = generate_complete_schedule(stored, use_cache=False)
+    assert len(body['schedule']) == len(expected)
+    assert body['schedule'][0]['lease_liability'] == pytest.approx(expected[0].lease_liability)
+    assert body['schedule'][-1]['rou_asset'] == pytest.approx(expected[-1].rou_asset, abs=1e-6)
+
+    bad = dict(edit, reviewer_value='n/a', recalculate=True)
+    assert client.post(f'/api/review/{lease_id}/save-edit', json=bad).get_json()['schedule'] is None
+    cache.clear()
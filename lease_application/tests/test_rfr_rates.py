@@ -0,0 +1,40 @@
+"""
+Tests for the RFR rate tables (utils/rfr_rates.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_rfr_rates.py -q
+"""
+
+import sys
+import os
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.utils.rfr_rates import RFRRateTable
+
+
+def test_rfr_bisect_lookup_matches_scan():
+    table = RFRRateTable()
+    table.rate_tables[3] = [(date(2019, 3, 1), 0.05), (date(2019, 3, 1), 0.06), (date(2010, 1, 1), 0.04)]
+    table.rate_tables[3].sort(key=lambda x: x[0], reverse=True)
+    table._compile()
+
+    def scan(rate_date, number):
+        entries = table.rate_tables.get(number) or []
+        for table_date, rate in entries:
+            if table_date <= rate_date:
+                return rate
+        return entries[0][1] if entries else 0.0
+
+    dates = [date(2005, 6, 1) + timedelta(days=37 * n) for n in range(200)] + [date(2019, 3, 1)]
+    for number in (0, 1, 2, 3, 4):
+        expected = [scan(d, number) for d in dates]
+        assert [table.get_rate(d, number) for d in dates] == expected
+        assert table.get_rates(dates, number) == expected
+
+    # Latest entry on or before the date, the first listed of two on the same date;
+    # before the table starts, its first entry (the latest date)
+    assert table.get_rate(date(2019, 2, 28), 3) == 0.04
+    assert table.get_rate(date(2019, 3, 1), 3) == 0.05
+    assert table.get_rate(date(2005, 1, 1), 3) == 0.05
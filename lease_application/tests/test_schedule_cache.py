@@ -0,0 +1,115 @@
+"""
+Tests for the schedule cache (schedule/cache.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_schedule_cache.py -q
+"""
+
+import sys
+import os
+import copy
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.core.schedule_frame import ScheduleFrame
+from lease_accounting.schedule.cache import ScheduleCache, get_schedule_cache, schedule_cache_key, schedule_cache_keys
+from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
+from lease_accounting.utils.rfr_rates import get_rfr_version, update_rfr_table, _rfr_table
+from tests.schedule_helpers import annual_lease, assert_schedules_match, with_standard
+
+
+def test_schedule_cache_hits_and_misses():
+    cache = get_schedule_cache()
+    cache.clear()
+    lease_data = annual_lease()
+    hits, misses = cache.hits, cache.misses
+
+    first = generate_complete_schedule(lease_data)
+    second = generate_complete_schedule(lease_data)
+    assert (cache.hits - hits, cache.misses - misses) == (1, 1)
+    assert_schedules_match(second, first)
+
+    # Callers get their own rows; descriptive fields do not change the key
+    second[1].rental_amount = -1.0
+    lease_data.description = 'renamed'
+    assert generate_complete_schedule(lease_data)[1].rental_amount == first[1].rental_amount
+    assert cache.hits - hits == 2
+    cache.clear()
+
+
+def test_schedule_cache_key_covers_inputs_gaap_and_rfr_tables():
+    lease_data = annual_lease()
+    key = schedule_cache_key(lease_data, 'scalar')
+    assert schedule_cache_key(copy.deepcopy(lease_data), 'scalar') == key
+    assert schedule_cache_key(lease_data, 'numpy') != key
+    assert schedule_cache_key(with_standard(lease_data, 'US-GAAP'), 'scalar') != key
+    lease_data.borrowing_rate += 1
+    assert schedule_cache_key(lease_data, 'scalar') != key
+
+    # Keys for several standards at once equal one schedule_cache_key() per standard
+    keys = schedule_cache_keys(lease_data, 'scalar', ['IFRS', 'IndAS', 'US-GAAP'])
+    assert keys == {standard: schedule_cache_key(with_standard(lease_data, standard), 'scalar')
+                    for standard in ('IFRS', 'IndAS', 'US-GAAP')}
+
+    # An RFR update only changes the keys of leases with an ARO on that table
+    lease_data.aro, lease_data.aro_table = 3000.0, 1
+    key = schedule_cache_key(lease_data, 'scalar')
+    version, table_version = get_rfr_version(), get_rfr_version(1)
+    rates = {table: list(rates) for table, rates in _rfr_table.rate_tables.items()}
+    update_rfr_table({table: list(entries) for table, entries in rates.items()})
+    assert get_rfr_version() == version + 1 and get_rfr_version(1) == table_version
+    assert schedule_cache_key(lease_data, 'scalar') == key
+    other = copy.deepcopy(lease_data)
+    other.aro_table = 2
+    other_key = schedule_cache_key(other, 'scalar')
+    update_rfr_table({**rates, 1: [(date(2000, 1, 1), 0.05)] + rates[1]})
+    try:
+        assert get_rfr_version(1) == table_version + 1
+        assert schedule_cache_key(lease_data, 'scalar') != key
+        assert schedule_cache_key(other, 'scalar') == other_key
+    finally:
+        update_rfr_table(rates)
+
+
+def test_schedule_cache_lru_eviction_by_rows():
+    rows = generate_complete_schedule(annual_lease(), use_cache=False)
+    small = ScheduleCache(max_rows=len(rows) * 2)
+    for n in range(3):
+        small.put(str(n), rows)
+    small.get('1')
+    small.put('3', rows)
+    assert small.get('0') is None and small.get('2') is None
+    assert small.get('1') is not None and small.get('3') is not None
+    assert small.stats()['evictions'] == 2 and small.stats()['rows'] <= small.max_rows
+
+    # A frame can be stored under several keys; each get() returns new rows
+    small.clear()
+    frame = ScheduleFrame.from_rows(rows)
+    small.put('a', frame)
+    small.put('b', frame)
+    first, second = small.get('a'), small.get('b')
+    first[0].rental_amount = -1.0
+    assert second[0].rental_amount == 1000.0 and small.get('a')[0].rental_amount == 1000.0
+
+
+def test_schedule_cache_tracks_latest_schedule_per_lease():
+    rows = generate_complete_schedule(annual_lease(), use_cache=False)
+    small = ScheduleCache(max_rows=len(rows) * 2)
+    leases = [annual_lease(auto_id=n + 1) for n in range(4)]
+    for n, lease in enumerate(leases):
+        small.put(str(n), rows, lease, 'scalar')
+    # Two schedules fit: the first two leases were evicted with theirs
+    assert small.stats()['latest'] == 2
+    assert small.latest_for(leases[0], 'scalar') is None and small.latest_for(leases[3], 'scalar') is not None
+    assert small.latest_for(leases[3], 'numpy') is None
+    # A lease's newer schedule replaces its previous one
+    small.put('4', rows, leases[3], 'scalar')
+    assert small.stats()['latest'] == 1 and small.latest_for(leases[2], 'scalar') is None
+    # Leases without an id (ad-hoc calculations) do not take a lease's slot
+    ad_hoc = annual_lease(auto_id=0)
+    small.put('5', rows, ad_hoc, 'scalar')
+    assert small.stats()['latest'] == 1 and small.latest_for(ad_hoc, 'scalar') is None
+    snapshot, latest_rows = small.latest_for(leases[3], 'scalar')
+    assert snapshot == leases[3] and snapshot is not leases[3]
+    assert_schedules_match(latest_rows, rows)
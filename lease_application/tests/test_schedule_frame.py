@@ -0,0 +1,71 @@
+"""
+Tests for the columnar schedule (core/schedule_frame.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_schedule_frame.py -q
+"""
+
+import sys
+import os
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.core.models import ProcessingFilters
+from lease_accounting.core.processor import LeaseProcessor
+from lease_accounting.core.projection_calculator import ProjectionCalculator
+from lease_accounting.core.schedule_frame import ScheduleFrame
+from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
+from lease_accounting.utils.disclosures_generator import DisclosuresGenerator
+from tests.schedule_helpers import ANNUAL_LEASE_G7, annual_lease, assert_schedules_match, monthly_lease
+
+
+def test_frame_round_trip():
+    lease_data = annual_lease()
+    rows = generate_complete_schedule(lease_data, use_cache=False)
+    frame = generate_complete_schedule(lease_data, as_frame=True, use_cache=False)
+    assert isinstance(frame, ScheduleFrame)
+    assert frame.column('lease_liability')[0] == pytest.approx(ANNUAL_LEASE_G7)
+    assert frame.to_dicts() == [row.to_dict() for row in rows]
+    assert frame.to_rows() == rows
+    assert_schedules_match(list(frame), rows)
+    assert frame[-1] == rows[-1] and frame.index(frame[-1]) == len(frame) - 1
+    assert [row.date for row in frame[1:3]] == [date(2021, 1, 31), date(2021, 2, 28)]
+    assert frame.memory_bytes() < 150 * len(frame)
+
+    # No ARO: M/N/O stay None, not 0
+    assert rows[1].aro_gross is None and frame[1].aro_gross is None
+
+    # Row views write through to the columns
+    frame[1].aro_gross = 12.0
+    frame[1].interest = 12.5
+    assert frame[1].aro_gross == 12.0 and frame.column('interest')[1] == 12.5
+    frame[1].aro_gross = None
+    assert frame[1].aro_gross is None
+    with pytest.raises(IndexError):
+        frame[len(frame)]
+
+
+def test_frame_consumers_match_row_lists():
+    leases = [annual_lease(), monthly_lease(aro=3000.0, aro_table=1, security_deposit=10000.0, security_discount=6.0)]
+    rows_list = [generate_complete_schedule(lease, use_cache=False) for lease in leases]
+    frames = [generate_complete_schedule(lease, as_frame=True, use_cache=False) for lease in leases]
+    processor = LeaseProcessor(ProcessingFilters())
+
+    for lease_data, rows, frame in zip(leases, rows_list, frames):
+        for balance_date in (date(2021, 6, 30), date(2022, 1, 1), date(2023, 3, 15)):
+            period_start = date(balance_date.year, 1, 1)
+            assert processor.get_opening_balances(frame, balance_date) == \
+                processor.get_opening_balances(rows, balance_date)
+            assert processor.get_closing_balances(frame, balance_date) == \
+                processor.get_closing_balances(rows, balance_date)
+            assert processor.calculate_period_activity(frame, period_start, balance_date) == \
+                processor.calculate_period_activity(rows, period_start, balance_date)
+            assert ProjectionCalculator(frame, lease_data).calculate_projections(balance_date) == \
+                ProjectionCalculator(rows, lease_data).calculate_projections(balance_date)
+
+    balance_date = date(2021, 12, 31)
+    assert DisclosuresGenerator().generate_disclosures([], leases, frames, balance_date) == \
+        DisclosuresGenerator().generate_disclosures([], leases, rows_list, balance_date)
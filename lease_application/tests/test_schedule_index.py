@@ -0,0 +1,90 @@
+"""
+Tests for indexed schedule lookups (core/schedule_index.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_schedule_index.py -q
+"""
+
+import sys
+import os
+from dataclasses import asdict
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.core import processor as processor_module
+from lease_accounting.core.models import ProcessingFilters
+from lease_accounting.core.processor import LeaseProcessor
+from lease_accounting.core.schedule_index import ScheduleIndex
+from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
+from tests.schedule_helpers import ANNUAL_LEASE_G7, annual_lease, monthly_lease
+
+LEASES = [
+    annual_lease(),
+    monthly_lease(aro=3000.0, aro_table=1, security_deposit=10000.0, security_discount=6.0),
+    monthly_lease(gaap_standard='US-GAAP', frequency_months=3, first_payment_date=date(2021, 2, 15), day_of_month='15'),
+]
+
+
+def test_annual_lease_balances_and_activity():
+    index = ScheduleIndex(generate_complete_schedule(annual_lease(), use_cache=False))
+    # Balances after the 2022-01-01 payment; at 2021-12-31, 364 days of interest
+    # and depreciation on G7
+    assert index.opening_balances(date(2022, 1, 1))[0] == pytest.approx(1.1 * ANNUAL_LEASE_G7 - 1000, rel=1e-12)
+    liability, rou, _, _ = index.closing_balances(date(2021, 12, 31))
+    assert liability == pytest.approx(ANNUAL_LEASE_G7 * 1.1 ** (364 / 365), rel=1e-12)
+    assert rou == pytest.approx(ANNUAL_LEASE_G7 * (1 - 364 / 1094), rel=1e-12)
+
+    activity = index.period_activity(date(2021, 12, 31), date(2022, 12, 31), None)
+    assert activity['rent_paid'] == 1000.0
+    assert activity['depreciation'] == pytest.approx(ANNUAL_LEASE_G7 * 365 / 1094, rel=1e-12)
+    # A day's interest on G7 to the payment, then 364 days on the balance after it
+    assert activity['interest'] == pytest.approx(
+        ANNUAL_LEASE_G7 * (1.1 - 1.1 ** (364 / 365)) + (1.1 * ANNUAL_LEASE_G7 - 1000) * (1.1 ** (364 / 365) - 1),
+        rel=1e-12)
+
+
+@pytest.mark.parametrize('lease_data', LEASES, ids=['annual', 'monthly', 'quarterly US-GAAP'])
+def test_schedule_index_lookups_match_scans(lease_data):
+    processor = LeaseProcessor(ProcessingFilters())
+    schedule = generate_complete_schedule(lease_data, use_cache=False)
+    index = ScheduleIndex(schedule)
+    assert index.ordered
+    # Before the start, on plotted rows, between rows and after the end
+    days = [schedule[0].date - timedelta(days=10), schedule[0].date, schedule[1].date,
+            schedule[1].date + timedelta(days=3), date(2022, 1, 1), date(2022, 6, 15),
+            schedule[-1].date, schedule[-1].date + timedelta(days=40)]
+    for day in days:
+        assert index.opening_balances(day) == processor.get_opening_balances(schedule, day)
+        assert index.closing_balances(day) == processor.get_closing_balances(schedule, day)
+        assert processor._get_pv_factor_at_date(schedule, day, lease_data, index) == \
+            processor._get_pv_factor_at_date(schedule, day, lease_data)
+        for later in (day + timedelta(days=30), day + timedelta(days=365)):
+            for modified in (None, later, schedule[len(schedule) // 2].date):
+                expected = processor.calculate_period_activity(schedule, day, later, modified)
+                assert index.period_activity(day, later, modified) == pytest.approx(expected, rel=1e-9, abs=1e-6)
+
+
+def test_process_single_lease_with_index_matches_scanning_path(monkeypatch):
+    # Unordered schedules fall back to the row scans
+    class UnorderedIndex(ScheduleIndex):
+        def __init__(self, schedule):
+            super().__init__(schedule)
+            self.ordered = False
+
+    filters = ProcessingFilters(start_date=date(2021, 12, 31), end_date=date(2022, 12, 31))
+    indexed = [LeaseProcessor(filters).process_single_lease(lease) for lease in LEASES]
+    monkeypatch.setattr(processor_module, 'ScheduleIndex', UnorderedIndex)
+    scanned = [LeaseProcessor(filters).process_single_lease(lease) for lease in LEASES]
+    for fast, slow in zip(indexed, scanned):
+        assert fast is not None and slow is not None
+        for name, value in asdict(slow).items():
+            if isinstance(value, float):
+                assert getattr(fast, name) == pytest.approx(value, rel=1e-9, abs=1e-6), name
+            elif name == 'projections':
+                # Period sums come from prefix sums on the indexed path
+                assert [pytest.approx(p, rel=1e-9, abs=1e-6) for p in value] == getattr(fast, name)
+            else:
+                assert getattr(fast, name) == value, name
@@ -0,0 +1,44 @@
+"""
+Tests for the timing cache (schedule/timing_cache.py)
+
+Run from lease_application/:
+    python -m pytest tests/test_timing_cache.py -q
+"""
+
+import sys
+import os
+from dataclasses import replace
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lease_accounting.schedule import generator_vba_complete
+from lease_accounting.schedule.generator_vba_complete import generate_complete_schedule
+from lease_accounting.schedule.timing_cache import TimingCache
+from tests.schedule_helpers import annual_lease, assert_schedules_match, monthly_lease
+
+
+def test_timing_cache_shared_by_leases_with_same_terms(monkeypatch):
+    # Two timings; rents, rates and deposits vary within each
+    templates = [annual_lease(), monthly_lease(first_payment_date=date(2021, 1, 15), day_of_month='15')]
+    leases = [replace(template, rental_1=rent, borrowing_rate=rate, security_deposit=deposit)
+              for template in templates
+              for rent, rate, deposit in ((900.0, 4.0, 0.0), (1234.56, 7.25, 2500.0), (48000.0, 4.0, 2500.0))]
+
+    expected = []
+    for lease_data in leases:
+        generator_vba_complete.get_timing_cache().clear()
+        expected.append(generate_complete_schedule(lease_data, use_cache=False))
+
+    cache = TimingCache()
+    monkeypatch.setattr(generator_vba_complete, 'get_timing_cache', lambda: cache)
+    for lease_data, schedule in zip(leases, expected):
+        assert_schedules_match(generate_complete_schedule(lease_data, use_cache=False), schedule)
+
+    # One skeleton and one escalation sequence per timing
+    stats = cache.stats()
+    assert stats['skeletons'] == len(templates)
+    assert stats['misses'] == 2 * len(templates)
+    assert stats['hits'] == 2 * (len(leases) - len(templates))
+    assert cache.skeleton(templates[0]) is cache.skeleton(leases[0])
+    assert cache.skeleton(templates[1]) is not cache.skeleton(templates[0])